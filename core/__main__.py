@@ -0,0 +1,5 @@
+import sys
+
+from core.runner import main
+
+sys.exit(main())
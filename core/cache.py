@@ -0,0 +1,402 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from core import __version__
+from core.instrumentation import count
+
+# Biến môi trường cấu hình bộ nhớ đệm mặc định
+CACHE_ENABLED_ENV = 'NUCLEAR_SIM_CACHE'          # "0" để tắt bộ nhớ đệm
+CACHE_DIR_ENV = 'NUCLEAR_SIM_CACHE_DIR'          # Thư mục tầng đĩa dùng chung giữa các tiến trình
+CACHE_SIZE_ENV = 'NUCLEAR_SIM_CACHE_MB'          # Dung lượng tối đa của tầng bộ nhớ (MB)
+CACHE_TTL_ENV = 'NUCLEAR_SIM_CACHE_TTL'          # Thời gian sống của mục (giây)
+
+
+def _canonicalize(value, hasher):
+    """Đưa giá trị vào hàm băm theo dạng chuẩn (không phụ thuộc thứ tự khóa, kiểu số của NumPy)"""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        hasher.update(f"ndarray:{array.dtype.str}:{array.shape}:".encode())
+        hasher.update(array.tobytes())
+    elif isinstance(value, dict):
+        hasher.update(f"dict:{len(value)}:".encode())
+        for key in sorted(value, key=repr):
+            _canonicalize(key, hasher)
+            _canonicalize(value[key], hasher)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}:{len(value)}:".encode())
+        for item in value:
+            _canonicalize(item, hasher)
+    elif isinstance(value, (bool, np.bool_)):
+        hasher.update(f"bool:{bool(value)};".encode())
+    elif isinstance(value, (int, np.integer)):
+        hasher.update(f"int:{int(value)};".encode())
+    elif isinstance(value, (float, np.floating)):
+        # 1 và 1.0 cho cùng một khóa
+        number = float(value)
+        hasher.update((f"int:{int(number)};" if number.is_integer() else f"float:{number!r};").encode())
+    elif isinstance(value, np.dtype) or (isinstance(value, type) and issubclass(value, np.generic)):
+        hasher.update(f"dtype:{np.dtype(value).str};".encode())
+    elif value is None or isinstance(value, (str, bytes, complex)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    else:
+        raise ValueError(f"Không chuẩn hóa được tham số kiểu {type(value).__name__} cho khóa bộ nhớ đệm")
+
+
+def canonical_key(*parts):
+    """
+    Khóa băm SHA-256 (chuỗi hex) của các tham số sau khi chuẩn hóa.
+
+    Hỗ trợ số, chuỗi, None, list/tuple, dict (không phụ thuộc thứ tự khóa), kiểu dữ liệu
+    NumPy và mảng NumPy (theo kiểu dữ liệu, hình dạng và nội dung).
+    """
+    hasher = hashlib.sha256()
+    _canonicalize(parts, hasher)
+    return hasher.hexdigest()
+
+
+def _freeze(value):
+    """Đặt mọi mảng NumPy trong kết quả thành chỉ đọc (kết quả được dùng chung giữa các lần gọi)"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, (np.ndarray, dict, list, tuple)):
+                _freeze(item)
+    return value
+
+
+def _share(value):
+    """
+    Bản sao cấu trúc của kết quả đã ghi nhớ cho một lời gọi.
+
+    Dictionary và list được sao chép (nông theo từng cấp) để người gọi sửa kết quả không làm
+    hỏng mục trong bộ nhớ đệm; mảng NumPy đã chỉ đọc nên được dùng chung, không sao chép.
+    """
+    if isinstance(value, dict):
+        return {key: _share(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_share(item) if isinstance(item, (dict, list, tuple)) else item for item in value]
+    if isinstance(value, tuple) and any(isinstance(item, (dict, list, tuple)) for item in value):
+        return type(value)(*map(_share, value)) if hasattr(value, '_fields') else tuple(map(_share, value))
+    return value
+
+
+def _input_arrays(value, arrays):
+    """Thu thập các mảng NumPy trong tham số của lời gọi (kể cả lồng trong dict/list/tuple)"""
+    if isinstance(value, np.ndarray):
+        arrays.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _input_arrays(item, arrays)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, (np.ndarray, dict, list, tuple)):
+                _input_arrays(item, arrays)
+    return arrays
+
+
+def _detach(value, inputs):
+    """
+    Sao chép các mảng trong kết quả dùng chung bộ nhớ với tham số của lời gọi (ví dụ mô hình
+    trả lại chính mảng distances được truyền vào), để việc đặt chỉ đọc (_freeze) chỉ áp dụng
+    cho mảng thuộc về bộ nhớ đệm.
+    """
+    if isinstance(value, np.ndarray):
+        return value.copy() if any(np.may_share_memory(value, array) for array in inputs) else value
+    if isinstance(value, dict):
+        return {key: _detach(item, inputs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_detach(item, inputs) if isinstance(item, (np.ndarray, dict, list, tuple)) else item
+                for item in value]
+    if isinstance(value, tuple) and any(isinstance(item, (np.ndarray, dict, list, tuple)) for item in value):
+        items = [_detach(item, inputs) for item in value]
+        return type(value)(*items) if hasattr(value, '_fields') else tuple(items)
+    return value
+
+
+def _source_hash(function):
+    """Băm mã nguồn của module định nghĩa hàm (kết quả cũ tự hết hiệu lực khi mô hình thay đổi)"""
+    try:
+        with open(inspect.getsourcefile(function), 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()[:16]
+    except (OSError, TypeError):
+        return None
+
+
+def _estimate_size(value):
+    """Ước lượng dung lượng bộ nhớ của kết quả (byte)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_size(key) + _estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, (int, float)) for item in value[:16]):
+            return 56 + 32 * len(value)
+        return 56 + sum(_estimate_size(item) for item in value)
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    return 32
+
+
+class ResultCache:
+    """
+    Bộ nhớ đệm kết quả mô phỏng hai tầng.
+
+    Tầng bộ nhớ: LRU giới hạn theo số mục và tổng dung lượng, mỗi mục có thời gian sống (TTL).
+    Tầng đĩa (tùy chọn): mỗi mục là một tệp pickle trong thư mục dùng chung, ghi nguyên tử
+    nên nhiều tiến trình máy chủ có thể dùng chung; TTL tính theo thời điểm sửa tệp.
+
+    Mảng NumPy trong kết quả được đặt chỉ đọc vì cùng một đối tượng được trả về cho mọi
+    lần gọi trùng khóa.
+    """
+    def __init__(self, max_entries=256, max_bytes=256 * 2**20, ttl=3600, disk_dir=None):
+        """
+        Tham số:
+            max_entries: Số mục tối đa trong tầng bộ nhớ
+            max_bytes: Tổng dung lượng tối đa của tầng bộ nhớ (byte)
+            ttl: Thời gian sống của mục (giây), None = không hết hạn
+            disk_dir: Thư mục của tầng đĩa (None = không dùng tầng đĩa)
+        """
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("Số mục và dung lượng tối đa phải lớn hơn 0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Thời gian sống phải lớn hơn 0")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries = OrderedDict()   # khóa -> (giá trị, dung lượng, thời điểm hết hạn)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._pending = {}              # khóa -> threading.Event của lần tính đang chạy
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls):
+        """Tạo bộ nhớ đệm theo các biến môi trường NUCLEAR_SIM_CACHE_*"""
+        ttl = float(os.environ.get(CACHE_TTL_ENV, 3600))
+        return cls(max_bytes=int(float(os.environ.get(CACHE_SIZE_ENV, 256)) * 2**20),
+                   ttl=ttl if ttl > 0 else None,
+                   disk_dir=os.environ.get(CACHE_DIR_ENV) or None)
+
+    def _expiry(self):
+        return time.monotonic() + self.ttl if self.ttl is not None else float('inf')
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.pkl')
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, key, value):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Ghi ra tệp tạm rồi đổi tên để tiến trình khác không đọc phải tệp ghi dở
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _store(self, key, value):
+        """Thêm mục vào tầng bộ nhớ và loại bỏ các mục ít dùng nhất khi vượt giới hạn (gọi khi đang giữ self._lock)"""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size, self._expiry())
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Lấy kết quả theo khóa (tầng bộ nhớ rồi tầng đĩa), trả về default nếu không có"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    count('cache.hits', rate=False)
+                    return entry[0]
+                self._bytes -= self._entries.pop(key)[1]
+                self.expirations += 1
+
+        if self.disk_dir is not None:
+            value = self._read_disk(key)
+            if value is not None:
+                value = _freeze(value)
+                with self._lock:
+                    self._store(key, value)
+                    self.disk_hits += 1
+                count('cache.disk_hits', rate=False)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        count('cache.misses', rate=False)
+        return default
+
+    def put(self, key, value):
+        """Lưu kết quả theo khóa vào tầng bộ nhớ (và tầng đĩa nếu có); trả về kết quả đã đặt chỉ đọc"""
+        value = _freeze(value)
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir is not None:
+            self._write_disk(key, value)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """
+        Lấy kết quả theo khóa, hoặc gọi compute() để tính rồi lưu lại.
+
+        Các lời gọi trùng khóa đến cùng lúc chỉ tính một lần: lời gọi đầu tiên tính, các lời
+        gọi sau chờ rồi đọc kết quả đã lưu. Nếu lời gọi đầu tiên lỗi (hoặc kết quả quá lớn để
+        lưu), lời gọi đang chờ kế tiếp tự tính lại.
+        """
+        sentinel = object()
+        while True:
+            value = self.get(key, sentinel)
+            if value is not sentinel:
+                return value
+
+            with self._lock:
+                pending = self._pending.get(key)
+                leader = pending is None
+                if leader:
+                    pending = self._pending[key] = threading.Event()
+            if not leader:
+                pending.wait()
+                continue
+
+            try:
+                return self.put(key, compute())
+            finally:
+                with self._lock:
+                    del self._pending[key]
+                pending.set()
+
+    def clear(self):
+        """Xóa tầng bộ nhớ (tầng đĩa dùng chung được giữ nguyên)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Thống kê bộ nhớ đệm: số lần trúng/trượt, số mục, dung lượng..."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Bộ nhớ đệm dùng chung của tiến trình (None nếu bị tắt bằng NUCLEAR_SIM_CACHE=0)"""
+    global _default_cache
+    if os.environ.get(CACHE_ENABLED_ENV, '1') == '0':
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache.from_env()
+        return _default_cache
+
+
+def _model_state(model):
+    """Các thuộc tính công khai (không phải hàm) xác định trạng thái của mô hình"""
+    return {name: value for name, value in vars(model).items()
+            if not name.startswith('_') and not callable(value)}
+
+
+def cached_result(ignore=(), cache=None, require=()):
+    """
+    Decorator ghi nhớ kết quả của phương thức mô hình.
+
+    Khóa gồm phiên bản và mã băm mã nguồn của module mô hình, tên lớp và phương thức, các
+    thuộc tính công khai của mô hình và các tham số của lời gọi (đã điền giá trị mặc định, nên
+    f(x) và f(x, mặc định) cùng một khóa). Mỗi lời gọi nhận một bản sao cấu trúc của kết quả
+    (xem _share), mảng NumPy trong đó chỉ đọc.
+
+    Tham số:
+        ignore: Tên các tham số không ảnh hưởng đến kết quả (hiển thị tiến trình, số lõi...)
+        cache: ResultCache dùng riêng (None = get_default_cache())
+        require: Tên các tham số phải khác None thì mới ghi nhớ (ví dụ seed của mô phỏng
+                 ngẫu nhiên: không có seed thì mỗi lời gọi là một mẫu mới)
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        code_version = (__version__, _source_hash(method))
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            target = cache if cache is not None else get_default_cache()
+            if target is None:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            if any(bound.arguments[name] is None for name in require):
+                return method(self, *args, **kwargs)
+            arguments = {name: value for name, value in bound.arguments.items()
+                         if name != 'self' and name not in ignore}
+            try:
+                key = canonical_key(code_version, type(self).__module__, type(self).__qualname__,
+                                    method.__name__, _model_state(self), arguments)
+            except ValueError:
+                # Tham số không chuẩn hóa được (đối tượng tùy ý): tính trực tiếp, không ghi nhớ
+                return method(self, *args, **kwargs)
+            inputs = _input_arrays([bound.arguments, _model_state(self)], [])
+
+            def compute():
+                result = method(self, *args, **kwargs)
+                return _detach(result, inputs) if inputs else result
+
+            return _share(target.get_or_compute(key, compute))
+
+        wrapper.uncached = method
+        return wrapper
+
+    return decorator
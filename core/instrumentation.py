@@ -0,0 +1,310 @@
+import contextvars
+import functools
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Biến môi trường điều khiển đo đạc
+PROFILE_ENV = 'NUCLEAR_SIM_PROFILE'              # "1" để bật bộ đếm và bộ đo thời gian
+PROFILER_ENV = 'NUCLEAR_SIM_PROFILER'            # "cprofile" hoặc "pyinstrument" cho profile_run
+PROFILE_DIR_ENV = 'NUCLEAR_SIM_PROFILE_DIR'      # Thư mục ghi profile của từng lần chạy
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+_enabled = os.environ.get(PROFILE_ENV, '0') not in ('', '0')
+_current_profile = contextvars.ContextVar('nuclear_sim_profile', default=None)
+_current_timer = contextvars.ContextVar('nuclear_sim_timer', default=None)
+_NULL_TIMER = nullcontext()
+
+
+def enable(flag=True):
+    """
+    Bật hoặc tắt đo đạc cho cả tiến trình (số liệu được cộng vào profile của tiến trình).
+
+    Khi đo đạc của tiến trình tắt, profile_run vẫn ghi số liệu của riêng khối lệnh của nó.
+
+    Biến môi trường cũng được đặt để các tiến trình con (nhóm tiến trình của core.runner và
+    core.sweep) kế thừa trạng thái.
+    """
+    global _enabled
+    _enabled = bool(flag)
+    os.environ[PROFILE_ENV] = '1' if _enabled else '0'
+
+
+def is_enabled():
+    """Đo đạc của cả tiến trình có đang bật không"""
+    return _enabled
+
+
+def _recording():
+    """Có ghi số liệu ở ngữ cảnh hiện tại không (đo đạc của tiến trình hoặc trong profile_run)"""
+    return _enabled or _current_profile.get() is not None
+
+
+class Profile:
+    """
+    Tập bộ đo thời gian và bộ đếm của một lần chạy (hoặc của cả tiến trình).
+
+    Mỗi bộ đếm ghi nhớ các bộ đo thời gian đang chạy khi nó được tăng, để báo cáo tốc độ
+    (ví dụ số va chạm mỗi giây của simulate_neutrons).
+    """
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.finished = None
+        self.timers = {}      # tên -> [số lần, tổng thời gian, thời gian lớn nhất]
+        self.counters = {}    # tên -> giá trị
+        self.counter_timers = {}  # tên bộ đếm -> tập tên bộ đo thời gian
+        self.report = None
+        self._lock = threading.Lock()
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            stat = self.timers.get(name)
+            if stat is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] = max(stat[2], seconds)
+
+    def add_count(self, name, value, timer=None):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if timer is not None:
+                self.counter_timers.setdefault(name, set()).add(timer)
+
+    def merge(self, other):
+        """Cộng dồn một profile khác (dạng Profile hoặc dictionary của to_dict)"""
+        data = other.to_dict() if isinstance(other, Profile) else other
+        with self._lock:
+            for name, stat in data['timers'].items():
+                current = self.timers.setdefault(name, [0, 0.0, 0.0])
+                current[0] += stat['count']
+                current[1] += stat['total']
+                current[2] = max(current[2], stat['max'])
+            for name, value in data['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, timers in data.get('counter_timers', {}).items():
+                self.counter_timers.setdefault(name, set()).update(timers)
+        return self
+
+    def to_dict(self):
+        """
+        Profile dưới dạng dictionary (ghi được ra JSON).
+
+        Trả về:
+            Dictionary {'name', 'started', 'wall', 'timers', 'counters', 'counter_timers', 'rates',
+            'report'} với timers[tên] = {'count', 'total', 'mean', 'max'} (giây) và rates[bộ đếm]
+            = giá trị / tổng thời gian của các bộ đo đã chạy khi bộ đếm được tăng (đơn vị mỗi giây)
+        """
+        with self._lock:
+            timers = {name: {'count': count, 'total': total, 'mean': total / count, 'max': longest}
+                      for name, (count, total, longest) in self.timers.items()}
+            counters = dict(self.counters)
+            counter_timers = {name: sorted(names) for name, names in self.counter_timers.items()}
+
+        rates = {}
+        for name, names in counter_timers.items():
+            total = sum(timers[timer]['total'] for timer in names if timer in timers)
+            if total > 0 and name in counters:
+                rates[name] = counters[name] / total
+        return {
+            'name': self.name,
+            'started': self.started,
+            'wall': (self.finished or time.time()) - self.started,
+            'timers': timers,
+            'counters': counters,
+            'counter_timers': counter_timers,
+            'rates': rates,
+            'report': self.report
+        }
+
+    def export(self, path):
+        """Ghi profile ra tệp JSON"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        return path
+
+
+_process_profile = Profile('process')
+_history = deque(maxlen=20)
+
+
+class _Timer:
+    """Bộ đo thời gian của một đoạn mã; ghi vào profile của tiến trình và của lần chạy hiện tại"""
+    __slots__ = ('name', 'start', 'token')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.token = _current_timer.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        _current_timer.reset(self.token)
+        if _enabled:
+            _process_profile.add_time(self.name, elapsed)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.add_time(self.name, elapsed)
+        return False
+
+
+def timer(name):
+    """Context manager đo thời gian một đoạn mã (không làm gì khi đo đạc bị tắt)"""
+    return _Timer(name) if _recording() else _NULL_TIMER
+
+
+def count(name, value=1, rate=True):
+    """
+    Tăng bộ đếm (số va chạm, số vòng lặp của bộ giải, số ô lưới...).
+
+    Nên gọi một lần với tổng số sau mỗi vòng tính, không gọi trong vòng lặp trong cùng.
+    rate=False cho bộ đếm không có nghĩa khi chia theo thời gian (ví dụ số lần trúng bộ nhớ đệm).
+    """
+    if not _recording():
+        return
+    timer_name = _current_timer.get() if rate else None
+    if _enabled:
+        _process_profile.add_count(name, value, timer_name)
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_count(name, value, timer_name)
+
+
+def instrumented(name=None):
+    """
+    Decorator đo thời gian một hàm hoặc phương thức (tên mặc định: Lớp.phương_thức).
+
+    Khi đo đạc bị tắt chỉ tốn một lần kiểm tra cờ và ngữ cảnh cho mỗi lời gọi. Với phương thức có
+    @cached_result, đặt decorator này bên dưới để chỉ đo các lần tính thật.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _recording():
+                return func(*args, **kwargs)
+            with _Timer(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _start_profiler(profiler):
+    if profiler == 'cprofile':
+        import cProfile
+        instance = cProfile.Profile()
+        instance.enable()
+        return instance
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        raise ValueError("Chưa cài đặt pyinstrument (pip install pyinstrument)")
+    instance = Profiler()
+    instance.start()
+    return instance
+
+
+def _stop_profiler(profiler, instance, profile, dump_path):
+    """Dừng bộ phân tích, lưu bản tóm tắt vào profile.report và ghi tệp nếu có đường dẫn"""
+    if profiler == 'cprofile':
+        import pstats
+        instance.disable()
+        output = io.StringIO()
+        pstats.Stats(instance, stream=output).sort_stats('cumulative').print_stats(25)
+        profile.report = output.getvalue()
+        if dump_path is not None:
+            instance.dump_stats(dump_path + '.prof')
+    else:
+        instance.stop()
+        profile.report = instance.output_text(unicode=True)
+        if dump_path is not None:
+            with open(dump_path + '.html', 'w', encoding='utf-8') as file:
+                file.write(instance.output_html())
+
+
+@contextmanager
+def profile_run(name, profiler=None, dump_dir=None):
+    """
+    Ghi một profile riêng cho một lần chạy (một trang, một điểm tham số...).
+
+    Bộ đo thời gian và bộ đếm trong khối được ghi vào profile này kể cả khi đo đạc của tiến
+    trình đang tắt (chỉ trong ngữ cảnh của khối, ví dụ một phiên giao diện), và vào profile của
+    tiến trình khi nó bật; toàn bộ khối được đo dưới tên name.
+
+    Tham số:
+        name: Tên lần chạy
+        profiler: 'cprofile' hoặc 'pyinstrument' để chạy thêm bộ phân tích (None = theo
+                  NUCLEAR_SIM_PROFILER); bản tóm tắt nằm trong profile.report
+        dump_dir: Thư mục ghi profile JSON và tệp của bộ phân tích (None = theo
+                  NUCLEAR_SIM_PROFILE_DIR, không ghi nếu chưa đặt)
+
+    Trả về:
+        Profile của lần chạy (qua câu lệnh with)
+    """
+    profiler = profiler or os.environ.get(PROFILER_ENV) or None
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Bộ phân tích không hợp lệ: {profiler}. Dùng một trong: {', '.join(PROFILERS)}")
+    dump_dir = dump_dir or os.environ.get(PROFILE_DIR_ENV) or None
+
+    profile = Profile(name)
+    token = _current_profile.set(profile)
+    instance = _start_profiler(profiler) if profiler is not None else None
+    try:
+        with timer(name):
+            yield profile
+    finally:
+        dump_path = None
+        if dump_dir is not None:
+            os.makedirs(dump_dir, exist_ok=True)
+            safe_name = ''.join(char if char.isalnum() or char in '-_.' else '_' for char in name)
+            dump_path = os.path.join(dump_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        if instance is not None:
+            _stop_profiler(profiler, instance, profile, dump_path)
+        _current_profile.reset(token)
+        profile.finished = time.time()
+        if _enabled:
+            _history.append(profile.to_dict())
+        if dump_path is not None:
+            profile.export(dump_path + '.json')
+
+
+def get_stats():
+    """Profile cộng dồn của cả tiến trình (dạng dictionary, xem Profile.to_dict)"""
+    return _process_profile.to_dict()
+
+
+def recent_profiles():
+    """Các profile của những lần chạy gần nhất khi đo đạc của tiến trình bật (mới nhất ở cuối)"""
+    return list(_history)
+
+
+def reset():
+    """Xóa mọi số liệu đã ghi"""
+    global _process_profile
+    _process_profile = Profile('process')
+    _history.clear()
+
+
+def format_profile(data):
+    """Định dạng profile (dictionary của to_dict) thành bảng văn bản"""
+    lines = [f"{data['name']}: {data['wall']:.3f} s"]
+    for name, stat in sorted(data['timers'].items(), key=lambda item: item[1]['total'], reverse=True):
+        lines.append(f"    {stat['total'] * 1000:10.1f} ms  x{stat['count']:<6d} "
+                     f"(max {stat['max'] * 1000:.1f} ms)  {name}")
+    for name, value in sorted(data['counters'].items()):
+        rate = data['rates'].get(name)
+        lines.append(f"    {value:>14,}  {name}" + (f"  ({rate:,.0f}/s)" if rate is not None else ""))
+    return "\n".join(lines)
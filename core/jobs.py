@@ -0,0 +1,236 @@
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Trạng thái của công việc
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class SimulationCancelled(RuntimeError):
+    """Mô phỏng dừng giữa chừng do có yêu cầu hủy (cancel_event được đặt)"""
+
+
+class Job:
+    """
+    Một mô phỏng chạy nền: trạng thái, các sự kiện tiến trình và kết quả.
+
+    Sự kiện tiến trình được đánh số tăng dần và giữ trong hàng đợi có giới hạn, nên trang
+    giao diện có thể hỏi lại các sự kiện mới kể từ số thứ tự đã nhận.
+    """
+    def __init__(self, job_id, owner, description, max_events):
+        self.id = job_id
+        self.owner = owner
+        self.description = description
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._events = deque(maxlen=max_events)
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        """Ghi một sự kiện tiến trình (dùng làm progress_callback của mô phỏng)"""
+        with self._lock:
+            self.progress = event
+            self._events.append((next(self._sequence), event))
+
+    def events(self, since=0):
+        """Các sự kiện có số thứ tự lớn hơn since, dạng danh sách (số thứ tự, sự kiện)"""
+        with self._lock:
+            return [(sequence, event) for sequence, event in self._events if sequence > since]
+
+    def set_status(self, status, result=None, error=None):
+        """
+        Chuyển trạng thái, ghi thời điểm bắt đầu/kết thúc trước khi công bố trạng thái mới
+        (nên ai thấy RUNNING thì có started, thấy trạng thái kết thúc thì có finished).
+        """
+        with self._lock:
+            if status == RUNNING:
+                self.started = time.time()
+            elif status in FINISHED_STATES:
+                self.result = result
+                self.error = error
+                self.finished = time.time()
+            self.status = status
+
+    def snapshot(self):
+        """Trạng thái hiện tại của công việc dưới dạng dictionary"""
+        with self._lock:
+            return {
+                'id': self.id,
+                'owner': self.owner,
+                'description': self.description,
+                'status': self.status,
+                'submitted': self.submitted,
+                'started': self.started,
+                'finished': self.finished,
+                'progress': self.progress,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """
+    Chạy mô phỏng dài trong một nhóm luồng có giới hạn.
+
+    Hàm mô phỏng được gọi với hai tham số từ khóa bổ sung: progress_callback (nhận
+    dictionary tiến trình) và cancel_event (threading.Event, được đặt khi công việc bị hủy).
+    Mỗi chủ sở hữu (phiên người dùng) chỉ được chạy đồng thời một số công việc nhất định.
+    """
+    def __init__(self, max_workers=2, max_jobs_per_owner=1, max_events=1000, retention=3600):
+        """
+        Tham số:
+            max_workers: Số luồng chạy mô phỏng đồng thời
+            max_jobs_per_owner: Số công việc chưa kết thúc tối đa của mỗi chủ sở hữu
+            max_events: Số sự kiện tiến trình giữ lại của mỗi công việc
+            retention: Thời gian giữ công việc đã kết thúc trước khi dọn (giây)
+        """
+        if max_workers <= 0 or max_jobs_per_owner <= 0:
+            raise ValueError("Số luồng và số công việc tối đa phải lớn hơn 0")
+
+        self.max_jobs_per_owner = max_jobs_per_owner
+        self.max_events = max_events
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='simulation')
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_event.is_set():
+            job.set_status(CANCELLED)
+            return None
+
+        job.set_status(RUNNING)
+        try:
+            result = func(*args, progress_callback=job.record, cancel_event=job.cancel_event, **kwargs)
+        except SimulationCancelled:
+            job.set_status(CANCELLED)
+        except BaseException as error:
+            job.set_status(FAILED, error=f"{type(error).__name__}: {error}")
+            if not isinstance(error, Exception):
+                raise
+        else:
+            job.set_status(DONE, result)
+        return job.result
+
+    def submit(self, func, *args, owner=None, description='', **kwargs):
+        """
+        Đưa một mô phỏng vào hàng đợi.
+
+        Tham số:
+            func: Hàm mô phỏng, nhận thêm progress_callback và cancel_event
+            owner: Chủ sở hữu (ví dụ mã phiên người dùng) để giới hạn số công việc đồng thời
+            description: Mô tả ngắn của công việc
+            args, kwargs: Tham số của func
+
+        Trả về:
+            Mã công việc (chuỗi)
+        """
+        self.cleanup()
+        with self._lock:
+            if owner is not None and len(self.active_jobs(owner)) >= self.max_jobs_per_owner:
+                raise ValueError(f"Đã đạt số công việc chạy đồng thời tối đa ({self.max_jobs_per_owner})")
+
+            job = Job(f"job-{next(self._ids)}", owner, description, self.max_events)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        """Đối tượng Job theo mã công việc"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Không tìm thấy công việc {job_id}")
+        return job
+
+    def status(self, job_id):
+        """Trạng thái hiện tại của công việc (xem Job.snapshot)"""
+        return self.get(job_id).snapshot()
+
+    def events(self, job_id, since=0):
+        """Các sự kiện tiến trình mới kể từ số thứ tự since"""
+        return self.get(job_id).events(since)
+
+    def stream(self, job_id, poll_interval=0.25, heartbeat=False):
+        """
+        Generator phát các sự kiện tiến trình của công việc cho đến khi nó kết thúc.
+
+        Tham số:
+            job_id: Mã công việc
+            poll_interval: Khoảng thời gian giữa hai lần hỏi sự kiện mới (giây)
+            heartbeat: Phát (số thứ tự cuối, None) ở mỗi lần hỏi không có sự kiện mới, để bên
+                       nhận (ví dụ trang Streamlit) vẫn được gọi lại đều đặn và xử lý được thao
+                       tác của người dùng như hủy
+
+        Trả về:
+            Generator các cặp (số thứ tự, sự kiện)
+        """
+        job = self.get(job_id)
+        since = 0
+        while True:
+            finished = job.status in FINISHED_STATES
+            events = job.events(since)
+            for sequence, event in events:
+                since = sequence
+                yield sequence, event
+            if finished:
+                return
+            if heartbeat and not events:
+                yield since, None
+            time.sleep(poll_interval)
+
+    def result(self, job_id, timeout=None):
+        """Chờ công việc kết thúc và trả về kết quả (None nếu bị hủy, ValueError nếu lỗi)"""
+        job = self.get(job_id)
+        job.future.result(timeout)
+        if job.status == FAILED:
+            raise ValueError(f"Công việc {job_id} thất bại: {job.error}")
+        return job.result
+
+    def cancel(self, job_id):
+        """Yêu cầu hủy công việc; mô phỏng dừng ở lần báo cáo tiến trình kế tiếp"""
+        job = self.get(job_id)
+        job.cancel_event.set()
+        if job.future.cancel():
+            job.set_status(CANCELLED)
+
+    def active_jobs(self, owner=None):
+        """Mã các công việc chưa kết thúc (của một chủ sở hữu nếu owner khác None)"""
+        return [job.id for job in list(self._jobs.values())
+                if job.status not in FINISHED_STATES and (owner is None or job.owner == owner)]
+
+    def cleanup(self):
+        """Bỏ các công việc đã kết thúc lâu hơn thời gian giữ lại"""
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [job.id for job in self._jobs.values()
+                           if job.finished is not None and job.finished < cutoff]:
+                del self._jobs[job_id]
+
+
+_default_manager = None
+_default_lock = threading.Lock()
+
+
+def get_job_manager():
+    """JobManager dùng chung của tiến trình (dùng chung giữa các phiên giao diện)"""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
@@ -0,0 +1,314 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from core import __version__
+from core.cache import canonical_key
+from core.runner import results_table
+
+METADATA_KEY = b'nuclear_sim'
+CATALOG_FILE = 'catalog.jsonl'
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+def _json_default(value):
+    """Chuyển kiểu NumPy sang kiểu JSON khi ghi tham số vào siêu dữ liệu"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _matches(value, condition):
+    """Giá trị tham số thỏa điều kiện: bằng nhau, thuộc danh sách, hoặc nằm trong khoảng (thấp, cao)"""
+    if isinstance(condition, tuple):
+        low, high = condition
+        return value is not None and (low is None or value >= low) and (high is None or value <= high)
+    if isinstance(condition, (list, set, frozenset)):
+        return value in condition
+    return value == condition
+
+
+class ResultsStore:
+    """
+    Kho lưu kết quả mô phỏng dạng cột (Arrow/Parquet) trong một thư mục.
+
+    Mỗi lần chạy là một tệp (một bảng Arrow cùng dạng với core.runner.results_table, mảng lưu
+    thành cột danh sách) kèm siêu dữ liệu: mô hình, phương thức, tham số, seed, phiên bản,
+    thời gian chạy. Danh mục catalog.jsonl ghi một dòng cho mỗi lần chạy để truy vấn theo tham
+    số mà không phải mở tệp dữ liệu.
+
+    Định dạng 'arrow' (Arrow IPC, mặc định không nén) được đọc qua ánh xạ bộ nhớ không sao chép:
+    mảng trả về trỏ thẳng vào tệp. Định dạng 'parquet' (nén zstd) nhỏ hơn nhiều trên đĩa nhưng
+    phải giải nén khi đọc; nén Arrow IPC (lz4, zstd) cũng mất tính không sao chép.
+    """
+    def __init__(self, path, format='arrow', compression=None):
+        """
+        Tham số:
+            path: Thư mục của kho (tạo mới nếu chưa có)
+            format: Định dạng tệp của các lần chạy mới ('arrow' hoặc 'parquet')
+            compression: Thuật toán nén (None = không nén với Arrow, zstd với Parquet)
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Định dạng không hợp lệ: {format}. Dùng một trong: {', '.join(FORMATS)}")
+
+        self.path = path
+        self.format = format
+        self.compression = compression if compression is not None or format == 'arrow' else 'zstd'
+        os.makedirs(path, exist_ok=True)
+        self._catalog = None
+        self._catalog_size = 0
+        self._lock = threading.Lock()
+
+    # Ghi
+
+    def save(self, model, result, params=None, method=None, seed=None, elapsed=None, metadata=None):
+        """
+        Lưu kết quả của một lần chạy mô hình.
+
+        Tham số:
+            model: Tên mô hình (ví dụ 'fallout')
+            result: Kết quả trả về của mô hình (dictionary, mảng, tuple...)
+            params: Tham số của lần chạy
+            method: Tên phương thức đã chạy
+            seed: Hạt giống ngẫu nhiên đã dùng
+            elapsed: Thời gian chạy (giây)
+            metadata: Dictionary siêu dữ liệu bổ sung (ghi dạng JSON)
+
+        Trả về:
+            Mã lần chạy (chuỗi)
+        """
+        params = dict(params or {})
+        table = results_table([{'params': params, 'result': result, 'error': None, 'elapsed': elapsed}],
+                              model, method)
+        return self.save_table(table, model, params, method, seed, elapsed, metadata)
+
+    def save_table(self, table, model, params=None, method=None, seed=None, elapsed=None, metadata=None):
+        """
+        Lưu một bảng Arrow (ví dụ kết quả của core.runner hoặc một phần của core.sweep) thành một lần chạy.
+
+        Trả về:
+            Mã lần chạy (chuỗi)
+        """
+        import pyarrow as pa
+
+        params = dict(params or {})
+        run_id = uuid.uuid4().hex
+        record = {
+            'id': run_id,
+            'model': model,
+            'method': method,
+            'params': json.loads(json.dumps(params, default=_json_default)),
+            'seed': seed,
+            'key': canonical_key(model, method, params, seed),
+            'version': __version__,
+            'pyarrow': pa.__version__,
+            'created': time.time(),
+            'elapsed': elapsed,
+            'rows': table.num_rows,
+            'file': os.path.join(model, run_id + FORMATS[self.format]),
+            'metadata': json.loads(json.dumps(metadata or {}, default=_json_default))
+        }
+
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[METADATA_KEY] = json.dumps(record).encode()
+        table = table.replace_schema_metadata(schema_metadata)
+
+        target = os.path.join(self.path, record['file'])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = target + '.tmp'
+        if self.format == 'arrow':
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, temp_path, compression=self.compression)
+        os.replace(temp_path, target)
+
+        # Một lần ghi ở chế độ append cho mỗi dòng nên nhiều tiến trình có thể cùng ghi danh mục
+        line = (json.dumps(record) + '\n').encode()
+        descriptor = os.open(os.path.join(self.path, CATALOG_FILE), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+        return run_id
+
+    # Danh mục và truy vấn
+
+    def records(self):
+        """Tất cả bản ghi danh mục (đọc lại phần mới được ghi thêm kể từ lần đọc trước)"""
+        catalog_path = os.path.join(self.path, CATALOG_FILE)
+        with self._lock:
+            if self._catalog is None:
+                self._catalog, self._catalog_size = {}, 0
+            if os.path.exists(catalog_path) and os.path.getsize(catalog_path) > self._catalog_size:
+                with open(catalog_path, 'rb') as file:
+                    file.seek(self._catalog_size)
+                    data = file.read()
+                # Bỏ dòng cuối chưa ghi xong (nếu có) để đọc lại ở lần sau
+                complete = data[:data.rfind(b'\n') + 1]
+                for line in complete.splitlines():
+                    if line.strip():
+                        record = json.loads(line)
+                        self._catalog[record['id']] = record
+                self._catalog_size += len(complete)
+            return list(self._catalog.values())
+
+    def query(self, model=None, method=None, seed=None, where=None, **params):
+        """
+        Các lần chạy thỏa điều kiện, theo thứ tự thời gian tạo.
+
+        Điều kiện tham số: query(yield_kt=20) (bằng), query(yield_kt=[10, 20]) (thuộc danh sách),
+        query(yield_kt=(10, None)) (khoảng, None = không giới hạn); where là hàm nhận dictionary
+        tham số và trả về True/False.
+
+        Trả về:
+            Danh sách bản ghi danh mục {'id', 'model', 'method', 'params', 'seed', 'key',
+            'version', 'created', 'elapsed', 'rows', 'file', 'metadata'}
+        """
+        matched = []
+        for record in self.records():
+            if model is not None and record['model'] != model:
+                continue
+            if method is not None and record['method'] != method:
+                continue
+            if seed is not None and record['seed'] != seed:
+                continue
+            if not all(_matches(record['params'].get(name), condition) for name, condition in params.items()):
+                continue
+            if where is not None and not where(record['params']):
+                continue
+            matched.append(record)
+        return sorted(matched, key=lambda record: record['created'])
+
+    def find(self, model, params=None, method=None, seed=None):
+        """Lần chạy mới nhất có cùng mô hình, phương thức, tham số và seed (None nếu chưa có)"""
+        key = canonical_key(model, method, dict(params or {}), seed)
+        matched = [record for record in self.records() if record['key'] == key]
+        return max(matched, key=lambda record: record['created']) if matched else None
+
+    def reindex(self):
+        """Dựng lại danh mục từ siêu dữ liệu của các tệp dữ liệu (khi danh mục bị mất hoặc hỏng)"""
+        import pyarrow.parquet as pq
+        import pyarrow as pa
+
+        lines = []
+        for directory, _, files in os.walk(self.path):
+            for name in sorted(files):
+                extension = os.path.splitext(name)[1]
+                if extension not in FORMATS.values():
+                    continue
+                file_path = os.path.join(directory, name)
+                if extension == '.arrow':
+                    with pa.memory_map(file_path) as source:
+                        schema = pa.ipc.open_file(source).schema
+                else:
+                    schema = pq.read_schema(file_path)
+                if schema.metadata and METADATA_KEY in schema.metadata:
+                    lines.append(schema.metadata[METADATA_KEY].decode() + '\n')
+
+        catalog_path = os.path.join(self.path, CATALOG_FILE)
+        with open(catalog_path + '.tmp', 'w', encoding='utf-8') as file:
+            file.writelines(lines)
+        os.replace(catalog_path + '.tmp', catalog_path)
+        with self._lock:
+            self._catalog = None
+        return len(lines)
+
+    # Đọc
+
+    def _record(self, run):
+        if isinstance(run, dict):
+            return run
+        for record in self.records():
+            if record['id'] == run:
+                return record
+        raise ValueError(f"Không tìm thấy lần chạy {run}")
+
+    def open(self, run, columns=None):
+        """
+        Bảng Arrow của một lần chạy (mã hoặc bản ghi danh mục).
+
+        Tệp Arrow IPC được ánh xạ bộ nhớ: bộ đệm của bảng trỏ thẳng vào tệp, không đọc hay sao
+        chép dữ liệu cho đến khi được dùng.
+        """
+        import pyarrow as pa
+
+        file_path = os.path.join(self.path, self._record(run)['file'])
+        if file_path.endswith('.arrow'):
+            with pa.memory_map(file_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+            return table.select(columns) if columns is not None else table
+
+        import pyarrow.parquet as pq
+        return pq.read_table(file_path, columns=columns, memory_map=True)
+
+    def load(self, run, row=0):
+        """
+        Kết quả của một hàng dưới dạng dictionary phẳng {tên cột: giá trị}.
+
+        Cột danh sách số được trả về thành mảng NumPy (không sao chép với tệp Arrow không nén)
+        và được định hình lại theo cột .shape đi kèm; tham số nằm ở các khóa param.*.
+        """
+        import pyarrow as pa
+
+        table = self.open(run)
+        if not 0 <= row < table.num_rows:
+            raise ValueError(f"Hàng {row} nằm ngoài bảng ({table.num_rows} hàng)")
+
+        values = {}
+        for name in table.column_names:
+            if name.endswith('.shape') and name[:-len('.shape')] in table.column_names:
+                continue
+            column = table.column(name)
+            scalar = column[row]
+            if not scalar.is_valid:
+                values[name] = None
+            elif pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+                items = scalar.values
+                try:
+                    array = items.to_numpy(zero_copy_only=True)
+                except pa.ArrowInvalid:
+                    array = items.to_numpy(zero_copy_only=False)
+                shape_name = name + '.shape'
+                if shape_name in table.column_names:
+                    shape = table.column(shape_name)[row].as_py()
+                    if shape is not None:
+                        array = array.reshape(shape)
+                values[name] = array
+            else:
+                values[name] = scalar.as_py()
+        return values
+
+    def scan(self, records=None, columns=None, filter=None, **params):
+        """
+        Bảng Arrow ghép các lần chạy, với bộ lọc theo hàng tùy chọn.
+
+        Tham số:
+            records: Danh sách bản ghi cần đọc (None = query(**params))
+            columns: Tên các cột cần đọc (None = tất cả)
+            filter: Biểu thức pyarrow.compute lọc theo hàng, ví dụ pc.field('param.yield_kt') > 10
+            params: Điều kiện truy vấn danh mục như của query
+
+        Trả về:
+            pyarrow.Table (None nếu không có lần chạy nào khớp)
+        """
+        import pyarrow as pa
+
+        records = self.query(**params) if records is None else records
+        tables = []
+        for record in records:
+            table = self.open(record, columns)
+            if filter is not None:
+                table = table.filter(filter)
+            tables.append(table.replace_schema_metadata(None))
+        if not tables:
+            return None
+        return pa.concat_tables(tables, promote_options='permissive')
@@ -0,0 +1,356 @@
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import instrumentation
+
+# Mô hình chạy được từ dòng lệnh: tên -> (module, lớp, phương thức mặc định)
+# Module chỉ được nhập khi mô hình được chọn, không nhập streamlit hay ui.*
+MODELS = {
+    'chain_reaction': ('models.chain_reaction', 'ChainReactionModel', 'simulate_chain_reaction'),
+    'neutron_transport': ('models.neutron_transport', 'NeutronTransportModel', 'solve_diffusion_equation'),
+    'monte_carlo': ('models.monte_carlo', 'MonteCarloNeutronTransport', 'simulate_neutrons'),
+    'blast_wave': ('models.blast_wave', 'SedovTaylorModel', 'simulate_blast_wave'),
+    'thermal_radiation': ('models.thermal_radiation', 'ThermalRadiationModel', 'calculate_thermal_effects'),
+    'emp_effects': ('models.emp_effects', 'EMPModel', 'calculate_emp_effects'),
+    'fallout': ('models.fallout', 'FalloutModel', 'simulate_fallout_pattern'),
+    'flash_effects': ('models.flash_effects', 'FlashEffectsModel', 'calculate_eye_effects'),
+}
+
+# Tham số điều khiển hiển thị, không có ý nghĩa khi chạy hàng loạt
+BATCH_OVERRIDES = {'show_progress': False}
+
+OUTPUT_FORMATS = ('.parquet', '.feather', '.arrow')
+
+
+def resolve_model(model, method=None):
+    """
+    Lớp mô hình và phương thức được chạy.
+
+    Tham số:
+        model: Tên mô hình trong MODELS
+        method: Tên phương thức công khai (None = phương thức mặc định của mô hình)
+
+    Trả về:
+        Tuple (lớp mô hình, tên phương thức)
+    """
+    if model not in MODELS:
+        raise ValueError(f"Mô hình không hợp lệ: {model}. Các mô hình hỗ trợ: {', '.join(MODELS)}")
+
+    module_name, class_name, default_method = MODELS[model]
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    method = method or default_method
+    if method.startswith('_') or not callable(getattr(model_class, method, None)):
+        raise ValueError(f"Mô hình {model} không có phương thức {method}")
+    return model_class, method
+
+
+def split_params(model_class, method, params):
+    """
+    Chia tham số thành tham số khởi tạo mô hình và tham số của phương thức (theo chữ ký hàm).
+
+    Trả về:
+        Tuple (tham số khởi tạo, tham số phương thức)
+    """
+    init_names = set(inspect.signature(model_class.__init__).parameters) - {'self'}
+    method_names = set(inspect.signature(getattr(model_class, method)).parameters) - {'self'}
+
+    init_params, method_params = {}, {}
+    for name, value in params.items():
+        if name in init_names:
+            init_params[name] = value
+        elif name in method_names:
+            method_params[name] = value
+        else:
+            raise ValueError(f"Tham số không hợp lệ cho {model_class.__name__}.{method}: {name}")
+
+    for name, value in BATCH_OVERRIDES.items():
+        if name in method_names and name not in method_params:
+            method_params[name] = value
+    return init_params, method_params
+
+
+def expand_grid(spec):
+    """
+    Danh sách các điểm tham số từ đặc tả lưới.
+
+    Đặc tả là dictionary gồm các khóa (đều tùy chọn):
+        params: Tham số cố định của mọi điểm (giá trị danh sách được truyền nguyên vẹn, ví dụ distances)
+        grid: Tham số quét, mỗi tham số là danh sách giá trị; các điểm là tích Descartes của chúng
+        points: Danh sách các điểm tham số cho trước, được ghép với mọi tổ hợp của grid
+
+    Trả về:
+        Danh sách dictionary tham số
+    """
+    unknown = set(spec) - {'params', 'grid', 'points'}
+    if unknown:
+        raise ValueError(f"Khóa không hợp lệ trong tệp tham số: {', '.join(sorted(unknown))}")
+
+    base = dict(spec.get('params', {}))
+    grid = spec.get('grid', {})
+    points = spec.get('points') or [{}]
+    for name, values in grid.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Tham số quét {name} phải là danh sách giá trị không rỗng")
+
+    names = list(grid)
+    return [{**base, **point, **dict(zip(names, combination))}
+            for point in points
+            for combination in itertools.product(*(grid[name] for name in names))]
+
+
+def load_params(path):
+    """Đọc đặc tả lưới tham số từ tệp JSON (None = một điểm với tham số mặc định)"""
+    if path is None:
+        return {}
+    with open(path, encoding='utf-8') as file:
+        spec = json.load(file)
+    if isinstance(spec, list):
+        spec = {'points': spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Tệp tham số {path} phải chứa một đối tượng hoặc danh sách JSON")
+    return spec
+
+
+def run_point(model, method, params, seed=None):
+    """
+    Chạy một điểm tham số (hàm cấp module để dùng được trong nhóm tiến trình).
+
+    Lỗi của mô phỏng không làm dừng cả lô: điểm lỗi được trả về với thông báo lỗi. Khi đo đạc
+    được bật (core.instrumentation), điểm được chạy trong một profile riêng.
+
+    Trả về:
+        Dictionary {'params', 'seed', 'result', 'error', 'elapsed', 'profile'} (profile là
+        dictionary của Profile.to_dict hoặc None khi đo đạc bị tắt)
+    """
+    start = time.perf_counter()
+    profile = None
+    try:
+        model_class, method = resolve_model(model, method)
+        init_params, method_params = split_params(model_class, method, params)
+        # Mô hình ngẫu nhiên nhận seed trực tiếp và dùng bộ sinh số ngẫu nhiên riêng (không đặt
+        # trạng thái toàn cục của NumPy); kết quả được ghi nhớ theo seed
+        if seed is not None and 'seed' in inspect.signature(getattr(model_class, method)).parameters:
+            method_params.setdefault('seed', seed)
+        if instrumentation.is_enabled():
+            with instrumentation.profile_run(f"{model}.{method}") as profile:
+                result = getattr(model_class(**init_params), method)(**method_params)
+        else:
+            result = getattr(model_class(**init_params), method)(**method_params)
+        error = None
+    except Exception as exc:
+        result, error = None, f"{type(exc).__name__}: {exc}"
+    return {'params': params, 'seed': seed, 'result': result, 'error': error,
+            'elapsed': time.perf_counter() - start, 'profile': None if profile is None else profile.to_dict()}
+
+
+def run_batch(model, points, method=None, jobs=1, seed=None):
+    """
+    Chạy mô hình trên danh sách điểm tham số, song song bằng nhóm tiến trình nếu jobs > 1.
+
+    Tham số:
+        model: Tên mô hình trong MODELS
+        points: Danh sách dictionary tham số (xem expand_grid)
+        method: Tên phương thức (None = phương thức mặc định)
+        jobs: Số tiến trình chạy song song
+        seed: Hạt giống ngẫu nhiên; điểm thứ i dùng seed + i
+
+    Trả về:
+        Danh sách kết quả của run_point theo thứ tự các điểm
+    """
+    if jobs <= 0:
+        raise ValueError("Số tiến trình phải lớn hơn 0")
+    # Kiểm tra mô hình và tham số trước khi khởi động các tiến trình
+    model_class, method = resolve_model(model, method)
+    for params in points:
+        split_params(model_class, method, params)
+
+    seeds = [None if seed is None else seed + index for index in range(len(points))]
+    if jobs == 1 or len(points) <= 1:
+        return [run_point(model, method, params, point_seed) for params, point_seed in zip(points, seeds)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(points) // (jobs * 4))
+        return list(executor.map(run_point, itertools.repeat(model), itertools.repeat(method),
+                                 points, seeds, chunksize=chunksize))
+
+
+def _flatten(value, name, row):
+    """Trải kết quả lồng nhau thành các cột name.key; mảng nhiều chiều thêm cột name.shape"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{name}.{key}" if name else str(key), row)
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        array = None
+        if not (isinstance(value, tuple) and any(isinstance(item, (np.ndarray, dict, list)) for item in value)):
+            array = np.asarray(value)
+        if array is None or array.dtype == object:
+            # Tuple các mảng (ví dụ (x, flux)) hoặc danh sách không đồng nhất: trải từng phần tử
+            for index, item in enumerate(value):
+                _flatten(item, f"{name or 'result'}.{index}", row)
+            return
+        row[name or 'result'] = array.ravel()
+        if array.ndim > 1:
+            row[f"{name or 'result'}.shape"] = list(array.shape)
+    elif isinstance(value, np.generic):
+        row[name or 'result'] = value.item()
+    else:
+        row[name or 'result'] = value
+
+
+def results_table(runs, model=None, method=None):
+    """
+    Bảng Arrow dạng cột từ kết quả của run_batch.
+
+    Mỗi điểm tham số là một hàng gồm các cột tham số (param.*), các trường kết quả đã trải
+    phẳng (mảng lưu thành cột danh sách), thời gian chạy và thông báo lỗi.
+    """
+    import pyarrow as pa
+
+    rows = []
+    for index, run in enumerate(runs):
+        row = {'point': index}
+        for name, value in run['params'].items():
+            _flatten(value, f"param.{name}", row)
+        _flatten(run['result'], '', row)
+        row['elapsed'] = run['elapsed']
+        row['error'] = run['error']
+        rows.append(row)
+
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    columns = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Kiểu khác nhau giữa các hàng: lưu dạng chuỗi JSON
+            columns[name] = pa.array([None if value is None else json.dumps(value, default=str)
+                                      for value in values])
+
+    metadata = {'model': model or '', 'method': method or ''}
+    return pa.table(columns).replace_schema_metadata(metadata)
+
+
+def write_table(table, path):
+    """Ghi bảng ra tệp Parquet (.parquet) hoặc Arrow IPC (.feather, .arrow)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Định dạng đầu ra không hỗ trợ: {extension}. Dùng một trong: {', '.join(OUTPUT_FORMATS)}")
+
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression='zstd')
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression='zstd')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core",
+                                     description="Chạy mô phỏng hàng loạt không cần giao diện Streamlit")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Chạy một mô hình trên lưới tham số")
+    run.add_argument("model", choices=list(MODELS), help="Mô hình cần chạy")
+    run.add_argument("--params", help="Tệp JSON chứa params/grid/points (mặc định: tham số mặc định)")
+    output = run.add_mutually_exclusive_group(required=True)
+    output.add_argument("--out", help="Tệp kết quả (.parquet, .feather hoặc .arrow)")
+    output.add_argument("--store", help="Thư mục kho kết quả (core.results_store): mỗi điểm là một lần chạy")
+    run.add_argument("--method", help="Phương thức của mô hình (mặc định: mô phỏng chính)")
+    run.add_argument("--jobs", type=int, default=1, help="Số tiến trình chạy song song")
+    run.add_argument("--seed", type=int, help="Hạt giống ngẫu nhiên (điểm thứ i dùng seed + i)")
+    run.add_argument("--profile", help="Tệp JSON ghi profile (thời gian, bộ đếm) cộng dồn của các điểm")
+
+    sweep = commands.add_parser("sweep", help="Quét mô hình theo thiết kế Descartes hoặc Latin hypercube")
+    sweep.add_argument("model", choices=list(MODELS), help="Mô hình cần quét")
+    sweep.add_argument("--design", required=True, help="Tệp JSON chứa params/grid/points và lhs/samples/seed")
+    sweep.add_argument("--out", required=True, help="Thư mục kết quả Parquet (chạy lại chỉ tính điểm mới)")
+    sweep.add_argument("--method", help="Phương thức của mô hình (mặc định: mô phỏng chính)")
+    sweep.add_argument("--jobs", type=int, default=1, help="Số tiến trình chạy song song")
+    sweep.add_argument("--chunk-size", type=int, default=256, help="Số điểm mỗi khối")
+    sweep.add_argument("--seed", type=int, help="Hạt giống ngẫu nhiên gốc của mô phỏng")
+
+    commands.add_parser("models", help="Liệt kê các mô hình và phương thức mặc định")
+    args = parser.parse_args(argv)
+
+    if args.command == "models":
+        for name, (module_name, class_name, method) in MODELS.items():
+            print(f"{name:20s} {module_name}.{class_name}.{method}")
+        return 0
+    if args.command == "sweep":
+        return _sweep_command(args)
+
+    if args.profile:
+        instrumentation.enable()
+
+    try:
+        points = expand_grid(load_params(args.params))
+        start = time.perf_counter()
+        runs = run_batch(args.model, points, args.method, args.jobs, args.seed)
+        method = args.method or MODELS[args.model][2]
+        if args.store:
+            from core.results_store import ResultsStore
+            store = ResultsStore(args.store)
+            for run in runs:
+                if run['error'] is None:
+                    metadata = None if run['profile'] is None else {'profile': run['profile']}
+                    store.save(args.model, run['result'], run['params'], method, run['seed'], run['elapsed'],
+                               metadata)
+        else:
+            write_table(results_table(runs, args.model, method), args.out)
+    except ValueError as error:
+        print(f"Lỗi: {error}", file=sys.stderr)
+        return 2
+
+    failed = sum(run['error'] is not None for run in runs)
+    print(f"{len(runs)} điểm, {failed} lỗi, {time.perf_counter() - start:.2f} s -> {args.out or args.store}")
+    if args.profile:
+        profile = instrumentation.Profile(f"run:{args.model}.{method}")
+        for run in runs:
+            if run['profile'] is not None:
+                profile.merge(run['profile'])
+        profile.finished = profile.started + time.perf_counter() - start
+        profile.export(args.profile)
+        print(instrumentation.format_profile(profile.to_dict()), file=sys.stderr)
+    for index, run in enumerate(runs):
+        if run['error'] is not None:
+            print(f"  điểm {index}: {run['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+
+def _sweep_command(args):
+    from core.sweep import design_points, run_sweep
+
+    def report(progress):
+        print(f"\r{progress['done']}/{progress['total']} điểm, {progress['failed']} lỗi, "
+              f"{progress['elapsed']:.1f} s", end='', file=sys.stderr, flush=True)
+
+    try:
+        points = design_points(load_params(args.design))
+        summary = run_sweep(args.model, points, args.out, args.method, args.jobs, args.chunk_size,
+                            args.seed, progress_callback=report)
+    except ValueError as error:
+        print(f"Lỗi: {error}", file=sys.stderr)
+        return 2
+
+    if summary['computed'] or summary['failed']:
+        print(file=sys.stderr)
+    print(f"{summary['total']} điểm: {summary['cached']} đã có, {summary['computed']} đã tính, "
+          f"{summary['failed']} lỗi, {summary['elapsed']:.2f} s -> {args.out}")
+    for index, error in summary['errors']:
+        print(f"  điểm {index}: {error}", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import glob
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from core.cache import canonical_key
+from core.runner import expand_grid, resolve_model, results_table, run_point, split_params
+
+PART_PATTERN = 'part-*.parquet'
+
+
+def latin_hypercube(dimensions, samples, seed=None):
+    """
+    Thiết kế Latin hypercube trên các khoảng tham số (scipy.stats.qmc).
+
+    Tham số:
+        dimensions: Dictionary tên tham số -> [thấp, cao] hoặc
+                    {'low', 'high', 'scale': 'linear'|'log', 'integer': bool}
+        samples: Số điểm mẫu
+        seed: Hạt giống của thiết kế (cùng seed cho cùng các điểm)
+
+    Trả về:
+        Danh sách dictionary tham số
+    """
+    from scipy.stats import qmc
+
+    if samples <= 0:
+        raise ValueError("Số điểm mẫu phải lớn hơn 0")
+
+    names, bounds = list(dimensions), []
+    for name in names:
+        spec = dimensions[name]
+        if isinstance(spec, (list, tuple)):
+            spec = {'low': spec[0], 'high': spec[1]}
+        low, high = float(spec['low']), float(spec['high'])
+        log_scale = spec.get('scale', 'linear') == 'log'
+        if not low < high or (log_scale and low <= 0):
+            raise ValueError(f"Khoảng không hợp lệ cho tham số {name}: [{low}, {high}]")
+        bounds.append((low, high, log_scale, bool(spec.get('integer', False))))
+
+    unit = qmc.LatinHypercube(d=len(names), seed=seed).random(samples)
+    columns = []
+    for column, (low, high, log_scale, integer) in zip(unit.T, bounds):
+        if log_scale:
+            values = np.exp(np.log(low) + column * (np.log(high) - np.log(low)))
+        else:
+            values = low + column * (high - low)
+        columns.append(np.rint(values).astype(int).tolist() if integer else values.tolist())
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def design_points(spec):
+    """
+    Các điểm tham số của thiết kế quét.
+
+    Ngoài các khóa params/grid/points của expand_grid, đặc tả có thể gồm lhs (các khoảng của
+    latin_hypercube), samples và seed; mỗi mẫu Latin hypercube được ghép với mọi điểm của lưới.
+    """
+    spec = dict(spec)
+    dimensions = spec.pop('lhs', None)
+    samples = spec.pop('samples', None)
+    seed = spec.pop('seed', None)
+    points = expand_grid(spec)
+    if dimensions is None:
+        return points
+    if samples is None:
+        raise ValueError("Thiết kế Latin hypercube cần số điểm mẫu (samples)")
+    return [{**point, **sample} for point in points for sample in latin_hypercube(dimensions, samples, seed)]
+
+
+def point_key(model, method, params, seed=None):
+    """Khóa nội dung của một điểm quét (không phụ thuộc thứ tự và kiểu số của tham số)"""
+    return canonical_key('sweep', model, method, params, seed)
+
+
+def read_parts(path, columns=None):
+    """
+    Đọc các phần kết quả đã ghi của một lần quét thành một bảng Arrow.
+
+    Các phần có thể suy ra kiểu cột khác nhau (ví dụ int và float), nên lược đồ được hợp nhất
+    trước khi đọc.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    files = sorted(glob.glob(os.path.join(path, PART_PATTERN)))
+    if not files:
+        return None
+    dataset = ds.dataset(files, format='parquet')
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()],
+                              promote_options='permissive')
+    return ds.dataset(files, schema=schema, format='parquet').to_table(columns=columns)
+
+
+def completed_keys(path):
+    """Tập khóa của các điểm đã có kết quả trong thư mục quét"""
+    table = read_parts(path, columns=['key'])
+    return set() if table is None else set(table.column('key').to_pylist())
+
+
+def _run_chunk(model, method, chunk, seed):
+    """Chạy một khối điểm trong tiến trình con và trả về bảng Arrow của các điểm thành công"""
+    import pyarrow as pa
+
+    runs, indices, keys, errors = [], [], [], []
+    for index, key, params in chunk:
+        # Hạt giống của điểm suy ra từ khóa để không phụ thuộc vào thứ tự hay cách chia khối
+        run = run_point(model, method, params, None if seed is None else int(key[:8], 16))
+        if run['error'] is not None:
+            errors.append((index, run['error']))
+            continue
+        runs.append(run)
+        indices.append(index)
+        keys.append(key)
+
+    if not runs:
+        return None, errors
+    table = results_table(runs, model, method)
+    table = table.set_column(table.schema.get_field_index('point'), 'point', pa.array(indices))
+    return table.append_column('key', pa.array(keys)), errors
+
+
+def _write_part(table, path, name):
+    """Ghi một phần kết quả (ghi tệp tạm rồi đổi tên để phần dở dang không bao giờ được đọc)"""
+    import pyarrow.parquet as pq
+
+    target = os.path.join(path, name)
+    temp_path = target + '.tmp'
+    pq.write_table(table, temp_path, compression='zstd')
+    os.replace(temp_path, target)
+    return target
+
+
+def run_sweep(model, points, out, method=None, jobs=1, chunk_size=256, seed=None, progress_callback=None):
+    """
+    Quét mô hình trên các điểm tham số, ghi dần kết quả ra thư mục Parquet.
+
+    Các điểm được chia thành khối và chạy song song trên nhóm tiến trình; mỗi khối hoàn tất
+    được ghi ngay thành một tệp part-*.parquet. Mỗi hàng mang khóa nội dung của điểm, nên khi
+    chạy lại vào cùng thư mục chỉ các điểm chưa có kết quả được tính (điểm lỗi được tính lại).
+
+    Tham số:
+        model: Tên mô hình trong core.runner.MODELS
+        points: Danh sách dictionary tham số (xem design_points)
+        out: Thư mục kết quả
+        method: Tên phương thức (None = phương thức mặc định)
+        jobs: Số tiến trình chạy song song
+        chunk_size: Số điểm mỗi khối
+        seed: Hạt giống ngẫu nhiên gốc (None = không đặt)
+        progress_callback: Hàm nhận dictionary {'done', 'total', 'failed', 'elapsed'} sau mỗi khối
+
+    Trả về:
+        Dictionary {'total', 'cached', 'computed', 'failed', 'errors', 'parts', 'elapsed'}
+    """
+    if jobs <= 0 or chunk_size <= 0:
+        raise ValueError("Số tiến trình và kích thước khối phải lớn hơn 0")
+
+    start = time.perf_counter()
+    model_class, method = resolve_model(model, method)
+    for params in points:
+        split_params(model_class, method, params)
+
+    os.makedirs(out, exist_ok=True)
+    done = completed_keys(out)
+    pending, seen = [], set()
+    for index, params in enumerate(points):
+        key = point_key(model, method, params, seed)
+        if key not in done and key not in seen:
+            seen.add(key)
+            pending.append((index, key, params))
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    summary = {'total': len(points), 'cached': len(points) - len(pending), 'computed': 0,
+               'failed': 0, 'errors': [], 'parts': [], 'elapsed': 0.0}
+    run_id = uuid.uuid4().hex[:8]
+
+    def collect(chunk_number, table, errors):
+        if table is not None:
+            summary['parts'].append(_write_part(table, out, f"part-{run_id}-{chunk_number:05d}.parquet"))
+            summary['computed'] += table.num_rows
+        summary['failed'] += len(errors)
+        summary['errors'].extend(errors)
+        if progress_callback is not None:
+            progress_callback({'done': summary['computed'] + summary['failed'], 'total': len(pending),
+                               'failed': summary['failed'], 'elapsed': time.perf_counter() - start})
+
+    if jobs == 1 or len(chunks) <= 1:
+        for chunk_number, chunk in enumerate(chunks):
+            collect(chunk_number, *_run_chunk(model, method, chunk, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # Giới hạn số khối đang chờ để bộ nhớ không tăng theo kích thước thiết kế
+            remaining = iter(enumerate(chunks))
+            running = {}
+            for chunk_number, chunk in remaining:
+                running[executor.submit(_run_chunk, model, method, chunk, seed)] = chunk_number
+                if len(running) >= 2 * jobs:
+                    break
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    collect(running.pop(future), *future.result())
+                    following = next(remaining, None)
+                    if following is not None:
+                        running[executor.submit(_run_chunk, model, method, following[1], seed)] = following[0]
+
+    summary['errors'].sort()
+    summary['elapsed'] = time.perf_counter() - start
+    return summary
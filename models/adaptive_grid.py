@@ -0,0 +1,276 @@
+import numpy as np
+
+from models.contours import marching_cells
+
+
+class AdaptiveGrid:
+    """
+    Lưới thích nghi dạng cây tứ phân (quadtree) cho các trường hiệu ứng 2 chiều.
+
+    Bắt đầu từ lưới đều 2^base_level x 2^base_level ô, mỗi ô được chia làm bốn khi:
+      - giá trị tại tâm ô lệch khỏi trung bình của bốn góc quá `tolerance` (trường thay
+        đổi nhanh hoặc cong mạnh), hoặc
+      - giá trị tại các góc và tâm ô nằm ở hai phía của một ngưỡng (đường đồng mức đi qua ô).
+
+    Các điểm lưới nằm trên mạng nguyên ở mức sâu nhất nên góc chung giữa các ô chỉ được
+    tính một lần; mỗi mức chỉ gọi hàm trường một lần trên mảng các điểm mới.
+    Hàm trường dùng giao diện chung field(x, y) -> giá trị (x, y tính bằng km), ví dụ
+    FalloutModel.field_function, ThermalRadiationModel.field_function, EMPModel.field_function.
+    """
+    def __init__(self, field, bounds, base_level=4, max_level=10, tolerance=0.05, thresholds=None,
+                 log_scale=True, dynamic_range=1e-9):
+        """
+        Tham số:
+            field: Hàm vector hóa field(x, y) -> giá trị (x, y: km)
+            bounds: Hộp bao (x_min, y_min, x_max, y_max) (km)
+            base_level: Mức chia đều ban đầu (2^base_level ô mỗi chiều)
+            max_level: Mức chia sâu nhất
+            tolerance: Sai số cho phép của nội suy tại tâm ô (theo log10 nếu log_scale,
+                       ngược lại tương đối so với giá trị lớn nhất)
+            thresholds: Danh sách ngưỡng cần phân giải chính xác đường đồng mức
+            log_scale: Đánh giá sai số theo log10 của trường (phù hợp trường giảm theo hàm mũ)
+            dynamic_range: Giá trị nhỏ hơn dynamic_range x giá trị lớn nhất được xem là nền
+        """
+        if not 0 <= base_level <= max_level:
+            raise ValueError("Phải có 0 <= base_level <= max_level")
+        if max_level > 20:
+            raise ValueError("max_level không được vượt quá 20")
+
+        x_min, y_min, x_max, y_max = bounds
+        if x_max <= x_min or y_max <= y_min:
+            raise ValueError("Hộp bao không hợp lệ")
+
+        self.field = field
+        self.bounds = (float(x_min), float(y_min), float(x_max), float(y_max))
+        self.base_level = base_level
+        self.max_level = max_level
+        self.tolerance = tolerance
+        self.thresholds = np.atleast_1d(np.asarray(thresholds if thresholds is not None else [], dtype=float))
+        self.log_scale = log_scale
+        self.dynamic_range = dynamic_range
+
+        # Bộ nhớ các điểm đã tính trên mạng nguyên (khóa đã sắp xếp, giá trị)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._values = np.empty(0)
+        self.evaluations = 0
+
+        self._build()
+
+    def _lattice_to_xy(self, ix, iy):
+        x_min, y_min, x_max, y_max = self.bounds
+        n = 2 ** self.max_level
+        return x_min + ix * (x_max - x_min) / n, y_min + iy * (y_max - y_min) / n
+
+    def _evaluate(self, ix, iy):
+        """Giá trị trường tại các điểm mạng (ix, iy), chỉ gọi hàm trường cho điểm chưa tính"""
+        keys = iy.astype(np.int64) * (2 ** self.max_level + 1) + ix
+        unique_keys = np.unique(keys)
+
+        position = np.searchsorted(self._keys, unique_keys)
+        known = position < len(self._keys)
+        known[known] = self._keys[position[known]] == unique_keys[known]
+        new_keys = unique_keys[~known]
+
+        if new_keys.size:
+            new_iy, new_ix = np.divmod(new_keys, 2 ** self.max_level + 1)
+            new_values = np.asarray(self.field(*self._lattice_to_xy(new_ix, new_iy)), dtype=float)
+            self.evaluations += new_keys.size
+
+            merged_keys = np.concatenate([self._keys, new_keys])
+            order = np.argsort(merged_keys, kind='stable')
+            self._keys = merged_keys[order]
+            self._values = np.concatenate([self._values, np.broadcast_to(new_values, new_keys.shape)])[order]
+
+        return self._values[np.searchsorted(self._keys, keys)]
+
+    def _transform(self, values):
+        """Chuyển giá trị sang thang dùng cho tiêu chí chia ô và nội suy"""
+        if self.log_scale:
+            return np.log10(np.maximum(values, self._floor))
+        return values / self._scale
+
+    def _inverse_transform(self, values):
+        if self.log_scale:
+            # Vùng nằm hoàn toàn dưới nền được trả về 0
+            return np.where(values > np.log10(self._floor), 10.0 ** values, 0.0)
+        return values * self._scale
+
+    def _build(self):
+        level = self.base_level
+        count = 2 ** level
+        rows, cols = np.divmod(np.arange(count * count), count)
+
+        leaves = {key: [] for key in ('level', 'row', 'col', 'corners')}
+        self._floor = None
+
+        while rows.size:
+            step = 2 ** (self.max_level - level)
+            iy0, ix0 = rows * step, cols * step
+            iy1, ix1 = iy0 + step, ix0 + step
+
+            corners = np.stack([self._evaluate(ix0, iy0), self._evaluate(ix1, iy0),
+                                self._evaluate(ix0, iy1), self._evaluate(ix1, iy1)], axis=-1)
+
+            # Thang giá trị được xác định từ lưới ban đầu
+            if self._floor is None:
+                peak = float(np.max(np.abs(corners))) or 1.0
+                self._floor = peak * self.dynamic_range
+                if np.any(self.thresholds > 0):
+                    # Nền phải thấp hơn ngưỡng nhỏ nhất để đường đồng mức vẫn phân giải được
+                    self._floor = min(self._floor, 0.1 * self.thresholds[self.thresholds > 0].min())
+                self._scale = peak
+
+            if level < self.max_level:
+                half = step // 2
+                center = self._evaluate(ix0 + half, iy0 + half)
+
+                transformed = self._transform(corners)
+                error = np.abs(self._transform(center) - transformed.mean(axis=-1))
+                refine = error > self.tolerance
+
+                if self.thresholds.size:
+                    samples = np.concatenate([corners, center[:, np.newaxis]], axis=-1)
+                    low, high = samples.min(axis=-1), samples.max(axis=-1)
+                    crosses = (low[:, np.newaxis] < self.thresholds) & (self.thresholds <= high[:, np.newaxis])
+                    refine |= crosses.any(axis=-1)
+            else:
+                refine = np.zeros(rows.size, dtype=bool)
+
+            keep = ~refine
+            leaves['level'].append(np.full(keep.sum(), level, dtype=np.int8))
+            leaves['row'].append(rows[keep])
+            leaves['col'].append(cols[keep])
+            leaves['corners'].append(corners[keep])
+
+            # Mỗi ô cần chia sinh ra bốn ô con ở mức tiếp theo
+            rows = (2 * rows[refine][:, np.newaxis] + np.array([0, 0, 1, 1])).ravel()
+            cols = (2 * cols[refine][:, np.newaxis] + np.array([0, 1, 0, 1])).ravel()
+            level += 1
+
+        self.leaf_level = np.concatenate(leaves['level'])
+        self.leaf_row = np.concatenate(leaves['row'])
+        self.leaf_col = np.concatenate(leaves['col'])
+        self.leaf_corners = np.concatenate(leaves['corners'])
+
+        # Chỉ mục lá theo mức: khóa row * 2^level + col đã sắp xếp
+        self._leaf_index = {}
+        for level in np.unique(self.leaf_level):
+            members = np.flatnonzero(self.leaf_level == level)
+            keys = self.leaf_row[members].astype(np.int64) * 2 ** int(level) + self.leaf_col[members]
+            order = np.argsort(keys)
+            self._leaf_index[int(level)] = (keys[order], members[order])
+
+    @property
+    def num_leaves(self):
+        return len(self.leaf_level)
+
+    @property
+    def depth(self):
+        """Mức sâu nhất thực tế của cây"""
+        return int(self.leaf_level.max())
+
+    def leaf_bounds(self):
+        """
+        Hộp bao của các ô lá.
+
+        Trả về:
+            Mảng (số lá, 4) gồm (x_min, y_min, x_max, y_max) (km)
+        """
+        step = 2 ** (self.max_level - self.leaf_level.astype(np.int64))
+        x0, y0 = self._lattice_to_xy(self.leaf_col * step, self.leaf_row * step)
+        x1, y1 = self._lattice_to_xy((self.leaf_col + 1) * step, (self.leaf_row + 1) * step)
+        return np.stack([x0, y0, x1, y1], axis=-1)
+
+    def sample(self, x, y):
+        """
+        Nội suy trường tại các điểm bất kỳ trong hộp bao từ ô lá chứa điểm
+        (song tuyến tính, theo log10 nếu log_scale), không gọi lại hàm trường.
+
+        Tham số:
+            x, y: Mảng tọa độ (km), có thể broadcast với nhau
+
+        Trả về:
+            Mảng giá trị cùng hình dạng broadcast của x và y
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        x_min, y_min, x_max, y_max = self.bounds
+        u = np.clip((x.ravel() - x_min) / (x_max - x_min), 0, 1)
+        v = np.clip((y.ravel() - y_min) / (y_max - y_min), 0, 1)
+
+        leaf = np.full(u.size, -1, dtype=np.int64)
+        pending = np.arange(u.size)
+        for level in sorted(self._leaf_index, reverse=True):
+            if not pending.size:
+                break
+            keys, members = self._leaf_index[level]
+            count = 2 ** level
+            rows = np.minimum((v[pending] * count).astype(np.int64), count - 1)
+            cols = np.minimum((u[pending] * count).astype(np.int64), count - 1)
+            query = rows * count + cols
+
+            position = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+            found = keys[position] == query
+            leaf[pending[found]] = members[position[found]]
+            pending = pending[~found]
+
+        count = 2.0 ** self.leaf_level[leaf]
+        fu = u * count - self.leaf_col[leaf]
+        fv = v * count - self.leaf_row[leaf]
+        corners = self._transform(self.leaf_corners[leaf])
+        values = ((corners[:, 0] * (1 - fu) + corners[:, 1] * fu) * (1 - fv)
+                  + (corners[:, 2] * (1 - fu) + corners[:, 3] * fu) * fv)
+        return self._inverse_transform(values).reshape(x.shape)
+
+    def to_raster(self, resolution=None, dtype=np.float32):
+        """
+        Xuất trường ra lưới đều (điểm nút), nội suy từ các ô lá.
+
+        Tham số:
+            resolution: Số điểm mỗi chiều (None = 2^depth + 1, khớp mức sâu nhất của cây)
+            dtype: Kiểu dữ liệu của lưới kết quả
+
+        Trả về:
+            Dictionary gồm trục 'x', 'y' (km) và 'values' (len(y), len(x))
+        """
+        if resolution is None:
+            resolution = 2 ** self.depth + 1
+        x_min, y_min, x_max, y_max = self.bounds
+        x = np.linspace(x_min, x_max, resolution)
+        y = np.linspace(y_min, y_max, resolution)
+
+        values = np.empty((resolution, resolution), dtype=dtype)
+        chunk_rows = max(1, 2 ** 20 // resolution)
+        for start in range(0, resolution, chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            values[rows] = self.sample(x[np.newaxis, :], y[rows, np.newaxis])
+
+        return {'x': x, 'y': y, 'values': values}
+
+    def to_contours(self, levels=None):
+        """
+        Trích đường đồng mức trực tiếp từ các ô lá bằng marching squares.
+
+        Các ô có đường đồng mức của một ngưỡng trong `thresholds` đã được chia tới mức sâu
+        nhất, nên đường đồng mức có độ phân giải của lưới mịn nhất mà không cần lưới đều.
+
+        Tham số:
+            levels: Danh sách ngưỡng (None = self.thresholds)
+
+        Trả về:
+            Dictionary {ngưỡng: danh sách mảng (n, 2) tọa độ (x, y) km của từng đường};
+            đường khép kín có điểm cuối trùng điểm đầu
+        """
+        levels = self.thresholds if levels is None else np.atleast_1d(np.asarray(levels, dtype=float))
+        corners = self._transform(self.leaf_corners)
+        step = 2 ** (self.max_level - self.leaf_level.astype(np.int64))
+        corner_ix = self.leaf_col[:, np.newaxis] * step[:, np.newaxis] + np.array([0, 1, 0, 1]) * step[:, np.newaxis]
+        corner_iy = self.leaf_row[:, np.newaxis] * step[:, np.newaxis] + np.array([0, 0, 1, 1]) * step[:, np.newaxis]
+        corner_keys = corner_iy * (2 ** self.max_level + 1) + corner_ix
+
+        contours = {}
+        for level in levels:
+            target = float(self._transform(np.asarray(level, dtype=float)))
+            lines = marching_cells(corners, corner_ix, corner_iy, corner_keys, target)
+            contours[float(level)] = [np.column_stack(self._lattice_to_xy(line[:, 0], line[:, 1])) for line in lines]
+
+        return contours
@@ -1,9 +1,9 @@
 import numpy as np
-from scipy.integrate import odeint
-import matplotlib.pyplot as plt
 from scipy.optimize import root_scalar
 from numba import jit
 import warnings
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 # Tách hàm tính bán kính ra khỏi lớp để có thể tối ưu hóa với numba
 @jit(nopython=True)
@@ -90,6 +90,30 @@ class SedovTaylorModel:
                 tau = 0.5  # Thời gian đặc trưng cho sự suy giảm
                 return shock_pressure * (1 - rel_distance) * np.exp(-rel_distance/tau)
     
+    def peak_overpressure(self, distance):
+        """
+        Tính áp suất dư lớn nhất theo thời gian tại khoảng cách distance (dạng đóng, vector hóa)
+        
+        Với R(t) = β·(E·t²/ρ)^(1/5), áp suất mặt sóng 0.75·ρ·(R/t)²/γ = 0.75·E·β⁵/(γ·R³)
+        không phụ thuộc ρ. Phía sau mặt sóng, tại u = r/R ≤ 0.95:
+            p(r, u) = 0.75·E·β⁵/(γ·r³) · u³·(1 - u)·e^(-2u)
+        đạt cực đại khi 2u² - 6u + 3 = 0, tức u* = (3 - √3)/2, nên không cần quét theo thời gian.
+        
+        Args:
+            distance: Khoảng cách (m), số hoặc mảng
+        
+        Returns:
+            Áp suất dư đỉnh (Pa), cùng hình dạng với distance
+        """
+        beta, tau = 1.15, 0.5
+        u = (3 - np.sqrt(3)) / 2
+        shape_factor = u**3 * (1 - u) * np.exp(-u / tau)
+        
+        distance = np.maximum(np.asarray(distance, dtype=float), 1.0)
+        return 0.75 * self.energy * beta**5 / self.gamma * shape_factor / distance**3
+    
+    @cached_result()
+    @instrumented()
     def simulate_blast_wave(self, max_distance=10000, times=None, num_points=200):
         """
         Mô phỏng sự lan truyền của sóng xung kích theo thời gian và khoảng cách
@@ -130,6 +154,8 @@ class SedovTaylorModel:
                         # Suy giảm hàm mũ phía sau mặt sóng xung kích
                         tau = 0.5
                         pressures[i, j] = shock_pressure * (1 - rel_distance) * np.exp(-rel_distance/tau)
+        
+        count('blast_wave.grid_cells', pressures.size)
                 
         return {
             'times': times,
@@ -229,6 +255,7 @@ class SedovTaylorModel:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
                 result = root_scalar(distance_diff, bracket=[0.1, 100], method='brentq')
+                count('solver.iterations', result.iterations)
                 arrival_time = result.root if result.converged else None
         except:
             arrival_time = None
@@ -281,6 +308,8 @@ class SedovTaylorModel:
             show_damage: Có hiển thị ngưỡng thiệt hại hay không
             lang: Ngôn ngữ hiển thị ('vi' cho tiếng Việt, 'en' cho tiếng Anh)
         """
+        import matplotlib.pyplot as plt
+        
         times = simulation_data['times']
         distances = simulation_data['distances']
         pressures = simulation_data['pressures']
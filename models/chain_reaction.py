@@ -1,5 +1,7 @@
 import numpy as np
 from scipy.integrate import solve_ivp
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 class ChainReactionModel:
     def __init__(self, fission_cross_section=1.0, neutron_speed=2200, 
@@ -57,6 +59,8 @@ class ChainReactionModel:
         critical_mass = volume * self.uranium_density  # g
         return critical_mass / 1000  # kg
     
+    @cached_result()
+    @instrumented()
     def simulate_chain_reaction(self, initial_neutrons=1, 
                                mass_ratio=1.5, time_span=(0, 0.001), 
                                time_steps=1000, include_delayed=False):
@@ -98,6 +102,7 @@ class ChainReactionModel:
             t_eval = np.linspace(time_span[0], time_span[1], time_steps)
             solution = solve_ivp(neutron_kinetics, time_span, y0, 
                                  method='BDF', t_eval=t_eval)
+            count('solver.evaluations', solution.nfev)
             
             return solution.t, solution.y[0]  # Chỉ trả về số lượng neutron
         else:
@@ -109,6 +114,7 @@ class ChainReactionModel:
             t_eval = np.linspace(time_span[0], time_span[1], time_steps)
             solution = solve_ivp(neutron_growth, time_span, [initial_neutrons], 
                                  method='RK45', t_eval=t_eval)
+            count('solver.evaluations', solution.nfev)
             
             return solution.t, solution.y[0]
             
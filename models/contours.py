@@ -0,0 +1,360 @@
+import numpy as np
+
+from models.threshold_solver import solve_threshold_radii
+
+# Thứ tự góc của ô: 0 dưới-trái, 1 dưới-phải, 2 trên-trái, 3 trên-phải.
+# Cạnh: 0 dưới, 1 phải, 2 trên, 3 trái
+_EDGE_CORNERS = {0: (0, 1), 1: (1, 3), 2: (2, 3), 3: (0, 2)}
+
+# Marching squares: mã trường hợp (bit 1 dưới-trái, 2 dưới-phải, 4 trên-phải, 8 trên-trái
+# nằm trên ngưỡng) -> các cặp cạnh bị đường đồng mức cắt. Trường hợp yên ngựa (5, 10)
+# có hai cách nối, chọn theo giá trị trung bình của ô (tâm trên ngưỡng, tâm dưới ngưỡng).
+_SEGMENT_TABLE = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)],
+    5: ([(0, 1), (2, 3)], [(3, 0), (1, 2)]),
+    6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)], 9: [(2, 0)],
+    10: ([(3, 0), (1, 2)], [(0, 1), (2, 3)]),
+    11: [(2, 1)], 12: [(1, 3)], 13: [(1, 0)], 14: [(0, 3)]
+}
+_SADDLE_CASES = (5, 10)
+
+
+def marching_cells(corners, corner_x, corner_y, corner_keys, level):
+    """
+    Marching squares vector hóa trên một tập ô bất kỳ (lưới đều hoặc lá của cây tứ phân).
+
+    Tham số:
+        corners: Giá trị tại bốn góc của mỗi ô, mảng (n, 4) theo thứ tự
+                 dưới-trái, dưới-phải, trên-trái, trên-phải
+        corner_x, corner_y: Tọa độ các góc, mảng (n, 4)
+        corner_keys: Mã số nguyên duy nhất của mỗi điểm góc, mảng (n, 4); hai ô kề nhau
+                     có chung cạnh khi có chung mã góc, dùng để nối các đoạn thẳng
+        level: Ngưỡng (cùng thang với corners)
+
+    Trả về:
+        Danh sách mảng (m, 2) tọa độ của các đường đồng mức;
+        đường khép kín có điểm cuối trùng điểm đầu
+    """
+    cases = (corners >= level) @ np.array([1, 2, 8, 4])
+    center_above = corners.mean(axis=-1) >= level
+
+    first, second = [], []
+    for case, pairs in _SEGMENT_TABLE.items():
+        cells = np.flatnonzero(cases == case)
+        if not cells.size:
+            continue
+        if case in _SADDLE_CASES:
+            for mask, saddle_pairs in ((center_above[cells], pairs[0]), (~center_above[cells], pairs[1])):
+                for edge_a, edge_b in saddle_pairs:
+                    first.append((cells[mask], edge_a))
+                    second.append((cells[mask], edge_b))
+        else:
+            for edge_a, edge_b in pairs:
+                first.append((cells, edge_a))
+                second.append((cells, edge_b))
+
+    if not first:
+        return []
+
+    def crossings(selections):
+        """Điểm cắt và mã cạnh của đường đồng mức trên các cạnh ô đã chọn"""
+        points, keys = [], []
+        for cells, edge in selections:
+            a, b = _EDGE_CORNERS[edge]
+            value_a, value_b = corners[cells, a], corners[cells, b]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = np.clip(np.nan_to_num((level - value_a) / (value_b - value_a), nan=0.5), 0, 1)
+            points.append(np.column_stack([
+                corner_x[cells, a] + t * (corner_x[cells, b] - corner_x[cells, a]),
+                corner_y[cells, a] + t * (corner_y[cells, b] - corner_y[cells, a])
+            ]))
+            key_a, key_b = corner_keys[cells, a], corner_keys[cells, b]
+            keys.append(np.column_stack([np.minimum(key_a, key_b), np.maximum(key_a, key_b)]))
+        return np.concatenate(points), np.concatenate(keys)
+
+    start_points, start_keys = crossings(first)
+    end_points, end_keys = crossings(second)
+    return _join_segments(start_points, end_points, start_keys, end_keys)
+
+
+def _join_segments(start_points, end_points, start_keys, end_keys):
+    """
+    Nối các đoạn thẳng có chung điểm cắt (cùng mã cạnh) thành các đường liên tục.
+
+    Trả về:
+        Danh sách mảng (n, 2); đường khép kín có điểm cuối trùng điểm đầu
+    """
+    endpoint_keys = [tuple(key) for key in np.concatenate([start_keys, end_keys]).tolist()]
+    count = len(start_points)
+
+    # Mỗi điểm cắt thuộc tối đa hai đoạn (hai ô kề nhau)
+    owners = {}
+    for index, key in enumerate(endpoint_keys):
+        owners.setdefault(key, []).append(index)
+
+    def neighbor(endpoint):
+        """Đầu mút của đoạn khác nằm cùng điểm cắt"""
+        for other in owners[endpoint_keys[endpoint]]:
+            if other % count != endpoint % count:
+                return other
+        return None
+
+    def other_end(endpoint):
+        return endpoint + count if endpoint < count else endpoint - count
+
+    used = np.zeros(count, dtype=bool)
+
+    def walk(endpoint):
+        """Đi dọc các đoạn kề nhau từ một đầu mút; trả về các đầu mút đi qua và đầu mút dừng"""
+        path = []
+        endpoint = neighbor(endpoint)
+        while endpoint is not None and not used[endpoint % count]:
+            used[endpoint % count] = True
+            endpoint = other_end(endpoint)
+            path.append(endpoint)
+            endpoint = neighbor(endpoint)
+        return path, endpoint
+
+    points = np.concatenate([start_points, end_points])
+    lines = []
+    for seed in range(count):
+        if used[seed]:
+            continue
+        used[seed] = True
+
+        forward, stop = walk(seed + count)
+        if stop == seed:
+            # Đường khép kín: điểm cuối trùng điểm đầu
+            line = points[[seed, seed + count] + forward]
+            line[-1] = line[0]
+        else:
+            backward, _ = walk(seed)
+            line = points[backward[::-1] + [seed, seed + count] + forward]
+        lines.append(line)
+
+    return lines
+
+
+def marching_squares(x, y, values, level):
+    """
+    Trích đường đồng mức của lưới đều bằng marching squares vector hóa.
+    Chỉ các ô có ngưỡng nằm giữa giá trị các góc được xử lý.
+
+    Tham số:
+        x, y: Trục tọa độ tăng dần
+        values: Mảng giá trị (len(y), len(x))
+        level: Ngưỡng
+
+    Trả về:
+        Danh sách mảng (m, 2) tọa độ (x, y) của các đường đồng mức
+    """
+    values = np.asarray(values, dtype=float)
+    above = values >= level
+    crossing = ((above[:-1, :-1] != above[:-1, 1:]) | (above[:-1, :-1] != above[1:, :-1])
+                | (above[:-1, :-1] != above[1:, 1:]))
+    rows, cols = np.nonzero(crossing)
+    if not rows.size:
+        return []
+
+    corner_rows = rows[:, np.newaxis] + np.array([0, 0, 1, 1])
+    corner_cols = cols[:, np.newaxis] + np.array([0, 1, 0, 1])
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    return marching_cells(values[corner_rows, corner_cols], x[corner_cols], y[corner_rows],
+                          corner_rows * values.shape[1] + corner_cols, level)
+
+
+def simplify_line(line, tolerance):
+    """
+    Giản lược đường gấp khúc bằng thuật toán Douglas-Peucker (không đệ quy).
+    Đường khép kín được tách tại điểm xa điểm đầu nhất để giữ hình dạng vòng.
+
+    Tham số:
+        line: Mảng (n, 2) tọa độ
+        tolerance: Khoảng lệch tối đa cho phép (cùng đơn vị với tọa độ)
+
+    Trả về:
+        Mảng (k, 2) gồm các điểm được giữ lại (k <= n)
+    """
+    line = np.asarray(line, dtype=float)
+    if tolerance <= 0 or len(line) < 3:
+        return line
+
+    if np.array_equal(line[0], line[-1]):
+        split = int(np.argmax(np.hypot(*(line - line[0]).T)))
+        if split == 0:
+            return line[[0, -1]]
+        return np.vstack([_douglas_peucker(line[:split + 1], tolerance)[:-1],
+                          _douglas_peucker(line[split:], tolerance)])
+    return _douglas_peucker(line, tolerance)
+
+
+def _douglas_peucker(points, tolerance):
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        # Khoảng cách vuông góc của các điểm bên trong tới dây cung (vector hóa)
+        chord = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(*chord)
+        if length > 0:
+            distances = np.abs(chord[0] * offsets[:, 1] - chord[1] * offsets[:, 0]) / length
+        else:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.extend([(start, index), (index, end)])
+
+    return points[keep]
+
+
+def polygon_area(line):
+    """Diện tích (có dấu) của đa giác theo công thức shoelace; đường hở được nối bằng dây cung"""
+    x, y = np.asarray(line, dtype=float).T
+    return 0.5 * (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _point_in_polygon(point, line):
+    """Kiểm tra điểm nằm trong đa giác (quy tắc chẵn-lẻ, vector hóa theo cạnh)"""
+    x, y = np.asarray(line, dtype=float).T
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    straddles = (y > point[1]) != (y_next > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x + (point[1] - y) * (x_next - x) / (y_next - y)
+    return np.count_nonzero(straddles & (point[0] < x_cross)) % 2 == 1
+
+
+def contour_statistics(lines, center=(0, 0)):
+    """
+    Thống kê của các đường đồng mức một ngưỡng.
+
+    Diện tích vùng bên trong được tính theo quy tắc chẵn-lẻ: vòng nằm trong một số lẻ
+    vòng khác là lỗ và bị trừ đi. Đường hở (bị cắt bởi biên lưới) được nối bằng dây cung
+    nên diện tích khi đó chỉ là gần đúng.
+
+    Tham số:
+        lines: Danh sách mảng (n, 2) tọa độ
+        center: Điểm tham chiếu để tính tầm xa nhất
+
+    Trả về:
+        Dictionary gồm 'area', 'max_range', 'num_vertices' và 'clipped'
+        (True nếu có đường hở)
+    """
+    if not lines:
+        return {'area': 0.0, 'max_range': 0.0, 'num_vertices': 0, 'clipped': False}
+
+    areas = np.array([abs(polygon_area(line)) for line in lines])
+    depth = np.zeros(len(lines), dtype=int)
+    for i, line in enumerate(lines):
+        for j, other in enumerate(lines):
+            if i != j and areas[j] > areas[i] and _point_in_polygon(line[0], other):
+                depth[i] += 1
+
+    vertices = np.vstack(lines)
+    return {
+        'area': float(np.sum(np.where(depth % 2 == 0, areas, -areas))),
+        'max_range': float(np.max(np.hypot(vertices[:, 0] - center[0], vertices[:, 1] - center[1]))),
+        'num_vertices': len(vertices),
+        'clipped': any(not np.array_equal(line[0], line[-1]) for line in lines)
+    }
+
+
+def extract_contours(x, y, values, levels, simplify_tolerance=0.0, log_scale=False, center=(0, 0)):
+    """
+    Trích và giản lược đường đồng mức của một lưới đều tại các ngưỡng cố định.
+
+    Tham số:
+        x, y: Trục tọa độ tăng dần
+        values: Mảng giá trị (len(y), len(x))
+        levels: Danh sách ngưỡng
+        simplify_tolerance: Sai lệch cho phép khi giản lược (0 = giữ nguyên)
+        log_scale: Nội suy điểm cắt theo log10 của giá trị (phù hợp trường giảm theo hàm mũ)
+        center: Điểm tham chiếu để tính tầm xa nhất
+
+    Trả về:
+        Dictionary {ngưỡng: {'lines', 'area', 'max_range', 'num_vertices', 'clipped'}}
+    """
+    values = np.asarray(values, dtype=float)
+    if log_scale:
+        with np.errstate(divide='ignore'):
+            values = np.log10(np.maximum(values, 0))
+
+    contours = {}
+    for level in np.atleast_1d(np.asarray(levels, dtype=float)):
+        target = np.log10(level) if log_scale else level
+        lines = [simplify_line(line, simplify_tolerance) for line in marching_squares(x, y, values, target)]
+        contours[float(level)] = {'lines': lines, **contour_statistics(lines, center)}
+    return contours
+
+
+def field_contours(field, bounds, levels, resolution=256, simplify_tolerance=None, log_scale=False,
+                   center=(0, 0)):
+    """
+    Trích đường đồng mức của một hàm trường field(x, y) (giao diện chung của các mô hình,
+    ví dụ FalloutModel.field_function) trên hộp bao cho trước.
+
+    Tham số:
+        field: Hàm vector hóa field(x, y) -> giá trị
+        bounds: Hộp bao (x_min, y_min, x_max, y_max)
+        levels: Danh sách ngưỡng
+        resolution: Số điểm lưới mỗi chiều
+        simplify_tolerance: Sai lệch cho phép khi giản lược (None = nửa bước lưới)
+        log_scale: Nội suy điểm cắt theo log10 của giá trị
+        center: Điểm tham chiếu để tính tầm xa nhất
+
+    Trả về:
+        Dictionary như extract_contours
+    """
+    x_min, y_min, x_max, y_max = bounds
+    x = np.linspace(x_min, x_max, resolution)
+    y = np.linspace(y_min, y_max, resolution)
+    values = field(x[np.newaxis, :], y[:, np.newaxis])
+
+    if simplify_tolerance is None:
+        simplify_tolerance = 0.5 * min(x[1] - x[0], y[1] - y[0])
+    return extract_contours(x, y, values, levels, simplify_tolerance, log_scale, center)
+
+
+def radial_contours(profile, levels, lower, upper, center=(0, 0), num_vertices=96):
+    """
+    Đường đồng mức của mô hình đối xứng xuyên tâm, tính bán kính bằng giải tích
+    (solve_threshold_radii) thay vì trên lưới.
+
+    Tham số:
+        profile: Hàm vector hóa profile(distance) -> giá trị, giảm theo khoảng cách
+        levels: Danh sách ngưỡng
+        lower, upper: Khoảng tìm bán kính (cùng đơn vị với khoảng cách)
+        center: Tâm của các vòng tròn
+        num_vertices: Số đỉnh của mỗi vòng tròn
+
+    Trả về:
+        Dictionary như extract_contours, thêm khóa 'radius'
+    """
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    radii = solve_threshold_radii(profile, levels, lower=lower, upper=upper)
+
+    angles = np.linspace(0, 2 * np.pi, num_vertices + 1)
+    angles[-1] = 0.0  # điểm cuối trùng chính xác điểm đầu
+    contours = {}
+    for level, radius in zip(levels, radii):
+        lines = []
+        if radius > 0:
+            lines = [np.column_stack([center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)])]
+        contours[float(level)] = {
+            'lines': lines,
+            'radius': float(radius),
+            'area': float(np.pi * radius**2),
+            'max_range': float(radius),
+            'num_vertices': len(lines[0]) if lines else 0,
+            'clipped': False
+        }
+    return contours
@@ -0,0 +1,323 @@
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import solve_triangular
+from scipy.sparse.linalg import expm as sparse_expm, expm_multiply
+
+# Thư viện chuỗi phân rã mặc định đi kèm mô hình
+DEFAULT_CHAIN_FILE = os.path.join(os.path.dirname(__file__), 'data', 'fission_product_chains.csv')
+
+# Hệ số đổi đơn vị thời gian bán rã sang giây
+TIME_UNITS = {
+    's': 1.0,
+    'min': 60.0,
+    'h': 3600.0,
+    'd': 24 * 3600.0,
+    'y': 365.25 * 24 * 3600.0
+}
+
+
+class DecayChain:
+    """
+    Thư viện chuỗi phân rã các sản phẩm phân hạch.
+
+    Các hạt nhân được sắp xếp theo thứ tự tô-pô (hạt mẹ đứng trước hạt con) nên ma trận
+    phân rã A (dN/dt = A·N) là ma trận tam giác dưới thưa: A[i, i] = -λ_i và
+    A[con, mẹ] = tỷ lệ nhánh · λ_mẹ.
+    """
+    def __init__(self, names, half_lives, fission_yields, gamma_energies, daughters):
+        """
+        Khởi tạo thư viện chuỗi phân rã.
+
+        Tham số:
+            names: Danh sách tên hạt nhân
+            half_lives: Thời gian bán rã (giây), np.inf cho hạt nhân bền
+            fission_yields: Số nguyên tử tạo ra trên mỗi phân hạch
+            gamma_energies: Năng lượng gamma trung bình trên mỗi phân rã (MeV)
+            daughters: Danh sách (cùng thứ tự) các dict {tên hạt con: tỷ lệ nhánh}
+        """
+        index = {name: i for i, name in enumerate(names)}
+        if len(index) != len(names):
+            raise ValueError("Thư viện chuỗi phân rã có hạt nhân bị trùng tên")
+
+        for name, branches in zip(names, daughters):
+            for daughter, fraction in branches.items():
+                if daughter not in index:
+                    raise ValueError(f"Hạt con không có trong thư viện: {name} -> {daughter}")
+                if not 0 <= fraction <= 1:
+                    raise ValueError(f"Tỷ lệ nhánh không hợp lệ: {name} -> {daughter}")
+
+        # Sắp xếp lại theo thứ tự tô-pô để ma trận phân rã là tam giác dưới
+        order = self._topological_order(names, daughters, index)
+
+        self.names = [names[i] for i in order]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.half_lives = np.asarray(half_lives, dtype=float)[order]
+        self.fission_yields = np.asarray(fission_yields, dtype=float)[order]
+        self.gamma_energies = np.asarray(gamma_energies, dtype=float)[order]
+        self.daughters = [daughters[i] for i in order]
+
+        # Hằng số phân rã λ = ln(2)/t_half (1/s), bằng 0 với hạt nhân bền
+        self.decay_constants = np.log(2) / self.half_lives
+
+        self.matrix = self._build_matrix()
+
+    @staticmethod
+    def _topological_order(names, daughters, index):
+        """Sắp xếp hạt nhân sao cho hạt mẹ luôn đứng trước hạt con (thuật toán Kahn)"""
+        in_degree = np.zeros(len(names), dtype=int)
+        for branches in daughters:
+            for daughter in branches:
+                in_degree[index[daughter]] += 1
+
+        # Giữ nguyên thứ tự trong tệp dữ liệu khi có thể
+        ready = [i for i in range(len(names)) if in_degree[i] == 0]
+        order = []
+        while ready:
+            i = ready.pop(0)
+            order.append(i)
+            for daughter in daughters[i]:
+                j = index[daughter]
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    ready.append(j)
+
+        if len(order) != len(names):
+            raise ValueError("Chuỗi phân rã chứa chu trình")
+
+        return np.array(order, dtype=int)
+
+    def _build_matrix(self):
+        """Xây dựng ma trận phân rã thưa (CSR)"""
+        rows = list(range(len(self.names)))
+        cols = list(range(len(self.names)))
+        values = list(-self.decay_constants)
+
+        for parent, branches in enumerate(self.daughters):
+            for daughter, fraction in branches.items():
+                rows.append(self.index[daughter])
+                cols.append(parent)
+                values.append(fraction * self.decay_constants[parent])
+
+        size = len(self.names)
+        return sparse.csr_matrix((values, (rows, cols)), shape=(size, size))
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CHAIN_FILE):
+        """
+        Đọc thư viện chuỗi phân rã từ tệp CSV.
+
+        Các cột: nuclide, half_life, unit, fission_yield, gamma_energy, daughters.
+        Dòng bắt đầu bằng '#' là chú thích; half_life để trống nghĩa là hạt nhân bền.
+        """
+        names, half_lives, yields, energies, daughters = [], [], [], [], []
+
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(line for line in f if not line.lstrip().startswith('#'))
+            for row in reader:
+                names.append(row['nuclide'].strip())
+
+                half_life = row['half_life'].strip()
+                if half_life:
+                    unit = row['unit'].strip()
+                    if unit not in TIME_UNITS:
+                        raise ValueError(f"Đơn vị thời gian không hợp lệ: {unit}")
+                    half_lives.append(float(half_life) * TIME_UNITS[unit])
+                else:
+                    half_lives.append(np.inf)
+
+                yields.append(float(row['fission_yield'] or 0))
+                energies.append(float(row['gamma_energy'] or 0))
+
+                branches = {}
+                for item in (row['daughters'] or '').split():
+                    daughter, _, fraction = item.partition(':')
+                    branches[daughter] = float(fraction) if fraction else 1.0
+                daughters.append(branches)
+
+        return cls(names, half_lives, yields, energies, daughters)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class BatemanSolver:
+    """
+    Giải hệ phương trình Bateman dN/dt = A·N bằng hàm mũ ma trận.
+
+    Ba cách tính được dùng:
+      - Phân tích phổ của ma trận tam giác A = C·Λ·C⁻¹ (chính xác với chuỗi không chu trình),
+        tính một lần rồi dùng lại cho mọi thời điểm đầu ra: exp(A·t) = C·exp(Λ·t)·C⁻¹.
+      - Khi hằng số phân rã của hạt mẹ và hạt con trùng hoặc gần trùng nhau, C có số điều
+        kiện rất lớn và cách trên mất chính xác; khi đó tích exp(A·t)·N0 được tính bằng
+        scipy.sparse.linalg.expm_multiply (chuỗi Taylor có chia bước) qua các thời điểm tăng dần.
+      - Ma trận lan truyền exp(A·Δt) thưa cho bước thời gian cố định, được lưu đệm
+        theo kích thước bước để lặp nhiều bước đều nhau.
+    """
+    # Số điều kiện lớn nhất của ma trận vector riêng để dùng phân tích phổ (sai số ~ 1e-8)
+    MAX_CONDITION = 1e8
+
+    def __init__(self, chain, propagator_cache_size=32):
+        """
+        Tham số:
+            chain: Thư viện DecayChain
+            propagator_cache_size: Số ma trận lan truyền exp(A·Δt) được lưu đệm
+        """
+        self.chain = chain
+        self.matrix = chain.matrix.tocsc()
+        self._modes = None
+        self.propagator = lru_cache(maxsize=propagator_cache_size)(self._propagator)
+
+    def _propagator(self, dt):
+        """Ma trận lan truyền thưa exp(A·dt) cho bước thời gian dt (giây)"""
+        return sparse.csr_matrix(sparse_expm(self.matrix * float(dt)))
+
+    def _spectral_decomposition(self):
+        """
+        Tính ma trận vector riêng C (tam giác dưới, đường chéo bằng 1) của ma trận phân rã.
+
+        Với vector riêng thứ k (trị riêng -λ_k), thành phần thứ i thỏa mãn
+        C[i, k] = Σ_mẹ A[i, mẹ]·C[mẹ, k] / (λ_i - λ_k), chỉ cần duyệt qua các hạt mẹ của i.
+
+        Trả về:
+            Ma trận C, hoặc None nếu hằng số phân rã trùng hoặc gần trùng nhau trong một chuỗi
+            làm C suy biến hay có số điều kiện vượt MAX_CONDITION
+        """
+        if self._modes is not None:
+            return None if self._modes is False else self._modes
+
+        decay_constants = self.chain.decay_constants
+        size = len(decay_constants)
+        modes = np.eye(size)
+        lower = sparse.tril(self.chain.matrix, k=-1).tocsr()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(1, size):
+                start, stop = lower.indptr[i], lower.indptr[i + 1]
+                if start == stop:
+                    continue
+                parents = lower.indices[start:stop]
+                numerator = lower.data[start:stop] @ modes[parents, :i]
+                denominator = decay_constants[i] - decay_constants[:i]
+                modes[i, :i] = np.divide(numerator, denominator,
+                                         out=np.zeros(i), where=numerator != 0)
+
+        condition = np.inf
+        if np.all(np.isfinite(modes)):
+            with np.errstate(over='ignore', invalid='ignore'):
+                inverse = solve_triangular(modes, np.eye(size), lower=True, unit_diagonal=True)
+                condition = np.linalg.norm(modes, 1) * np.linalg.norm(inverse, 1)
+
+        # False đánh dấu đã kiểm tra và phải dùng expm_multiply
+        self._modes = modes if condition <= self.MAX_CONDITION else False
+        return None if self._modes is False else self._modes
+
+    def _mode_amplitudes(self, initial_inventory):
+        """Hệ số khai triển C⁻¹·N0 của lượng ban đầu theo các vector riêng"""
+        modes = self._spectral_decomposition()
+        amplitudes = solve_triangular(modes, np.asarray(initial_inventory, dtype=float),
+                                      lower=True, unit_diagonal=True)
+        return modes, amplitudes
+
+    def _solve_expm_multiply(self, initial_inventory, times):
+        """
+        Tính exp(A·t)·N0 bằng expm_multiply, đi qua các thời điểm phân biệt theo thứ tự tăng dần.
+
+        Trả về:
+            Mảng (số phần tử của times, số hạt nhân) theo thứ tự times.ravel()
+        """
+        unique_times, inverse = np.unique(np.ravel(times), return_inverse=True)
+        if unique_times.size and unique_times[0] < 0:
+            raise ValueError("Thời điểm đầu ra không được âm")
+
+        inventory = np.asarray(initial_inventory, dtype=float)
+        results = np.empty((len(unique_times), len(inventory)))
+        previous = 0.0
+        for k, t in enumerate(unique_times):
+            if t > previous:
+                inventory = expm_multiply(self.matrix * (t - previous), inventory)
+                previous = t
+            results[k] = inventory
+        return results[inverse]
+
+    def solve(self, initial_inventory, times):
+        """
+        Tính lượng hạt nhân tại nhiều thời điểm trong một lần.
+
+        Tham số:
+            initial_inventory: Số nguyên tử ban đầu của mỗi hạt nhân (theo thứ tự chain.names)
+            times: Mảng thời điểm đầu ra (giây)
+
+        Trả về:
+            Mảng (số thời điểm, số hạt nhân) số nguyên tử
+        """
+        times = np.asarray(times, dtype=float)
+        if self._spectral_decomposition() is None:
+            return self._solve_expm_multiply(initial_inventory, times).reshape(times.shape + (-1,))
+
+        modes, amplitudes = self._mode_amplitudes(initial_inventory)
+        weights = np.exp(-np.multiply.outer(times, self.chain.decay_constants)) * amplitudes
+        return weights @ modes.T
+
+    def activities(self, initial_inventory, times):
+        """
+        Tính hoạt độ (Bq) của mỗi hạt nhân tại nhiều thời điểm.
+
+        Trả về:
+            Mảng (số thời điểm, số hạt nhân) hoạt độ
+        """
+        return self.solve(initial_inventory, times) * self.chain.decay_constants
+
+    def weighted_activity(self, initial_inventory, times, weights):
+        """
+        Tính tổng có trọng số Σ w_i·A_i(t) của hoạt độ (ví dụ tốc độ liều) tại nhiều thời điểm.
+
+        Với phân tích phổ chỉ cần O(số thời điểm × số hạt nhân) phép tính vì trọng số được
+        chiếu lên các vector riêng trước.
+
+        Tham số:
+            initial_inventory: Số nguyên tử ban đầu của mỗi hạt nhân
+            times: Mảng thời điểm đầu ra (giây), hình dạng tùy ý
+            weights: Trọng số của mỗi hạt nhân (ví dụ liều trên mỗi phân rã)
+
+        Trả về:
+            Mảng cùng hình dạng với times
+        """
+        times = np.asarray(times, dtype=float)
+        weighted = np.asarray(weights, dtype=float) * self.chain.decay_constants
+        if self._spectral_decomposition() is None:
+            return (self._solve_expm_multiply(initial_inventory, times) @ weighted).reshape(times.shape)
+
+        modes, amplitudes = self._mode_amplitudes(initial_inventory)
+        projected = weighted @ modes
+        return np.exp(-np.multiply.outer(times, self.chain.decay_constants)) @ (projected * amplitudes)
+
+    def step(self, inventory, dt, steps=1):
+        """
+        Lan truyền lượng hạt nhân qua một hoặc nhiều bước thời gian đều nhau.
+
+        Tham số:
+            inventory: Số nguyên tử hiện tại của mỗi hạt nhân
+            dt: Kích thước bước thời gian (giây)
+            steps: Số bước
+
+        Trả về:
+            Mảng (steps, số hạt nhân) lượng hạt nhân sau mỗi bước
+        """
+        propagator = self.propagator(float(dt))
+        inventory = np.asarray(inventory, dtype=float)
+
+        results = np.empty((steps, len(inventory)))
+        for k in range(steps):
+            inventory = propagator @ inventory
+            results[k] = inventory
+        return results
+
+
+@lru_cache(maxsize=None)
+def load_decay_chain(path=DEFAULT_CHAIN_FILE):
+    """Đọc và lưu đệm thư viện chuỗi phân rã cùng bộ giải Bateman tương ứng"""
+    return BatemanSolver(DecayChain.from_csv(path))
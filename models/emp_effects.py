@@ -1,5 +1,12 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
+
+# Ngưỡng cường độ trường (V/m) phân chia các mức độ tác động
+IMPACT_LEVEL_BOUNDS = np.array([1000, 5000, 15000, 30000])
+
+# Nhãn của các mức độ tác động, chỉ số trùng với mã số nguyên
+IMPACT_LEVEL_LABELS = ("Không đáng kể", "Nhẹ", "Trung bình", "Nghiêm trọng", "Thảm khốc")
 
 class EMPModel:
     def __init__(self, yield_kt=20, burst_height=30, ground_conductivity=0.005, detonation_type="high-altitude"):
@@ -88,27 +95,32 @@ class EMPModel:
         conductivity_reference = 0.01  # S/m (giá trị tham chiếu)
         ground_factor = 1.0 - 0.4 * np.tanh(self.ground_conductivity / conductivity_reference)
         
-        # Mảng kết quả
-        field_strength = np.zeros_like(distances_m, dtype=float)
-        
-        # Tính cường độ trường theo khoảng cách với mô hình vật lý chính xác hơn
-        for i, distance in enumerate(distances_m):
-            if self.detonation_type == "high-altitude":
-                # Vụ nổ tầm cao có phạm vi ảnh hưởng lớn hơn và giảm chậm hơn theo khoảng cách
-                effective_distance = max(distance, 1000)  # Tránh giá trị quá lớn ở gần tâm vụ nổ
-                attenuation = (40000 / effective_distance) ** 1.1  # Giảm theo khoảng cách
-                attenuation = min(1.0, attenuation)  # Giới hạn giá trị tối đa
-            else:
-                # Vụ nổ thấp hơn giảm nhanh hơn theo khoảng cách
-                effective_distance = max(distance, 500)
-                attenuation = (3000 / effective_distance) ** 1.5
-                attenuation = min(1.0, attenuation)
-            
-            # Kết hợp các thành phần
-            field_strength[i] = emp_base * height_factor * ground_factor * attenuation
+        # Suy giảm theo khoảng cách, tính đồng thời cho toàn bộ mảng
+        if self.detonation_type == "high-altitude":
+            # Vụ nổ tầm cao có phạm vi ảnh hưởng lớn hơn và giảm chậm hơn theo khoảng cách
+            effective_distance = np.maximum(distances_m, 1000)  # Tránh giá trị quá lớn ở gần tâm vụ nổ
+            attenuation = np.minimum(1.0, (40000 / effective_distance) ** 1.1)  # Giới hạn giá trị tối đa
+        else:
+            # Vụ nổ thấp hơn giảm nhanh hơn theo khoảng cách
+            effective_distance = np.maximum(distances_m, 500)
+            attenuation = np.minimum(1.0, (3000 / effective_distance) ** 1.5)
+        
+        # Kết hợp các thành phần
+        field_strength = (emp_base * height_factor * ground_factor) * attenuation
             
         return field_strength
     
+    def field_function(self):
+        """
+        Trả về hàm trường field(x, y) -> cường độ trường EMP (V/m) theo giao diện chung
+        của lưới thích nghi và lớp bản đồ (x, y tính bằng km, tâm vụ nổ tại gốc tọa độ)
+        """
+        def field(x, y):
+            return self.calculate_emp_field_strength(np.hypot(x, y))
+        return field
+    
+    @cached_result()
+    @instrumented()
     def calculate_emp_effects(self, distances):
         """
         Tính tác động của EMP ở các khoảng cách khác nhau
@@ -124,6 +136,7 @@ class EMPModel:
                 - phân loại mức độ tác động
         """
         field_strength = self.calculate_emp_field_strength(distances)
+        count('emp.points', np.size(distances))
         
         # Ngưỡng hư hỏng cho các loại thiết bị (V/m)
         threshold_consumer_electronics = 5000      # Thiết bị điện tử tiêu dùng
@@ -148,19 +161,8 @@ class EMPModel:
         max_recovery_time = 180  # 6 tháng cho các tác động nghiêm trọng nhất
         recovery_time = max_recovery_time * power_grid_damage_prob * communication_damage_prob
         
-        # Phân loại mức độ tác động
-        impact_levels = np.zeros_like(distances, dtype=object)
-        for i, strength in enumerate(field_strength):
-            if strength < 1000:
-                impact_levels[i] = "Không đáng kể"
-            elif strength < 5000:
-                impact_levels[i] = "Nhẹ"
-            elif strength < 15000:
-                impact_levels[i] = "Trung bình"
-            elif strength < 30000:
-                impact_levels[i] = "Nghiêm trọng"
-            else:
-                impact_levels[i] = "Thảm khốc"
+        # Phân loại mức độ tác động thành mã số nguyên nhỏ gọn
+        impact_codes = self.classify_impact_levels(field_strength)
         
         return {
             'distances': distances,
@@ -171,7 +173,68 @@ class EMPModel:
             'communication_damage': communication_damage_prob,
             'military_hardened_damage': military_damage_prob,
             'estimated_recovery_time': recovery_time,  # ngày
-            'impact_level': impact_levels
+            'impact_level': self.impact_level_names(impact_codes),
+            'impact_level_code': impact_codes,
+            'impact_level_labels': IMPACT_LEVEL_LABELS
+        }
+    
+    @staticmethod
+    def classify_impact_levels(field_strength):
+        """
+        Phân loại mức độ tác động theo cường độ trường
+        
+        Tham số:
+            field_strength (array): Cường độ trường EMP (V/m), mảng với số chiều bất kỳ
+            
+        Trả về:
+            array: Mã mức độ tác động (int8), tra nhãn qua IMPACT_LEVEL_LABELS
+        """
+        return np.digitize(field_strength, IMPACT_LEVEL_BOUNDS).astype(np.int8)
+    
+    @staticmethod
+    def impact_level_names(impact_codes):
+        """
+        Tra nhãn mức độ tác động từ mã số nguyên
+        
+        Tham số:
+            impact_codes (array): Mã mức độ tác động từ classify_impact_levels
+            
+        Trả về:
+            array: Mảng nhãn (dtype object) cùng hình dạng với impact_codes
+        """
+        return np.asarray(IMPACT_LEVEL_LABELS, dtype=object)[impact_codes]
+    
+    @cached_result()
+    @instrumented()
+    def calculate_emp_ground_map(self, max_distance=1000, resolution=1000, dtype=np.float32):
+        """
+        Tính bản đồ cường độ trường EMP và mức độ tác động trên lưới mặt đất 2D
+        
+        Tham số:
+            max_distance (float): Nửa chiều rộng của bản đồ tính từ tâm vụ nổ (km)
+            resolution (int): Số điểm lưới theo mỗi trục
+            dtype: Kiểu dữ liệu của lưới cường độ trường
+            
+        Trả về:
+            dict: Từ điển gồm:
+                - trục tọa độ x, y (km)
+                - cường độ trường (V/m) dạng lưới resolution x resolution
+                - mã mức độ tác động (int8) và bảng nhãn tương ứng
+        """
+        x = np.linspace(-max_distance, max_distance, resolution)
+        y = np.linspace(-max_distance, max_distance, resolution)
+        
+        # Khoảng cách tới tâm bằng broadcasting, không cần tạo meshgrid
+        distances = np.hypot(x[np.newaxis, :], y[:, np.newaxis]).astype(dtype, copy=False)
+        field_strength = self.calculate_emp_field_strength(distances).astype(dtype, copy=False)
+        count('emp.grid_cells', field_strength.size)
+        
+        return {
+            'x': x,
+            'y': y,
+            'field_strength': field_strength,  # V/m
+            'impact_level_code': self.classify_impact_levels(field_strength),
+            'impact_level_labels': IMPACT_LEVEL_LABELS
         }
     
     def visualize_emp_effects(self, max_distance=100, points=100):
@@ -182,6 +245,8 @@ class EMPModel:
             max_distance (float): Khoảng cách tối đa để hiển thị (km)
             points (int): Số điểm dữ liệu để tính toán
         """
+        import matplotlib.pyplot as plt
+        
         distances = np.linspace(1, max_distance, points)
         effects = self.calculate_emp_effects(distances)
         
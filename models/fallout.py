@@ -1,7 +1,10 @@
 import numpy as np
-from scipy.integrate import odeint
-import matplotlib.pyplot as plt
-from scipy.interpolate import griddata
+from scipy.special import gamma, gammaincc
+from models.decay_chain import DEFAULT_CHAIN_FILE, load_decay_chain
+from models.grid_index import RegularGrid
+from models.quadrature import gauss_kronrod
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 class FalloutModel:
     def __init__(self, yield_kt=20, fission_fraction=0.5, burst_height=0, soil_type="normal"):
@@ -49,6 +52,19 @@ class FalloutModel:
             'Ru-103': 7.3e-9
         }
         
+        # Hệ số khuếch tán theo phân loại ổn định khí quyển Pasquill-Gifford
+        self.stability_factors = {
+            'A': 0.18,  # Rất không ổn định - khuếch tán mạnh
+            'B': 0.14,  # Không ổn định vừa
+            'C': 0.10,  # Hơi không ổn định
+            'D': 0.06,  # Trung tính
+            'E': 0.04,  # Hơi ổn định
+            'F': 0.02   # Rất ổn định - khuếch tán yếu
+        }
+        
+        # Dữ liệu đồng vị dạng mảng cho các phép tính vector hóa
+        self._build_isotope_arrays()
+        
         # Tính toán diện tích mưa phóng xạ dựa trên năng lượng vụ nổ
         self.fallout_radius = self._calculate_fallout_radius()
     
@@ -65,6 +81,43 @@ class FalloutModel:
         
         return k * np.sqrt(self.yield_kt * self.fission_fraction)
     
+    def _build_isotope_arrays(self):
+        """
+        Chuyển dữ liệu đồng vị sang các mảng NumPy thẳng hàng (cùng thứ tự với self.isotopes).
+        
+        Hằng số phân rã, năng suất, năng lượng và hệ số chuyển đổi liều chỉ được tính một lần
+        khi khởi tạo thay vì trong mỗi lần tính tốc độ liều.
+        """
+        self.isotope_names = list(self.isotopes)
+        self.half_lives = np.array([self.isotopes[name]['half_life'] for name in self.isotope_names])
+        self.decay_constants = np.log(2) / self.half_lives  # 1/s
+        self.isotope_yields = np.array([self.isotopes[name]['yield'] for name in self.isotope_names])
+        self.isotope_energies = np.array([self.isotopes[name]['energy'] for name in self.isotope_names])
+        self.dose_factors = np.array([self.dose_conversion_factors[name] for name in self.isotope_names])
+        
+        # Trọng số liều của mỗi đồng vị, chuẩn hóa theo năng lượng trung bình 0.5 MeV
+        self.dose_weights = self.dose_factors * self.isotope_energies / 0.5
+        
+        # Hoạt độ ban đầu được ghi nhớ theo (năng lượng vụ nổ, tỷ lệ phân hạch)
+        self._activity_cache = {}
+    
+    def _initial_activity_array(self):
+        """
+        Hoạt độ ban đầu (Bq) của các đồng vị dưới dạng mảng, được ghi nhớ
+        theo cặp (yield_kt, fission_fraction).
+        """
+        key = (self.yield_kt, self.fission_fraction)
+        activities = self._activity_cache.get(key)
+        if activities is None:
+            # Số phản ứng phân hạch dựa trên năng lượng vụ nổ và tỷ lệ phân hạch
+            fissions = 1.45e23 * self.yield_kt * self.fission_fraction
+            
+            # Hoạt độ ban đầu (Bq) = λ * N, với N = số phân hạch * năng suất đồng vị
+            activities = fissions * self.isotope_yields * self.decay_constants
+            activities.setflags(write=False)
+            self._activity_cache[key] = activities
+        return activities
+    
     def calculate_initial_activity(self):
         """
         Tính toán hoạt độ phóng xạ ban đầu của các đồng vị.
@@ -75,21 +128,84 @@ class FalloutModel:
         Trả về:
             Dictionary chứa hoạt độ ban đầu (Bq) của mỗi đồng vị
         """
-        # Số phản ứng phân hạch dựa trên năng lượng vụ nổ và tỷ lệ phân hạch
-        fissions = 1.45e23 * self.yield_kt * self.fission_fraction
+        return dict(zip(self.isotope_names, self._initial_activity_array().tolist()))
+    
+    def _distance_factor(self, distance):
+        """
+        Phân bố theo khoảng cách (mô hình Gaussian cải tiến).
         
-        initial_activities = {}
-        for isotope, data in self.isotopes.items():
-            # Hằng số phân rã λ = ln(2)/t_half
-            decay_constant = np.log(2) / data['half_life']  # 1/s
-            
-            # Số nguyên tử ban đầu = số phân hạch * năng suất đồng vị
-            initial_amount = fissions * data['yield']
+        Tham số:
+            distance: Khoảng cách (km), số hoặc mảng
+        """
+        # Tránh chia cho 0
+        distance = np.maximum(distance, 0.001)
+        return np.exp(-(distance**2) / (2 * (self.fallout_radius / 3)**2))
+    
+    def _dose_scale(self):
+        """
+        Hệ số chung của tốc độ liều: độ cao vụ nổ, loại đất và đổi đơn vị sang Sv/h.
+        Bằng 0 với nổ tầng cao (không có mưa phóng xạ đáng kể).
+        """
+        if self.burst_height > 1000:  # Nổ tầng cao (airburst)
+            return 0.0
+        
+        # Mưa phóng xạ giảm theo độ cao vụ nổ
+        fallout_factor = np.exp(-self.burst_height / 300) if self.burst_height > 0 else 1.0
+        
+        # Hệ số liên quan đến đất (ảnh hưởng đến lượng vật chất bị cuốn theo)
+        soil_factor = self.soil_factors.get(self.soil_type, 1.0)
+        
+        # Chuyển đổi sang đơn vị Sv/h
+        return fallout_factor * soil_factor * 3600
+    
+    def _isotope_dose_rate(self, times_seconds):
+        """
+        Tính tốc độ liều tại tâm mẫu phân bố (chưa nhân hệ số khoảng cách và độ cao).
+        
+        Hoạt độ của mọi đồng vị được tính cho tất cả thời điểm cùng lúc, sau đó cộng dồn
+        qua các đồng vị bằng một phép nhân ma trận - vector.
+        
+        Tham số:
+            times_seconds: Thời gian sau vụ nổ (giây), số hoặc mảng
             
-            # Hoạt độ ban đầu (Bq) = λ * N
-            initial_activities[isotope] = initial_amount * decay_constant
+        Trả về:
+            Mảng tốc độ liều (Sv/h) cùng hình dạng với times_seconds
+        """
+        times_seconds = np.asarray(times_seconds, dtype=float)
+        
+        # Hoạt độ (thời điểm x đồng vị), co theo trục đồng vị
+        activities = self._initial_activity_array() * np.exp(-np.multiply.outer(times_seconds, self.decay_constants))
+        dose_rate = activities @ self.dose_weights
+        
+        # Công thức Way-Wigner (t^-1.2), chỉ áp dụng sau 1 giờ
+        # để tránh giá trị quá lớn ở thời điểm ban đầu
+        way_wigner_factor = np.where(times_seconds > 3600,
+                                     (np.maximum(times_seconds, 3600) / 3600) ** (-1.2), 1.0)
+        
+        return dose_rate * way_wigner_factor * self._dose_scale()
+    
+    def dose_rate(self, distance, time, height=0):
+        """
+        Tính tốc độ liều lượng phóng xạ cho mảng khoảng cách, thời gian và độ cao.
+        
+        Các tham số được broadcast theo quy tắc của NumPy, ví dụ
+        dose_rate(distances[:, None], times[None, :]) cho bảng khoảng cách x thời gian.
+        
+        Tham số:
+            distance: Khoảng cách từ điểm nổ (km)
+            time: Thời gian sau vụ nổ (giây)
+            height: Độ cao so với mặt đất (m)
             
-        return initial_activities
+        Trả về:
+            Mảng tốc độ liều lượng (Sv/h) có hình dạng broadcast của các tham số
+        """
+        distance = np.asarray(distance, dtype=float)
+        height = np.asarray(height, dtype=float)
+        
+        # Hiệu ứng độ cao - phóng xạ giảm theo độ cao
+        height_factor = np.exp(-height / 100)
+        
+        return self._isotope_dose_rate(time) * self._distance_factor(distance) * height_factor
     
     def calculate_dose_rate(self, distance, time, height=0):
         """
@@ -103,67 +219,178 @@ class FalloutModel:
         Trả về:
             Tốc độ liều lượng (Sv/h) tại vị trí và thời điểm cụ thể
         """
-        # Kiểm tra nổ trên cao để xác định mức độ mưa phóng xạ
-        fallout_factor = 1.0
-        if self.burst_height > 0:
-            # Mưa phóng xạ giảm theo độ cao vụ nổ
-            fallout_factor = np.exp(-self.burst_height / 300)
+        dose_rate = self.dose_rate(distance, time, height)
+        return float(dose_rate) if dose_rate.ndim == 0 else dose_rate
+    
+    def inventory_dose_rate(self, times, distance=0, height=0, chain_file=DEFAULT_CHAIN_FILE):
+        """
+        Tính tốc độ liều từ toàn bộ kho sản phẩm phân hạch theo chuỗi phân rã đầy đủ.
+        
+        Thay cho 7 đồng vị độc lập và hệ số Way-Wigner, lượng hạt nhân được tính bằng
+        phương trình Bateman trên thư viện chuỗi phân rã (xem models.decay_chain).
+        
+        Tham số:
+            times: Mảng thời gian sau vụ nổ (giây)
+            distance: Khoảng cách từ điểm nổ (km), broadcast với times
+            height: Độ cao so với mặt đất (m)
+            chain_file: Tệp thư viện chuỗi phân rã (CSV)
+            
+        Trả về:
+            Mảng tốc độ liều lượng (Sv/h)
+        """
+        times = np.asarray(times, dtype=float)
         
         if self.burst_height > 1000:  # Nổ tầng cao (airburst)
-            return 0.0  # Không có mưa phóng xạ đáng kể
+            return np.zeros(np.broadcast_shapes(times.shape, np.shape(distance), np.shape(height)))
         
-        # Hệ số liên quan đến đất (ảnh hưởng đến lượng vật chất bị cuốn theo)
-        soil_factor = self.soil_factors.get(self.soil_type, 1.0)
+        solver = load_decay_chain(chain_file)
+        chain = solver.chain
         
-        # Tính hoạt độ ban đầu của các đồng vị
-        initial_activities = self.calculate_initial_activity()
+        # Số nguyên tử ban đầu = số phân hạch * năng suất
+        fissions = 1.45e23 * self.yield_kt * self.fission_fraction
+        initial_inventory = fissions * chain.fission_yields
         
-        # Tính liều lượng tổng từ mỗi đồng vị
-        dose_rate = 0
-        for isotope, data in self.isotopes.items():
-            # Hằng số phân rã
-            decay_constant = np.log(2) / data['half_life']
-            
-            # Hoạt độ tại thời điểm t (theo luật phân rã phóng xạ)
-            activity = initial_activities[isotope] * np.exp(-decay_constant * time)
-            
-            # Hệ số chuyển đổi từ hoạt độ sang liều lượng
-            dose_conv = self.dose_conversion_factors[isotope]
-            
-            # Tính liều lượng dựa trên khoảng cách (giảm theo hàm nghịch đảo bình phương)
-            if distance < 0.001:  # Tránh chia cho 0
-                distance = 0.001
-                
-            # Phân bố theo khoảng cách (mô hình Gaussian cải tiến)
-            distance_factor = np.exp(-(distance**2) / (2 * (self.fallout_radius/3)**2))
+        # Hệ số chuyển đổi liều: dùng giá trị đã biết, còn lại lấy trung bình
+        default_factor = np.mean(self.dose_factors)
+        dose_factors = np.array([self.dose_conversion_factors.get(name, default_factor)
+                                 for name in chain.names])
+        weights = dose_factors * chain.gamma_energies / 0.5
+        
+        dose_rate = solver.weighted_activity(initial_inventory, times, weights)
+        height_factor = np.exp(-np.asarray(height, dtype=float) / 100)
+        
+        return (dose_rate * self._dose_scale()
+                * self._distance_factor(np.asarray(distance, dtype=float)) * height_factor)
+    
+    def _pattern_distance_factor(self, x, y, time_hours, wind_speed, wind_direction, diffusion_factor):
+        """
+        Tính hệ số phân bố theo khoảng cách của mẫu mưa phóng xạ bị gió kéo dài.
+        
+        Tham số:
+            x, y: Mảng tọa độ (km), có thể broadcast với nhau
+            time_hours: Thời gian sau vụ nổ (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad)
+            diffusion_factor: Hệ số khuếch tán theo lớp ổn định khí quyển
             
-            # Hiệu ứng độ cao - phóng xạ giảm theo độ cao
-            height_factor = np.exp(-height / 100)
+        Trả về:
+            Mảng hệ số (0-1) có hình dạng broadcast của x và y
+        """
+        # Khoảng cách từ tâm vụ nổ
+        distance = np.hypot(x, y)
+        
+        # Chuyển tọa độ sang hệ quy chiếu gió bằng phép quay
+        cos_w, sin_w = np.cos(wind_direction), np.sin(wind_direction)
+        along_wind = x * cos_w + y * sin_w
+        cross_wind = y * cos_w - x * sin_w
+        
+        # Tâm mưa phóng xạ dịch chuyển theo gió, khuếch tán ngang tăng theo quãng đường.
+        # Khi lặng gió (wind_speed = 0) độ rộng và quãng đường được chặn dưới 1 m để không chia
+        # cho 0: mẫu khi đó trở về phân bố đối xứng quanh tâm.
+        wind_displacement = wind_speed * time_hours
+        displacement_scale = np.maximum(wind_displacement, 1e-3)
+        sigma_y = np.maximum(diffusion_factor * np.sqrt(wind_displacement), 1e-3)
+        
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            dx = along_wind - wind_displacement
+            crosswind_factor = np.exp(-(cross_wind**2) / (2 * sigma_y**2))
             
-            # Đóng góp liều lượng từ đồng vị này
-            energy_factor = data['energy'] / 0.5  # Chuẩn hóa theo năng lượng trung bình 0.5 MeV
-            dose_contribution = activity * dose_conv * distance_factor * height_factor * energy_factor
+            # Phía trước tâm dịch chuyển giảm nhanh, phía sau kéo dài hơn
+            alongwind_factor = np.exp(-np.where(dx < 0, -dx / (displacement_scale / 3),
+                                                dx / (displacement_scale / 1.5)))
             
-            dose_rate += dose_contribution
+            # Khoảng cách hiệu dụng có tính đến các yếu tố ảnh hưởng
+            effective_distance = distance * (1 - 0.7 * crosswind_factor * alongwind_factor)
         
-        # Áp dụng công thức Way-Wigner (t^-1.2) cho sự suy giảm tổng
-        # Chỉ áp dụng sau 1 giờ để tránh giá trị quá lớn ở thời điểm ban đầu
-        if time > 3600:
-            way_wigner_factor = (time / 3600)**(-1.2)
-        else:
-            way_wigner_factor = 1.0
+        return self._distance_factor(effective_distance)
+    
+    def center_dose_rate(self, time_hours):
+        """
+        Tốc độ liều tại tâm mẫu phân bố (hệ số nhân của pattern_factor), vector hóa theo thời gian.
         
-        # Kết hợp các yếu tố
-        final_dose_rate = dose_rate * way_wigner_factor * fallout_factor * soil_factor
+        Tham số:
+            time_hours: Thời gian sau vụ nổ (giờ), số hoặc mảng
         
-        # Chuyển đổi sang đơn vị Sv/h
-        return final_dose_rate * 3600
+        Trả về:
+            Mảng tốc độ liều (Sv/h) cùng hình dạng với time_hours
+        """
+        return self._isotope_dose_rate(np.asarray(time_hours, dtype=float) * 3600)
+    
+    def pattern_factor(self, x, y, time_hours, wind_speed=10, wind_direction=0, stability_class='D'):
+        """
+        Hình dạng chuẩn hóa (0-1) của mẫu mưa phóng xạ bị gió kéo dài, tâm tại gốc tọa độ:
+        pattern_dose_rate = center_dose_rate * pattern_factor.
+        
+        Tham số:
+            x, y: Mảng tọa độ (km) so với tâm vụ nổ, có thể broadcast với nhau
+            time_hours: Thời gian sau vụ nổ (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+        
+        Trả về:
+            Mảng hệ số có hình dạng broadcast của x và y
+        """
+        diffusion_factor = self.stability_factors.get(stability_class, 0.06)
+        return self._pattern_distance_factor(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                             time_hours, wind_speed, wind_direction, diffusion_factor)
+    
+    def pattern_cutoff_radius(self, center_rate, min_dose_rate):
+        """
+        Bán kính (km) ngoài đó tốc độ liều của mẫu chắc chắn nhỏ hơn min_dose_rate, với mọi
+        hướng và tốc độ gió.
+        
+        Khoảng cách hiệu dụng của mẫu không nhỏ hơn 0.3 lần khoảng cách thực, nên hệ số phân
+        bố không vượt quá exp(-(0.3·d)²/(2σ²)) với σ = R/3 và bán kính cắt có dạng đóng
+        d = σ·√(2·ln(D0/ngưỡng)) / 0.3.
+        
+        Tham số:
+            center_rate: Tốc độ liều tại tâm (Sv/h), xem center_dose_rate
+            min_dose_rate: Ngưỡng tốc độ liều (Sv/h)
+        """
+        if center_rate <= min_dose_rate:
+            return 0.0
+        sigma = self.fallout_radius / 3
+        return float(sigma * np.sqrt(2 * np.log(center_rate / min_dose_rate)) / 0.3)
+    
+    def pattern_dose_rate(self, x, y, time_hours, wind_speed=10, wind_direction=0, stability_class='D'):
+        """
+        Tốc độ liều của mẫu mưa phóng xạ tại các điểm bất kỳ (không cần lưới đều),
+        dùng cho các lớp bản đồ tính theo yêu cầu.
+        
+        Tham số:
+            x, y: Mảng tọa độ (km), có thể broadcast với nhau
+            time_hours: Thời gian sau vụ nổ (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+        
+        Trả về:
+            Mảng tốc độ liều (Sv/h)
+        """
+        return (self.center_dose_rate(time_hours)
+                * self.pattern_factor(x, y, time_hours, wind_speed, wind_direction, stability_class))
+    
+    def field_function(self, time_hours, wind_speed=10, wind_direction=0, stability_class='D'):
+        """
+        Trả về hàm trường field(x, y) -> tốc độ liều (Sv/h) của mẫu mưa phóng xạ tại thời điểm
+        cho trước, theo giao diện chung của lưới thích nghi và lớp bản đồ (x, y tính bằng km).
+        """
+        def field(x, y):
+            return self.pattern_dose_rate(x, y, time_hours, wind_speed, wind_direction, stability_class)
+        return field
     
+    @cached_result(ignore=('chunk_rows',))
+    @instrumented()
     def simulate_fallout_pattern(self, max_distance=100, resolution=100, wind_speed=10, 
-                               wind_direction=0, stability_class='D', times=[1, 24, 168, 720]):
+                               wind_direction=0, stability_class='D', times=[1, 24, 168, 720],
+                               dtype=np.float32, chunk_rows=None):
         """
         Mô phỏng mẫu mưa phóng xạ theo điều kiện môi trường.
         
+        Toàn bộ lưới được tính bằng mảng: hoạt độ đồng vị được tính một lần cho mỗi
+        thời điểm và phép biến đổi sang hệ quy chiếu gió được broadcast trên lưới.
+        
         Tham số:
             max_distance: Khoảng cách tối đa từ tâm vụ nổ (km)
             resolution: Độ phân giải của lưới điểm
@@ -171,6 +398,9 @@ class FalloutModel:
             wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
             stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
             times: Danh sách các mốc thời gian (giờ) để mô phỏng
+            dtype: Kiểu dữ liệu của lưới kết quả (mặc định float32)
+            chunk_rows: Số hàng lưới tính trong mỗi khối (None = cả lưới một lần),
+                        dùng để giới hạn bộ nhớ tạm cho lưới rất lớn
             
         Trả về:
             Dictionary chứa lưới tọa độ và liều lượng tại các thời điểm
@@ -178,75 +408,228 @@ class FalloutModel:
         # Tạo lưới điểm
         x = np.linspace(-max_distance, max_distance, resolution)
         y = np.linspace(-max_distance, max_distance, resolution)
-        X, Y = np.meshgrid(x, y)
         
-        # Hệ số khuếch tán theo phân loại ổn định khí quyển
-        stability_factors = {
-            'A': 0.18,  # Rất không ổn định - khuếch tán mạnh
-            'B': 0.14,  # Không ổn định vừa
-            'C': 0.10,  # Hơi không ổn định
-            'D': 0.06,  # Trung tính
-            'E': 0.04,  # Hơi ổn định
-            'F': 0.02   # Rất ổn định - khuếch tán yếu
-        }
-        diffusion_factor = stability_factors.get(stability_class, 0.06)
+        diffusion_factor = self.stability_factors.get(stability_class, 0.06)
+        
+        # Tốc độ liều tại tâm mẫu phân bố cho mọi thời điểm
+        coefficients = self._isotope_dose_rate(np.asarray(times, dtype=float) * 3600)
+        
+        if chunk_rows is None:
+            chunk_rows = len(y)
         
         results = {}
-        for time_hours in times:
-            time_seconds = time_hours * 3600
-            dose_rate = np.zeros_like(X)
+        for time_hours, coefficient in zip(times, coefficients):
+            dose_rate = np.empty((len(y), len(x)), dtype=dtype)
             
-            # Tính toán trên lưới điểm
-            for i in range(len(x)):
-                for j in range(len(y)):
-                    # Tọa độ điểm hiện tại
-                    point_x, point_y = X[i,j], Y[i,j]
-                    
-                    # Khoảng cách từ tâm vụ nổ
-                    distance = np.sqrt(point_x**2 + point_y**2)
-                    
-                    # Chuyển tọa độ sang hệ quy chiếu gió
-                    # Góc giữa vector vị trí và vector gió
-                    angle = np.arctan2(point_y, point_x) - wind_direction
-                    
-                    # Thành phần dọc và ngang so với hướng gió
-                    along_wind = distance * np.cos(angle)
-                    cross_wind = distance * np.sin(angle)
-                    
-                    # Mô hình Gaussian cải tiến cho mưa phóng xạ
-                    # Tâm mưa phóng xạ dịch chuyển theo gió
-                    wind_displacement = wind_speed * time_hours
-                    
-                    # Khoảng cách hiệu dụng bị ảnh hưởng bởi gió và khuếch tán
-                    sigma_y = diffusion_factor * np.sqrt(wind_displacement)  # Khuếch tán ngang
-                    
-                    # Vị trí tương đối so với tâm mưa phóng xạ dịch chuyển
-                    dx = along_wind - wind_displacement
-                    dy = cross_wind
-                    
-                    # Hệ số suy giảm theo khoảng cách ngang với hướng gió
-                    crosswind_factor = np.exp(-(dy**2) / (2 * sigma_y**2))
-                    
-                    # Hệ số phân bố theo hướng gió (hàm mũ có điều chỉnh)
-                    if dx < 0:  # Phía trước tâm dịch chuyển
-                        alongwind_factor = np.exp(-np.abs(dx) / (wind_displacement/3))
-                    else:  # Phía sau tâm dịch chuyển (kéo dài hơn)
-                        alongwind_factor = np.exp(-dx / (wind_displacement/1.5))
-                    
-                    # Tính khoảng cách hiệu dụng có tính đến các yếu tố ảnh hưởng
-                    effective_distance = distance * (1 - 0.7 * crosswind_factor * alongwind_factor)
-                    
-                    # Tính liều lượng tại điểm này
-                    dose_rate[i,j] = self.calculate_dose_rate(effective_distance, time_seconds)
+            # Tính theo từng khối hàng để giới hạn bộ nhớ tạm
+            for start in range(0, len(y), chunk_rows):
+                stop = min(start + chunk_rows, len(y))
+                distance_factor = self._pattern_distance_factor(
+                    x[np.newaxis, :], y[start:stop, np.newaxis],
+                    time_hours, wind_speed, wind_direction, diffusion_factor
+                )
+                np.multiply(distance_factor, coefficient, out=dose_rate[start:stop], casting='unsafe')
             
             results[f"{time_hours}h"] = dose_rate
         
+        count('fallout.grid_cells', len(x) * len(y) * len(times))
+        
+        # Lưới tọa độ dạng view chỉ đọc, không tốn thêm bộ nhớ
         return {
-            'grid_x': X,
-            'grid_y': Y,
+            'grid_x': np.broadcast_to(x[np.newaxis, :], (len(y), len(x))),
+            'grid_y': np.broadcast_to(y[:, np.newaxis], (len(y), len(x))),
             'dose_rates': results
         }
     
+    def animate_fallout_pattern(self, max_distance=100, resolution=100, wind_speed=10, wind_direction=0,
+                                stability_class='D', times=None, deposition_hours=24, shape_keyframes=16,
+                                dtype=np.float32):
+        """
+        Tạo chuỗi khung hình tốc độ liều mưa phóng xạ theo thời gian (generator).
+        
+        Khác với simulate_fallout_pattern (tính lại toàn bộ ở mỗi thời điểm):
+          - Hệ số phân rã của mọi đồng vị cho mọi khung được tính một lần (ma trận
+            khung x đồng vị), mỗi khung chỉ còn nhân với một hệ số vô hướng.
+          - Hình dạng mẫu chỉ thay đổi trong thời gian lắng đọng (t < deposition_hours) và
+            chỉ được tính đầy đủ tại shape_keyframes thời điểm phân bố logarit; các khung ở
+            giữa nội suy tuyến tính theo log(t) giữa hai khung khóa kề nhau.
+          - Sau deposition_hours, mẫu lắng đọng trên mặt đất cố định và chỉ còn phân rã.
+          - Mặt nạ thời điểm đến (estimate_fallout_arrival) đặt bằng 0 những ô mà mưa phóng
+            xạ chưa tới.
+          - Giá trị lớn nhất của cả chuỗi ('peak', có ngay từ khung đầu tiên) suy ra từ hệ số
+            phân rã và giá trị lớn nhất của các khung khóa, không cần duyệt trước các khung
+            (chặn trên: bỏ qua mặt nạ thời điểm đến), để cố định thang màu khi phát dần.
+        
+        Tham số:
+            max_distance: Khoảng cách tối đa từ tâm vụ nổ (km)
+            resolution: Độ phân giải của lưới điểm
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+            times: Các thời điểm của khung hình (giờ), dương và tăng dần
+                   (None = 300 khung phân bố logarit từ 1 đến 720 giờ)
+            deposition_hours: Thời điểm mẫu lắng đọng trên mặt đất được cố định (giờ)
+            shape_keyframes: Số khung khóa của hình dạng mẫu trong thời gian lắng đọng
+            dtype: Kiểu dữ liệu của khung hình
+        
+        Trả về:
+            Generator các dictionary {'index', 'time', 'grid_x', 'grid_y', 'dose_rate', 'peak'}
+        """
+        if times is None:
+            times = np.geomspace(1, 720, 300)
+        times = np.asarray(times, dtype=float)
+        if times.size == 0:
+            return
+        if times[0] <= 0 or np.any(np.diff(times) < 0):
+            raise ValueError("Các thời điểm của khung hình phải dương và tăng dần")
+        if shape_keyframes < 2:
+            raise ValueError("Số khung khóa phải ít nhất là 2")
+        
+        x = np.linspace(-max_distance, max_distance, resolution)[np.newaxis, :]
+        y = np.linspace(-max_distance, max_distance, resolution)[:, np.newaxis]
+        shape_2d = (y.size, x.size)
+        grid_x = np.broadcast_to(x, shape_2d)
+        grid_y = np.broadcast_to(y, shape_2d)
+        
+        diffusion_factor = self.stability_factors.get(stability_class, 0.06)
+        
+        # Tốc độ liều tại tâm cho mọi khung: phân rã theo từng đồng vị, một phép tính duy nhất
+        coefficients = self._isotope_dose_rate(times * 3600)
+        
+        # Thời điểm mưa phóng xạ tới từng ô, tính một lần
+        arrival = self.estimate_fallout_arrival(np.hypot(x, y), wind_speed)
+        last_arrival = arrival.max()
+        
+        # Khung khóa của hình dạng mẫu và trọng số nội suy theo log(t) của mọi khung: khung sau
+        # shape_end dùng nguyên khung khóa cuối (trọng số 1)
+        shape_end = max(deposition_hours, times[0])
+        key_times = np.geomspace(min(times[0], shape_end), shape_end, shape_keyframes)
+        log_key_times = np.log(key_times)
+        upper = np.minimum(np.searchsorted(key_times, times, side='right'), shape_keyframes - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(times >= shape_end, 1.0,
+                               (np.log(times) - log_key_times[upper - 1])
+                               / (log_key_times[upper] - log_key_times[upper - 1]))
+        
+        # Chỉ các khung khóa được dùng bởi ít nhất một khung hình
+        used = np.union1d(upper[weights > 0], upper[weights < 1] - 1)
+        key_shapes = {k: self._pattern_distance_factor(x, y, key_times[k], wind_speed, wind_direction,
+                                                       diffusion_factor).astype(dtype)
+                      for k in used.tolist()}
+        key_peaks = np.zeros(shape_keyframes)
+        key_peaks[used] = [float(key_shapes[k].max()) for k in used.tolist()]
+        peak = float(np.max(coefficients * ((1 - weights) * key_peaks[upper - 1] + weights * key_peaks[upper])))
+        
+        for index, (time_hours, coefficient, k, weight) in enumerate(zip(times, coefficients, upper, weights)):
+            if weight >= 1:
+                dose_rate = np.multiply(key_shapes[k], coefficient, dtype=dtype)
+            else:
+                dose_rate = np.multiply(key_shapes[k - 1], (1 - weight) * coefficient, dtype=dtype)
+                if weight > 0:
+                    dose_rate += np.multiply(key_shapes[k], weight * coefficient, dtype=dtype)
+            
+            if time_hours < last_arrival:
+                dose_rate[arrival > time_hours] = 0
+            
+            yield {
+                'index': index,
+                'time': float(time_hours),
+                'grid_x': grid_x,
+                'grid_y': grid_y,
+                'dose_rate': dose_rate,
+                'peak': peak
+            }
+    
+    def _puff_trajectory(self, wind_speed, wind_direction, stability_class, num_puffs, deposition_hours):
+        """
+        Tạo các puff lắng đọng dọc theo quỹ đạo đám mây.
+        
+        Puff thứ k lắng xuống tại thời điểm τ_k, cách tâm vụ nổ s_k = v·τ_k theo hướng gió.
+        Độ rộng ngang tăng theo quãng đường theo công thức Briggs
+        σ = k·s·(1 + 1e-4·s)^-0.5 (s tính bằng mét) với k lấy từ stability_factors,
+        cộng với kích thước ban đầu R/3 của mẫu phân bố. Lượng lắng đọng giảm theo
+        hàm mũ dọc quỹ đạo, tổng trọng số bằng 1.
+        
+        Trả về:
+            Dictionary các mảng: time (giờ), x, y, sigma (km) và weight
+        """
+        release_times = (np.arange(num_puffs) + 0.5) / num_puffs * deposition_hours
+        travel = wind_speed * release_times  # km
+        
+        diffusion_factor = self.stability_factors.get(stability_class, 0.06)
+        travel_m = travel * 1000
+        sigma_y = diffusion_factor * travel_m / np.sqrt(1 + 1e-4 * travel_m) / 1000
+        sigma = np.sqrt((self.fallout_radius / 3)**2 + sigma_y**2)
+        
+        weights = np.exp(-3 * release_times / deposition_hours)
+        
+        return {
+            'time': release_times,
+            'x': travel * np.cos(wind_direction),
+            'y': travel * np.sin(wind_direction),
+            'sigma': sigma,
+            'weight': weights / weights.sum()
+        }
+    
+    @cached_result()
+    @instrumented()
+    def simulate_puff_pattern(self, max_distance=100, resolution=100, wind_speed=10,
+                              wind_direction=0, stability_class='D', times=[1, 24, 168, 720],
+                              num_puffs=50, deposition_hours=24, cutoff_sigma=4.0, dtype=np.float32):
+        """
+        Mô phỏng mẫu mưa phóng xạ bằng chuỗi puff Gaussian dọc theo quỹ đạo đám mây.
+        
+        Là phương án nhẹ hơn mô hình hạt: mỗi puff chỉ được tính trên các ô lưới trong
+        phạm vi cutoff_sigma·σ quanh tâm (tìm bằng chỉ mục hộp bao của RegularGrid),
+        nên chi phí xấp xỉ O(số puff × số ô lân cận) thay vì O(số puff × số ô).
+        Tổng tốc độ liều trên mặt đất bằng với mẫu Gaussian của calculate_dose_rate.
+        
+        Tham số:
+            max_distance: Khoảng cách tối đa từ tâm vụ nổ (km)
+            resolution: Độ phân giải của lưới điểm
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+            times: Danh sách các mốc thời gian (giờ) để mô phỏng
+            num_puffs: Số puff dọc theo quỹ đạo
+            deposition_hours: Thời gian đám mây còn gây lắng đọng (giờ)
+            cutoff_sigma: Bán kính cắt của mỗi puff (số lần σ)
+            dtype: Kiểu dữ liệu của lưới kết quả (mặc định float32)
+            
+        Trả về:
+            Dictionary chứa lưới tọa độ, liều lượng tại các thời điểm và thông tin các puff
+        """
+        grid = RegularGrid.square(max_distance, resolution)
+        puffs = self._puff_trajectory(wind_speed, wind_direction, stability_class,
+                                      num_puffs, deposition_hours)
+        
+        # Chuẩn hóa để tích phân mỗi puff bằng trọng số của nó nhân tổng của mẫu cơ sở
+        base_sigma = self.fallout_radius / 3
+        peak_factors = puffs['weight'] * (base_sigma / puffs['sigma'])**2
+        
+        center_rates = self._isotope_dose_rate(np.asarray(times, dtype=float) * 3600)
+        
+        results = {}
+        for time_hours, center_rate in zip(times, center_rates):
+            dose_rate = np.zeros(grid.shape, dtype=dtype)
+            
+            # Chỉ các puff đã lắng xuống trước thời điểm đang xét
+            for k in np.flatnonzero(puffs['time'] <= time_hours):
+                grid.add_gaussian(dose_rate, puffs['x'][k], puffs['y'][k], puffs['sigma'][k],
+                                  center_rate * peak_factors[k], cutoff=cutoff_sigma)
+            
+            results[f"{time_hours}h"] = dose_rate
+        
+        count('fallout.puffs', num_puffs)
+        count('fallout.grid_cells', grid.x.size * grid.y.size * len(times))
+        
+        return {
+            'grid_x': np.broadcast_to(grid.x[np.newaxis, :], grid.shape),
+            'grid_y': np.broadcast_to(grid.y[:, np.newaxis], grid.shape),
+            'dose_rates': results,
+            'puffs': puffs
+        }
+    
     def estimate_fallout_arrival(self, distance, wind_speed):
         """
         Ước tính thời gian mưa phóng xạ đến một địa điểm cụ thể.
@@ -258,18 +641,55 @@ class FalloutModel:
         Trả về:
             Thời gian ước tính mưa phóng xạ đến địa điểm (giờ)
         """
-        # Tính toán thời gian ước tính (giờ)
-        if wind_speed < 0.1:  # Tránh chia cho 0
-            wind_speed = 0.1
+        # Tính toán thời gian ước tính (giờ), tránh chia cho 0
+        wind_speed = np.maximum(wind_speed, 0.1)
             
         # Thời gian = khoảng cách / tốc độ, có điều chỉnh theo độ cao mây nấm
         cloud_height_factor = 1 + 0.2 * np.log10(self.yield_kt)
         
         return (distance / wind_speed) * cloud_height_factor
     
-    def calculate_integrated_dose(self, distance, time_start, time_end, wind_speed=10, wind_direction=0):
+    def _window_dose(self, time_start, time_end):
         """
-        Tính toán liều tích lũy trong khoảng thời gian từ time_start đến time_end.
+        Tích phân giải tích của tốc độ liều tại tâm mẫu phân bố theo thời gian.
+        
+        Với mỗi đồng vị, phần phân rã mũ trước 1 giờ có nguyên hàm e^(-λt)/λ, còn phần
+        có hệ số Way-Wigner (t/3600)^-1.2 sau 1 giờ được biểu diễn bằng hàm gamma
+        không đầy đủ: ∫ e^(-λt)·t^-1.2 dt = λ^0.2·[Γ(-0.2, λa) - Γ(-0.2, λb)].
+        
+        Tham số:
+            time_start, time_end: Mảng cận tích phân (giây), time_start <= time_end
+            
+        Trả về:
+            Mảng liều (Sv) cùng hình dạng với các cận
+        """
+        a = np.asarray(time_start, dtype=float)[..., np.newaxis]
+        b = np.asarray(time_end, dtype=float)[..., np.newaxis]
+        decay = self.decay_constants
+        coefficients = self._initial_activity_array() * self.dose_weights
+        
+        # Đoạn trước 1 giờ: ∫ e^(-λt) dt
+        a1, b1 = np.minimum(a, 3600), np.minimum(b, 3600)
+        early = np.exp(-decay * a1) * -np.expm1(-decay * (b1 - a1)) / decay
+        
+        # Đoạn sau 1 giờ: ∫ e^(-λt)·(t/3600)^-1.2 dt
+        a2, b2 = np.maximum(a, 3600), np.maximum(b, 3600)
+        late = 3600**1.2 * decay**0.2 * (_gamma_upper_neg02(decay * a2) - _gamma_upper_neg02(decay * b2))
+        
+        # Tốc độ liều tính theo giờ nên chia 3600 để nhận liều (Sv)
+        return (early + late) @ coefficients * self._dose_scale() / 3600
+    
+    def integrated_dose(self, distance, time_start, time_end, wind_speed=10, wind_direction=0,
+                        rtol=1e-8):
+        """
+        Tính liều tích lũy cho mảng vị trí và khoảng thời gian trong một lần gọi.
+        
+        Khoảng cách hiệu dụng giảm tuyến tính theo quãng đường gió d - 0.5·v·t cho đến
+        khi đạt 0.5·d, sau đó giữ nguyên. Phần khoảng cách không đổi được tích phân giải
+        tích, phần chuyển tiếp được tích phân bằng Gauss-Kronrod thích nghi theo log(t).
+        
+        Các tham số được broadcast theo quy tắc của NumPy, ví dụ bảng thời gian lưu trú
+        integrated_dose(distances[:, None], 0, stay_times[None, :]).
         
         Tham số:
             distance: Khoảng cách từ tâm vụ nổ (km)
@@ -277,51 +697,123 @@ class FalloutModel:
             time_end: Thời gian kết thúc tích lũy (giờ)
             wind_speed: Tốc độ gió (km/h)
             wind_direction: Hướng gió (rad)
+            rtol: Sai số tương đối cho phép của phần tích phân số
             
         Trả về:
-            Liều tích lũy (Sv) trong khoảng thời gian chỉ định
+            Mảng liều tích lũy (Sv) có hình dạng broadcast của các tham số
         """
-        # Chuyển đổi thời gian từ giờ sang giây
-        t_start = time_start * 3600
-        t_end = time_end * 3600
+        distance, time_start, time_end, wind_speed = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (distance, time_start, time_end, wind_speed))
+        )
+        shape = distance.shape
+        distance, wind_speed = distance.ravel(), wind_speed.ravel()
         
-        # Tính thời gian mưa phóng xạ đến địa điểm (giờ)
+        # Mưa phóng xạ chỉ tích lũy sau khi đến nơi, và không sớm hơn 1 giây
         arrival_time = self.estimate_fallout_arrival(distance, wind_speed) * 3600
+        t_start = np.maximum(np.maximum(time_start.ravel() * 3600, arrival_time), 1)
+        t_end = np.maximum(time_end.ravel() * 3600, t_start)
+        
+        # Thời điểm khoảng cách hiệu dụng ngừng thay đổi (giây)
+        with np.errstate(divide='ignore'):
+            t_steady = np.where(wind_speed > 0, 3600 * distance / np.maximum(wind_speed, 1e-300), np.inf)
+        t_steady = np.clip(t_steady, t_start, t_end)
+        
+        # Phần khoảng cách không đổi (0.5·d): tích phân giải tích
+        dose = self._window_dose(t_steady, t_end) * self._distance_factor(0.5 * distance)
+        
+        # Phần chuyển tiếp: tích phân số trên các đoạn tách tại 1 giờ (điểm gãy Way-Wigner)
+        transient = np.flatnonzero(t_steady > t_start)
+        if transient.size:
+            knot = np.clip(3600, t_start[transient], t_steady[transient])
+            lower = np.log(np.concatenate([t_start[transient], knot]))
+            upper = np.log(np.concatenate([knot, t_steady[transient]]))
+            segment_owner = np.concatenate([transient, transient])
+            
+            def integrand(log_time, owner):
+                time = np.exp(log_time)
+                index = segment_owner[owner][:, np.newaxis]
+                effective_distance = distance[index] - 0.5 * wind_speed[index] * time / 3600
+                return self._isotope_dose_rate(time) * self._distance_factor(effective_distance) * time
+            
+            segments = gauss_kronrod(integrand, lower, upper, rtol=rtol)
+            dose += np.bincount(segment_owner, weights=segments, minlength=dose.size) / 3600
         
-        # Nếu mưa phóng xạ chưa đến trong khoảng thời gian xét
-        if arrival_time > t_end:
-            return 0.0
-        
-        # Điều chỉnh thời gian bắt đầu nếu mưa phóng xạ đến sau thời điểm bắt đầu
-        if arrival_time > t_start:
-            t_start = arrival_time
+        return dose.reshape(shape)
+    
+    def pattern_integrated_dose(self, x, y, time_start, time_end, wind_speed=10, wind_direction=0,
+                                stability_class='D', rtol=1e-6):
+        """
+        Tính liều tích lũy của mẫu mưa phóng xạ bị gió kéo dài (cùng trường với
+        pattern_dose_rate) tại các điểm bất kỳ.
         
-        # Số điểm lấy mẫu để tính tích phân
-        num_samples = 50
+        Liều chỉ tích lũy sau khi mưa phóng xạ đến nơi; tích phân theo log(t) bằng
+        Gauss-Kronrod thích nghi, tách tại 1 giờ (điểm gãy Way-Wigner).
         
-        # Thời gian lấy mẫu (thang logarit để bắt được sự thay đổi nhanh ở đầu)
-        if t_start < 1:  # Tránh log(0)
-            t_start = 1
+        Tham số:
+            x, y: Mảng tọa độ (km)
+            time_start: Thời gian bắt đầu tích lũy (giờ)
+            time_end: Thời gian kết thúc tích lũy (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+            rtol: Sai số tương đối cho phép của tích phân số
+            
+        Trả về:
+            Mảng liều tích lũy (Sv) có hình dạng broadcast của x, y, time_start và time_end
+        """
+        x, y, time_start, time_end = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (x, y, time_start, time_end))
+        )
+        shape = x.shape
+        x, y = x.ravel(), y.ravel()
+        diffusion_factor = self.stability_factors.get(stability_class, 0.06)
+        
+        arrival_time = self.estimate_fallout_arrival(np.hypot(x, y), wind_speed) * 3600
+        t_start = np.maximum(np.maximum(time_start.ravel() * 3600, arrival_time), 1)
+        t_end = np.maximum(time_end.ravel() * 3600, t_start)
+        
+        dose = np.zeros(x.size)
+        active = np.flatnonzero(t_end > t_start)
+        if active.size:
+            knot = np.clip(3600, t_start[active], t_end[active])
+            lower = np.log(np.concatenate([t_start[active], knot]))
+            upper = np.log(np.concatenate([knot, t_end[active]]))
+            segment_owner = np.concatenate([active, active])
+            
+            def integrand(log_time, owner):
+                time = np.exp(log_time)
+                index = segment_owner[owner][:, np.newaxis]
+                factor = self._pattern_distance_factor(x[index], y[index], time / 3600, wind_speed,
+                                                       wind_direction, diffusion_factor)
+                return self._isotope_dose_rate(time) * factor * time
+            
+            segments = gauss_kronrod(integrand, lower, upper, rtol=rtol)
+            dose += np.bincount(segment_owner, weights=segments, minlength=dose.size) / 3600
         
-        log_times = np.logspace(np.log10(t_start), np.log10(t_end), num_samples)
+        return dose.reshape(shape)
+    
+    def calculate_integrated_dose(self, distance, time_start, time_end, wind_speed=10, wind_direction=0):
+        """
+        Tính toán liều tích lũy trong khoảng thời gian từ time_start đến time_end.
         
-        # Tính liều lượng tại mỗi thời điểm
-        dose_rates = []
-        for t in log_times:
-            # Tính góc giữa vector vị trí và vector gió
-            # Đơn giản hóa bằng cách xét khoảng cách hiệu dụng
-            wind_displacement = (wind_speed * (t / 3600)) / distance
-            wind_effect = 1 - 0.5 * wind_displacement if wind_displacement < 1 else 0.5
+        Tham số:
+            distance: Khoảng cách từ tâm vụ nổ (km)
+            time_start: Thời gian bắt đầu tích lũy (giờ)
+            time_end: Thời gian kết thúc tích lũy (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad)
             
-            effective_distance = distance * wind_effect
-            dose_rates.append(self.calculate_dose_rate(effective_distance, t))
-        
-        # Tích phân số để tính liều tích lũy (phương pháp hình thang)
-        integrated_dose = 0
-        for i in range(1, len(log_times)):
-            dt = log_times[i] - log_times[i-1]
-            avg_dose_rate = (dose_rates[i] + dose_rates[i-1]) / 2
-            integrated_dose += avg_dose_rate * dt
-        
-        # Trả về liều tích lũy (Sv)
-        return integrated_dose 
\ No newline at end of file
+        Trả về:
+            Liều tích lũy (Sv) trong khoảng thời gian chỉ định
+        """
+        dose = self.integrated_dose(distance, time_start, time_end, wind_speed, wind_direction)
+        return float(dose) if dose.ndim == 0 else dose
+
+
+def _gamma_upper_neg02(x):
+    """
+    Hàm gamma không đầy đủ trên Γ(-0.2, x) với x > 0, tính từ Γ(0.8, x) theo
+    hệ thức truy hồi Γ(s+1, x) = s·Γ(s, x) + x^s·e^(-x).
+    """
+    x = np.asarray(x, dtype=float)
+    return 5 * (x**-0.2 * np.exp(-x) - gammaincc(0.8, x) * gamma(0.8))
@@ -1,5 +1,8 @@
 import numpy as np
 from scipy.special import erf
+from models.threshold_solver import solve_threshold_radii
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 class FlashEffectsModel:
     """
@@ -78,6 +81,8 @@ class FlashEffectsModel:
         
         return base_illuminance * attenuation_factor
     
+    @cached_result()
+    @instrumented()
     def calculate_eye_effects(self, distances_km):
         """
         Tính tác động đến mắt ở các khoảng cách khác nhau.
@@ -89,7 +94,8 @@ class FlashEffectsModel:
             dict: Từ điển chứa kết quả tính toán xác suất tổn thương mắt
         """
         # Tính cường độ ánh sáng tại mỗi khoảng cách
-        illuminance_values = np.array([self.calculate_illuminance(d) for d in distances_km])
+        illuminance_values = self.calculate_illuminance(np.asarray(distances_km, dtype=float))
+        count('flash.points', illuminance_values.size)
         
         # Điều chỉnh theo độ giãn đồng tử (thời gian trong ngày)
         adjusted_illuminance = illuminance_values * self.dilation_factor
@@ -124,6 +130,14 @@ class FlashEffectsModel:
         self.day_condition = condition
         self.dilation_factor = self.pupil_dilation.get(condition, 1.0)
         
+    def _effect_thresholds(self):
+        """Ánh xạ loại tác động sang ngưỡng độ rọi (lux)"""
+        return {
+            "temporary_blindness": self.flash_blindness_threshold,
+            "retinal_burn": self.retinal_burn_threshold,
+            "permanent_damage": self.permanent_damage_threshold
+        }
+        
     def get_max_effect_distance(self, effect_type="temporary_blindness", probability=0.5):
         """
         Ước tính khoảng cách tối đa mà tác động cụ thể có xác suất xảy ra lớn hơn ngưỡng cho trước.
@@ -135,27 +149,45 @@ class FlashEffectsModel:
         Trả về:
             float: Khoảng cách tối đa (km) có xác suất ảnh hưởng lớn hơn ngưỡng
         """
-        # Mảng khoảng cách để tìm kiếm
-        test_distances = np.logspace(-1, 2, 200)  # Từ 0.1 đến 100 km
-        
-        # Tính các tác động
-        effects = self.calculate_eye_effects(test_distances)
-        
-        # Lấy mảng xác suất tương ứng
-        if effect_type == "temporary_blindness":
-            prob_array = effects['temporary_blindness_probability']
-        elif effect_type == "retinal_burn":
-            prob_array = effects['retinal_burn_probability']
-        elif effect_type == "permanent_damage":
-            prob_array = effects['permanent_damage_probability']
-        else:
+        if effect_type not in self._effect_thresholds():
             return 0
         
-        # Tìm điểm xa nhất có xác suất lớn hơn ngưỡng
-        indices = np.where(prob_array >= probability)[0]
+        return float(self.get_max_effect_distances([effect_type], probability)[effect_type])
+    
+    @cached_result()
+    @instrumented()
+    def get_max_effect_distances(self, effect_types=None, probabilities=0.5,
+                                 min_distance=0.1, max_distance=100.0):
+        """
+        Tính khoảng cách tối đa cho nhiều loại tác động và nhiều ngưỡng xác suất trong một lần giải.
         
-        if len(indices) > 0:
-            max_index = indices[-1]
-            return test_distances[max_index]
-        else:
-            return 0 
\ No newline at end of file
+        Tham số:
+            effect_types (list): Danh sách loại tác động (None = tất cả các loại)
+            probabilities (float hoặc array): Ngưỡng xác suất (0-1)
+            min_distance (float): Khoảng cách nhỏ nhất của vùng tìm kiếm (km)
+            max_distance (float): Khoảng cách lớn nhất của vùng tìm kiếm (km)
+            
+        Trả về:
+            dict: {loại tác động: khoảng cách (km)}, mỗi giá trị có cùng hình dạng với probabilities.
+                  Trả về 0 nếu tác động không xảy ra trong vùng tìm kiếm.
+        """
+        thresholds = self._effect_thresholds()
+        if effect_types is None:
+            effect_types = list(thresholds)
+            
+        for effect_type in effect_types:
+            if effect_type not in thresholds:
+                raise ValueError(f"Loại tác động không hợp lệ: {effect_type}")
+        
+        # Đảo ngược hàm sigmoid trong calculate_eye_effects:
+        # p = 1 - 1/(1 + exp((I·k - T)/(0.1·T)))  =>  I = T·(1 + 0.1·ln(p/(1-p))) / k
+        probabilities = np.clip(np.asarray(probabilities, dtype=float), 1e-12, 1 - 1e-12)
+        threshold_values = np.array([thresholds[effect] for effect in effect_types])
+        threshold_values = threshold_values.reshape((-1,) + (1,) * probabilities.ndim)
+        logit = np.log(probabilities / (1 - probabilities))
+        illuminance_targets = threshold_values * (1 + 0.1 * logit) / self.dilation_factor
+        
+        distances = solve_threshold_radii(self.calculate_illuminance, illuminance_targets,
+                                          lower=min_distance, upper=max_distance)
+        
+        return {effect: distances[i] for i, effect in enumerate(effect_types)}
@@ -0,0 +1,298 @@
+import io
+import threading
+
+import numpy as np
+
+from core.cache import ResultCache, canonical_key
+
+EARTH_RADIUS_KM = 6371.0088          # Bán kính Trái Đất trung bình (km)
+WEB_MERCATOR_RADIUS = 6378137.0      # Bán kính của phép chiếu Web Mercator (m)
+MAX_LATITUDE = 85.0511287798066      # Vĩ độ giới hạn của lưới ô Web Mercator
+TILE_SIZE = 256                      # Số điểm ảnh mỗi cạnh ô
+MAX_MOSAIC_TILES = 64                # Số ô tối đa của một ảnh ghép (64 ô float32 = 16 MB)
+TILE_CACHE_BYTES = 64 * 2**20        # Dung lượng bộ nhớ đệm ô dùng chung của tiến trình (256 ô float32)
+
+
+def lonlat_to_web_mercator(lon, lat):
+    """
+    Chuyển kinh độ, vĩ độ (độ) sang tọa độ Web Mercator (m), vector hóa.
+
+    Trả về:
+        Tuple (x, y) cùng hình dạng broadcast của các tham số
+    """
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    x = WEB_MERCATOR_RADIUS * np.radians(lon)
+    y = WEB_MERCATOR_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+
+def web_mercator_to_lonlat(x, y):
+    """
+    Chuyển tọa độ Web Mercator (m) sang kinh độ, vĩ độ (độ), vector hóa.
+
+    Trả về:
+        Tuple (lon, lat)
+    """
+    lon = np.degrees(np.asarray(x, dtype=float) / WEB_MERCATOR_RADIUS)
+    lat = np.degrees(2 * np.arctan(np.exp(np.asarray(y, dtype=float) / WEB_MERCATOR_RADIUS)) - np.pi / 2)
+    return lon, lat
+
+
+def lonlat_to_tile(lon, lat, zoom):
+    """Chỉ số ô XYZ (tx, ty) chứa điểm (lon, lat) ở mức zoom"""
+    x, y = lonlat_to_web_mercator(lon, lat)
+    n = 2 ** zoom
+    extent = np.pi * WEB_MERCATOR_RADIUS
+    tx = np.clip(np.floor((x + extent) / (2 * extent) * n), 0, n - 1).astype(int)
+    ty = np.clip(np.floor((extent - y) / (2 * extent) * n), 0, n - 1).astype(int)
+    return tx, ty
+
+
+def tile_bounds(zoom, tx, ty):
+    """
+    Biên của ô XYZ theo tọa độ Web Mercator.
+
+    Trả về:
+        Tuple (x_min, y_min, x_max, y_max) (m)
+    """
+    extent = np.pi * WEB_MERCATOR_RADIUS
+    size = 2 * extent / 2 ** zoom
+    x_min = -extent + tx * size
+    y_max = extent - ty * size
+    return x_min, y_max - size, x_min + size, y_max
+
+
+def tiles_covering(lon_min, lat_min, lon_max, lat_max, zoom):
+    """Danh sách các ô (tx, ty) ở mức zoom phủ hộp bao kinh độ/vĩ độ"""
+    tx_min, ty_min = lonlat_to_tile(lon_min, lat_max, zoom)
+    tx_max, ty_max = lonlat_to_tile(lon_max, lat_min, zoom)
+    return [(int(tx), int(ty)) for ty in range(ty_min, ty_max + 1) for tx in range(tx_min, tx_max + 1)]
+
+
+def fit_zoom(lon_min, lat_min, lon_max, lat_max, zoom, max_tiles=MAX_MOSAIC_TILES):
+    """Mức zoom lớn nhất không vượt zoom mà hộp bao được phủ bởi không quá max_tiles ô"""
+    while zoom > 0 and len(tiles_covering(lon_min, lat_min, lon_max, lat_max, zoom)) > max_tiles:
+        zoom -= 1
+    return zoom
+
+
+class AzimuthalEquidistant:
+    """
+    Phép chiếu phương vị đẳng cự cục bộ trên mặt cầu quanh tâm vụ nổ.
+
+    Khoảng cách và phương vị từ tâm được bảo toàn, nên tọa độ (x, y) (km, x hướng Đông,
+    y hướng Bắc) dùng trực tiếp được cho các mô hình đặt vụ nổ tại gốc tọa độ.
+    """
+    def __init__(self, center_lat, center_lon):
+        """
+        Tham số:
+            center_lat, center_lon: Vĩ độ, kinh độ của tâm phép chiếu (độ)
+        """
+        if not -90 <= center_lat <= 90:
+            raise ValueError("Vĩ độ phải nằm trong khoảng [-90, 90]")
+
+        self.center_lat = center_lat
+        self.center_lon = center_lon
+        self._sin_lat0 = np.sin(np.radians(center_lat))
+        self._cos_lat0 = np.cos(np.radians(center_lat))
+
+    def forward(self, lat, lon):
+        """
+        Chiếu vĩ độ, kinh độ (độ) sang tọa độ cục bộ (km), vector hóa.
+
+        Trả về:
+            Tuple (x, y)
+        """
+        lat = np.radians(lat)
+        dlon = np.radians(np.asarray(lon, dtype=float) - self.center_lon)
+        sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+
+        # Góc ở tâm theo công thức haversine (ổn định với khoảng cách nhỏ)
+        haversine = (np.sin((lat - np.radians(self.center_lat)) / 2)**2
+                     + self._cos_lat0 * cos_lat * np.sin(dlon / 2)**2)
+        c = 2 * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.where(c > 1e-12, c / np.sin(c), 1.0)
+
+        x = EARTH_RADIUS_KM * k * cos_lat * np.sin(dlon)
+        y = EARTH_RADIUS_KM * k * (self._cos_lat0 * sin_lat - self._sin_lat0 * cos_lat * np.cos(dlon))
+        return x, y
+
+    def inverse(self, x, y):
+        """
+        Chuyển tọa độ cục bộ (km) về vĩ độ, kinh độ (độ), vector hóa.
+
+        Trả về:
+            Tuple (lat, lon)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        rho = np.hypot(x, y)
+        c = rho / EARTH_RADIUS_KM
+        sin_c, cos_c = np.sin(c), np.cos(c)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(rho > 0, y * sin_c / rho, 0.0)
+
+        lat = np.arcsin(np.clip(cos_c * self._sin_lat0 + ratio * self._cos_lat0, -1, 1))
+        lon = self.center_lon + np.degrees(np.arctan2(
+            x * sin_c, rho * self._cos_lat0 * cos_c - y * self._sin_lat0 * sin_c))
+        return np.degrees(lat), (lon + 180) % 360 - 180
+
+
+_tile_cache = None
+_tile_cache_lock = threading.Lock()
+
+
+def get_tile_cache():
+    """Bộ nhớ đệm ô dùng chung của tiến trình (giới hạn TILE_CACHE_BYTES, dùng chung giữa các phiên)"""
+    global _tile_cache
+    with _tile_cache_lock:
+        if _tile_cache is None:
+            _tile_cache = ResultCache(max_entries=1024, max_bytes=TILE_CACHE_BYTES)
+        return _tile_cache
+
+
+class TileRenderer:
+    """
+    Tính các ô bản đồ XYZ của một trường hiệu ứng theo yêu cầu.
+
+    Mỗi ô chỉ được tính khi được yêu cầu, ở đúng độ phân giải của mức zoom đó: tâm các
+    điểm ảnh được chuyển Web Mercator -> kinh độ/vĩ độ -> tọa độ cục bộ rồi đưa vào hàm
+    trường vector hóa. Kết quả được giữ trong bộ nhớ đệm LRU nên khi kéo hoặc phóng to
+    bản đồ, các ô đã tính không phải tính lại.
+
+    Khi có field_key (các tham số xác định trường), ô được giữ trong bộ nhớ đệm dùng chung
+    của tiến trình (get_tile_cache) theo khóa field_key + (zoom, tx, ty): mọi phiên xem cùng
+    một trường dùng chung ô, và tổng dung lượng không tăng theo số phiên. Không có field_key
+    thì mỗi renderer có bộ nhớ đệm riêng tối đa cache_size ô.
+    """
+    def __init__(self, field, center_lat, center_lon, tile_size=TILE_SIZE, field_key=None,
+                 cache_size=MAX_MOSAIC_TILES, dtype=np.float32):
+        """
+        Tham số:
+            field: Hàm vector hóa field(x, y) -> giá trị, với x, y là tọa độ cục bộ (km)
+            center_lat, center_lon: Vị trí tâm vụ nổ (độ)
+            tile_size: Số điểm ảnh mỗi cạnh ô
+            field_key: Tuple tham số xác định hàm trường (None = không dùng bộ nhớ đệm chung)
+            cache_size: Số ô tối đa trong bộ nhớ đệm riêng (khi không có field_key)
+            dtype: Kiểu dữ liệu của ô kết quả
+        """
+        self.field = field
+        self.projection = AzimuthalEquidistant(center_lat, center_lon)
+        self.tile_size = tile_size
+        self.dtype = dtype
+        if field_key is not None:
+            self._cache = get_tile_cache()
+            self._key = (field_key, center_lat, center_lon, tile_size, np.dtype(dtype))
+        else:
+            self._cache = ResultCache(max_entries=cache_size, max_bytes=TILE_CACHE_BYTES, ttl=None)
+            self._key = ()
+        self.hits = 0
+        self.misses = 0
+
+    def tile(self, zoom, tx, ty):
+        """Giá trị trường trên một ô (mảng chỉ đọc tile_size x tile_size, hàng đầu tiên ở phía Bắc)"""
+        if not (0 <= tx < 2 ** zoom and 0 <= ty < 2 ** zoom):
+            raise ValueError(f"Ô không hợp lệ ở mức zoom {zoom}: ({tx}, {ty})")
+
+        computed = []
+
+        def compute():
+            computed.append(True)
+            return self._tile(zoom, tx, ty)
+
+        values = self._cache.get_or_compute(canonical_key('tile', self._key, zoom, tx, ty), compute)
+        if computed:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return values
+
+    def _tile(self, zoom, tx, ty):
+        """Tính giá trị trường trên một ô (không qua bộ nhớ đệm, dùng qua self.tile)"""
+
+        x_min, y_min, x_max, y_max = tile_bounds(zoom, tx, ty)
+        step = (x_max - x_min) / self.tile_size
+        pixel_x = x_min + (np.arange(self.tile_size) + 0.5) * step
+        pixel_y = y_max - (np.arange(self.tile_size) + 0.5) * step
+
+        # Kinh độ chỉ phụ thuộc cột, vĩ độ chỉ phụ thuộc hàng
+        lon, _ = web_mercator_to_lonlat(pixel_x, 0.0)
+        _, lat = web_mercator_to_lonlat(0.0, pixel_y)
+        x, y = self.projection.forward(lat[:, np.newaxis], lon[np.newaxis, :])
+
+        values = np.asarray(self.field(x, y), dtype=self.dtype)
+        values.setflags(write=False)
+        return values
+
+    def cache_info(self):
+        """Số ô của renderer này lấy từ bộ nhớ đệm và phải tính: dictionary {'hits', 'misses'}"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def mosaic(self, lon_min, lat_min, lon_max, lat_max, zoom, max_tiles=MAX_MOSAIC_TILES):
+        """
+        Ghép các ô phủ hộp bao kinh độ/vĩ độ ở mức zoom thành một ảnh.
+
+        Số ô bị giới hạn bởi max_tiles (xem fit_zoom để chọn mức zoom phù hợp với vùng hiển thị).
+
+        Trả về:
+            Tuple (values, bounds) với bounds = (lon_min, lat_min, lon_max, lat_max) của ảnh ghép
+        """
+        tiles = tiles_covering(lon_min, lat_min, lon_max, lat_max, zoom)
+        if len(tiles) > max_tiles:
+            raise ValueError(f"Vùng hiển thị cần {len(tiles)} ô ở mức zoom {zoom}, vượt giới hạn {max_tiles} ô")
+        tx_values = sorted({tx for tx, _ in tiles})
+        ty_values = sorted({ty for _, ty in tiles})
+
+        size = self.tile_size
+        values = np.empty((len(ty_values) * size, len(tx_values) * size), dtype=self.dtype)
+        for tx, ty in tiles:
+            row = (ty - ty_values[0]) * size
+            col = (tx - tx_values[0]) * size
+            values[row:row + size, col:col + size] = self.tile(zoom, tx, ty)
+
+        west, _, _, north = tile_bounds(zoom, tx_values[0], ty_values[0])
+        _, south, east, _ = tile_bounds(zoom, tx_values[-1], ty_values[-1])
+        (west, east), (north, south) = web_mercator_to_lonlat([west, east], [north, south])
+        return values, (float(west), float(south), float(east), float(north))
+
+    @staticmethod
+    def to_rgba(values, vmin, vmax, colormap='viridis', log_scale=True):
+        """
+        Tô màu mảng giá trị thành ảnh RGBA (uint8); giá trị dưới vmin trong suốt.
+
+        Tham số:
+            values: Mảng giá trị
+            vmin, vmax: Khoảng giá trị của thang màu
+            colormap: Tên bảng màu của matplotlib
+            log_scale: Dùng thang logarit
+        """
+        from matplotlib import colormaps
+
+        if vmin <= 0 and log_scale:
+            raise ValueError("vmin phải lớn hơn 0 khi dùng thang logarit")
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if log_scale:
+                scaled = (np.log10(values) - np.log10(vmin)) / (np.log10(vmax) - np.log10(vmin))
+            else:
+                scaled = (values - vmin) / (vmax - vmin)
+
+        rgba = colormaps[colormap](np.clip(np.nan_to_num(scaled, nan=0.0), 0, 1), bytes=True)
+        rgba[..., 3] = np.where(values >= vmin, 180, 0)
+        return rgba
+
+    @classmethod
+    def to_png(cls, values, vmin, vmax, colormap='viridis', log_scale=True):
+        """Tô màu mảng giá trị (xem to_rgba) và mã hóa thành ảnh PNG (bytes)"""
+        from matplotlib.image import imsave
+
+        buffer = io.BytesIO()
+        imsave(buffer, cls.to_rgba(values, vmin, vmax, colormap, log_scale), format='png')
+        return buffer.getvalue()
+
+    def render_png(self, zoom, tx, ty, vmin, vmax, colormap='viridis', log_scale=True):
+        """Tính (hoặc lấy từ bộ nhớ đệm) một ô và mã hóa thành ảnh PNG (bytes)"""
+        return self.to_png(self.tile(zoom, tx, ty), vmin, vmax, colormap, log_scale)
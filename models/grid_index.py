@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class RegularGrid:
+    """
+    Lưới đều 2 chiều với chỉ mục hộp bao.
+
+    Vì bước lưới không đổi, các ô nằm trong hộp bao của một vòng tròn được xác định
+    trực tiếp bằng số học (O(1)), nên mỗi nguồn (puff, vụ nổ...) chỉ cần tính trên
+    các ô lân cận thay vì trên toàn bộ lưới.
+    """
+    def __init__(self, x, y):
+        """
+        Tham số:
+            x, y: Trục tọa độ đều, tăng dần (km)
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+        if len(self.x) < 2 or len(self.y) < 2:
+            raise ValueError("Lưới phải có ít nhất 2 điểm theo mỗi chiều")
+
+        self.dx = (self.x[-1] - self.x[0]) / (len(self.x) - 1)
+        self.dy = (self.y[-1] - self.y[0]) / (len(self.y) - 1)
+
+        if self.dx <= 0 or self.dy <= 0:
+            raise ValueError("Các trục của lưới phải tăng dần")
+
+    @classmethod
+    def square(cls, max_distance, resolution):
+        """Lưới vuông [-max_distance, max_distance]² với resolution điểm mỗi chiều"""
+        axis = np.linspace(-max_distance, max_distance, resolution)
+        return cls(axis, axis)
+
+    @property
+    def shape(self):
+        return len(self.y), len(self.x)
+
+    def _axis_range(self, axis, step, low, high):
+        """Khoảng chỉ số [start, stop) của các điểm trên trục nằm trong [low, high]"""
+        start = int(np.clip(np.ceil((low - axis[0]) / step - 1e-9), 0, len(axis)))
+        stop = int(np.clip(np.floor((high - axis[0]) / step + 1e-9) + 1, 0, len(axis)))
+        return start, max(start, stop)
+
+    def window(self, center_x, center_y, radius):
+        """
+        Tìm các ô lưới trong hộp bao của vòng tròn tâm (center_x, center_y).
+
+        Tham số:
+            center_x, center_y: Tâm (km)
+            radius: Bán kính (km)
+
+        Trả về:
+            Tuple (lát cắt hàng, lát cắt cột); lát cắt rỗng nếu vòng tròn nằm ngoài lưới
+        """
+        row_start, row_stop = self._axis_range(self.y, self.dy, center_y - radius, center_y + radius)
+        col_start, col_stop = self._axis_range(self.x, self.dx, center_x - radius, center_x + radius)
+        return slice(row_start, row_stop), slice(col_start, col_stop)
+
+    def add_gaussian(self, grid, center_x, center_y, sigma, amplitude, cutoff=4.0):
+        """
+        Cộng dồn tại chỗ một phân bố Gaussian đẳng hướng vào lưới, chỉ trên các ô
+        cách tâm không quá cutoff·sigma. Hàm Gaussian tách được theo x và y nên mỗi
+        khối được tính bằng một tích ngoài.
+
+        Tham số:
+            grid: Mảng (ny, nx) cần cộng dồn
+            center_x, center_y: Tâm (km)
+            sigma: Độ lệch chuẩn (km)
+            amplitude: Giá trị tại tâm
+            cutoff: Số lần sigma để cắt phân bố
+        """
+        rows, cols = self.window(center_x, center_y, cutoff * sigma)
+        if rows.start == rows.stop or cols.start == cols.stop:
+            return
+
+        along_x = np.exp(-(self.x[cols] - center_x)**2 / (2 * sigma**2))
+        along_y = np.exp(-(self.y[rows] - center_y)**2 / (2 * sigma**2))
+        grid[rows, cols] += amplitude * np.multiply.outer(along_y, along_x)
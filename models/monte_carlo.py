@@ -1,9 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from tqdm import tqdm
 import time
 import multiprocessing as mp
-from functools import partial
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
+from core.jobs import SimulationCancelled
 
 class MonteCarloNeutronTransport:
     def __init__(self, radius=10.0, 
@@ -81,12 +81,14 @@ class MonteCarloNeutronTransport:
         
         return fission, scatter, absorb, total
     
-    def _sample_direction(self, isotropic=True, previous_direction=None, scattering_angle=None):
+    def _sample_direction(self, rng, isotropic=True, previous_direction=None, scattering_angle=None):
         """
         Lấy mẫu hướng ngẫu nhiên trong không gian 3D
         
         Tham số:
         --------
+        rng : numpy.random.Generator
+            Bộ sinh số ngẫu nhiên của lần mô phỏng
         isotropic : bool
             Nếu True, lấy mẫu hướng đẳng hướng
         previous_direction : ndarray
@@ -96,8 +98,8 @@ class MonteCarloNeutronTransport:
         """
         if isotropic:
             # Lấy mẫu đẳng hướng trong không gian 3D
-            theta = np.arccos(2*np.random.random() - 1)
-            phi = 2 * np.pi * np.random.random()
+            theta = np.arccos(2*rng.random() - 1)
+            phi = 2 * np.pi * rng.random()
             direction = np.array([
                 np.sin(theta) * np.cos(phi),
                 np.sin(theta) * np.sin(phi),
@@ -107,7 +109,7 @@ class MonteCarloNeutronTransport:
             # Tán xạ bất đẳng hướng
             if previous_direction is not None and scattering_angle is not None:
                 # Lấy mẫu góc tán xạ từ phân bố
-                mu = np.random.normal(np.cos(scattering_angle), 0.1)
+                mu = rng.normal(np.cos(scattering_angle), 0.1)
                 mu = np.clip(mu, -1, 1)  # Giới hạn trong phạm vi hợp lệ
                 
                 # Tạo hệ tọa độ địa phương với trục z là hướng trước đó
@@ -125,16 +127,16 @@ class MonteCarloNeutronTransport:
                 y_axis = np.cross(z_axis, x_axis)
                 
                 # Tính hướng mới
-                phi = 2 * np.pi * np.random.random()
+                phi = 2 * np.pi * rng.random()
                 direction = (mu * z_axis + 
                             np.sqrt(1 - mu**2) * (np.cos(phi) * x_axis + np.sin(phi) * y_axis))
             else:
                 # Mặc định quay lại đẳng hướng nếu thiếu tham số
-                return self._sample_direction(isotropic=True)
+                return self._sample_direction(rng, isotropic=True)
         
         return direction
     
-    def _initialize_neutrons(self, num_neutrons):
+    def _initialize_neutrons(self, num_neutrons, rng):
         """
         Khởi tạo neutron với phân bố không gian cụ thể
         
@@ -142,6 +144,8 @@ class MonteCarloNeutronTransport:
         --------
         num_neutrons : int
             Số lượng neutron cần khởi tạo
+        rng : numpy.random.Generator
+            Bộ sinh số ngẫu nhiên của lần mô phỏng
         
         Trả về:
         -------
@@ -155,9 +159,9 @@ class MonteCarloNeutronTransport:
                 pos = np.array([0.0, 0.0, 0.0])
             elif self.initial_distribution == 'uniform':
                 # Phân bố đều trong hình cầu
-                r = self.radius * np.random.random()**(1/3)  # Phân bố đều theo thể tích
-                theta = np.arccos(2*np.random.random() - 1)
-                phi = 2 * np.pi * np.random.random()
+                r = self.radius * rng.random()**(1/3)  # Phân bố đều theo thể tích
+                theta = np.arccos(2*rng.random() - 1)
+                phi = 2 * np.pi * rng.random()
                 pos = np.array([
                     r * np.sin(theta) * np.cos(phi),
                     r * np.sin(theta) * np.sin(phi),
@@ -166,7 +170,7 @@ class MonteCarloNeutronTransport:
             elif self.initial_distribution == 'gaussian':
                 # Phân bố Gaussian xung quanh tâm
                 sigma = self.radius / 3.0  # Độ lệch chuẩn
-                pos = np.random.normal(0, sigma, 3)
+                pos = rng.normal(0, sigma, 3)
             else:
                 # Mặc định là tâm nếu không xác định
                 pos = np.array([0.0, 0.0, 0.0])
@@ -186,7 +190,7 @@ class MonteCarloNeutronTransport:
         
         return neutrons
         
-    def _process_neutron_batch(self, neutrons, max_interactions, fission_chain=True):
+    def _process_neutron_batch(self, neutrons, max_interactions, fission_chain=True, seed=None):
         """
         Xử lý một lô neutron (hỗ trợ tính toán song song)
         
@@ -198,11 +202,14 @@ class MonteCarloNeutronTransport:
             Số lượng tương tác tối đa cho mỗi neutron
         fission_chain : bool
             Liệu có mô phỏng chuỗi phân hạch hay không
+        seed : numpy.random.SeedSequence
+            Hạt giống của dòng số ngẫu nhiên riêng của lô
             
         Trả về:
         -------
         tuple : (kết quả, neutron thế hệ tiếp theo)
         """
+        rng = np.random.default_rng(seed)
         n_fissions = 0
         n_absorptions = 0
         n_escapes = 0
@@ -223,11 +230,11 @@ class MonteCarloNeutronTransport:
                 fission_xs, scatter_xs, absorb_xs, total_xs = self._get_cross_sections(energy_group)
                 
                 # Lấy mẫu đường tự do trung bình
-                mfp = -np.log(np.random.random()) / total_xs
+                mfp = -np.log(rng.random()) / total_xs
                 path_lengths.append(mfp)
                 
                 # Hướng di chuyển ngẫu nhiên
-                direction = self._sample_direction()
+                direction = self._sample_direction(rng)
                 
                 # Di chuyển neutron
                 pos = pos + mfp * direction
@@ -239,7 +246,7 @@ class MonteCarloNeutronTransport:
                     continue
                 
                 # Xác định loại tương tác
-                interaction_type = np.random.random() * total_xs
+                interaction_type = rng.random() * total_xs
                 
                 if interaction_type < fission_xs:
                     n_fissions += 1
@@ -250,14 +257,14 @@ class MonteCarloNeutronTransport:
                         fission_sites.append(pos.copy())
                         
                         # Tạo neutron mới cho thế hệ tiếp theo
-                        n_new = np.random.poisson(self.fission_neutrons)
+                        n_new = rng.poisson(self.fission_neutrons)
                         for _ in range(n_new):
                             # Đối với tính toán đa nhóm, chọn nhóm năng lượng theo phổ phân hạch
                             if self.energy_groups > 1:
                                 # Giả sử phổ phân hạch ưu tiên năng lượng cao (nhóm 0)
                                 probs = np.exp(-np.arange(self.energy_groups))
                                 probs = probs / np.sum(probs)
-                                new_energy_group = np.random.choice(np.arange(self.energy_groups), p=probs)
+                                new_energy_group = rng.choice(np.arange(self.energy_groups), p=probs)
                             else:
                                 new_energy_group = 0
                                 
@@ -275,7 +282,7 @@ class MonteCarloNeutronTransport:
                     if self.energy_groups > 1:
                         # Chuyển tiếp nhóm năng lượng sau tán xạ
                         scatter_probs = self.scatter_matrix[energy_group]
-                        energy_group = np.random.choice(np.arange(self.energy_groups), p=scatter_probs)
+                        energy_group = rng.choice(np.arange(self.energy_groups), p=scatter_probs)
                 
                 interactions += 1
                 
@@ -290,9 +297,14 @@ class MonteCarloNeutronTransport:
             'fission_sites': fission_sites
         }, next_gen_neutrons
         
+    # Mô phỏng ngẫu nhiên: chỉ ghi nhớ khi có seed (cách chia lô song song cũng ảnh hưởng kết quả)
+    @cached_result(ignore=('show_progress', 'progress_callback', 'cancel_event', 'progress_interval'),
+                   require=('seed',))
+    @instrumented()
     def simulate_neutrons(self, num_neutrons=1000, max_interactions=100, 
                           show_progress=True, fission_chain=True, 
-                          use_parallel=False, n_cores=None):
+                          use_parallel=False, n_cores=None,
+                          progress_callback=None, cancel_event=None, progress_interval=100, seed=None):
         """
         Mô phỏng Monte Carlo cho quá trình vận chuyển neutron
         
@@ -310,11 +322,26 @@ class MonteCarloNeutronTransport:
             Sử dụng tính toán song song để tăng tốc
         n_cores : int
             Số lõi CPU sử dụng cho tính toán song song
+        progress_callback : callable
+            Hàm nhận dictionary tiến trình {'generation', 'generation_size', 'generation_done',
+            'histories_done', 'k', 'elapsed', 'eta'} sau mỗi progress_interval lịch sử neutron
+            và cuối mỗi thế hệ
+        cancel_event : threading.Event
+            Khi được đặt, mô phỏng dừng ở lần báo cáo tiến trình kế tiếp và ném SimulationCancelled
+        progress_interval : int
+            Số lịch sử neutron giữa hai lần báo cáo tiến trình
+        seed : int
+            Hạt giống ngẫu nhiên (None = không đặt; kết quả chỉ được ghi nhớ khi có seed)
         
         Trả về:
         --------
         dict : Kết quả của mô phỏng
         """
+        # Bộ sinh số ngẫu nhiên riêng của lời gọi (không dùng trạng thái toàn cục của NumPy, vốn
+        # bị chia sẻ giữa các công việc chạy đồng thời); mỗi lô song song có dòng con độc lập
+        seed_sequence = np.random.SeedSequence(seed)
+        rng = np.random.default_rng(seed_sequence.spawn(1)[0])
+        
         # Mảng để theo dõi kết quả
         n_fissions = 0
         n_absorptions = 0
@@ -327,7 +354,7 @@ class MonteCarloNeutronTransport:
         fission_sites = []
         
         # Khởi tạo neutron (có thể tăng lên với phân hạch)
-        neutrons = self._initialize_neutrons(num_neutrons)
+        neutrons = self._initialize_neutrons(num_neutrons, rng)
         
         generation = 0
         start_time = time.time()
@@ -336,6 +363,36 @@ class MonteCarloNeutronTransport:
         if use_parallel and n_cores is None:
             n_cores = max(1, mp.cpu_count() - 1)  # Để lại một lõi cho hệ thống
         
+        histories_done = 0
+        
+        def report(generation_done):
+            """Gửi sự kiện tiến trình và kiểm tra yêu cầu hủy"""
+            if cancel_event is not None and cancel_event.is_set():
+                raise SimulationCancelled(f"Mô phỏng bị hủy ở thế hệ {generation}")
+            if progress_callback is None:
+                return
+            
+            elapsed = time.time() - start_time
+            k = (generation_sizes[-1] / generation_sizes[-2]
+                 if len(generation_sizes) > 1 and generation_sizes[-2] > 0 else None)
+            
+            # Ước lượng số lịch sử còn lại: phần còn lại của thế hệ hiện tại và các thế hệ sau
+            # với quy mô nhân theo k (bằng 1 khi chưa có ước lượng)
+            growth = k if fission_chain and k else (1.0 if fission_chain else 0.0)
+            remaining = len(neutrons) - generation_done
+            remaining += sum(len(neutrons) * growth**j for j in range(1, self.max_generations - generation + 1))
+            rate = histories_done / elapsed if elapsed > 0 else 0
+            
+            progress_callback({
+                'generation': generation,
+                'generation_size': len(neutrons),
+                'generation_done': generation_done,
+                'histories_done': histories_done,
+                'k': k,
+                'elapsed': elapsed,
+                'eta': remaining / rate if rate > 0 else None
+            })
+        
         while neutrons and generation < self.max_generations:  # Giới hạn số thế hệ
             generation += 1
             next_gen_neutrons = []
@@ -347,6 +404,7 @@ class MonteCarloNeutronTransport:
                     print(desc)
                     iterator = neutrons
                 else:
+                    from tqdm import tqdm
                     iterator = tqdm(neutrons, desc=desc)
             else:
                 iterator = neutrons
@@ -358,11 +416,11 @@ class MonteCarloNeutronTransport:
                 batches = [neutrons[i:i+batch_size] for i in range(0, len(neutrons), batch_size)]
                 
                 # Xử lý song song
+                batch_seeds = seed_sequence.spawn(len(batches))
                 with mp.Pool(n_cores) as pool:
-                    process_func = partial(self._process_neutron_batch, 
-                                           max_interactions=max_interactions, 
-                                           fission_chain=fission_chain)
-                    results = pool.map(process_func, batches)
+                    results = pool.starmap(self._process_neutron_batch,
+                                           [(batch, max_interactions, fission_chain, batch_seed)
+                                            for batch, batch_seed in zip(batches, batch_seeds)])
                 
                 # Tổng hợp kết quả
                 for res, new_neutrons in results:
@@ -373,9 +431,13 @@ class MonteCarloNeutronTransport:
                     final_positions.extend(res['final_positions'])
                     fission_sites.extend(res['fission_sites'])
                     next_gen_neutrons.extend(new_neutrons)
+                histories_done += len(neutrons)
             else:
                 # Xử lý tuần tự
-                for neutron in iterator:
+                for index, neutron in enumerate(iterator):
+                    if index and index % progress_interval == 0:
+                        report(index)
+                    
                     pos = neutron['pos']
                     energy_group = neutron['energy_group']
                     weight = neutron['weight']
@@ -387,11 +449,11 @@ class MonteCarloNeutronTransport:
                         fission_xs, scatter_xs, absorb_xs, total_xs = self._get_cross_sections(energy_group)
                         
                         # Lấy mẫu đường tự do trung bình
-                        mfp = -np.log(np.random.random()) / total_xs
+                        mfp = -np.log(rng.random()) / total_xs
                         path_lengths.append(mfp)
                         
                         # Hướng di chuyển ngẫu nhiên (sử dụng tán xạ đẳng hướng)
-                        direction = self._sample_direction()
+                        direction = self._sample_direction(rng)
                         
                         # Di chuyển neutron
                         pos = pos + mfp * direction
@@ -403,7 +465,7 @@ class MonteCarloNeutronTransport:
                             continue
                         
                         # Xác định loại tương tác
-                        interaction_type = np.random.random() * total_xs
+                        interaction_type = rng.random() * total_xs
                         
                         if interaction_type < fission_xs:
                             n_fissions += 1
@@ -414,13 +476,13 @@ class MonteCarloNeutronTransport:
                                 fission_sites.append(pos.copy())
                                 
                                 # Tạo neutron mới cho thế hệ tiếp theo
-                                n_new = np.random.poisson(self.fission_neutrons)
+                                n_new = rng.poisson(self.fission_neutrons)
                                 for _ in range(n_new):
                                     if self.energy_groups > 1:
                                         # Phổ phân hạch ưu tiên năng lượng cao
                                         probs = np.exp(-np.arange(self.energy_groups))
                                         probs = probs / np.sum(probs)
-                                        new_energy_group = np.random.choice(np.arange(self.energy_groups), p=probs)
+                                        new_energy_group = rng.choice(np.arange(self.energy_groups), p=probs)
                                     else:
                                         new_energy_group = 0
                                         
@@ -438,15 +500,17 @@ class MonteCarloNeutronTransport:
                             if self.energy_groups > 1:
                                 # Chuyển tiếp nhóm năng lượng
                                 scatter_probs = self.scatter_matrix[energy_group]
-                                energy_group = np.random.choice(np.arange(self.energy_groups), p=scatter_probs)
+                                energy_group = rng.choice(np.arange(self.energy_groups), p=scatter_probs)
                         
                         interactions += 1
                         
                     final_positions.append(np.linalg.norm(pos))
+                    histories_done += 1
                     
             # Cập nhật neutron cho thế hệ tiếp theo
-            neutrons = next_gen_neutrons if fission_chain else []
             generation_sizes.append(len(next_gen_neutrons))
+            report(len(neutrons))
+            neutrons = next_gen_neutrons if fission_chain else []
             
             # Kiểm tra sự hội tụ của k-hiệu quả
             if fission_chain and len(generation_sizes) > 3 and generation_sizes[-1] > 0:
@@ -473,6 +537,10 @@ class MonteCarloNeutronTransport:
                 k_error = np.std(k_values) / np.sqrt(len(k_values)) if len(k_values) > 1 else 0
         
         elapsed_time = time.time() - start_time
+        
+        # Mỗi đoạn bay tự do kết thúc bằng một va chạm hoặc thoát ra ngoài
+        count('monte_carlo.histories', histories_done)
+        count('monte_carlo.collisions', len(path_lengths))
             
         return {
             'fissions': n_fissions,
@@ -496,6 +564,8 @@ class MonteCarloNeutronTransport:
         results : dict
             Kết quả từ phương thức simulate_neutrons
         """
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 2, figsize=(14, 10))
         
         # Đồ thị 1: Phân bố tương tác
@@ -561,6 +631,8 @@ class MonteCarloNeutronTransport:
         fig : matplotlib Figure
             Hình ảnh phân tích
         """
+        import matplotlib.pyplot as plt
+        
         if self.energy_groups <= 1:
             return None
             
@@ -1,7 +1,8 @@
 import numpy as np
 from scipy.sparse import diags
 from scipy.sparse.linalg import spsolve
-import matplotlib.pyplot as plt
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 class NeutronTransportModel:
     def __init__(self, spatial_points=100, scattering_xs=0.1, 
@@ -23,6 +24,8 @@ class NeutronTransportModel:
         """
         return 1.0 / (3.0 * (self.scattering_xs + self.absorption_xs))
     
+    @cached_result()
+    @instrumented()
     def solve_diffusion_equation(self, size=10.0, boundary_condition="vacuum", source_distribution=None):
         """
         Giải phương trình khuếch tán nơtron một nhóm:
@@ -77,6 +80,8 @@ class NeutronTransportModel:
         else:
             raise ValueError("Điều kiện biên không được hỗ trợ: {}".format(boundary_condition))
         
+        count('diffusion.cells', self.spatial_points)
+        
         # Giải hệ phương trình
         try:
             flux = np.linalg.solve(A, S)
@@ -86,6 +91,8 @@ class NeutronTransportModel:
         
         return x, flux
     
+    @cached_result()
+    @instrumented()
     def solve_multigroup_diffusion(self, num_groups=2, sizes=None, cross_sections=None):
         """
         Giải phương trình khuếch tán nơtron đa nhóm
@@ -120,6 +127,8 @@ class NeutronTransportModel:
         """
         Vẽ đồ thị thông lượng nơtron
         """
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(10, 6))
         plt.plot(x, flux)
         plt.title(title)
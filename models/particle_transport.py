@@ -0,0 +1,289 @@
+import multiprocessing as mp
+import time
+from functools import partial
+
+import numpy as np
+
+from core.instrumentation import count, instrumented
+from models.fallout import FalloutModel
+from models.weather import WeatherStore
+from models.wind_field import WindField
+
+# Các lớp kích thước hạt mặc định: đường kính (µm) và tỷ lệ hoạt độ phóng xạ mang theo
+DEFAULT_DIAMETERS_UM = (25, 50, 100, 200, 400)
+DEFAULT_ACTIVITY_FRACTIONS = (0.10, 0.20, 0.30, 0.25, 0.15)
+
+
+def settling_velocity(diameter_um, particle_density=2600.0, air_density=1.225, air_viscosity=1.81e-5):
+    """
+    Tính vận tốc lắng (m/s) của hạt hình cầu trong không khí.
+
+    Dùng định luật Stokes có hiệu chỉnh lực cản Schiller-Naumann cho hạt lớn:
+    v·(1 + 0.15·Re^0.687) = v_Stokes, giải bằng chia đôi (vế trái tăng đơn điệu theo v).
+
+    Tham số:
+        diameter_um: Đường kính hạt (µm), số hoặc mảng
+        particle_density: Khối lượng riêng của hạt (kg/m³)
+        air_density: Khối lượng riêng của không khí (kg/m³)
+        air_viscosity: Độ nhớt động lực của không khí (Pa·s)
+
+    Trả về:
+        Vận tốc lắng (m/s), cùng hình dạng với diameter_um
+    """
+    diameter = np.asarray(diameter_um, dtype=float) * 1e-6
+    stokes = (particle_density - air_density) * 9.81 * diameter**2 / (18 * air_viscosity)
+
+    low, high = np.zeros_like(stokes), stokes.copy()
+    for _ in range(60):
+        velocity = 0.5 * (low + high)
+        reynolds = air_density * velocity * diameter / air_viscosity
+        too_fast = velocity * (1 + 0.15 * reynolds**0.687) > stokes
+        high = np.where(too_fast, velocity, high)
+        low = np.where(too_fast, low, velocity)
+
+    return 0.5 * (low + high)
+
+
+class ParticleFalloutModel:
+    """
+    Mô hình phân tán hạt Lagrange cho mưa phóng xạ.
+
+    Các hạt đánh dấu được thả trong đám mây nấm đã ổn định, trôi theo trường gió 3 chiều
+    thay đổi theo thời gian, lắng xuống theo vận tốc của lớp kích thước và khuếch tán rối
+    ngẫu nhiên, rồi được cộng dồn lên lưới mặt đất khi chạm đất. Dữ liệu hạt được lưu theo
+    kiểu cấu trúc mảng (mỗi thuộc tính là một mảng NumPy) để mọi bước tính đều vector hóa.
+    """
+    def __init__(self, yield_kt=20, fission_fraction=0.5, burst_height=0, soil_type="normal",
+                 diameters_um=DEFAULT_DIAMETERS_UM, activity_fractions=DEFAULT_ACTIVITY_FRACTIONS,
+                 particle_density=2600.0, horizontal_diffusivity=500.0, vertical_diffusivity=5.0):
+        """
+        Khởi tạo mô hình phân tán hạt.
+
+        Tham số:
+            yield_kt: Năng lượng vụ nổ (kiloton TNT)
+            fission_fraction: Tỷ lệ năng lượng từ phản ứng phân hạch (0-1)
+            burst_height: Độ cao vụ nổ (mét)
+            soil_type: Loại đất ảnh hưởng đến mưa phóng xạ ("normal", "dry", "wet")
+            diameters_um: Đường kính đại diện của các lớp kích thước hạt (µm)
+            activity_fractions: Tỷ lệ hoạt độ mang theo bởi mỗi lớp kích thước
+            particle_density: Khối lượng riêng của hạt (kg/m³)
+            horizontal_diffusivity: Hệ số khuếch tán rối theo phương ngang (m²/s)
+            vertical_diffusivity: Hệ số khuếch tán rối theo phương thẳng đứng (m²/s)
+        """
+        if len(diameters_um) != len(activity_fractions):
+            raise ValueError("Số lớp kích thước hạt và số tỷ lệ hoạt độ phải bằng nhau")
+
+        self.yield_kt = yield_kt
+        self.fission_fraction = fission_fraction
+        self.burst_height = burst_height
+
+        # Mô hình mưa phóng xạ cơ sở dùng để quy đổi lượng lắng đọng sang tốc độ liều
+        self.fallout = FalloutModel(yield_kt, fission_fraction, burst_height, soil_type)
+
+        self.diameters_um = np.asarray(diameters_um, dtype=float)
+        self.activity_fractions = np.asarray(activity_fractions, dtype=float)
+        self.activity_fractions = self.activity_fractions / self.activity_fractions.sum()
+        self.settling_velocities = settling_velocity(self.diameters_um, particle_density)
+
+        self.horizontal_diffusivity = horizontal_diffusivity
+        self.vertical_diffusivity = vertical_diffusivity
+
+        self.cloud_top, self.cloud_bottom, self.cloud_radius = self._cloud_geometry()
+
+    def _cloud_geometry(self):
+        """
+        Kích thước gần đúng của đám mây nấm đã ổn định.
+
+        Trả về:
+            (độ cao đỉnh mây (m), độ cao đáy mây (m), bán kính mây (km))
+        """
+        # Công thức thực nghiệm gần đúng theo năng lượng vụ nổ W (kt)
+        cloud_top = 7900 * self.yield_kt**0.143
+        cloud_bottom = 0.6 * cloud_top
+        cloud_radius = 1.2 * self.yield_kt**(1 / 3)
+        return cloud_top, cloud_bottom, cloud_radius
+
+    def _initialize_particles(self, num_particles, rng):
+        """
+        Khởi tạo các hạt trong mũ nấm (90%) và thân nấm (10%).
+
+        Trả về:
+            Dictionary các mảng thuộc tính hạt: x, y (km), z (m), settling (m/s), weight
+        """
+        size_class = rng.choice(len(self.diameters_um), size=num_particles, p=self.activity_fractions)
+
+        # Phân bố đều trong hình trụ: bán kính theo căn bậc hai để mật độ đều trên mặt cắt
+        in_stem = rng.random(num_particles) < 0.1
+        radius = np.where(in_stem, 0.2, 1.0) * self.cloud_radius * np.sqrt(rng.random(num_particles))
+        angle = rng.uniform(0, 2 * np.pi, num_particles)
+        bottom = np.where(in_stem, 0.0, self.cloud_bottom)
+        top = np.where(in_stem, self.cloud_bottom, self.cloud_top)
+
+        return {
+            'x': radius * np.cos(angle),
+            'y': radius * np.sin(angle),
+            'z': bottom + (top - bottom) * rng.random(num_particles),
+            'settling': self.settling_velocities[size_class],
+            # Mỗi hạt mang một phần bằng nhau của tổng hoạt độ
+            'weight': np.full(num_particles, 1.0 / num_particles)
+        }
+
+    def _transport_chunk(self, chunk, wind_field, edges, dt, max_time, total_particles):
+        """
+        Mô phỏng một nhóm hạt độc lập cho đến khi chạm đất hoặc hết thời gian.
+
+        Tham số:
+            chunk: Tuple (số hạt, hạt giống ngẫu nhiên)
+            wind_field: Trường gió WindField
+            edges: Tuple (cạnh ô theo x, cạnh ô theo y) của lưới mặt đất (km)
+            dt: Bước thời gian (giây)
+            max_time: Thời gian mô phỏng tối đa (giây)
+            total_particles: Tổng số hạt của toàn bộ mô phỏng (để chuẩn hóa trọng số)
+
+        Trả về:
+            Dictionary chứa lưới lắng đọng và thời gian đến của nhóm hạt
+        """
+        num_particles, seed = chunk
+        rng = np.random.default_rng(seed)
+        particles = self._initialize_particles(num_particles, rng)
+        particles['weight'] *= num_particles / total_particles
+
+        x_edges, y_edges = edges
+        nx, ny = len(x_edges) - 1, len(y_edges) - 1
+        deposition = np.zeros(nx * ny)
+        arrival = np.zeros(nx * ny)
+        outside = 0.0
+
+        horizontal_step = np.sqrt(2 * self.horizontal_diffusivity * dt) / 1000  # km
+        vertical_step = np.sqrt(2 * self.vertical_diffusivity * dt)  # m
+
+        t = 0.0
+        while t < max_time and particles['x'].size:
+            n_particles = particles['x'].size
+            u, v, w = wind_field.sample(t, particles['z'], particles['y'], particles['x'])
+
+            # Trôi theo gió (m/s -> km) và khuếch tán rối
+            particles['x'] += u * dt / 1000 + horizontal_step * rng.standard_normal(n_particles)
+            particles['y'] += v * dt / 1000 + horizontal_step * rng.standard_normal(n_particles)
+            particles['z'] += (w - particles['settling']) * dt + vertical_step * rng.standard_normal(n_particles)
+            t += dt
+
+            landed = particles['z'] <= 0
+            if not landed.any():
+                continue
+
+            # Cộng dồn các hạt vừa chạm đất lên lưới mặt đất
+            x_landed, y_landed = particles['x'][landed], particles['y'][landed]
+            weight = particles['weight'][landed]
+            column = np.searchsorted(x_edges, x_landed, side='right') - 1
+            row = np.searchsorted(y_edges, y_landed, side='right') - 1
+            inside = (column >= 0) & (column < nx) & (row >= 0) & (row < ny)
+
+            cell = row[inside] * nx + column[inside]
+            deposition += np.bincount(cell, weights=weight[inside], minlength=nx * ny)
+            arrival += np.bincount(cell, weights=weight[inside] * t, minlength=nx * ny)
+            outside += weight[~inside].sum()
+
+            # Chỉ giữ lại các hạt còn lơ lửng
+            airborne = ~landed
+            particles = {name: values[airborne] for name, values in particles.items()}
+
+        return {
+            'deposition': deposition,
+            'arrival': arrival,
+            'outside': outside,
+            'airborne': particles['weight'].sum()
+        }
+
+    @instrumented()
+    def simulate(self, wind_field=None, num_particles=100000, max_distance=200, resolution=200,
+                 dt=120, max_time_hours=48, use_parallel=False, n_cores=None, seed=None):
+        """
+        Mô phỏng vận chuyển và lắng đọng mưa phóng xạ bằng các hạt đánh dấu.
+
+        Tham số:
+            wind_field: Trường gió WindField hoặc kho dữ liệu WeatherStore chứa các biến u, v, w
+                        (None = gió đồng nhất 10 km/h hướng Đông)
+            num_particles: Số hạt đánh dấu
+            max_distance: Nửa kích thước của lưới mặt đất (km)
+            resolution: Số ô lưới theo mỗi chiều
+            dt: Bước thời gian (giây)
+            max_time_hours: Thời gian mô phỏng tối đa (giờ)
+            use_parallel: Chia các hạt thành nhóm và mô phỏng song song trên nhiều lõi CPU
+            n_cores: Số lõi CPU sử dụng cho tính toán song song
+            seed: Hạt giống ngẫu nhiên để tái lập kết quả
+
+        Trả về:
+            Dictionary chứa tọa độ tâm ô, tỷ lệ hoạt độ lắng đọng trên mỗi km² ('deposition'),
+            thời gian đến trung bình (giờ) và tỷ lệ hạt còn lơ lửng hoặc rơi ngoài lưới
+        """
+        if wind_field is None:
+            wind_field = WindField.uniform()
+        elif isinstance(wind_field, WeatherStore):
+            wind_field = WindField.from_weather(wind_field)
+
+        start_time = time.time()
+
+        x_edges = np.linspace(-max_distance, max_distance, resolution + 1)
+        y_edges = np.linspace(-max_distance, max_distance, resolution + 1)
+
+        if use_parallel and n_cores is None:
+            n_cores = max(1, mp.cpu_count() - 1)  # Để lại một lõi cho hệ thống
+        n_chunks = n_cores if use_parallel else 1
+
+        # Mỗi nhóm hạt có dòng số ngẫu nhiên độc lập
+        sizes = np.full(n_chunks, num_particles // n_chunks)
+        sizes[:num_particles % n_chunks] += 1
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        chunks = list(zip(sizes.tolist(), seeds))
+
+        transport = partial(self._transport_chunk, wind_field=wind_field, edges=(x_edges, y_edges),
+                            dt=dt, max_time=max_time_hours * 3600, total_particles=num_particles)
+
+        if use_parallel and n_chunks > 1:
+            with mp.Pool(n_cores) as pool:
+                results = pool.map(transport, chunks)
+        else:
+            results = [transport(chunk) for chunk in chunks]
+
+        deposition = sum(result['deposition'] for result in results).reshape(resolution, resolution)
+        arrival = sum(result['arrival'] for result in results).reshape(resolution, resolution)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arrival_time = np.where(deposition > 0, arrival / deposition / 3600, np.nan)
+
+        cell_area = (x_edges[1] - x_edges[0]) * (y_edges[1] - y_edges[0])
+        count('particle_transport.particles', num_particles)
+
+        return {
+            'x': 0.5 * (x_edges[:-1] + x_edges[1:]),
+            'y': 0.5 * (y_edges[:-1] + y_edges[1:]),
+            'deposition': (deposition / cell_area).astype(np.float32),
+            'arrival_time': arrival_time.astype(np.float32),
+            'airborne_fraction': sum(result['airborne'] for result in results),
+            'outside_fraction': sum(result['outside'] for result in results),
+            'num_particles': num_particles,
+            'elapsed': time.time() - start_time
+        }
+
+    def dose_rate_map(self, results, time_hours):
+        """
+        Quy đổi lượng lắng đọng sang tốc độ liều (Sv/h) tại một thời điểm.
+
+        Tổng tốc độ liều trên mặt đất được bảo toàn so với mẫu Gaussian của FalloutModel:
+        tốc độ liều tại tâm nhân với diện tích hiệu dụng 2π·(R/3)² được phân bố theo
+        tỷ lệ lắng đọng. Các ô mà mưa phóng xạ chưa đến được đặt bằng 0.
+
+        Tham số:
+            results: Kết quả của simulate()
+            time_hours: Thời gian sau vụ nổ (giờ)
+
+        Trả về:
+            Lưới tốc độ liều (Sv/h)
+        """
+        sigma = self.fallout.fallout_radius / 3
+        total = self.fallout.center_dose_rate(time_hours) * 2 * np.pi * sigma**2
+
+        dose_rate = results['deposition'] * np.float32(total)
+        arrived = np.nan_to_num(results['arrival_time'], nan=np.inf) <= time_hours
+        return np.where(arrived, dose_rate, 0).astype(np.float32)
@@ -0,0 +1,100 @@
+import numpy as np
+
+# Nút và trọng số Gauss-Kronrod 15 điểm (nửa dương, theo QUADPACK qk15)
+_KRONROD_NODES = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0
+])
+_KRONROD_WEIGHTS = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714
+])
+# Trọng số Gauss 7 điểm, dùng các nút Kronrod có chỉ số lẻ
+_GAUSS_WEIGHTS = np.array([
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327
+])
+
+# Bộ 15 nút đầy đủ trên [-1, 1] và trọng số tương ứng
+NODES = np.concatenate([-_KRONROD_NODES[:-1], _KRONROD_NODES[::-1]])
+KRONROD_WEIGHTS = np.concatenate([_KRONROD_WEIGHTS[:-1], _KRONROD_WEIGHTS[::-1]])
+GAUSS_WEIGHTS = np.zeros(15)
+GAUSS_WEIGHTS[1::2] = np.concatenate([_GAUSS_WEIGHTS[:-1], _GAUSS_WEIGHTS[::-1]])
+
+_TINY = np.finfo(float).tiny
+
+
+def gauss_kronrod(integrand, lower, upper, rtol=1e-8, atol=0.0, max_levels=30, full_output=False):
+    """
+    Tính đồng thời nhiều tích phân xác định bằng quy tắc Gauss-Kronrod (G7-K15) thích nghi.
+
+    Mọi đoạn con chưa đạt sai số của tất cả các tích phân được đánh giá cùng lúc:
+    mỗi vòng lặp gọi `integrand` một lần trên mảng (số đoạn, 15) điểm, sau đó chia đôi
+    các đoạn có sai số ước tính |K15 - G7| lớn hơn ngưỡng cho phép.
+
+    Tham số:
+        integrand: Hàm vector hóa integrand(x, owner) -> giá trị, với x là mảng (số đoạn, 15)
+                   và owner là mảng (số đoạn,) chỉ số tích phân mà mỗi đoạn thuộc về
+        lower, upper: Mảng 1 chiều cận dưới và cận trên của các tích phân
+        rtol: Sai số tương đối cho phép của mỗi tích phân
+        atol: Sai số tuyệt đối cho phép trên mỗi đoạn con
+        max_levels: Số lần chia đôi tối đa
+        full_output: Nếu True, trả thêm dictionary thông tin hội tụ
+
+    Trả về:
+        Mảng giá trị tích phân. Nếu full_output=True: (values, info) với info gồm
+        'error' (ước tính sai số), 'evaluations' và 'converged'.
+    """
+    lower = np.asarray(lower, dtype=float).ravel()
+    upper = np.asarray(upper, dtype=float).ravel()
+    count = lower.size
+
+    values = np.zeros(count)
+    errors = np.zeros(count)
+    converged = np.ones(count, dtype=bool)
+
+    owner = np.arange(count)
+    a, b = lower.copy(), upper.copy()
+    evaluations = 0
+
+    for level in range(max_levels + 1):
+        if not owner.size:
+            break
+
+        center = 0.5 * (a + b)
+        half_width = 0.5 * (b - a)
+        x = center[:, np.newaxis] + half_width[:, np.newaxis] * NODES
+        fx = np.asarray(integrand(x, owner), dtype=float)
+        evaluations += fx.size
+
+        kronrod = half_width * (fx @ KRONROD_WEIGHTS)
+        gauss = half_width * (fx @ GAUSS_WEIGHTS)
+        error = np.abs(kronrod - gauss)
+
+        # Sai số cho phép của mỗi đoạn tỷ lệ với độ rộng của nó trên ước tính hiện tại
+        # của cả tích phân, để các đoạn có giá trị không đáng kể không bị chia mãi.
+        # Sai số dưới số thực chuẩn nhỏ nhất (vùng số dưới chuẩn) luôn được chấp nhận.
+        estimate = values + np.bincount(owner, weights=kronrod, minlength=count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tolerance = np.maximum(max(atol, _TINY), rtol * np.abs(estimate[owner])
+                                   * (b - a) / (upper[owner] - lower[owner]))
+
+        # Chấp nhận các đoạn đạt sai số, các đoạn còn lại bị chia đôi (trừ vòng cuối)
+        within = (error <= tolerance) | (error == 0)
+        accept = within | (level == max_levels)
+        values += np.bincount(owner[accept], weights=kronrod[accept], minlength=count)
+        errors += np.bincount(owner[accept], weights=error[accept], minlength=count)
+        converged[owner[~within & accept]] = False
+
+        refine = ~accept
+        owner = np.repeat(owner[refine], 2)
+        a = np.column_stack([a[refine], center[refine]]).ravel()
+        b = np.column_stack([center[refine], b[refine]]).ravel()
+
+    if full_output:
+        return values, {'error': errors, 'evaluations': evaluations, 'converged': converged}
+    return values
@@ -0,0 +1,194 @@
+import numpy as np
+
+from core.instrumentation import instrumented
+from models.blast_wave import SedovTaylorModel
+from models.fallout import FalloutModel
+from models.grid_index import RegularGrid
+from models.thermal_radiation import ThermalRadiationModel
+from models.threshold_solver import solve_threshold_radii
+
+
+class MultiBurstScenario:
+    """
+    Kịch bản nhiều vụ nổ trên cùng một lưới (bài tập ứng phó khẩn cấp).
+
+    Mỗi vụ nổ có vị trí, thời điểm, sức công phá, độ cao nổ và tỷ lệ phân hạch riêng.
+    Các trường được tổng hợp như sau:
+      - Tốc độ liều mưa phóng xạ: cộng dồn, dịch theo thời điểm nổ và phân rã theo
+        tuổi của từng vụ nổ
+      - Áp suất dư đỉnh: giá trị lớn nhất qua các vụ nổ
+      - Mật độ năng lượng nhiệt: cộng dồn
+
+    Mỗi vụ nổ chỉ được tính trên các ô lưới trong bán kính cắt của nó (nơi trường còn
+    vượt ngưỡng tối thiểu), tìm bằng chỉ mục hộp bao của RegularGrid, và kết quả được
+    cộng dồn tại chỗ vào lưới chung.
+    """
+    def __init__(self, wind_speed=10, wind_direction=0, stability_class='D', min_dose_rate=1e-6,
+                 min_overpressure=1000, min_thermal_energy=1e4):
+        """
+        Tham số:
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+            min_dose_rate: Tốc độ liều nhỏ nhất được tính (Sv/h)
+            min_overpressure: Áp suất dư nhỏ nhất được tính (Pa)
+            min_thermal_energy: Mật độ năng lượng nhiệt nhỏ nhất được tính (J/m²)
+        """
+        if min_dose_rate <= 0 or min_overpressure <= 0 or min_thermal_energy <= 0:
+            raise ValueError("Các ngưỡng tối thiểu phải lớn hơn 0")
+
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.stability_class = stability_class
+        self.min_dose_rate = min_dose_rate
+        self.min_overpressure = min_overpressure
+        self.min_thermal_energy = min_thermal_energy
+        self.events = []
+
+    def add_event(self, x=0, y=0, time=0, yield_kt=20, burst_height=0, fission_fraction=0.5,
+                  soil_type="normal"):
+        """
+        Thêm một vụ nổ vào kịch bản.
+
+        Tham số:
+            x, y: Vị trí vụ nổ (km)
+            time: Thời điểm nổ tính từ đầu kịch bản (giờ)
+            yield_kt: Sức công phá (kiloton TNT)
+            burst_height: Độ cao nổ (mét)
+            fission_fraction: Tỷ lệ năng lượng từ phân hạch (0-1)
+            soil_type: Loại đất ("normal", "dry", "wet")
+
+        Trả về:
+            Dictionary mô tả vụ nổ (kèm các mô hình hiệu ứng của nó)
+        """
+        if yield_kt <= 0:
+            raise ValueError("Sức công phá phải lớn hơn 0")
+        if not 0 <= fission_fraction <= 1:
+            raise ValueError("Tỷ lệ phân hạch phải nằm trong khoảng [0, 1]")
+        if time < 0 or burst_height < 0:
+            raise ValueError("Thời điểm và độ cao nổ không được âm")
+
+        fallout = FalloutModel(yield_kt, fission_fraction, burst_height, soil_type)
+        blast = SedovTaylorModel(yield_kt, altitude=burst_height)
+        thermal = ThermalRadiationModel(yield_kt, burst_height)
+
+        # Bán kính cắt (km) của các hiệu ứng không phụ thuộc thời gian, giải một lần cho mỗi vụ nổ
+        overpressure_cutoff = solve_threshold_radii(
+            lambda distance: blast.peak_overpressure(np.hypot(distance, burst_height)),
+            self.min_overpressure, lower=1.0, upper=1e6) / 1000
+        thermal_cutoff = solve_threshold_radii(thermal.calculate_thermal_energy_density,
+                                               self.min_thermal_energy, lower=1.0, upper=1e6) / 1000
+
+        event = {
+            'x': float(x),
+            'y': float(y),
+            'time': float(time),
+            'yield_kt': yield_kt,
+            'burst_height': burst_height,
+            'fission_fraction': fission_fraction,
+            'fallout': fallout,
+            'blast': blast,
+            'thermal': thermal,
+            'overpressure_cutoff': float(overpressure_cutoff),
+            'thermal_cutoff': float(thermal_cutoff)
+        }
+        self.events.append(event)
+        return event
+
+    def _grid(self, grid, max_distance, resolution):
+        if grid is not None:
+            return grid
+        if not self.events:
+            return RegularGrid.square(max_distance, resolution)
+
+        # Lưới vuông quanh trọng tâm các vụ nổ
+        center_x = np.mean([event['x'] for event in self.events])
+        center_y = np.mean([event['y'] for event in self.events])
+        axis = np.linspace(-max_distance, max_distance, resolution)
+        return RegularGrid(axis + center_x, axis + center_y)
+
+    @instrumented()
+    def dose_rate_map(self, times=[1, 24, 168, 720], grid=None, max_distance=100, resolution=100,
+                      dtype=np.float32):
+        """
+        Tổng hợp tốc độ liều mưa phóng xạ của mọi vụ nổ tại các thời điểm kịch bản.
+
+        Vụ nổ tại thời điểm t_k đóng góp mẫu phân bố của FalloutModel ở tuổi t - t_k
+        (tâm dời về vị trí vụ nổ); vụ nổ chưa xảy ra không đóng góp.
+
+        Tham số:
+            times: Danh sách thời điểm tính từ đầu kịch bản (giờ)
+            grid: RegularGrid dùng chung (None = lưới vuông quanh các vụ nổ)
+            max_distance: Nửa cạnh của lưới mặc định (km)
+            resolution: Số điểm mỗi chiều của lưới mặc định
+            dtype: Kiểu dữ liệu của lưới kết quả
+
+        Trả về:
+            Dictionary chứa lưới tọa độ và tốc độ liều (Sv/h) tại các thời điểm
+        """
+        grid = self._grid(grid, max_distance, resolution)
+
+        results = {f"{time_hours}h": np.zeros(grid.shape, dtype=dtype) for time_hours in times}
+        for event in self.events:
+            fallout = event['fallout']
+            ages = np.asarray(times, dtype=float) - event['time']
+            center_rates = fallout.center_dose_rate(np.maximum(ages, 0))
+
+            for time_hours, age, center_rate in zip(times, ages, center_rates):
+                if age <= 0:
+                    continue
+                rows, cols = grid.window(event['x'], event['y'], fallout.pattern_cutoff_radius(center_rate, self.min_dose_rate))
+                if rows.start == rows.stop or cols.start == cols.stop:
+                    continue
+
+                factor = fallout.pattern_factor(
+                    grid.x[np.newaxis, cols] - event['x'], grid.y[rows, np.newaxis] - event['y'],
+                    age, self.wind_speed, self.wind_direction, self.stability_class
+                )
+                results[f"{time_hours}h"][rows, cols] += center_rate * factor
+
+        return {
+            'grid_x': np.broadcast_to(grid.x[np.newaxis, :], grid.shape),
+            'grid_y': np.broadcast_to(grid.y[:, np.newaxis], grid.shape),
+            'dose_rates': results
+        }
+
+    @instrumented()
+    def effects_map(self, grid=None, max_distance=100, resolution=100, dtype=np.float32):
+        """
+        Tổng hợp áp suất dư đỉnh (lớn nhất qua các vụ nổ) và mật độ năng lượng nhiệt
+        (cộng dồn) trên lưới chung.
+
+        Tham số:
+            grid: RegularGrid dùng chung (None = lưới vuông quanh các vụ nổ)
+            max_distance: Nửa cạnh của lưới mặc định (km)
+            resolution: Số điểm mỗi chiều của lưới mặc định
+            dtype: Kiểu dữ liệu của lưới kết quả
+
+        Trả về:
+            Dictionary chứa lưới tọa độ, 'overpressure' (Pa) và 'thermal_energy' (J/m²)
+        """
+        grid = self._grid(grid, max_distance, resolution)
+        overpressure = np.zeros(grid.shape, dtype=dtype)
+        thermal_energy = np.zeros(grid.shape, dtype=dtype)
+
+        for event in self.events:
+            rows, cols = grid.window(event['x'], event['y'], event['overpressure_cutoff'])
+            if rows.start != rows.stop and cols.start != cols.stop:
+                distance = np.hypot(grid.x[np.newaxis, cols] - event['x'], grid.y[rows, np.newaxis] - event['y'])
+                block = overpressure[rows, cols]
+                slant_range = np.hypot(distance * 1000, event['burst_height'])
+                np.maximum(block, event['blast'].peak_overpressure(slant_range), out=block, casting='unsafe')
+
+            rows, cols = grid.window(event['x'], event['y'], event['thermal_cutoff'])
+            if rows.start != rows.stop and cols.start != cols.stop:
+                distance = np.hypot(grid.x[np.newaxis, cols] - event['x'], grid.y[rows, np.newaxis] - event['y'])
+                thermal_energy[rows, cols] += event['thermal'].calculate_thermal_energy_density(
+                    np.maximum(distance * 1000, 1.0))
+
+        return {
+            'grid_x': np.broadcast_to(grid.x[np.newaxis, :], grid.shape),
+            'grid_y': np.broadcast_to(grid.y[:, np.newaxis], grid.shape),
+            'overpressure': overpressure,
+            'thermal_energy': thermal_energy
+        }
@@ -0,0 +1,238 @@
+import os
+
+import numpy as np
+
+# Hệ số bảo vệ (protection factor, PF) theo lớp che chắn của bản đồ công trình/sử dụng đất.
+# Liều bên trong = liều bên ngoài / PF. Giá trị gần đúng theo hướng dẫn phòng thủ dân sự.
+DEFAULT_SHIELDING_CLASSES = {
+    0: {'name': 'Đất trống', 'protection_factor': 1.0},
+    1: {'name': 'Phương tiện giao thông', 'protection_factor': 1.5},
+    2: {'name': 'Nhà khung gỗ/nhẹ', 'protection_factor': 3.0},
+    3: {'name': 'Nhà gạch 1-2 tầng', 'protection_factor': 10.0},
+    4: {'name': 'Nhà bê tông nhiều tầng', 'protection_factor': 40.0},
+    5: {'name': 'Tầng hầm', 'protection_factor': 100.0},
+    6: {'name': 'Hầm trú ẩn', 'protection_factor': 1000.0}
+}
+
+
+def load_class_raster(path):
+    """
+    Đọc bản đồ lớp che chắn từ tệp cục bộ.
+
+    Hỗ trợ:
+      - .npy: mảng số nguyên (ny, nx), được ánh xạ bộ nhớ
+      - .npz: khóa 'classes' và tùy chọn các trục 'x', 'y' (km)
+
+    Trả về:
+        Tuple (classes, x, y); x, y là None nếu tệp không có trục tọa độ
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return np.load(path, mmap_mode='r'), None, None
+    if extension == '.npz':
+        with np.load(path) as data:
+            x = data['x'] if 'x' in data.files else None
+            y = data['y'] if 'y' in data.files else None
+            return data['classes'], x, y
+    raise ValueError(f"Định dạng bản đồ không được hỗ trợ: {extension}")
+
+
+class ShelterModel:
+    """
+    Mô hình che chắn bức xạ mặt đất (ground-shine) theo bản đồ lớp công trình.
+
+    Hệ số bảo vệ được tra bằng bảng theo lớp (một phép lấy chỉ số mảng), và các lưới
+    lớn được xử lý theo từng khối hàng để giới hạn bộ nhớ tạm.
+    """
+    def __init__(self, shielding_classes=None, default_protection_factor=1.0, chunk_rows=512):
+        """
+        Tham số:
+            shielding_classes: Dictionary {mã lớp: {'name', 'protection_factor'}}
+                               (None = DEFAULT_SHIELDING_CLASSES)
+            default_protection_factor: PF cho các mã lớp không có trong bảng
+            chunk_rows: Số hàng lưới xử lý trong mỗi khối
+        """
+        self.shielding_classes = shielding_classes or DEFAULT_SHIELDING_CLASSES
+        self.chunk_rows = chunk_rows
+
+        for code, shielding in self.shielding_classes.items():
+            if int(code) < 0 or shielding['protection_factor'] < 1:
+                raise ValueError(f"Lớp che chắn không hợp lệ: {code}")
+
+        # Bảng tra hệ số truyền qua (1/PF) theo mã lớp
+        size = max(int(code) for code in self.shielding_classes) + 1
+        self.transmission_table = np.full(size, 1.0 / default_protection_factor, dtype=np.float32)
+        for code, shielding in self.shielding_classes.items():
+            self.transmission_table[int(code)] = 1.0 / shielding['protection_factor']
+        self.default_transmission = np.float32(1.0 / default_protection_factor)
+
+    def transmission(self, classes):
+        """
+        Tra hệ số truyền qua (1/PF) cho mảng mã lớp.
+
+        Tham số:
+            classes: Mảng mã lớp (số nguyên)
+
+        Trả về:
+            Mảng float32 cùng hình dạng
+        """
+        classes = np.asarray(classes)
+        known = (classes >= 0) & (classes < len(self.transmission_table))
+        return np.where(known, self.transmission_table[np.where(known, classes, 0)], self.default_transmission)
+
+    def protection_factor(self, classes):
+        """Tra hệ số bảo vệ PF cho mảng mã lớp"""
+        return 1.0 / self.transmission(classes)
+
+    @staticmethod
+    def resample_classes(classes, raster_x, raster_y, grid_x, grid_y):
+        """
+        Lấy mẫu bản đồ lớp lên lưới tính toán theo ô gần nhất.
+
+        Tham số:
+            classes: Mảng mã lớp (ny, nx), có thể là memmap
+            raster_x, raster_y: Trục tọa độ tâm ô của bản đồ (km), tăng dần
+            grid_x, grid_y: Trục tọa độ của lưới tính toán (km)
+
+        Trả về:
+            Mảng mã lớp trên lưới tính toán; điểm nằm ngoài bản đồ nhận mã -1
+        """
+        def nearest(axis, values):
+            index = np.clip(np.searchsorted(axis, values), 1, len(axis) - 1)
+            index -= values - axis[index - 1] < axis[index] - values
+            half_step = 0.5 * (axis[-1] - axis[0]) / max(len(axis) - 1, 1)
+            inside = (values >= axis[0] - half_step) & (values <= axis[-1] + half_step)
+            return index, inside
+
+        columns, inside_x = nearest(np.asarray(raster_x, dtype=float), np.asarray(grid_x, dtype=float))
+        rows, inside_y = nearest(np.asarray(raster_y, dtype=float), np.asarray(grid_y, dtype=float))
+
+        resampled = np.asarray(classes)[np.ix_(rows, columns)].astype(np.int16)
+        resampled[~np.multiply.outer(inside_y, inside_x)] = -1
+        return resampled
+
+    def sheltered(self, field, classes):
+        """
+        Áp dụng hệ số che chắn lên một lưới tốc độ liều hoặc liều tích lũy.
+
+        Tham số:
+            field: Lưới giá trị ngoài trời (ny, nx)
+            classes: Lưới mã lớp cùng hình dạng
+
+        Trả về:
+            Lưới giá trị trong công trình (float32)
+        """
+        if np.shape(field) != np.shape(classes):
+            raise ValueError("Lưới giá trị và bản đồ lớp phải cùng hình dạng")
+
+        result = np.empty(np.shape(field), dtype=np.float32)
+        for start in range(0, result.shape[0], self.chunk_rows):
+            rows = slice(start, start + self.chunk_rows)
+            np.multiply(field[rows], self.transmission(classes[rows]), out=result[rows], casting='unsafe')
+        return result
+
+    def dose_rasters(self, fallout, grid_x, grid_y, classes, time_hours, stay_start=0, stay_end=24,
+                     wind_speed=10, wind_direction=0, stability_class='D'):
+        """
+        Tính các lưới tốc độ liều và liều tích lũy ngoài trời và trong công trình.
+
+        Liều ngoài trời lấy theo mẫu mưa phóng xạ bị gió kéo dài (FalloutModel.pattern_dose_rate),
+        cùng trường với simulate_fallout_pattern trên lưới đó.
+
+        Tham số:
+            fallout: FalloutModel
+            grid_x, grid_y: Trục tọa độ của lưới (km)
+            classes: Lưới mã lớp (len(grid_y), len(grid_x))
+            time_hours: Thời điểm tính tốc độ liều (giờ)
+            stay_start, stay_end: Khoảng thời gian lưu trú để tính liều tích lũy (giờ)
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+
+        Trả về:
+            Dictionary các lưới float32: 'dose_rate', 'sheltered_dose_rate',
+            'integrated_dose', 'sheltered_integrated_dose' và 'protection_factor'
+        """
+        grid_x = np.asarray(grid_x, dtype=float)
+        grid_y = np.asarray(grid_y, dtype=float)
+        shape = (len(grid_y), len(grid_x))
+        if np.shape(classes) != shape:
+            raise ValueError(f"Bản đồ lớp phải có hình dạng {shape}")
+
+        rasters = {name: np.empty(shape, dtype=np.float32)
+                   for name in ('dose_rate', 'sheltered_dose_rate', 'integrated_dose',
+                                'sheltered_integrated_dose', 'protection_factor')}
+
+        for start in range(0, shape[0], self.chunk_rows):
+            rows = slice(start, start + self.chunk_rows)
+            x, y = grid_x[np.newaxis, :], grid_y[rows, np.newaxis]
+            transmission = self.transmission(classes[rows])
+
+            dose_rate = fallout.pattern_dose_rate(x, y, time_hours, wind_speed, wind_direction, stability_class)
+            integrated = fallout.pattern_integrated_dose(x, y, stay_start, stay_end, wind_speed,
+                                                         wind_direction, stability_class)
+
+            rasters['dose_rate'][rows] = dose_rate
+            rasters['sheltered_dose_rate'][rows] = dose_rate * transmission
+            rasters['integrated_dose'][rows] = integrated
+            rasters['sheltered_integrated_dose'][rows] = integrated * transmission
+            rasters['protection_factor'][rows] = 1.0 / transmission
+
+        return rasters
+
+    def shelter_or_evacuate(self, fallout, grid_x, grid_y, classes, planning_hours=168,
+                            evacuation_start=6, transit_hours=2, transit_class=1, wind_speed=10,
+                            wind_direction=0, stability_class='D'):
+        """
+        So sánh trú ẩn tại chỗ với sơ tán cho từng ô lưới.
+
+        - Trú ẩn tại chỗ: ở trong công trình của ô suốt thời gian kế hoạch.
+        - Sơ tán: ở trong công trình đến evacuation_start, sau đó di chuyển ra khỏi vùng
+          ảnh hưởng trong transit_hours với che chắn của lớp transit_class (phương tiện).
+
+        Tham số:
+            fallout: FalloutModel
+            grid_x, grid_y: Trục tọa độ của lưới (km)
+            classes: Lưới mã lớp
+            planning_hours: Thời gian kế hoạch (giờ)
+            evacuation_start: Thời điểm bắt đầu sơ tán (giờ)
+            transit_hours: Thời gian di chuyển trong vùng mưa phóng xạ (giờ)
+            transit_class: Mã lớp che chắn khi di chuyển
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió (rad), 0 là hướng Đông, π/2 là hướng Bắc
+            stability_class: Phân loại ổn định Pasquill-Gifford ('A' đến 'F')
+
+        Trả về:
+            Dictionary các lưới: 'shelter_dose', 'evacuate_dose' (Sv, float32) và
+            'evacuate' (True nếu sơ tán cho liều thấp hơn)
+        """
+        grid_x = np.asarray(grid_x, dtype=float)
+        grid_y = np.asarray(grid_y, dtype=float)
+        shape = (len(grid_y), len(grid_x))
+        transit_transmission = self.transmission(transit_class)
+        evacuation_end = min(evacuation_start + transit_hours, planning_hours)
+
+        shelter_dose = np.empty(shape, dtype=np.float32)
+        evacuate_dose = np.empty(shape, dtype=np.float32)
+
+        for start in range(0, shape[0], self.chunk_rows):
+            rows = slice(start, start + self.chunk_rows)
+            x, y = grid_x[np.newaxis, :, np.newaxis], grid_y[rows, np.newaxis, np.newaxis]
+            transmission = self.transmission(classes[rows])
+
+            # Liều ngoài trời (mẫu theo gió) trên ba đoạn thời gian, tính chung một lần gọi
+            windows = fallout.pattern_integrated_dose(
+                x, y,
+                np.array([0, evacuation_start, evacuation_end]),
+                np.array([evacuation_start, evacuation_end, planning_hours]),
+                wind_speed, wind_direction, stability_class
+            )
+
+            shelter_dose[rows] = windows.sum(axis=-1) * transmission
+            evacuate_dose[rows] = windows[..., 0] * transmission + windows[..., 1] * transit_transmission
+
+        return {
+            'shelter_dose': shelter_dose,
+            'evacuate_dose': evacuate_dose,
+            'evacuate': evacuate_dose < shelter_dose
+        }
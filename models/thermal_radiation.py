@@ -1,5 +1,8 @@
 import numpy as np
-from scipy.special import erf
+from scipy.special import erf, erfinv
+from models.threshold_solver import solve_threshold_radii
+from core.cache import cached_result
+from core.instrumentation import count, instrumented
 
 class ThermalRadiationModel:
     def __init__(self, yield_kt=20, burst_height=0, relative_humidity=0.5, visibility=20):
@@ -25,6 +28,45 @@ class ThermalRadiationModel:
         # Hệ số giảm bức xạ theo độ ẩm
         self.humidity_attenuation = 0.1 + 0.4 * relative_humidity  # độ giảm bức xạ tăng theo độ ẩm
         
+        # Ngưỡng năng lượng gây bỏng và gây cháy (J/m²)
+        self.effect_thresholds = {
+            'first_degree': 2e5,
+            'second_degree': 4e5,
+            'third_degree': 6e5,
+            'paper_ignition': 1e5,
+            'grass_ignition': 3e5,
+            'wood_ignition': 8e5
+        }
+        
+    @classmethod
+    def from_weather(cls, store, yield_kt=20, burst_height=0, time=0, x=0, y=0,
+                     relative_humidity=0.5, visibility=20):
+        """
+        Khởi tạo mô hình với độ ẩm và tầm nhìn nội suy từ kho dữ liệu thời tiết
+        tại vị trí và thời điểm vụ nổ.
+        
+        Tham số:
+            store: WeatherStore (hoặc đường dẫn) chứa các biến 'relative_humidity' (0-1)
+                   và 'visibility' (km)
+            yield_kt: Sức công phá tính bằng kiloton TNT
+            burst_height: Chiều cao vụ nổ tính bằng mét
+            time: Thời điểm trong dữ liệu thời tiết (giây)
+            x, y: Vị trí vụ nổ trên lưới dữ liệu (km)
+            relative_humidity, visibility: Giá trị mặc định khi kho dữ liệu thiếu biến
+        """
+        from models.weather import WeatherStore
+        
+        if not isinstance(store, WeatherStore):
+            store = WeatherStore(store)
+        
+        conditions = {'relative_humidity': relative_humidity, 'visibility': visibility}
+        available = [name for name in conditions if name in store]
+        if available:
+            sampled = store.sample(available, time, burst_height, y, x)
+            conditions.update({name: float(sampled[name]) for name in available})
+        
+        return cls(yield_kt, burst_height, conditions['relative_humidity'], conditions['visibility'])
+        
     def calculate_atmospheric_transmission(self, distance):
         """
         Tính hệ số truyền qua khí quyển theo khoảng cách.
@@ -69,6 +111,18 @@ class ThermalRadiationModel:
         energy_density = self.thermal_energy / (4 * np.pi * slant_range**2) * transmission * terrain_factor
         return energy_density
     
+    def field_function(self, terrain_factor=1.0):
+        """
+        Trả về hàm trường field(x, y) -> mật độ năng lượng nhiệt (J/m²) theo giao diện chung
+        của lưới thích nghi và lớp bản đồ (x, y tính bằng km, tâm vụ nổ tại gốc tọa độ).
+        """
+        def field(x, y):
+            distance = np.maximum(np.hypot(x, y) * 1000, 1.0)  # km -> m, tránh chia cho 0
+            return self.calculate_thermal_energy_density(distance, terrain_factor)
+        return field
+    
+    @cached_result()
+    @instrumented()
     def calculate_thermal_effects(self, distances, terrain_factor=1.0):
         """
         Tính toán các ảnh hưởng nhiệt ở nhiều khoảng cách khác nhau.
@@ -80,7 +134,8 @@ class ThermalRadiationModel:
         Trả về:
             Dictionary chứa khoảng cách, mật độ năng lượng, xác suất bỏng và nguy cơ cháy
         """
-        energy_densities = np.array([self.calculate_thermal_energy_density(d, terrain_factor) for d in distances])
+        energy_densities = self.calculate_thermal_energy_density(np.asarray(distances, dtype=float), terrain_factor)
+        count('thermal.points', np.size(energy_densities))
         
         # Ngưỡng bỏng da (J/m²)
         first_degree_burn = 2e5  # ngưỡng bỏng độ 1
@@ -125,34 +180,40 @@ class ThermalRadiationModel:
         Trả về:
             Bán kính ước tính (mét) nơi xác suất ảnh hưởng vượt quá ngưỡng
         """
-        # Ánh xạ loại ảnh hưởng đến ngưỡng năng lượng
-        effect_thresholds = {
-            'first_degree': 2e5,
-            'second_degree': 4e5,
-            'third_degree': 6e5,
-            'paper_ignition': 1e5,
-            'grass_ignition': 3e5,
-            'wood_ignition': 8e5
-        }
+        return float(self.get_damage_radii([effect_type], probability_threshold)[effect_type])
+    
+    @cached_result()
+    @instrumented()
+    def get_damage_radii(self, effect_types=None, probability_thresholds=0.5, max_radius=1e6):
+        """
+        Tính bán kính thiệt hại cho nhiều loại ảnh hưởng và nhiều ngưỡng xác suất
+        trong một lần giải.
         
-        if effect_type not in effect_thresholds:
-            raise ValueError(f"Loại ảnh hưởng không hợp lệ: {effect_type}")
-            
-        # Lấy ngưỡng năng lượng cho loại ảnh hưởng
-        threshold = effect_thresholds[effect_type]
-        
-        # Tính toán ngưỡng năng lượng điều chỉnh theo xác suất
-        # Biến đổi ngược hàm lỗi để tìm năng lượng cần thiết ở ngưỡng xác suất
-        adjusted_threshold = threshold * (1 + 0.2 * erf(2 * probability_threshold - 1))
-        
-        # Tìm bán kính bằng phương pháp ước lượng thô
-        # Giả định truyền khí quyển là 1.0 cho ước tính ban đầu
-        initial_radius = np.sqrt(self.thermal_energy / (4 * np.pi * adjusted_threshold))
-        
-        # Tinh chỉnh ước tính bằng phương pháp lặp đơn giản
-        radius = initial_radius
-        for _ in range(5):  # 5 vòng lặp thường đủ để hội tụ
-            transmission = self.calculate_atmospheric_transmission(radius)
-            radius = np.sqrt(self.thermal_energy * transmission / (4 * np.pi * adjusted_threshold))
+        Tham số:
+            effect_types: Danh sách loại ảnh hưởng (None = tất cả các loại)
+            probability_thresholds: Ngưỡng xác suất (số hoặc mảng, 0-1)
+            max_radius: Bán kính tìm kiếm tối đa (mét)
             
-        return radius
\ No newline at end of file
+        Trả về:
+            Dictionary {loại ảnh hưởng: bán kính (mét)}, mỗi giá trị có cùng hình dạng
+            với probability_thresholds
+        """
+        if effect_types is None:
+            effect_types = list(self.effect_thresholds)
+        
+        for effect_type in effect_types:
+            if effect_type not in self.effect_thresholds:
+                raise ValueError(f"Loại ảnh hưởng không hợp lệ: {effect_type}")
+        
+        # Đảo ngược chính xác hàm xác suất trong calculate_thermal_effects:
+        # p = 0.5 * (1 + erf((E - T) / (0.2 * T)))  =>  E = T * (1 + 0.2 * erfinv(2p - 1))
+        probabilities = np.clip(np.asarray(probability_thresholds, dtype=float), 1e-12, 1 - 1e-12)
+        thresholds = np.array([self.effect_thresholds[effect] for effect in effect_types])
+        thresholds = thresholds.reshape((-1,) + (1,) * probabilities.ndim)
+        energy_targets = thresholds * (1 + 0.2 * erfinv(2 * probabilities - 1))
+        
+        # Giải đồng thời mọi tổ hợp (loại ảnh hưởng, xác suất)
+        radii = solve_threshold_radii(self.calculate_thermal_energy_density, energy_targets,
+                                      lower=1.0, upper=max_radius)
+        
+        return {effect: radii[i] for i, effect in enumerate(effect_types)}
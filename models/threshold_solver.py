@@ -0,0 +1,109 @@
+import numpy as np
+
+from core.instrumentation import count
+
+
+def solve_threshold_radii(field, targets, lower, upper, rtol=1e-10, ftol=1e-12,
+                          max_iter=100, full_output=False):
+    """
+    Tìm khoảng cách mà tại đó một trường giảm đơn điệu theo khoảng cách
+    (mật độ năng lượng nhiệt, độ rọi, áp suất...) bằng đúng các ngưỡng cho trước.
+
+    Phương pháp: dò nghiệm có khoảng chặn (kiểu Brent) trên trục log-log, kết hợp
+    nội suy cát tuyến Illinois với chia đôi dự phòng. Các trường vật lý ở đây gần
+    với luật lũy thừa nên trên trục log-log gần như tuyến tính, thường chỉ cần vài
+    lần tính hàm để đạt sai số máy. Tất cả các ngưỡng được giải đồng thời, mỗi vòng
+    lặp chỉ gọi `field` một lần trên mảng các ngưỡng chưa hội tụ.
+
+    Tham số:
+        field: Hàm vector hóa f(distances) -> giá trị dương, giảm theo khoảng cách
+        targets: Mảng (hoặc số) các ngưỡng cần tìm khoảng cách
+        lower: Khoảng cách nhỏ nhất của khoảng tìm kiếm (> 0)
+        upper: Khoảng cách lớn nhất của khoảng tìm kiếm
+        rtol: Sai số tương đối cho phép của khoảng cách
+        ftol: Sai số cho phép của log(f) so với log(ngưỡng)
+        max_iter: Số vòng lặp tối đa
+        full_output: Nếu True, trả thêm dictionary thông tin hội tụ
+
+    Trả về:
+        Mảng khoảng cách cùng hình dạng với `targets`. Ngưỡng lớn hơn f(lower)
+        cho kết quả 0 (không có vùng ảnh hưởng), ngưỡng nhỏ hơn hoặc bằng f(upper)
+        cho kết quả `upper` (vùng ảnh hưởng vượt khoảng tìm kiếm).
+        Nếu full_output=True: (radii, info) với info gồm 'iterations',
+        'evaluations' và 'converged'.
+    """
+    if not 0 < lower < upper:
+        raise ValueError("Khoảng tìm kiếm phải thỏa mãn 0 < lower < upper")
+
+    targets = np.asarray(targets, dtype=float)
+    shape = targets.shape
+    flat_targets = targets.ravel()
+    radii = np.zeros(flat_targets.size)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_targets = np.log(flat_targets)
+
+        # Giá trị của trường tại hai đầu khoảng tìm kiếm (chung cho mọi ngưỡng)
+        log_lower, log_upper = np.log(lower), np.log(upper)
+        f_bounds = np.log(np.asarray(field(np.array([lower, upper])), dtype=float))
+        evaluations = 2
+
+        # Ngưỡng không dương luôn được thỏa mãn trên toàn khoảng tìm kiếm
+        saturated = (flat_targets <= 0) | (f_bounds[1] - log_targets >= 0)
+        outside = ~saturated & (f_bounds[0] - log_targets <= 0)
+        radii[saturated] = upper
+
+        active = np.flatnonzero(~saturated & ~outside)
+        a = np.full(active.size, log_lower)
+        b = np.full(active.size, log_upper)
+        ga = f_bounds[0] - log_targets[active]
+        gb = f_bounds[1] - log_targets[active]
+        side = np.zeros(active.size, dtype=np.int8)
+        converged = np.zeros(flat_targets.size, dtype=bool)
+        converged[saturated | outside] = True
+
+        iterations = 0
+        while active.size and iterations < max_iter:
+            iterations += 1
+
+            # Điểm cát tuyến, chia đôi khi điểm nội suy không hợp lệ
+            x = b - gb * (b - a) / (gb - ga)
+            mid = 0.5 * (a + b)
+            bisect = ~np.isfinite(x) | (x <= a) | (x >= b)
+            x = np.where(bisect, mid, x)
+
+            gx = np.log(np.asarray(field(np.exp(x)), dtype=float)) - log_targets[active]
+            evaluations += x.size
+
+            # Cập nhật khoảng chặn, áp dụng hiệu chỉnh Illinois khi một đầu bị giữ lại
+            move_a = gx > 0
+            ga_new = np.where(move_a, gx, np.where(side == -1, 0.5 * ga, ga))
+            gb_new = np.where(~move_a, gx, np.where(side == 1, 0.5 * gb, gb))
+            a = np.where(move_a, x, a)
+            b = np.where(~move_a, x, b)
+            ga, gb = ga_new, gb_new
+            side = np.where(move_a, 1, -1).astype(np.int8)
+
+            done = (np.abs(gx) <= ftol) | (b - a <= rtol)
+            if np.any(done):
+                finished = active[done]
+                radii[finished] = np.exp(x[done])
+                converged[finished] = True
+                keep = ~done
+                active, a, b, ga, gb, side = active[keep], a[keep], b[keep], ga[keep], gb[keep], side[keep]
+
+        # Các ngưỡng chưa hội tụ nhận trung điểm của khoảng chặn cuối cùng
+        if active.size:
+            radii[active] = np.exp(0.5 * (a + b))
+
+    count('solver.iterations', iterations)
+    count('solver.evaluations', evaluations)
+
+    radii = radii.reshape(shape)
+    if full_output:
+        return radii, {
+            'iterations': iterations,
+            'evaluations': evaluations,
+            'converged': converged.reshape(shape)
+        }
+    return radii
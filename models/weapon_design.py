@@ -1,6 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.optimize import minimize
+from core.instrumentation import count, instrumented
 
 class NuclearWeaponDesignModel:
     """
@@ -294,6 +294,7 @@ class NuclearWeaponDesignModel:
             
         return characteristics
     
+    @instrumented()
     def optimize_design(self, target_yield, constraints=None, weapon_type=None):
         """
         Tối ưu hóa thiết kế để đạt được năng lượng mục tiêu với các ràng buộc
@@ -347,6 +348,7 @@ class NuclearWeaponDesignModel:
         # Tối ưu hóa
         initial_guess = [0.7, 0.8, 0.6, 0.9]
         result = minimize(objective_function, initial_guess, bounds=bounds, method='L-BFGS-B')
+        count('solver.iterations', result.nit)
         
         # Chuyển đổi kết quả về design_params
         optimized_params = {}
@@ -388,6 +390,8 @@ class NuclearWeaponDesignModel:
         Trả về:
             matplotlib.figure: Đồ thị hiệu suất
         """
+        import matplotlib.pyplot as plt
+        
         if fixed_params is None:
             if self.weapon_type == "fission":
                 fixed_params = {
@@ -0,0 +1,379 @@
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+# Tên tệp mô tả và tệp trục tọa độ trong thư mục kho dữ liệu thời tiết
+MANIFEST_FILE = 'manifest.json'
+AXES_FILE = 'axes.npz'
+
+# Thứ tự các trục của mọi biến thời tiết
+AXIS_NAMES = ('time', 'height', 'y', 'x')
+
+
+def _axis_weights(axis, values):
+    """Chỉ số ô lưới bên trái và trọng số nội suy tuyến tính trên một trục (giữ giá trị biên)"""
+    if len(axis) == 1:
+        return 0, None
+
+    index = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+    fraction = np.clip((values - axis[index]) / (axis[index + 1] - axis[index]), 0.0, 1.0)
+    return index, fraction
+
+
+def grid_corners(axes, query):
+    """
+    Tính chỉ số và trọng số các góc ô lưới cho nội suy đa tuyến tính theo 4 trục.
+
+    Các trục chỉ có một điểm được bỏ qua (giá trị không đổi theo trục đó), nên trường
+    2 chiều tĩnh chỉ cần 4 góc thay vì 16. Kết quả dùng chung cho nhiều biến trên cùng lưới.
+
+    Tham số:
+        axes: Tuple 4 trục (time, height, y, x), mỗi trục tăng dần
+        query: Tuple 4 mảng tọa độ điểm cần tính (có thể broadcast với nhau)
+
+    Trả về:
+        Danh sách (tuple chỉ số theo 4 trục, trọng số)
+    """
+    indices, fractions = zip(*(_axis_weights(axis, np.asarray(values, dtype=float))
+                               for axis, values in zip(axes, query)))
+    active_axes = [k for k, fraction in enumerate(fractions) if fraction is not None]
+
+    corners = []
+    for corner in range(2 ** len(active_axes)):
+        weight = 1.0
+        corner_index = list(indices)
+        for bit, k in enumerate(active_axes):
+            if corner >> bit & 1:
+                corner_index[k] = indices[k] + 1
+                weight = weight * fractions[k]
+            else:
+                weight = weight * (1 - fractions[k])
+        corners.append((tuple(corner_index), weight))
+
+    return corners
+
+
+def interpolate(values, corners, shape):
+    """
+    Nội suy một biến từ các góc ô lưới đã tính bằng grid_corners.
+
+    Tham số:
+        values: Mảng 4 chiều (ndarray, memmap hoặc ChunkedArray)
+        corners: Kết quả của grid_corners
+        shape: Hình dạng kết quả (hình dạng broadcast của các điểm)
+    """
+    result = 0.0
+    for index, weight in corners:
+        result = result + weight * values[index]
+    return np.broadcast_to(result, shape)
+
+
+class ChunkedArray:
+    """
+    Mảng 4 chiều (time, height, y, x) được lưu thành các khối theo trục thời gian,
+    mỗi khối là một tệp .npy được ánh xạ bộ nhớ khi cần.
+
+    Chỉ các khối chứa các mốc thời gian được truy cập mới được mở, và hệ điều hành
+    chỉ nạp các trang dữ liệu thực sự được đọc.
+    """
+    def __init__(self, directory, shape, chunk_size, dtype=np.float32, mode='r'):
+        """
+        Tham số:
+            directory: Thư mục chứa các tệp khối
+            shape: Hình dạng đầy đủ (nt, nz, ny, nx)
+            chunk_size: Số mốc thời gian trong mỗi khối
+            dtype: Kiểu dữ liệu
+            mode: 'r' (chỉ đọc) hoặc 'r+' (cho phép ghi)
+        """
+        self.directory = directory
+        self.shape = tuple(int(n) for n in shape)
+        self.chunk_size = int(chunk_size)
+        self.dtype = np.dtype(dtype)
+        self.mode = mode
+        self._chunks = {}
+
+    def __reduce__(self):
+        # Khi truyền sang tiến trình khác chỉ gửi đường dẫn, các khối được mở lại ở đó
+        return (ChunkedArray, (self.directory, self.shape, self.chunk_size, self.dtype, 'r'))
+
+    @property
+    def num_chunks(self):
+        return -(-self.shape[0] // self.chunk_size)
+
+    def _chunk_path(self, chunk):
+        return os.path.join(self.directory, f'chunk_{chunk:05d}.npy')
+
+    def chunk(self, chunk):
+        """Mở (hoặc tạo khi ghi) khối thứ `chunk` dưới dạng memmap"""
+        array = self._chunks.get(chunk)
+        if array is None:
+            path = self._chunk_path(chunk)
+            if os.path.exists(path):
+                array = np.load(path, mmap_mode=self.mode)
+            elif self.mode == 'r':
+                raise ValueError(f"Thiếu khối dữ liệu: {path}")
+            else:
+                length = min(self.chunk_size, self.shape[0] - chunk * self.chunk_size)
+                array = open_memmap(path, mode='w+', dtype=self.dtype, shape=(length,) + self.shape[1:])
+                array[...] = np.nan
+            self._chunks[chunk] = array
+        return array
+
+    def __getitem__(self, index):
+        """
+        Đọc giá trị theo tuple chỉ số nguyên (số hoặc mảng) của 4 trục.
+        Các điểm được nhóm theo khối thời gian để mỗi khối chỉ được truy cập một lần.
+        """
+        time_index = np.asarray(index[0])
+        chunk_index = time_index // self.chunk_size
+        local_index = time_index - chunk_index * self.chunk_size
+
+        if chunk_index.ndim == 0:
+            return self.chunk(int(chunk_index))[(local_index,) + tuple(index[1:])]
+
+        shape = np.broadcast_shapes(*(np.shape(i) for i in index))
+        chunk_index, local_index = np.broadcast_to(chunk_index, shape), np.broadcast_to(local_index, shape)
+        rest = [np.broadcast_to(i, shape) for i in index[1:]]
+
+        result = np.empty(shape, dtype=self.dtype)
+        for chunk in np.unique(chunk_index):
+            mask = chunk_index == chunk
+            result[mask] = self.chunk(int(chunk))[(local_index[mask],) + tuple(i[mask] for i in rest)]
+        return result
+
+    def write(self, data, time_start=0):
+        """
+        Ghi một khối dữ liệu (k, nz, ny, nx) bắt đầu từ mốc thời gian time_start.
+
+        Tham số:
+            data: Mảng dữ liệu (có thể là memmap, được sao chép theo từng khối)
+            time_start: Chỉ số mốc thời gian đầu tiên
+        """
+        if self.mode == 'r':
+            raise ValueError("Kho dữ liệu được mở ở chế độ chỉ đọc")
+
+        time_stop = time_start + len(data)
+        for chunk in range(time_start // self.chunk_size, -(-time_stop // self.chunk_size)):
+            chunk_start = chunk * self.chunk_size
+            start = max(time_start, chunk_start)
+            stop = min(time_stop, chunk_start + self.chunk_size)
+            self.chunk(chunk)[start - chunk_start:stop - chunk_start] = data[start - time_start:stop - time_start]
+
+    def scatter(self, index, values):
+        """Ghi các giá trị rời rạc theo tuple mảng chỉ số của 4 trục"""
+        time_index = np.asarray(index[0])
+        chunk_index = time_index // self.chunk_size
+        for chunk in np.unique(chunk_index):
+            mask = chunk_index == chunk
+            local = (time_index[mask] - chunk * self.chunk_size,) + tuple(np.asarray(i)[mask] for i in index[1:])
+            self.chunk(int(chunk))[local] = np.asarray(values)[mask]
+
+    def flush(self):
+        for array in self._chunks.values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def to_numpy(self):
+        """Nạp toàn bộ mảng vào bộ nhớ (chỉ dùng cho dữ liệu nhỏ)"""
+        return np.concatenate([np.asarray(self.chunk(c)) for c in range(self.num_chunks)])
+
+
+class WeatherStore:
+    """
+    Kho dữ liệu khí tượng dạng lưới (gió, độ ẩm, tầm nhìn...) trên đĩa.
+
+    Mỗi biến là một ChunkedArray (time, height, y, x) chung một bộ trục tọa độ:
+    thời gian sau vụ nổ (giây), độ cao (mét) và tọa độ ngang (km) với tâm vụ nổ tại (0, 0).
+    Dữ liệu dự báo nhiều GB được ánh xạ bộ nhớ thay vì nạp vào RAM cho mỗi lần chạy.
+    """
+    def __init__(self, path, mode='r'):
+        """
+        Mở kho dữ liệu đã có.
+
+        Tham số:
+            path: Thư mục kho dữ liệu
+            mode: 'r' (chỉ đọc) hoặc 'r+' (cho phép ghi thêm biến)
+        """
+        self.path = path
+        self.mode = mode
+
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        with np.load(os.path.join(path, AXES_FILE)) as axes:
+            self.axes = tuple(axes[name] for name in AXIS_NAMES)
+
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.chunk_size = self.manifest['chunk_size']
+        self.dtype = np.dtype(self.manifest['dtype'])
+        self._arrays = {}
+
+    def __reduce__(self):
+        return (WeatherStore, (self.path, 'r'))
+
+    @classmethod
+    def create(cls, path, times, heights, y, x, chunk_size=8, dtype=np.float32):
+        """
+        Tạo kho dữ liệu rỗng.
+
+        Tham số:
+            path: Thư mục kho dữ liệu
+            times: Trục thời gian (giây)
+            heights: Trục độ cao (mét)
+            y, x: Trục tọa độ ngang (km)
+            chunk_size: Số mốc thời gian trong mỗi khối
+            dtype: Kiểu dữ liệu lưu trữ
+        """
+        axes = [np.atleast_1d(np.asarray(axis, dtype=float)) for axis in (times, heights, y, x)]
+        for name, axis in zip(AXIS_NAMES, axes):
+            if np.any(np.diff(axis) <= 0):
+                raise ValueError(f"Trục {name} phải tăng dần")
+
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, AXES_FILE), **dict(zip(AXIS_NAMES, axes)))
+        with open(os.path.join(path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'chunk_size': int(chunk_size), 'dtype': np.dtype(dtype).str, 'variables': {}}, f, indent=2)
+
+        return cls(path, mode='r+')
+
+    @property
+    def variables(self):
+        return list(self.manifest['variables'])
+
+    def __contains__(self, name):
+        return name in self.manifest['variables']
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise ValueError(f"Kho dữ liệu không có biến: {name}")
+        array = self._arrays.get(name)
+        if array is None:
+            array = ChunkedArray(os.path.join(self.path, name), self.shape, self.chunk_size, self.dtype, self.mode)
+            self._arrays[name] = array
+        return array
+
+    def add_variable(self, name, units=''):
+        """Khai báo một biến mới và trả về ChunkedArray để ghi dữ liệu"""
+        if self.mode == 'r':
+            raise ValueError("Kho dữ liệu được mở ở chế độ chỉ đọc")
+
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+        self.manifest['variables'][name] = {'units': units}
+        with open(os.path.join(self.path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        return self[name]
+
+    def sample(self, names, time, height, y, x):
+        """
+        Nội suy tuyến tính theo không gian và thời gian, vector hóa theo mảng điểm.
+
+        Tham số:
+            names: Tên một biến hoặc danh sách tên biến
+            time: Thời gian (giây)
+            height: Độ cao (mét)
+            y, x: Tọa độ ngang (km)
+
+        Trả về:
+            Mảng giá trị (một biến) hoặc dictionary {tên biến: mảng}
+        """
+        shape = np.broadcast_shapes(np.shape(time), np.shape(height), np.shape(y), np.shape(x))
+        corners = grid_corners(self.axes, (time, height, y, x))
+
+        if isinstance(names, str):
+            return interpolate(self[names], corners, shape)
+        return {name: interpolate(self[name], corners, shape) for name in names}
+
+    def flush(self):
+        for array in self._arrays.values():
+            array.flush()
+
+    @classmethod
+    def from_arrays(cls, path, times, heights, y, x, variables, units=None, chunk_size=8, dtype=np.float32):
+        """
+        Nhập dữ liệu từ các mảng (time, height, y, x), ví dụ mảng kiểu NetCDF hoặc memmap .npy.
+        Dữ liệu được sao chép theo từng khối thời gian nên mảng nguồn không cần nằm trong RAM.
+
+        Tham số:
+            variables: Dictionary {tên biến: mảng 4 chiều}
+            units: Dictionary {tên biến: đơn vị}
+        """
+        store = cls.create(path, times, heights, y, x, chunk_size, dtype)
+        units = units or {}
+        for name, data in variables.items():
+            if np.shape(data) != store.shape:
+                raise ValueError(f"Biến {name} phải có hình dạng {store.shape}")
+            array = store.add_variable(name, units.get(name, ''))
+            for start in range(0, store.shape[0], store.chunk_size):
+                array.write(np.asarray(data[start:start + store.chunk_size], dtype=store.dtype), start)
+        store.flush()
+        return cls(path)
+
+    @classmethod
+    def from_npz(cls, npz_path, path, chunk_size=8, dtype=np.float32):
+        """
+        Nhập từ tệp .npz chứa các trục (time, height, y, x) và các biến 4 chiều.
+        Thiếu trục time hoặc height nghĩa là dữ liệu không đổi theo trục đó.
+        """
+        with np.load(npz_path) as data:
+            axes = [data[name] if name in data.files else np.zeros(1) for name in AXIS_NAMES]
+            shape = tuple(len(axis) for axis in axes)
+            variables = {name: data[name].reshape(shape) for name in data.files if name not in AXIS_NAMES}
+        return cls.from_arrays(path, *axes, variables, chunk_size=chunk_size, dtype=dtype)
+
+    @classmethod
+    def from_npy(cls, directory, path, chunk_size=8, dtype=np.float32):
+        """
+        Nhập từ thư mục chứa axes.npz và một tệp <biến>.npy cho mỗi biến.
+        Các tệp .npy được ánh xạ bộ nhớ và sao chép theo từng khối.
+        """
+        with np.load(os.path.join(directory, AXES_FILE)) as data:
+            axes = [data[name] if name in data.files else np.zeros(1) for name in AXIS_NAMES]
+        variables = {
+            os.path.splitext(name)[0]: np.load(os.path.join(directory, name), mmap_mode='r')
+            for name in sorted(os.listdir(directory)) if name.endswith('.npy')
+        }
+        return cls.from_arrays(path, *axes, variables, chunk_size=chunk_size, dtype=dtype)
+
+    @classmethod
+    def from_parquet(cls, parquet_path, path, variables=None, chunk_size=8, dtype=np.float32):
+        """
+        Nhập từ bảng Parquet dạng dài: mỗi dòng là một điểm lưới với các cột tọa độ
+        (time, height, y, x; thiếu cột nghĩa là trục một điểm) và các cột biến.
+        Bảng được đọc theo từng lô bằng pyarrow nên không cần nạp toàn bộ vào RAM.
+
+        Tham số:
+            variables: Danh sách cột biến cần nhập (None = mọi cột không phải tọa độ)
+        """
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(parquet_path)
+        columns = parquet.schema_arrow.names
+        coordinates = [name for name in AXIS_NAMES if name in columns]
+        if variables is None:
+            variables = [name for name in columns if name not in AXIS_NAMES]
+
+        # Lượt 1: xác định các trục từ giá trị duy nhất của cột tọa độ
+        unique = {name: set() for name in coordinates}
+        for batch in parquet.iter_batches(columns=coordinates):
+            for name in coordinates:
+                unique[name].update(np.unique(batch.column(name).to_numpy()).tolist())
+        axes = [np.array(sorted(unique[name]), dtype=float) if name in unique else np.zeros(1)
+                for name in AXIS_NAMES]
+
+        store = cls.create(path, *axes, chunk_size=chunk_size, dtype=dtype)
+        arrays = {name: store.add_variable(name) for name in variables}
+
+        # Lượt 2: ghi từng lô vào đúng ô lưới
+        for batch in parquet.iter_batches(columns=coordinates + list(variables)):
+            index = tuple(
+                np.searchsorted(axis, batch.column(name).to_numpy()) if name in coordinates
+                else np.zeros(batch.num_rows, dtype=np.intp)
+                for name, axis in zip(AXIS_NAMES, axes)
+            )
+            for name in variables:
+                arrays[name].scatter(index, batch.column(name).to_numpy(zero_copy_only=False))
+
+        store.flush()
+        return cls(path)
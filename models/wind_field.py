@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+
+from models.weather import ChunkedArray, WeatherStore, grid_corners, interpolate
+
+
+class WindField:
+    """
+    Trường gió 3 chiều thay đổi theo thời gian trên lưới đều theo các trục (t, z, y, x).
+
+    Các thành phần gió có thể là mảng ánh xạ bộ nhớ (np.memmap) hoặc biến của kho dữ liệu
+    thời tiết (ChunkedArray) nên trường gió lớn không cần nạp hết vào RAM: phép nội suy
+    chỉ đọc các ô lưới xung quanh điểm cần tính.
+    """
+    def __init__(self, times, heights, y, x, u, v, w=None, source=None):
+        """
+        Khởi tạo trường gió.
+
+        Tham số:
+            times: Trục thời gian sau vụ nổ (giây), tăng dần
+            heights: Trục độ cao (mét), tăng dần
+            y, x: Trục tọa độ ngang (km), tăng dần, tâm vụ nổ tại (0, 0)
+            u, v: Thành phần gió hướng Đông và hướng Bắc (m/s), mảng (nt, nz, ny, nx)
+                  (ndarray, memmap hoặc ChunkedArray)
+            w: Thành phần gió thẳng đứng (m/s), None nếu bằng 0
+            source: Thư mục dữ liệu gốc (dùng để mở lại memmap khi truyền sang tiến trình khác)
+        """
+        self.axes = tuple(np.atleast_1d(np.asarray(axis, dtype=float)) for axis in (times, heights, y, x))
+        shape = tuple(len(axis) for axis in self.axes)
+
+        for axis in self.axes:
+            if np.any(np.diff(axis) <= 0):
+                raise ValueError("Các trục của trường gió phải tăng dần")
+
+        for name, component in (('u', u), ('v', v), ('w', w)):
+            if component is not None and np.shape(component) != shape:
+                raise ValueError(f"Thành phần gió {name} phải có hình dạng {shape}")
+
+        self.u = u
+        self.v = v
+        self.w = w
+        self.source = source
+
+    @classmethod
+    def uniform(cls, wind_speed=10, wind_direction=0):
+        """
+        Tạo trường gió đồng nhất tương đương với tham số gió vô hướng của FalloutModel.
+
+        Tham số:
+            wind_speed: Tốc độ gió (km/h)
+            wind_direction: Hướng gió thổi tới (rad), 0 là hướng Đông, π/2 là hướng Bắc
+        """
+        speed = wind_speed / 3.6  # km/h -> m/s
+        u = np.full((1, 1, 1, 1), speed * np.cos(wind_direction))
+        v = np.full((1, 1, 1, 1), speed * np.sin(wind_direction))
+        return cls([0.0], [0.0], [0.0], [0.0], u, v)
+
+    @classmethod
+    def from_npz(cls, path):
+        """
+        Đọc trường gió từ tệp .npz với các khóa times, heights, y, x, u, v (và tùy chọn w).
+        Tệp .npz được nạp toàn bộ vào bộ nhớ; dùng from_directory cho dữ liệu lớn.
+        """
+        with np.load(path) as data:
+            w = data['w'] if 'w' in data.files else None
+            return cls(data['times'], data['heights'], data['y'], data['x'], data['u'], data['v'], w)
+
+    @classmethod
+    def from_directory(cls, path):
+        """
+        Đọc trường gió từ thư mục chứa axes.npz (times, heights, y, x) và các tệp
+        u.npy, v.npy, w.npy (tùy chọn). Các thành phần gió được ánh xạ bộ nhớ ở chế độ chỉ đọc.
+        """
+        with np.load(os.path.join(path, 'axes.npz')) as axes:
+            times, heights, y, x = axes['times'], axes['heights'], axes['y'], axes['x']
+
+        def component(name):
+            file_path = os.path.join(path, f'{name}.npy')
+            return np.load(file_path, mmap_mode='r') if os.path.exists(file_path) else None
+
+        return cls(times, heights, y, x, component('u'), component('v'), component('w'), source=path)
+
+    @classmethod
+    def from_weather(cls, store):
+        """
+        Tạo trường gió từ kho dữ liệu thời tiết (các biến u, v và tùy chọn w).
+
+        Tham số:
+            store: WeatherStore hoặc đường dẫn thư mục kho dữ liệu
+        """
+        if not isinstance(store, WeatherStore):
+            store = WeatherStore(store)
+        w = store['w'] if 'w' in store else None
+        return cls(*store.axes, store['u'], store['v'], w)
+
+    def save(self, path):
+        """Ghi trường gió ra thư mục theo định dạng của from_directory"""
+        os.makedirs(path, exist_ok=True)
+        times, heights, y, x = self.axes
+        np.savez(os.path.join(path, 'axes.npz'), times=times, heights=heights, y=y, x=x)
+        for name in ('u', 'v', 'w'):
+            component = getattr(self, name)
+            if component is not None:
+                data = component.to_numpy() if isinstance(component, ChunkedArray) else np.asarray(component)
+                np.save(os.path.join(path, f'{name}.npy'), data)
+
+    def __reduce__(self):
+        # Trường gió ánh xạ bộ nhớ được mở lại từ thư mục thay vì sao chép dữ liệu
+        if self.source is not None:
+            return (WindField.from_directory, (self.source,))
+        return (WindField, (*self.axes, self.u, self.v, self.w))
+
+    def sample(self, time, height, y, x):
+        """
+        Nội suy vận tốc gió tại các điểm (vector hóa theo mảng điểm).
+
+        Tham số:
+            time: Thời gian (giây)
+            height: Độ cao (mét)
+            y, x: Tọa độ ngang (km)
+
+        Trả về:
+            Tuple (u, v, w) vận tốc gió (m/s), cùng hình dạng với các điểm
+        """
+        shape = np.broadcast_shapes(np.shape(time), np.shape(height), np.shape(y), np.shape(x))
+        corners = grid_corners(self.axes, (time, height, y, x))
+
+        u = interpolate(self.u, corners, shape)
+        v = interpolate(self.v, corners, shape)
+        w = np.zeros(shape) if self.w is None else interpolate(self.w, corners, shape)
+        return u, v, w
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from tests.benchmarks.workloads import select
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_MEMORY_LIMIT = 2 * 2**30
+
+# Chênh lệch tuyệt đối tối thiểu để coi là suy giảm (khối lượng dưới mili giây dao động mạnh)
+MIN_DELTA = {'median': 0.002, 'peak_memory': 2**20}
+
+
+@contextmanager
+def _cache_disabled():
+    """Tắt bộ nhớ đệm kết quả khi đo, nếu không các lần chạy sau chỉ là tra cứu bộ nhớ đệm"""
+    previous = os.environ.get('NUCLEAR_SIM_CACHE')
+    os.environ['NUCLEAR_SIM_CACHE'] = '0'
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ['NUCLEAR_SIM_CACHE']
+        else:
+            os.environ['NUCLEAR_SIM_CACHE'] = previous
+
+
+def measure(workload, repeat=3, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """
+    Đo một khối lượng công việc.
+
+    Hàm chạy được gọi một lần để khởi động (biên dịch numba, nhập module), sau đó repeat lần
+    có đo thời gian, và một lần cuối dưới tracemalloc để lấy bộ nhớ cấp phát cao nhất (tách
+    riêng để việc theo dõi bộ nhớ không làm sai lệch thời gian).
+
+    Trả về:
+        Dictionary {'name', 'group', 'size', 'units', 'timings', 'min', 'median', 'throughput',
+        'peak_memory'} hoặc {'name', ..., 'skipped': lý do}
+    """
+    entry = {'name': workload.name, 'group': workload.group, 'size': workload.size, 'units': workload.units}
+    if workload.memory_estimate is not None and workload.memory_estimate(workload.size) > memory_limit:
+        entry['skipped'] = (f"cần khoảng {workload.memory_estimate(workload.size) / 2**30:.1f} GB, "
+                            f"vượt giới hạn {memory_limit / 2**30:.1f} GB")
+        return entry
+
+    with _cache_disabled():
+        return _measure(workload, entry, repeat)
+
+
+def _measure(workload, entry, repeat):
+    run = workload.setup(workload.size)
+    run()
+
+    timings, processed = [], workload.size
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = run()
+        timings.append(time.perf_counter() - start)
+        if isinstance(count, int):
+            processed = count
+
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    entry.update({
+        'timings': timings,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'throughput': processed / min(timings) if min(timings) > 0 else float('inf'),
+        'peak_memory': peak_memory
+    })
+    return entry
+
+
+def run_benchmarks(workloads, repeat=3, memory_limit=DEFAULT_MEMORY_LIMIT, log=None):
+    """Đo danh sách khối lượng công việc; trả về báo cáo kèm thông tin môi trường"""
+    import numpy as np
+
+    results = []
+    for workload in workloads:
+        entry = measure(workload, repeat, memory_limit)
+        results.append(entry)
+        if log is not None:
+            log(format_entry(entry))
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(report, baseline, tolerance=0.25):
+    """
+    So sánh báo cáo với báo cáo gốc.
+
+    Một khối lượng bị coi là suy giảm khi thời gian trung vị hoặc bộ nhớ cao nhất vượt giá trị
+    gốc quá tolerance (tỷ lệ, 0.25 = 25%) và quá chênh lệch tối thiểu MIN_DELTA. Khối lượng không
+    có trong báo cáo gốc được bỏ qua.
+
+    Trả về:
+        Danh sách dictionary {'name', 'metric', 'baseline', 'current', 'ratio'}
+    """
+    reference = {entry['name']: entry for entry in baseline['results'] if 'skipped' not in entry}
+    regressions = []
+    for entry in report['results']:
+        base = reference.get(entry['name'])
+        if base is None or 'skipped' in entry:
+            continue
+        for metric in ('median', 'peak_memory'):
+            if (base[metric] > 0 and entry[metric] > base[metric] * (1 + tolerance)
+                    and entry[metric] - base[metric] > MIN_DELTA[metric]):
+                regressions.append({'name': entry['name'], 'metric': metric, 'baseline': base[metric],
+                                    'current': entry[metric], 'ratio': entry[metric] / base[metric]})
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_report(report, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+
+def format_entry(entry):
+    if 'skipped' in entry:
+        return f"{entry['name']:32s} bỏ qua: {entry['skipped']}"
+    return (f"{entry['name']:32s} {entry['median'] * 1000:10.2f} ms  "
+            f"{entry['throughput']:12.4g} {entry['units']}/s  {entry['peak_memory'] / 2**20:8.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks",
+                                     description="Đo hiệu năng các đường nóng của mô hình và trang giao diện")
+    parser.add_argument("--tier", choices=("quick", "full"), default="quick", help="Mức khối lượng công việc")
+    parser.add_argument("-k", "--filter", help="Chỉ đo các khối lượng có tên chứa chuỗi này")
+    parser.add_argument("--repeat", type=int, default=3, help="Số lần đo mỗi khối lượng")
+    parser.add_argument("--output", help="Tệp JSON ghi kết quả")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Tệp JSON kết quả gốc để so sánh")
+    parser.add_argument("--save-baseline", action="store_true", help="Ghi kết quả làm kết quả gốc mới")
+    parser.add_argument("--no-compare", action="store_true", help="Chỉ đo, không so sánh với kết quả gốc")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Mức suy giảm cho phép (tỷ lệ)")
+    parser.add_argument("--memory-limit", type=float, default=DEFAULT_MEMORY_LIMIT / 2**30,
+                        help="Bỏ qua khối lượng ước tính cần nhiều bộ nhớ hơn (GB)")
+    args = parser.parse_args(argv)
+
+    workloads = select(args.tier, args.filter)
+    if not workloads:
+        print("Không có khối lượng công việc nào khớp", file=sys.stderr)
+        return 2
+
+    report = run_benchmarks(workloads, args.repeat, args.memory_limit * 2**30, log=print)
+    if args.output:
+        save_report(report, args.output)
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Đã ghi kết quả gốc: {args.baseline}")
+        return 0
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"Không tìm thấy kết quả gốc {args.baseline}: chạy với --save-baseline để tạo "
+              f"hoặc --no-compare để chỉ đo", file=sys.stderr)
+        return 2
+    regressions = compare(report, load_report(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"SUY GIẢM {regression['name']} {regression['metric']}: "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g} (x{regression['ratio']:.2f})")
+    return 1 if regressions else 0
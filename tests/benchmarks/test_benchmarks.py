@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from tests.benchmarks.harness import DEFAULT_BASELINE, compare, load_report, measure
+from tests.benchmarks.workloads import select
+
+# So sánh với kết quả gốc chỉ khi được yêu cầu (BENCHMARK_COMPARE=1): kết quả gốc được đo trên
+# một máy cụ thể, chạy pytest mặc định chỉ kiểm tra các khối lượng chạy được
+COMPARE = os.environ.get('BENCHMARK_COMPARE', '0') == '1'
+
+# Mức suy giảm cho phép khi chạy cùng pytest (máy CI dao động nhiều hơn khi đo riêng)
+TOLERANCE = float(os.environ.get('BENCHMARK_TOLERANCE', 0.5))
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    if not COMPARE:
+        return None
+    if not os.path.exists(DEFAULT_BASELINE):
+        pytest.fail(f"Không tìm thấy kết quả gốc {DEFAULT_BASELINE}; "
+                    f"tạo bằng: python -m tests.benchmarks --save-baseline")
+    return load_report(DEFAULT_BASELINE)
+
+
+@pytest.mark.parametrize('workload', select('quick'), ids=lambda workload: workload.name)
+def test_benchmark(workload, baseline):
+    entry = measure(workload, repeat=1)
+    if 'skipped' in entry:
+        pytest.skip(entry['skipped'])
+
+    assert entry['throughput'] > 0
+    if baseline is None:
+        return
+    assert any(base['name'] == workload.name for base in baseline['results']), \
+        f"{workload.name} chưa có trong kết quả gốc; chạy lại python -m tests.benchmarks --save-baseline"
+    regressions = compare({'results': [entry]}, baseline, TOLERANCE)
+    assert not regressions, regressions
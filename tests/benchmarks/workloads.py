@@ -0,0 +1,176 @@
+import os
+
+import numpy as np
+
+# Thư mục gốc của dự án (để trang giao diện được nhập trong AppTest)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Các trang được đo thời gian hiển thị
+PAGES = ["chain_reaction", "neutron_transport", "monte_carlo", "blast_wave", "thermal_radiation",
+         "emp_effects", "fallout", "weapon_design", "flash_effects"]
+
+PAGE_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from ui.translator import translator as locale
+from ui.translations import translations
+locale.add_translations(translations)
+from ui.pages.{page} import render_page
+render_page()
+"""
+
+
+class Workload:
+    """
+    Một khối lượng công việc chuẩn để đo hiệu năng.
+
+    setup(size) chuẩn bị dữ liệu (không tính thời gian) và trả về hàm chạy không tham số; hàm
+    chạy trả về số đơn vị đã xử lý (None = size) để tính thông lượng theo đơn vị mỗi giây.
+    """
+    def __init__(self, group, size, units, setup, tier='quick', memory_estimate=None):
+        """
+        Tham số:
+            group: Nhóm khối lượng (ví dụ 'monte_carlo')
+            size: Kích thước bài toán (số lịch sử, số ô lưới...)
+            units: Tên đơn vị của thông lượng (ví dụ 'histories')
+            setup: Hàm nhận size và trả về hàm chạy
+            tier: 'quick' (chạy cùng pytest) hoặc 'full' (chỉ khi chạy toàn bộ bộ đo)
+            memory_estimate: Hàm nhận size, trả về bộ nhớ ước tính (byte) để bỏ qua bài toán quá lớn
+        """
+        self.group = group
+        self.size = size
+        self.units = units
+        self.setup = setup
+        self.tier = tier
+        self.memory_estimate = memory_estimate
+
+    @property
+    def name(self):
+        return f"{self.group}[{self.size}]"
+
+
+def _monte_carlo(size):
+    from models.monte_carlo import MonteCarloNeutronTransport
+
+    model = MonteCarloNeutronTransport()
+
+    def run():
+        # Không có chuỗi phân hạch: đúng size lịch sử neutron mỗi lần chạy
+        model.simulate_neutrons(num_neutrons=size, show_progress=False, fission_chain=False)
+    return run
+
+
+def _diffusion(size):
+    from models.neutron_transport import NeutronTransportModel
+
+    model = NeutronTransportModel(spatial_points=size)
+
+    def run():
+        model.solve_diffusion_equation()
+    return run
+
+
+def _fallout(size):
+    from models.fallout import FalloutModel
+
+    model = FalloutModel(yield_kt=100)
+
+    def run():
+        model.simulate_fallout_pattern(max_distance=200, resolution=size)
+        return size * size
+    return run
+
+
+def _blast(size):
+    from models.blast_wave import SedovTaylorModel
+
+    model = SedovTaylorModel(energy_kt=100)
+
+    def run():
+        result = model.simulate_blast_wave(num_points=size)
+        return result['pressures'].size
+    return run
+
+
+def _curve(model_factory, method):
+    def setup(size):
+        model = model_factory()
+        distances = np.linspace(0.1, 50, size)
+
+        def run():
+            getattr(model, method)(distances)
+        return run
+    return setup
+
+
+def _thermal_model():
+    from models.thermal_radiation import ThermalRadiationModel
+    return ThermalRadiationModel(yield_kt=100)
+
+
+def _flash_model():
+    from models.flash_effects import FlashEffectsModel
+    return FlashEffectsModel(yield_kt=100)
+
+
+def _emp_model():
+    from models.emp_effects import EMPModel
+    return EMPModel(yield_kt=100)
+
+
+def _emp_map(size):
+    model = _emp_model()
+
+    def run():
+        model.calculate_emp_ground_map(max_distance=1000, resolution=size)
+        return size * size
+    return run
+
+
+def _page(page):
+    def setup(size):
+        from streamlit.testing.v1 import AppTest
+
+        script = PAGE_SCRIPT.format(root=PROJECT_ROOT, page=page)
+
+        def run():
+            app = AppTest.from_string(script, default_timeout=300)
+            app.run()
+            if app.exception:
+                raise RuntimeError(f"Trang {page} lỗi: {app.exception[0].value}")
+            return 1
+        return run
+    return setup
+
+
+WORKLOADS = [
+    Workload('monte_carlo', 1000, 'histories', _monte_carlo),
+    Workload('monte_carlo', 10000, 'histories', _monte_carlo),
+    Workload('monte_carlo', 100000, 'histories', _monte_carlo, tier='full'),
+    # Bộ giải khuếch tán hiện dựng ma trận dày n x n: lưới lớn bị bỏ qua theo ước tính bộ nhớ
+    Workload('diffusion', 1000, 'cells', _diffusion, memory_estimate=lambda n: 8 * n * n),
+    Workload('diffusion', 10000, 'cells', _diffusion, tier='full', memory_estimate=lambda n: 8 * n * n),
+    Workload('diffusion', 100000, 'cells', _diffusion, tier='full', memory_estimate=lambda n: 8 * n * n),
+    Workload('diffusion', 1000000, 'cells', _diffusion, tier='full', memory_estimate=lambda n: 8 * n * n),
+    Workload('fallout_grid', 100, 'cells', _fallout),
+    Workload('fallout_grid', 500, 'cells', _fallout),
+    Workload('fallout_grid', 2000, 'cells', _fallout, tier='full'),
+    Workload('blast_field', 200, 'cells', _blast),
+    Workload('blast_field', 2000, 'cells', _blast, tier='full'),
+    Workload('thermal_curve', 10000, 'points', _curve(_thermal_model, 'calculate_thermal_effects')),
+    Workload('thermal_curve', 1000000, 'points', _curve(_thermal_model, 'calculate_thermal_effects'), tier='full'),
+    Workload('flash_curve', 10000, 'points', _curve(_flash_model, 'calculate_eye_effects')),
+    Workload('flash_curve', 1000000, 'points', _curve(_flash_model, 'calculate_eye_effects'), tier='full'),
+    Workload('emp_curve', 10000, 'points', _curve(_emp_model, 'calculate_emp_effects')),
+    Workload('emp_curve', 1000000, 'points', _curve(_emp_model, 'calculate_emp_effects'), tier='full'),
+    Workload('emp_map', 200, 'cells', _emp_map),
+    Workload('emp_map', 1000, 'cells', _emp_map, tier='full'),
+    Workload('page_render.chain_reaction', 1, 'renders', _page('chain_reaction')),
+] + [Workload(f'page_render.{page}', 1, 'renders', _page(page), tier='full')
+     for page in PAGES if page != 'chain_reaction']
+
+
+def select(tier='quick', pattern=None):
+    """Các khối lượng của một mức ('quick' hoặc 'full' = tất cả), lọc theo chuỗi con trong tên"""
+    return [workload for workload in WORKLOADS
+            if (tier == 'full' or workload.tier == 'quick') and (pattern is None or pattern in workload.name)]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from models.adaptive_grid import AdaptiveGrid
+
+BOUNDS = (-20.0, -20.0, 20.0, 20.0)
+
+
+def _peak(x, y):
+    """Trường giảm theo hàm mũ quanh gốc tọa độ"""
+    return 1e3 * np.exp(-np.hypot(x, y) / 2.0)
+
+
+def test_linear_field_needs_no_refinement():
+    grid = AdaptiveGrid(lambda x, y: 3 * x - 2 * y + 100, BOUNDS, base_level=3, log_scale=False)
+
+    assert grid.depth == 3 and grid.num_leaves == 64
+    assert grid.evaluations == 9 * 9 + 64
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-20, 20, 100), rng.uniform(-20, 20, 100)
+    np.testing.assert_allclose(grid.sample(x, y), 3 * x - 2 * y + 100, rtol=1e-12)
+
+
+def test_leaves_tile_the_domain():
+    grid = AdaptiveGrid(_peak, BOUNDS, base_level=3, max_level=8, tolerance=0.02)
+
+    bounds = grid.leaf_bounds()
+    area = (bounds[:, 2] - bounds[:, 0]) * (bounds[:, 3] - bounds[:, 1])
+    np.testing.assert_allclose(area.sum(), 40.0 * 40.0)
+    assert grid.depth > 3
+    # Ô nhỏ nhất tập trung quanh đỉnh của trường
+    deepest = bounds[grid.leaf_level == grid.depth]
+    assert np.all(np.abs(deepest).max(axis=1) < 10)
+    # Ít lần gọi hàm trường hơn lưới đều ở mức sâu nhất
+    assert grid.evaluations < (2 ** grid.depth + 1) ** 2 / 4
+
+
+def test_sample_accuracy_in_log_space():
+    grid = AdaptiveGrid(_peak, BOUNDS, base_level=3, max_level=9, tolerance=0.01)
+
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(-20, 20, 2000), rng.uniform(-20, 20, 2000)
+    error = np.abs(np.log10(grid.sample(x, y)) - np.log10(_peak(x, y)))
+    assert np.percentile(error, 99) < 0.05
+
+    raster = grid.to_raster(resolution=33)
+    np.testing.assert_allclose(raster['values'], grid.sample(raster['x'][None, :], raster['y'][:, None]), rtol=1e-6)
+
+
+def test_threshold_contours_are_resolved_at_finest_level():
+    threshold = _peak(8.0, 0.0)
+    grid = AdaptiveGrid(_peak, BOUNDS, base_level=3, max_level=8, tolerance=1.0, thresholds=[threshold])
+
+    lines = grid.to_contours()[float(threshold)]
+    assert len(lines) == 1
+    np.testing.assert_array_equal(lines[0][0], lines[0][-1])
+    np.testing.assert_allclose(np.hypot(*lines[0].T), 8.0, rtol=0.01)
+
+    # Các ô mà đường đồng mức đi qua đều ở mức sâu nhất
+    bounds = grid.leaf_bounds()
+    distance = np.hypot((bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2)
+    size = bounds[:, 2] - bounds[:, 0]
+    crossing = np.abs(distance - 8.0) < 0.5 * size
+    assert np.all(grid.leaf_level[crossing] == grid.max_level)
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        AdaptiveGrid(_peak, BOUNDS, base_level=5, max_level=4)
+    with pytest.raises(ValueError):
+        AdaptiveGrid(_peak, BOUNDS, max_level=21)
+    with pytest.raises(ValueError):
+        AdaptiveGrid(_peak, (0, 0, -1, 1))
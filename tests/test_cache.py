@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import core.cache
+from core.cache import ResultCache, cached_result, canonical_key
+
+
+def _make_model_class(cache):
+    """Lớp mô hình nhỏ đếm số lần tính thật sự (thuộc tính _calls không thuộc trạng thái mô hình)"""
+    class Model:
+        def __init__(self, scale=1.0):
+            self.scale = scale
+            self._calls = 0
+
+        @cached_result(ignore=('show_progress',), cache=cache, require=('seed',))
+        def compute(self, values, show_progress=False, seed=0):
+            self._calls += 1
+            return {'values': np.asarray(values, dtype=float) * self.scale, 'labels': ['a', 'b']}
+
+    return Model
+
+
+def test_canonical_key_is_stable_across_equivalent_arguments():
+    assert canonical_key({'a': 1, 'b': 2.0}) == canonical_key({'b': 2, 'a': 1.0})
+    assert canonical_key(np.int64(3), np.float32(0.5)) == canonical_key(3, 0.5)
+    assert canonical_key(np.arange(3)) != canonical_key(np.arange(3).astype(float))
+    assert canonical_key(np.arange(3)) != canonical_key(np.arange(1, 4))
+    with pytest.raises(ValueError):
+        canonical_key(object())
+
+
+def test_cached_result_hits_and_invalidates_on_model_state():
+    cache = ResultCache()
+    model = _make_model_class(cache)()
+
+    model.compute([1, 2])
+    model.compute([1.0, 2.0], show_progress=True)
+    assert model._calls == 1
+    assert cache.stats()['hits'] == 1
+
+    model.scale = 2.0
+    result = model.compute([1, 2])
+    assert model._calls == 2
+    np.testing.assert_array_equal(result['values'], [2.0, 4.0])
+
+
+def test_cached_result_skips_required_none_arguments():
+    cache = ResultCache()
+    model = _make_model_class(cache)()
+
+    model.compute([1, 2], seed=None)
+    model.compute([1, 2], seed=None)
+    assert model._calls == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_cached_result_key_includes_code_version(monkeypatch):
+    cache = ResultCache()
+    _make_model_class(cache)().compute([1, 2])
+
+    # Cùng lớp, cùng tham số nhưng phiên bản khác: không được dùng lại kết quả cũ
+    monkeypatch.setattr(core.cache, '__version__', 'khác')
+    model = _make_model_class(cache)()
+    model.compute([1, 2])
+    assert model._calls == 1
+    assert cache.stats()['entries'] == 2
+
+
+def test_cached_result_returns_isolated_copies():
+    cache = ResultCache()
+    model = _make_model_class(cache)()
+
+    first = model.compute([1, 2])
+    first['values'] = None
+    first['labels'].append('c')
+    with pytest.raises(ValueError):
+        model.compute([1, 2])['values'][0] = 5.0
+
+    second = model.compute([1, 2])
+    np.testing.assert_array_equal(second['values'], [1.0, 2.0])
+    assert second['labels'] == ['a', 'b']
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_result_cache_expires_entries():
+    cache = ResultCache(ttl=0.05)
+    cache.put('a', 1)
+    time.sleep(0.1)
+
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_result_cache_disk_tier_shared_between_instances(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).put('a', {'values': np.arange(3)})
+
+    value = ResultCache(disk_dir=str(tmp_path)).get('a')
+    np.testing.assert_array_equal(value['values'], np.arange(3))
+    assert not value['values'].flags.writeable
+
+
+def test_cached_result_leaves_input_arrays_writable():
+    class Model:
+        @cached_result(cache=ResultCache())
+        def compute(self, distances):
+            return {'distances': distances, 'doubled': distances * 2}
+
+    distances = np.linspace(1, 10, 5)
+    result = Model().compute(distances)
+
+    # Kết quả chứa chính mảng được truyền vào: bộ nhớ đệm giữ bản sao, mảng của người gọi vẫn ghi được
+    distances *= 2
+    np.testing.assert_array_equal(result['distances'], np.linspace(1, 10, 5))
+    assert not result['distances'].flags.writeable
+    np.testing.assert_array_equal(Model().compute(np.linspace(1, 10, 5))['distances'], np.linspace(1, 10, 5))
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'values': np.arange(3)}
+
+    def request(_):
+        barrier.wait()
+        return cache.get_or_compute('khóa', compute)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(request, range(8)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_computation_is_retried_by_waiting_caller():
+    cache = ResultCache()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("lỗi")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(cache.get_or_compute, 'khóa', failing)
+        started.wait()
+        second = executor.submit(cache.get_or_compute, 'khóa', lambda: 42)
+        with pytest.raises(RuntimeError):
+            first.result()
+        assert second.result() == 42
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from ui.components.charts import ChartBuilder, ChartData
+
+
+def _reference_lttb(x, y, max_points):
+    """LTTB theo từng điểm (tham chiếu), cùng cách chia nhóm với ChartData.lttb"""
+    edges = np.linspace(1, len(x) - 1, max_points - 1).astype(int)
+    selected = [0]
+    for i in range(max_points - 2):
+        if i + 2 < len(edges):
+            next_x = np.mean(x[edges[i + 1]:edges[i + 2]])
+            next_y = np.mean(y[edges[i + 1]:edges[i + 2]])
+        else:
+            next_x, next_y = x[-1], y[-1]
+        a = selected[-1]
+        best, best_area = None, -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs((x[a] - next_x) * (y[j] - y[a]) - (x[a] - x[j]) * (next_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+    selected.append(len(x) - 1)
+    return x[selected], y[selected]
+
+
+def test_lttb_matches_reference_and_keeps_spikes():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.5, 1.5, 5000))
+    y = np.sin(x / 50) + 0.1 * rng.standard_normal(x.size)
+    y[1234], y[4321] = 10.0, -10.0
+
+    line_x, line_y = ChartData.lttb(x, y, max_points=200)
+
+    reference_x, reference_y = _reference_lttb(x, y, 200)
+    np.testing.assert_array_equal(line_x, reference_x)
+    np.testing.assert_array_equal(line_y, reference_y)
+    assert len(line_x) == 200 and np.all(np.diff(line_x) > 0)
+    assert line_x[0] == x[0] and line_x[-1] == x[-1]
+    assert 10.0 in line_y and -10.0 in line_y
+
+
+def test_short_series_are_returned_unchanged():
+    x, y = np.arange(10.0), np.arange(10.0) ** 2
+
+    for method in (ChartData.lttb, ChartData.aggregate):
+        line_x, line_y = method(x, y, max_points=10)
+        np.testing.assert_array_equal(line_x, x)
+        np.testing.assert_array_equal(line_y, y)
+    assert ChartData.line(list(x), list(y), max_points=None) == (list(x), list(y))
+
+
+def test_aggregate_statistics():
+    x = np.arange(10.0)
+    y = np.array([1, 5, 2, 8, 3, 9, 4, 7, 6, 0], dtype=float)
+
+    # Các nhóm liên tiếp: [0, 1], [2, 3, 4], [5, 6], [7, 8, 9]
+    np.testing.assert_allclose(ChartData.aggregate(x, y, 4, 'mean')[0], [0.5, 3.0, 5.5, 8.0])
+    np.testing.assert_allclose(ChartData.aggregate(x, y, 4, 'mean')[1], [3.0, 13 / 3, 6.5, 13 / 3])
+    np.testing.assert_array_equal(ChartData.aggregate(x, y, 4, 'min')[1], [1, 2, 4, 0])
+    np.testing.assert_array_equal(ChartData.aggregate(x, y, 4, 'max')[1], [5, 8, 9, 7])
+    with pytest.raises(ValueError):
+        ChartData.aggregate(x, y, 4, 'median')
+
+
+def test_histogram_ignores_non_finite_values():
+    values = np.concatenate([np.random.default_rng(1).normal(size=10000), [np.nan, np.inf, -np.inf]])
+
+    centers, counts, widths = ChartData.histogram(values, bins=25)
+
+    assert len(centers) == len(counts) == len(widths) == 25
+    assert counts.sum() == 10000
+    np.testing.assert_allclose(np.diff(centers), widths[:-1])
+
+
+def test_chart_builder_sends_only_the_point_budget():
+    x = np.linspace(0, 1, 20000)
+
+    fig = ChartBuilder.multi_line_chart(x, {'a': np.sin(x), 'b': np.cos(x)}, 'tiêu đề', 'x', 'y', max_points=500)
+    assert [len(trace.x) for trace in fig.data] == [500, 500]
+
+    fig = ChartBuilder.histogram_chart(np.random.default_rng(2).normal(size=50000), 'tiêu đề', 'x', 'y', bins=40)
+    assert len(fig.data[0].x) == 40
@@ -0,0 +1,65 @@
+import numpy as np
+
+from models.contours import extract_contours, field_contours, radial_contours, simplify_line
+
+
+def _radial_field(x, y):
+    """Trường giảm dần theo khoảng cách tới gốc tọa độ"""
+    return 100.0 / (1.0 + np.hypot(x, y))
+
+
+def test_circle_contour_area_and_range():
+    contours = field_contours(_radial_field, (-10, -10, 10, 10), [100.0 / 6], resolution=201)
+    contour = contours[100.0 / 6]
+
+    assert len(contour['lines']) == 1 and not contour['clipped']
+    np.testing.assert_allclose(contour['area'], np.pi * 25, rtol=0.01)
+    np.testing.assert_allclose(contour['max_range'], 5.0, rtol=0.01)
+
+
+def test_annulus_subtracts_inner_ring():
+    x = y = np.linspace(-10, 10, 401)
+    radius = np.hypot(x[np.newaxis, :], y[:, np.newaxis])
+    # Giá trị cao trong vành 3 < r < 6
+    values = np.where((radius > 3) & (radius < 6), 1.0, 0.0)
+
+    contour = extract_contours(x, y, values, [0.5])[0.5]
+
+    assert len(contour['lines']) == 2
+    np.testing.assert_allclose(contour['area'], np.pi * (36 - 9), rtol=0.03)
+
+
+def test_clipped_contour_is_flagged():
+    contour = field_contours(_radial_field, (0, 0, 10, 10), [100.0 / 6], resolution=101)[100.0 / 6]
+
+    assert contour['clipped']
+
+
+def test_log_scale_matches_linear_positions():
+    contour = field_contours(lambda x, y: 10.0 ** -np.hypot(x, y), (-5, -5, 5, 5), [1e-3],
+                             resolution=201, log_scale=True)[1e-3]
+
+    np.testing.assert_allclose(contour['max_range'], 3.0, rtol=0.01)
+
+
+def test_simplify_line_respects_tolerance():
+    t = np.linspace(0, 2 * np.pi, 1001)
+    line = np.column_stack([np.cos(t), np.sin(t)])
+    line[-1] = line[0]
+
+    simplified = simplify_line(line, 0.01)
+
+    assert len(simplified) < len(line) / 10
+    np.testing.assert_array_equal(simplified[0], simplified[-1])
+    # Mọi điểm của đường gốc nằm gần đường giản lược (bán kính đỉnh giữ nguyên)
+    np.testing.assert_allclose(np.hypot(*simplified.T), 1.0)
+    chord_radius = np.cos(np.pi / (len(simplified) - 1))
+    assert 1.0 - chord_radius <= 0.01
+
+
+def test_radial_contours_radius():
+    contours = radial_contours(lambda distance: 100.0 / (1.0 + distance), [20.0, 1e6], lower=0.01, upper=100)
+
+    np.testing.assert_allclose(contours[20.0]['radius'], 4.0, rtol=1e-6)
+    np.testing.assert_allclose(contours[20.0]['area'], np.pi * 16, rtol=1e-6)
+    assert contours[1e6]['lines'] == [] and contours[1e6]['area'] == 0.0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from models.decay_chain import BatemanSolver, DecayChain, load_decay_chain
+
+
+def _linear_chain(half_lives):
+    """Chuỗi A0 -> A1 -> ... -> hạt nhân bền cuối, chỉ A0 có mặt ban đầu"""
+    names = [f"N{i}" for i in range(len(half_lives) + 1)]
+    daughters = [{names[i + 1]: 1.0} for i in range(len(half_lives))] + [{}]
+    yields = [1.0] + [0.0] * len(half_lives)
+    return DecayChain(names, list(half_lives) + [np.inf], yields, [0.0] * len(names), daughters)
+
+
+def _reference(chain, initial_inventory, times):
+    matrix = chain.matrix.toarray()
+    return np.array([expm(matrix * t) @ initial_inventory for t in times])
+
+
+def _relative_error(result, reference):
+    return np.max(np.abs(result - reference)) / np.max(np.abs(reference))
+
+
+@pytest.mark.parametrize('half_lives', [
+    [5.0, 5.0],                                # hằng số phân rã trùng nhau
+    [5.0, 5.0 * (1 + 1e-9), 5.0 * (1 + 2e-9)],  # gần trùng nhau
+    [30.0, 2.0, 600.0, 45.0],                  # tách biệt rõ
+])
+def test_solve_matches_expm(half_lives):
+    chain = _linear_chain(half_lives)
+    initial_inventory = chain.fission_yields * 1e20
+    times = np.array([0.0, 1.0, 10.0, 100.0, 1000.0])
+
+    result = BatemanSolver(chain).solve(initial_inventory, times)
+
+    assert _relative_error(result, _reference(chain, initial_inventory, times)) < 1e-9
+
+
+def test_long_chain_with_close_pair_matches_expm():
+    half_lives = np.random.default_rng(0).uniform(10, 1000, 400)
+    half_lives[101] = half_lives[100] * (1 + 1e-7)
+    chain = _linear_chain(half_lives)
+    initial_inventory = chain.fission_yields * 1e20
+    times = np.array([10.0, 1000.0, 1e4])
+
+    result = BatemanSolver(chain).solve(initial_inventory, times)
+
+    assert _relative_error(result, _reference(chain, initial_inventory, times)) < 1e-9
+
+
+def test_weighted_activity_keeps_shape_and_matches_solve():
+    chain = _linear_chain([5.0, 5.0, 50.0])
+    solver = BatemanSolver(chain)
+    initial_inventory = chain.fission_yields * 1e20
+    weights = np.array([1.0, 2.0, 0.5, 0.0])
+    times = np.array([[1.0, 10.0], [10.0, 100.0]])
+
+    result = solver.weighted_activity(initial_inventory, times, weights)
+
+    expected = solver.activities(initial_inventory, times.ravel()) @ weights
+    assert result.shape == times.shape
+    np.testing.assert_allclose(result.ravel(), expected, rtol=1e-12)
+
+
+def test_default_library_matches_expm():
+    solver = load_decay_chain()
+    initial_inventory = solver.chain.fission_yields * 1e20
+    times = np.geomspace(3600, 720 * 3600, 12)
+
+    result = solver.solve(initial_inventory, times)
+
+    assert _relative_error(result, _reference(solver.chain, initial_inventory, times)) < 1e-9
@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+from models.fallout import FalloutModel
+
+
+def _reference_dose_rate(model, distance, time):
+    """Tốc độ liều của một điểm theo cách tính từng đồng vị của phiên bản gốc (tham chiếu)"""
+    if model.burst_height > 1000:
+        return 0.0
+    fallout_factor = np.exp(-model.burst_height / 300) if model.burst_height > 0 else 1.0
+    soil_factor = model.soil_factors.get(model.soil_type, 1.0)
+    fissions = 1.45e23 * model.yield_kt * model.fission_fraction
+
+    dose_rate = 0.0
+    for isotope, data in model.isotopes.items():
+        decay_constant = np.log(2) / data['half_life']
+        activity = fissions * data['yield'] * decay_constant * np.exp(-decay_constant * time)
+        distance_factor = np.exp(-max(distance, 0.001)**2 / (2 * (model.fallout_radius / 3)**2))
+        dose_rate += (activity * model.dose_conversion_factors[isotope] * distance_factor
+                      * data['energy'] / 0.5)
+
+    way_wigner_factor = (time / 3600)**(-1.2) if time > 3600 else 1.0
+    return dose_rate * way_wigner_factor * fallout_factor * soil_factor * 3600
+
+
+def _reference_pattern(model, x, y, time_hours, wind_speed, wind_direction, diffusion_factor):
+    """Mẫu mưa phóng xạ tính từng ô như phiên bản gốc (tham chiếu)"""
+    dose_rate = np.zeros((len(y), len(x)))
+    for i, point_y in enumerate(y):
+        for j, point_x in enumerate(x):
+            distance = np.hypot(point_x, point_y)
+            angle = np.arctan2(point_y, point_x) - wind_direction
+            wind_displacement = wind_speed * time_hours
+            sigma_y = diffusion_factor * np.sqrt(wind_displacement)
+            dx = distance * np.cos(angle) - wind_displacement
+            dy = distance * np.sin(angle)
+            crosswind_factor = np.exp(-dy**2 / (2 * sigma_y**2))
+            if dx < 0:
+                alongwind_factor = np.exp(-abs(dx) / (wind_displacement / 3))
+            else:
+                alongwind_factor = np.exp(-dx / (wind_displacement / 1.5))
+            effective_distance = distance * (1 - 0.7 * crosswind_factor * alongwind_factor)
+            dose_rate[i, j] = _reference_dose_rate(model, effective_distance, time_hours * 3600)
+    return dose_rate
+
+
+@pytest.mark.parametrize('burst_height, wind_speed, wind_direction, stability_class', [
+    (0, 10, 0.0, 'D'),
+    (50, 25, 2.3, 'A'),
+    (500, 5, -1.0, 'F'),
+])
+def test_vectorized_pattern_matches_per_cell_reference(burst_height, wind_speed, wind_direction, stability_class):
+    model = FalloutModel(yield_kt=100, burst_height=burst_height)
+    times = [1, 24, 168]
+
+    result = FalloutModel.simulate_fallout_pattern.uncached(
+        model, max_distance=60, resolution=21, wind_speed=wind_speed, wind_direction=wind_direction,
+        stability_class=stability_class, times=times, dtype=np.float64)
+
+    x = np.linspace(-60, 60, 21)
+    diffusion_factor = model.stability_factors[stability_class]
+    for time_hours in times:
+        expected = _reference_pattern(model, x, x, time_hours, wind_speed, wind_direction, diffusion_factor)
+        np.testing.assert_allclose(result['dose_rates'][f"{time_hours}h"], expected, rtol=1e-10, atol=0)
+    np.testing.assert_array_equal(result['grid_x'][0], x)
+    np.testing.assert_array_equal(result['grid_y'][:, 0], x)
+
+
+def test_chunked_pattern_matches_single_block():
+    model = FalloutModel(yield_kt=50)
+
+    whole = FalloutModel.simulate_fallout_pattern.uncached(model, resolution=64)
+    chunked = FalloutModel.simulate_fallout_pattern.uncached(model, resolution=64, chunk_rows=7)
+
+    for key, dose_rate in whole['dose_rates'].items():
+        assert dose_rate.dtype == np.float32
+        np.testing.assert_array_equal(chunked['dose_rates'][key], dose_rate)
+
+
+def test_calm_wind_pattern_is_finite_and_symmetric():
+    model = FalloutModel(yield_kt=100)
+
+    result = FalloutModel.simulate_fallout_pattern.uncached(model, max_distance=50, resolution=41, wind_speed=0)
+
+    for dose_rate in result['dose_rates'].values():
+        assert np.all(np.isfinite(dose_rate))
+        np.testing.assert_allclose(dose_rate, dose_rate[::-1, ::-1], rtol=1e-5)
+
+
+def test_initial_activity_follows_yield_changes():
+    model = FalloutModel(yield_kt=20, fission_fraction=0.5)
+    first = model.calculate_initial_activity()
+    expected = {name: 1.45e23 * 20 * 0.5 * data['yield'] * np.log(2) / data['half_life']
+                for name, data in model.isotopes.items()}
+    assert first.keys() == expected.keys()
+    np.testing.assert_allclose(list(first.values()), list(expected.values()), rtol=1e-12)
+
+    # Hoạt độ được ghi nhớ theo (yield_kt, fission_fraction) nên phải đổi theo tham số
+    model.yield_kt = 40
+    np.testing.assert_allclose(list(model.calculate_initial_activity().values()),
+                               [2 * value for value in expected.values()], rtol=1e-12)
+    with pytest.raises(ValueError):
+        model._initial_activity_array()[0] = 0.0
+
+
+def test_dose_rate_broadcast_matches_scalar_reference():
+    model = FalloutModel(yield_kt=100, burst_height=120, soil_type="sandy")
+    distances = np.array([0.0, 1.0, 5.0, 20.0])
+    times = np.array([60.0, 3600.0, 7200.0, 86400.0 * 7])
+    heights = np.array([0.0, 50.0])
+
+    table = model.dose_rate(distances[:, None, None], times[None, :, None], heights[None, None, :])
+
+    assert table.shape == (4, 4, 2)
+    for i, distance in enumerate(distances):
+        for j, time in enumerate(times):
+            for k, height in enumerate(heights):
+                expected = _reference_dose_rate(model, distance, time) * np.exp(-height / 100)
+                np.testing.assert_allclose(table[i, j, k], expected, rtol=1e-12)
+    assert isinstance(model.calculate_dose_rate(5.0, 3600.0), float)
+    np.testing.assert_allclose(model.calculate_dose_rate(5.0, 7200.0, 50.0), table[2, 2, 1], rtol=1e-15)
+
+
+def test_high_airburst_has_no_fallout():
+    model = FalloutModel(yield_kt=100, burst_height=1500)
+
+    np.testing.assert_array_equal(model.dose_rate([0.0, 10.0], 3600.0), 0.0)
+
+
+def _quad_dose(rate, time_start, time_end):
+    """Liều (Sv) bằng scipy quad theo log(t), tách tại 1 giờ; rate nhận thời gian (giây)"""
+    knots = [time_start, 3600.0, time_end] if time_start < 3600.0 < time_end else [time_start, time_end]
+    dose = 0.0
+    for lower, upper in zip(knots[:-1], knots[1:]):
+        dose += quad(lambda log_time: rate(np.exp(log_time)) * np.exp(log_time),
+                     np.log(lower), np.log(upper), epsabs=0, epsrel=1e-11, limit=200)[0]
+    return dose / 3600
+
+
+def test_window_dose_matches_quadrature():
+    model = FalloutModel(yield_kt=50)
+    windows = np.array([[1.0, 600.0], [60.0, 7200.0], [3600.0, 86400.0], [7200.0, 86400.0 * 30]])
+
+    doses = model._window_dose(windows[:, 0], windows[:, 1])
+
+    for (time_start, time_end), dose in zip(windows, doses):
+        expected = _quad_dose(lambda time: model._isotope_dose_rate(time), time_start, time_end)
+        np.testing.assert_allclose(dose, expected, rtol=1e-8)
+
+
+@pytest.mark.parametrize('wind_speed', [0.0, 5.0, 30.0])
+def test_integrated_dose_matches_quadrature(wind_speed):
+    model = FalloutModel(yield_kt=100)
+    distances = np.array([0.5, 5.0, 20.0])
+    windows = [(0.0, 1.0), (0.5, 48.0), (2.0, 720.0)]
+
+    doses = model.integrated_dose(distances[:, None], [w[0] for w in windows], [w[1] for w in windows],
+                                  wind_speed=wind_speed)
+
+    assert doses.shape == (3, 3)
+    for i, distance in enumerate(distances):
+        for j, (time_start, time_end) in enumerate(windows):
+            arrival = model.estimate_fallout_arrival(distance, wind_speed) * 3600
+            lower = max(time_start * 3600, arrival, 1.0)
+            upper = max(time_end * 3600, lower)
+
+            def rate(time):
+                effective_distance = max(distance - 0.5 * wind_speed * time / 3600, 0.5 * distance)
+                return model.dose_rate(effective_distance, time)
+
+            expected = _quad_dose(rate, lower, upper) if upper > lower else 0.0
+            np.testing.assert_allclose(doses[i, j], expected, rtol=1e-6)
+    assert isinstance(model.calculate_integrated_dose(5.0, 1.0, 24.0), float)
+
+
+def test_pattern_integrated_dose_matches_quadrature():
+    model = FalloutModel(yield_kt=100)
+    points = np.array([[3.0, 1.0], [15.0, -4.0], [-6.0, 2.0]])
+
+    doses = model.pattern_integrated_dose(points[:, 0], points[:, 1], 0.0, 72.0, wind_speed=15,
+                                          wind_direction=0.3, stability_class='C')
+
+    for (x, y), dose in zip(points, doses):
+        arrival = model.estimate_fallout_arrival(np.hypot(x, y), 15) * 3600
+        expected = _quad_dose(lambda time: float(model.pattern_dose_rate(x, y, time / 3600, 15, 0.3, 'C')),
+                              max(arrival, 1.0), 72.0 * 3600)
+        np.testing.assert_allclose(dose, expected, rtol=1e-5)
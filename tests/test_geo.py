@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from models.geo import (EARTH_RADIUS_KM, AzimuthalEquidistant, TileRenderer, fit_zoom, lonlat_to_tile,
+                        lonlat_to_web_mercator, tile_bounds, tiles_covering, web_mercator_to_lonlat)
+
+# Hà Nội
+CENTER = (21.03, 105.85)
+
+
+def _radial(x, y):
+    return np.hypot(x, y)
+
+
+def test_azimuthal_projection_round_trip_and_distances():
+    projection = AzimuthalEquidistant(*CENTER)
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-2000, 2000, 200), rng.uniform(-2000, 2000, 200)
+
+    lat, lon = projection.inverse(x, y)
+    x2, y2 = projection.forward(lat, lon)
+    np.testing.assert_allclose(x2, x, atol=1e-6)
+    np.testing.assert_allclose(y2, y, atol=1e-6)
+
+    # Khoảng cách từ tâm bảo toàn: 1 độ vĩ tuyến về phía Bắc = R·π/180
+    x, y = projection.forward(CENTER[0] + 1, CENTER[1])
+    np.testing.assert_allclose(x, 0, atol=1e-9)
+    np.testing.assert_allclose(y, EARTH_RADIUS_KM * np.pi / 180, rtol=1e-12)
+    np.testing.assert_allclose(projection.forward(*CENTER), (0, 0), atol=1e-12)
+    with pytest.raises(ValueError):
+        AzimuthalEquidistant(95, 0)
+
+
+def test_web_mercator_round_trip_and_tiles():
+    lon, lat = np.array([-179.0, 0.0, 105.85]), np.array([-60.0, 0.0, 21.03])
+    np.testing.assert_allclose(web_mercator_to_lonlat(*lonlat_to_web_mercator(lon, lat)), (lon, lat), atol=1e-9)
+
+    tx, ty = lonlat_to_tile(105.85, 21.03, 10)
+    x, y = lonlat_to_web_mercator(105.85, 21.03)
+    x_min, y_min, x_max, y_max = tile_bounds(10, tx, ty)
+    assert x_min <= x < x_max and y_min < y <= y_max
+    assert lonlat_to_tile(0.0, 0.0, 0) == (0, 0)
+
+
+def test_tiles_covering_and_fit_zoom():
+    bounds = (105.0, 20.5, 106.5, 21.5)
+
+    tiles = tiles_covering(*bounds, 10)
+    tx, ty = zip(*tiles)
+    assert len(tiles) == (max(tx) - min(tx) + 1) * (max(ty) - min(ty) + 1)
+
+    zoom = fit_zoom(*bounds, 14, max_tiles=16)
+    assert len(tiles_covering(*bounds, zoom)) <= 16 < len(tiles_covering(*bounds, zoom + 1))
+
+
+def test_tile_values_match_projected_field():
+    renderer = TileRenderer(_radial, *CENTER, tile_size=32)
+    tx, ty = lonlat_to_tile(CENTER[1], CENTER[0], 8)
+
+    values = renderer.tile(8, tx, ty)
+    assert values.shape == (32, 32) and values.dtype == np.float32
+    assert not values.flags.writeable
+
+    # Điểm ảnh góc Tây Bắc: tâm điểm ảnh chiếu ngược về kinh độ/vĩ độ rồi về tọa độ cục bộ
+    x_min, _, x_max, y_max = tile_bounds(8, tx, ty)
+    step = (x_max - x_min) / 32
+    lon, lat = web_mercator_to_lonlat(x_min + step / 2, y_max - step / 2)
+    x, y = renderer.projection.forward(lat, lon)
+    np.testing.assert_allclose(values[0, 0], np.hypot(x, y), rtol=1e-6)
+    with pytest.raises(ValueError):
+        renderer.tile(2, 4, 0)
+
+
+def test_shared_tile_cache_across_renderers():
+    calls = []
+
+    def field(x, y):
+        calls.append(1)
+        return _radial(x, y)
+
+    key = ('test_geo', 'shared')
+    first = TileRenderer(field, *CENTER, tile_size=16, field_key=key)
+    second = TileRenderer(field, *CENTER, tile_size=16, field_key=key)
+    other = TileRenderer(field, *CENTER, tile_size=16, field_key=key + ('khác',))
+
+    np.testing.assert_array_equal(first.tile(6, 50, 28), second.tile(6, 50, 28))
+    assert len(calls) == 1
+    assert first.cache_info() == {'hits': 0, 'misses': 1}
+    assert second.cache_info() == {'hits': 1, 'misses': 0}
+
+    other.tile(6, 50, 28)
+    assert len(calls) == 2
+
+
+def test_mosaic_assembles_tiles_and_enforces_limit():
+    renderer = TileRenderer(_radial, *CENTER, tile_size=16)
+    bounds = (105.0, 20.5, 106.5, 21.5)
+
+    values, (west, south, east, north) = renderer.mosaic(*bounds, 8)
+    tiles = tiles_covering(*bounds, 8)
+    assert values.size == len(tiles) * 16 * 16
+    assert west <= bounds[0] and south <= bounds[1] and east >= bounds[2] and north >= bounds[3]
+
+    tx, ty = min(tiles)
+    np.testing.assert_array_equal(values[:16, :16], renderer.tile(8, tx, ty))
+    with pytest.raises(ValueError):
+        renderer.mosaic(*bounds, 14, max_tiles=16)
+
+
+def test_to_rgba_transparent_below_vmin():
+    rgba = TileRenderer.to_rgba(np.array([[1e-3, 1.0, 100.0]]), vmin=0.1, vmax=10)
+
+    assert rgba.shape == (1, 3, 4) and rgba.dtype == np.uint8
+    np.testing.assert_array_equal(rgba[0, :, 3], [0, 180, 180])
+    with pytest.raises(ValueError):
+        TileRenderer.to_rgba(np.ones((2, 2)), vmin=0, vmax=1)
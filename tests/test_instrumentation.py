@@ -0,0 +1,108 @@
+import json
+import threading
+
+import pytest
+
+from core import instrumentation
+from core.instrumentation import Profile, count, instrumented, profile_run, timer
+
+
+@pytest.fixture(autouse=True)
+def disabled(monkeypatch):
+    # Mỗi kiểm thử bắt đầu với đo đạc của tiến trình tắt và không có số liệu cũ
+    monkeypatch.setenv(instrumentation.PROFILE_ENV, '0')
+    instrumentation.enable(False)
+    instrumentation.reset()
+    yield
+    instrumentation.enable(False)
+    instrumentation.reset()
+
+
+@instrumented()
+def _work(n):
+    count('work.items', n)
+    return sum(range(n))
+
+
+def test_disabled_instrumentation_records_nothing():
+    assert _work(100) == 4950
+    with timer('khối'):
+        count('bộ đếm')
+
+    stats = instrumentation.get_stats()
+    assert stats['timers'] == {} and stats['counters'] == {}
+    assert instrumentation.recent_profiles() == []
+
+
+def test_profile_run_is_scoped_to_its_block():
+    _work(10)
+    with profile_run('lần chạy') as profile:
+        _work(100)
+        _work(50)
+    _work(10)
+
+    data = profile.to_dict()
+    assert data['counters'] == {'work.items': 150}
+    assert data['timers']['_work']['count'] == 2
+    assert data['timers']['lần chạy']['count'] == 1
+    assert data['counter_timers'] == {'work.items': ['_work']}
+    assert data['rates']['work.items'] > 0
+    # Đo đạc của tiến trình tắt: không cộng vào tổng của tiến trình
+    assert instrumentation.get_stats()['counters'] == {}
+
+
+def test_profile_run_does_not_capture_other_threads():
+    started, release = threading.Event(), threading.Event()
+
+    def other():
+        started.wait()
+        _work(1000)
+        release.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    with profile_run('luồng chính') as profile:
+        started.set()
+        release.wait(5)
+    thread.join()
+
+    assert profile.to_dict()['counters'] == {}
+
+
+def test_enabled_instrumentation_accumulates_process_totals():
+    instrumentation.enable()
+    _work(10)
+    with profile_run('lần chạy'):
+        _work(20)
+
+    stats = instrumentation.get_stats()
+    assert stats['counters'] == {'work.items': 30}
+    assert stats['timers']['_work']['count'] == 2
+    assert [data['name'] for data in instrumentation.recent_profiles()] == ['lần chạy']
+    assert 'work.items' in instrumentation.format_profile(stats)
+
+
+def test_merge_and_export(tmp_path):
+    first, second = Profile('a'), Profile('b')
+    first.add_time('t', 1.0)
+    first.add_count('c', 2, timer='t')
+    second.add_time('t', 3.0)
+    second.add_count('c', 4, timer='t')
+
+    data = first.merge(second.to_dict()).to_dict()
+    assert data['timers']['t'] == {'count': 2, 'total': 4.0, 'mean': 2.0, 'max': 3.0}
+    assert data['counters'] == {'c': 6} and data['rates'] == {'c': 1.5}
+
+    path = first.export(str(tmp_path / 'profile.json'))
+    assert json.loads(open(path, encoding='utf-8').read())['counters'] == {'c': 6}
+
+
+def test_profile_run_dump_and_profiler(tmp_path):
+    with profile_run('điểm 1/2', profiler='cprofile', dump_dir=str(tmp_path)) as profile:
+        _work(10)
+
+    assert 'function calls' in profile.report
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.json', '.prof']
+    with pytest.raises(ValueError):
+        with profile_run('lỗi', profiler='khong_ton_tai'):
+            pass
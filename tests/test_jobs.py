@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from core.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, Job, JobManager, SimulationCancelled
+
+
+def _cancellable(steps, release, progress_callback=None, cancel_event=None):
+    """Mô phỏng giả: báo tiến trình rồi chờ release, dừng khi có yêu cầu hủy"""
+    for step in range(steps):
+        progress_callback({'step': step})
+        while not release.wait(0.01):
+            if cancel_event.is_set():
+                raise SimulationCancelled()
+        release.clear()
+    return steps
+
+
+def _failing(progress_callback=None, cancel_event=None):
+    raise RuntimeError("lỗi mô phỏng")
+
+
+def test_job_runs_to_completion():
+    manager = JobManager()
+    release = threading.Event()
+    release.set()
+    job_id = manager.submit(_cancellable, 1, release)
+
+    assert manager.result(job_id, timeout=5) == 1
+    status = manager.status(job_id)
+    assert status['status'] == DONE
+    assert status['started'] is not None and status['finished'] >= status['started']
+    assert status['progress'] == {'step': 0}
+
+
+def test_cancel_running_job():
+    manager = JobManager()
+    release = threading.Event()
+    job_id = manager.submit(_cancellable, 3, release)
+    # Chờ mô phỏng bắt đầu (sự kiện tiến trình đầu tiên)
+    next(manager.stream(job_id, poll_interval=0.01))
+
+    manager.cancel(job_id)
+
+    assert manager.result(job_id, timeout=5) is None
+    status = manager.status(job_id)
+    assert status['status'] == CANCELLED
+    assert status['finished'] is not None
+
+
+def test_cancel_queued_job_never_starts():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    blocking = manager.submit(_cancellable, 1, release)
+    queued = manager.submit(_cancellable, 1, threading.Event())
+    assert manager.status(queued)['status'] == QUEUED
+
+    manager.cancel(queued)
+    release.set()
+    manager.result(blocking, timeout=5)
+
+    status = manager.status(queued)
+    assert status['status'] == CANCELLED
+    assert status['started'] is None and status['finished'] is not None
+
+
+def test_failed_job_raises_on_result():
+    manager = JobManager()
+    job_id = manager.submit(_failing)
+
+    with pytest.raises(ValueError, match="lỗi mô phỏng"):
+        manager.result(job_id, timeout=5)
+    assert manager.status(job_id)['status'] == FAILED
+
+
+def test_set_status_records_times_before_publishing():
+    job = Job('job-1', None, '', max_events=10)
+
+    job.set_status(RUNNING)
+    assert job.started is not None and job.finished is None
+
+    job.set_status(DONE, result=42)
+    snapshot = job.snapshot()
+    assert snapshot['status'] == DONE and snapshot['finished'] is not None
+    assert job.result == 42
+
+
+def test_owner_limit():
+    manager = JobManager(max_jobs_per_owner=1)
+    release = threading.Event()
+    job_id = manager.submit(_cancellable, 1, release, owner='phiên')
+
+    with pytest.raises(ValueError):
+        manager.submit(_cancellable, 1, release, owner='phiên')
+    release.set()
+    manager.result(job_id, timeout=5)
+
+
+def test_stream_heartbeat_while_waiting():
+    manager = JobManager()
+    release = threading.Event()
+    job_id = manager.submit(_cancellable, 1, release)
+
+    received = []
+    for sequence, event in manager.stream(job_id, poll_interval=0.01, heartbeat=True):
+        received.append((sequence, event))
+        # Nhịp không có sự kiện mới vẫn được phát khi mô phỏng đang chờ
+        if event is None:
+            release.set()
+
+    assert (1, {'step': 0}) in received
+    assert any(event is None for _, event in received)
+    assert manager.status(job_id)['status'] == DONE
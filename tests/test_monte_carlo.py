@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from models.monte_carlo import MonteCarloNeutronTransport
+
+
+def _run(seed, **kwargs):
+    model = MonteCarloNeutronTransport()
+    return MonteCarloNeutronTransport.simulate_neutrons.uncached(
+        model, num_neutrons=200, show_progress=False, seed=seed, **kwargs)
+
+
+def test_seeded_runs_are_reproducible_when_run_concurrently():
+    reference = _run(1)
+
+    # Các lần chạy đồng thời không dùng chung trạng thái ngẫu nhiên toàn cục
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_run, [1, 2, 1, 2]))
+
+    for result in results[::2]:
+        assert result['generation_sizes'] == reference['generation_sizes']
+        np.testing.assert_array_equal(result['path_lengths'], reference['path_lengths'])
+    assert results[1]['path_lengths'] != reference['path_lengths']
+
+
+def test_seed_does_not_touch_global_random_state():
+    np.random.seed(0)
+    expected = np.random.random()
+    np.random.seed(0)
+    _run(5, fission_chain=False)
+
+    assert np.random.random() == expected
+
+
+def test_parallel_batches_are_reproducible():
+    first = _run(3, use_parallel=True, n_cores=2)
+    second = _run(3, use_parallel=True, n_cores=2)
+
+    assert first['generation_sizes'] == second['generation_sizes']
+    assert first['fissions'] + first['absorptions'] + first['escapes'] > 0
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from models.particle_transport import ParticleFalloutModel, settling_velocity
+from models.wind_field import WindField
+
+
+def _simulate(model, **kwargs):
+    params = dict(num_particles=3000, max_distance=300, resolution=60, dt=600, max_time_hours=24, seed=3)
+    params.update(kwargs)
+    return model.simulate(**params)
+
+
+def test_settling_velocity_matches_stokes_for_small_particles():
+    # Hạt nhỏ (Re << 1) tuân theo định luật Stokes
+    diameter = 5e-6
+    stokes = (2600.0 - 1.225) * 9.81 * diameter**2 / (18 * 1.81e-5)
+    np.testing.assert_allclose(settling_velocity(5.0), stokes, rtol=1e-3)
+
+    # Hạt lớn chịu lực cản phi tuyến nên chậm hơn Stokes nhưng vẫn tăng theo kích thước
+    velocities = settling_velocity([25, 50, 100, 200, 400])
+    assert np.all(np.diff(velocities) > 0)
+    assert velocities[-1] < (2600.0 - 1.225) * 9.81 * 400e-6**2 / (18 * 1.81e-5)
+
+
+def test_activity_is_conserved():
+    results = _simulate(ParticleFalloutModel(yield_kt=20))
+
+    cell_area = (results['x'][1] - results['x'][0]) * (results['y'][1] - results['y'][0])
+    deposited = results['deposition'].astype(float).sum() * cell_area
+    total = deposited + results['airborne_fraction'] + results['outside_fraction']
+    np.testing.assert_allclose(total, 1.0, rtol=1e-5)
+    assert deposited > 0.5
+
+
+def test_seed_reproduces_results_and_wind_moves_deposition():
+    model = ParticleFalloutModel(yield_kt=20)
+    wind = WindField.uniform(wind_speed=30, wind_direction=np.pi / 2)
+
+    first = _simulate(model, wind_field=wind)
+    second = _simulate(model, wind_field=wind)
+    np.testing.assert_array_equal(first['deposition'], second['deposition'])
+
+    # Gió thổi về hướng Bắc: trọng tâm lắng đọng nằm ở phía Bắc tâm vụ nổ
+    weights = first['deposition'].astype(float)
+    center_y = (weights.sum(axis=1) @ first['y']) / weights.sum()
+    center_x = (weights.sum(axis=0) @ first['x']) / weights.sum()
+    assert center_y > 20 and abs(center_x) < 0.2 * center_y
+
+
+def test_memory_mapped_wind_field_runs_in_parallel(tmp_path):
+    times, heights = np.array([0.0, 86400.0]), np.array([0.0, 20000.0])
+    y = x = np.array([-500.0, 500.0])
+    shape = (2, 2, 2, 2)
+    WindField(times, heights, y, x, np.full(shape, 5.0), np.zeros(shape)).save(str(tmp_path))
+    wind = WindField.from_directory(str(tmp_path))
+    model = ParticleFalloutModel(yield_kt=20)
+
+    serial = _simulate(model, wind_field=wind)
+    parallel = _simulate(model, wind_field=wind, use_parallel=True, n_cores=2)
+
+    # Các nhóm hạt dùng dòng số ngẫu nhiên khác nhau nhưng cùng phân bố
+    assert parallel['num_particles'] == serial['num_particles']
+    for results in (serial, parallel):
+        weights = results['deposition'].astype(float)
+        assert (weights.sum(axis=0) @ results['x']) / weights.sum() > 20
+
+
+def test_dose_rate_map_is_zero_before_arrival():
+    model = ParticleFalloutModel(yield_kt=20)
+    results = _simulate(model, wind_field=WindField.uniform(wind_speed=30))
+
+    dose_rate = model.dose_rate_map(results, 6.0)
+    assert dose_rate.dtype == np.float32
+    assert np.all(dose_rate[np.isnan(results['arrival_time'])] == 0)
+    assert np.all(dose_rate[results['arrival_time'] > 6.0] == 0)
+
+    # Sau khi toàn bộ hạt đã lắng, tổng liều tỷ lệ với lượng lắng đọng
+    late = model.dose_rate_map(results, 48.0)
+    ratio = late[late > 0] / results['deposition'][late > 0]
+    np.testing.assert_allclose(ratio, ratio[0], rtol=1e-5)
+
+
+def test_mismatched_size_classes_are_rejected():
+    with pytest.raises(ValueError):
+        ParticleFalloutModel(diameters_um=(25, 50), activity_fractions=(1.0,))
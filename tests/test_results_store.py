@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.results_store import CATALOG_FILE, ResultsStore
+
+
+def _result(scale):
+    return {'dose': np.arange(6.0).reshape(2, 3) * scale, 'peak': 5.0 * scale}
+
+
+@pytest.mark.parametrize('format', ['arrow', 'parquet'])
+def test_save_load_round_trip(tmp_path, format):
+    store = ResultsStore(str(tmp_path), format=format)
+    run_id = store.save('fallout', _result(2.0), params={'yield_kt': 20}, seed=7, elapsed=0.5)
+
+    values = store.load(run_id)
+    np.testing.assert_array_equal(values['dose'], _result(2.0)['dose'])
+    assert values['peak'] == 10.0
+    assert values['param.yield_kt'] == 20
+
+    record = store.query(model='fallout')[0]
+    assert record['id'] == run_id and record['seed'] == 7 and record['rows'] == 1
+
+
+def test_query_and_find(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    ids = {yield_kt: store.save('fallout', _result(yield_kt), params={'yield_kt': yield_kt})
+           for yield_kt in (10, 20, 50)}
+    store.save('blast_wave', _result(1.0), params={'yield_kt': 20})
+
+    assert [record['id'] for record in store.query(model='fallout', yield_kt=(15, None))] == [ids[20], ids[50]]
+    assert [record['id'] for record in store.query(model='fallout', yield_kt=[10, 50])] == [ids[10], ids[50]]
+    assert len(store.query(yield_kt=20)) == 2
+    assert store.find('fallout', {'yield_kt': 20.0})['id'] == ids[20]
+    assert store.find('fallout', {'yield_kt': 30}) is None
+
+
+def test_reindex_rebuilds_lost_catalog(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    ids = {store.save('fallout', _result(scale), params={'yield_kt': scale}) for scale in (1, 2)}
+    os.remove(os.path.join(str(tmp_path), CATALOG_FILE))
+
+    reopened = ResultsStore(str(tmp_path))
+    assert reopened.records() == []
+    assert reopened.reindex() == 2
+    assert {record['id'] for record in reopened.records()} == ids
+
+
+def test_catalog_sees_runs_written_by_another_instance(tmp_path):
+    reader = ResultsStore(str(tmp_path))
+    assert reader.records() == []
+
+    run_id = ResultsStore(str(tmp_path)).save('fallout', _result(1.0))
+    assert [record['id'] for record in reader.records()] == [run_id]
+
+
+def test_invalid_format(tmp_path):
+    with pytest.raises(ValueError):
+        ResultsStore(str(tmp_path), format='csv')
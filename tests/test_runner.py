@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from core import instrumentation
+from core.runner import expand_grid, main, resolve_model, results_table, run_batch, run_point, split_params
+from models.thermal_radiation import ThermalRadiationModel
+
+DISTANCES = [100.0, 1000.0, 5000.0]
+
+
+def test_expand_grid_cartesian_product():
+    points = expand_grid({'params': {'distances': DISTANCES}, 'grid': {'yield_kt': [10, 20], 'burst_height': [0, 500]},
+                          'points': [{'terrain_factor': 1.0}, {'terrain_factor': 0.5}]})
+
+    assert len(points) == 8
+    assert points[0] == {'distances': DISTANCES, 'terrain_factor': 1.0, 'yield_kt': 10, 'burst_height': 0}
+    assert expand_grid({}) == [{}]
+    with pytest.raises(ValueError):
+        expand_grid({'grids': {}})
+    with pytest.raises(ValueError):
+        expand_grid({'grid': {'yield_kt': []}})
+
+
+def test_resolve_and_split_params():
+    model_class, method = resolve_model('thermal_radiation')
+    assert model_class is ThermalRadiationModel and method == 'calculate_thermal_effects'
+
+    init_params, method_params = split_params(model_class, method, {'yield_kt': 10, 'distances': DISTANCES})
+    assert init_params == {'yield_kt': 10} and method_params == {'distances': DISTANCES}
+    with pytest.raises(ValueError):
+        split_params(model_class, method, {'khong_ton_tai': 1})
+    with pytest.raises(ValueError):
+        resolve_model('khong_ton_tai')
+    with pytest.raises(ValueError):
+        resolve_model('thermal_radiation', '_private')
+
+
+def test_run_point_reports_errors_without_raising():
+    run = run_point('thermal_radiation', None, {'distances': 'không hợp lệ'})
+
+    assert run['result'] is None and run['error'].startswith('ValueError')
+    assert run['profile'] is None
+
+
+def test_parallel_batch_matches_serial():
+    points = expand_grid({'params': {'distances': DISTANCES}, 'grid': {'yield_kt': [10, 20, 50]}})
+
+    serial = run_batch('thermal_radiation', points)
+    parallel = run_batch('thermal_radiation', points, jobs=2)
+
+    for first, second in zip(serial, parallel):
+        assert first['error'] is None and second['error'] is None
+        np.testing.assert_array_equal(first['result']['energy_density'], second['result']['energy_density'])
+    with pytest.raises(ValueError):
+        run_batch('thermal_radiation', points, jobs=0)
+
+
+def test_results_table_flattens_results():
+    runs = run_batch('thermal_radiation', [{'yield_kt': 10, 'distances': DISTANCES}, {'distances': 'lỗi'}])
+
+    table = results_table(runs, 'thermal_radiation', 'calculate_thermal_effects')
+
+    assert table.num_rows == 2
+    assert table.column('param.yield_kt').to_pylist() == [10, None]
+    assert len(table.column('energy_density')[0].as_py()) == len(DISTANCES)
+    assert table.column('error')[0].as_py() is None and table.column('error')[1].as_py()
+    assert table.schema.metadata[b'model'] == b'thermal_radiation'
+
+
+def test_cli_writes_parquet_and_profile(tmp_path, capsys, monkeypatch):
+    # --profile bật đo đạc của tiến trình; khôi phục biến môi trường sau khi kiểm thử
+    monkeypatch.setenv(instrumentation.PROFILE_ENV, '0')
+    params = tmp_path / 'params.json'
+    params.write_text(json.dumps({'params': {'distances': DISTANCES}, 'grid': {'yield_kt': [10, 20]}}))
+    out, profile = tmp_path / 'out.parquet', tmp_path / 'profile.json'
+
+    try:
+        code = main(['run', 'thermal_radiation', '--params', str(params), '--out', str(out),
+                     '--profile', str(profile)])
+    finally:
+        instrumentation.enable(False)
+        instrumentation.reset()
+
+    assert code == 0
+    assert pq.read_table(out).num_rows == 2
+    assert json.loads(profile.read_text())['name'] == 'run:thermal_radiation.calculate_thermal_effects'
+    assert '2 điểm, 0 lỗi' in capsys.readouterr().out
+
+
+def test_cli_exit_codes(tmp_path):
+    params = tmp_path / 'params.json'
+    params.write_text(json.dumps([{'distances': DISTANCES}, {'distances': 'lỗi'}]))
+
+    assert main(['run', 'thermal_radiation', '--params', str(params), '--out', str(tmp_path / 'out.arrow')]) == 1
+    assert main(['run', 'thermal_radiation', '--params', str(params), '--out', str(tmp_path / 'out.csv')]) == 2
+    params.write_text(json.dumps({'params': {'khong_ton_tai': 1}}))
+    assert main(['run', 'thermal_radiation', '--params', str(params), '--out', str(tmp_path / 'out.arrow')]) == 2
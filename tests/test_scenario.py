@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from models.grid_index import RegularGrid
+from models.scenario import MultiBurstScenario
+
+GRID = RegularGrid(np.linspace(-60, 80, 57), np.linspace(-50, 50, 41))
+TIMES = [1, 5, 30]
+WIND = dict(wind_speed=15, wind_direction=0.5, stability_class='C')
+
+
+def _single_event(x, y, time, yield_kt, burst_height=0):
+    scenario = MultiBurstScenario(**WIND)
+    event = scenario.add_event(x=x, y=y, time=time, yield_kt=yield_kt, burst_height=burst_height)
+    return scenario, event
+
+
+def test_single_event_matches_shifted_pattern():
+    scenario, event = _single_event(10, -5, 2, 100)
+
+    result = scenario.dose_rate_map(TIMES, grid=GRID, dtype=np.float64)
+
+    x, y = np.meshgrid(GRID.x - 10, GRID.y + 5)
+    np.testing.assert_array_equal(result['dose_rates']['1h'], 0.0)
+    for time_hours in TIMES[1:]:
+        expected = event['fallout'].pattern_dose_rate(x, y, time_hours - 2, **WIND)
+        computed = result['dose_rates'][f"{time_hours}h"]
+        # Ngoài bán kính cắt chỉ bỏ đi các giá trị nhỏ hơn ngưỡng tối thiểu
+        inside = computed > 0
+        np.testing.assert_allclose(computed[inside], expected[inside], rtol=1e-12)
+        assert np.all(expected[~inside] < scenario.min_dose_rate)
+
+
+def test_events_superpose():
+    scenario = MultiBurstScenario(**WIND)
+    scenario.add_event(x=-20, y=10, time=0, yield_kt=50)
+    scenario.add_event(x=30, y=-10, time=3, yield_kt=200, burst_height=100)
+
+    combined = scenario.dose_rate_map(TIMES, grid=GRID, dtype=np.float64)
+
+    singles = []
+    for event in scenario.events:
+        single, _ = _single_event(event['x'], event['y'], event['time'], event['yield_kt'], event['burst_height'])
+        singles.append(single.dose_rate_map(TIMES, grid=GRID, dtype=np.float64))
+    for key, dose_rate in combined['dose_rates'].items():
+        np.testing.assert_allclose(dose_rate, singles[0]['dose_rates'][key] + singles[1]['dose_rates'][key],
+                                   rtol=1e-12)
+
+
+def test_effects_take_peak_overpressure_and_sum_thermal():
+    scenario = MultiBurstScenario()
+    events = [scenario.add_event(x=-5, y=0, yield_kt=20), scenario.add_event(x=8, y=3, yield_kt=300, burst_height=500)]
+
+    result = scenario.effects_map(grid=GRID, dtype=np.float64)
+
+    # Tham chiếu tính trên toàn lưới, không cắt theo bán kính
+    overpressure, thermal_energy = [], []
+    for event in events:
+        distance = np.hypot(GRID.x[np.newaxis, :] - event['x'], GRID.y[:, np.newaxis] - event['y'])
+        overpressure.append(event['blast'].peak_overpressure(np.hypot(distance * 1000, event['burst_height'])))
+        thermal_energy.append(event['thermal'].calculate_thermal_energy_density(np.maximum(distance * 1000, 1.0)))
+
+    # Phần bị cắt của mỗi vụ nổ nhỏ hơn ngưỡng tối thiểu tương ứng
+    np.testing.assert_allclose(result['overpressure'], np.maximum(*overpressure),
+                               rtol=1e-12, atol=scenario.min_overpressure)
+    np.testing.assert_allclose(result['thermal_energy'], sum(thermal_energy),
+                               rtol=1e-12, atol=len(events) * scenario.min_thermal_energy)
+    assert result['overpressure'].max() > 100 * scenario.min_overpressure
+
+
+def test_invalid_events_are_rejected():
+    scenario = MultiBurstScenario()
+    with pytest.raises(ValueError):
+        scenario.add_event(yield_kt=0)
+    with pytest.raises(ValueError):
+        scenario.add_event(fission_fraction=1.5)
+    with pytest.raises(ValueError):
+        scenario.add_event(time=-1)
+    with pytest.raises(ValueError):
+        MultiBurstScenario(min_dose_rate=0)
+
+
+def test_default_grid_is_centered_on_events():
+    scenario = MultiBurstScenario()
+    scenario.add_event(x=10, y=20)
+    scenario.add_event(x=30, y=40)
+
+    result = scenario.dose_rate_map([1], max_distance=5, resolution=11)
+
+    assert result['grid_x'][0, 0] == 15 and result['grid_x'][0, -1] == 25
+    assert result['grid_y'][0, 0] == 25 and result['grid_y'][-1, 0] == 35
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from models.fallout import FalloutModel
+from models.shelter import ShelterModel, load_class_raster
+
+GRID_X = np.linspace(-20, 40, 13)
+GRID_Y = np.linspace(-15, 15, 7)
+
+
+def _classes():
+    return np.arange(GRID_X.size * GRID_Y.size).reshape(GRID_Y.size, GRID_X.size) % 8 - 1
+
+
+def test_transmission_lookup_and_unknown_classes():
+    model = ShelterModel(default_protection_factor=2.0)
+
+    np.testing.assert_allclose(model.protection_factor([0, 3, 6]), [1.0, 10.0, 1000.0], rtol=1e-6)
+    # Mã lớp ngoài bảng (âm hoặc quá lớn) nhận PF mặc định
+    np.testing.assert_allclose(model.protection_factor([-1, 7, 99]), 2.0)
+    with pytest.raises(ValueError):
+        ShelterModel({0: {'name': 'lỗi', 'protection_factor': 0.5}})
+
+
+def test_resample_classes_nearest_cell():
+    classes = np.arange(12).reshape(3, 4)
+    raster_x, raster_y = np.array([0.0, 1.0, 2.0, 3.0]), np.array([0.0, 1.0, 2.0])
+
+    resampled = ShelterModel.resample_classes(classes, raster_x, raster_y, [0.4, 0.6, 3.4, 4.0], [1.9, -0.6])
+
+    np.testing.assert_array_equal(resampled, [[8, 9, 11, -1], [-1, -1, -1, -1]])
+
+
+def test_dose_rasters_match_pattern_and_are_chunk_independent():
+    fallout = FalloutModel(yield_kt=100)
+    classes = _classes()
+    params = dict(time_hours=12, stay_start=1, stay_end=48, wind_speed=15, wind_direction=0.4,
+                  stability_class='C')
+
+    whole = ShelterModel().dose_rasters(fallout, GRID_X, GRID_Y, classes, **params)
+    chunked = ShelterModel(chunk_rows=2).dose_rasters(fallout, GRID_X, GRID_Y, classes, **params)
+
+    for name, raster in whole.items():
+        np.testing.assert_array_equal(chunked[name], raster)
+
+    x, y = np.meshgrid(GRID_X, GRID_Y)
+    outdoor = fallout.pattern_dose_rate(x, y, 12, 15, 0.4, 'C')
+    integrated = fallout.pattern_integrated_dose(x, y, 1, 48, 15, 0.4, 'C')
+    transmission = ShelterModel().transmission(classes)
+    np.testing.assert_allclose(whole['dose_rate'], outdoor, rtol=1e-6)
+    np.testing.assert_allclose(whole['integrated_dose'], integrated, rtol=1e-6)
+    np.testing.assert_allclose(whole['sheltered_integrated_dose'], integrated * transmission, rtol=1e-6)
+    assert np.all(whole['sheltered_dose_rate'] <= whole['dose_rate'])
+
+
+def test_shelter_or_evacuate_splits_dose_windows():
+    fallout = FalloutModel(yield_kt=100)
+    classes = np.full((GRID_Y.size, GRID_X.size), 3)
+    model = ShelterModel(chunk_rows=3)
+
+    decision = model.shelter_or_evacuate(fallout, GRID_X, GRID_Y, classes, planning_hours=96,
+                                         evacuation_start=4, transit_hours=2, wind_speed=15)
+
+    x, y = np.meshgrid(GRID_X, GRID_Y)
+    doses = [fallout.pattern_integrated_dose(x, y, start, end, 15, 0, 'D') for start, end in ((0, 4), (4, 6), (6, 96))]
+    np.testing.assert_allclose(decision['shelter_dose'], sum(doses) / 10, rtol=1e-5)
+    np.testing.assert_allclose(decision['evacuate_dose'], doses[0] / 10 + doses[1] / 1.5, rtol=1e-5)
+    np.testing.assert_array_equal(decision['evacuate'], decision['evacuate_dose'] < decision['shelter_dose'])
+
+
+def test_load_class_raster(tmp_path):
+    classes = _classes()
+    np.save(tmp_path / 'classes.npy', classes)
+    np.savez(tmp_path / 'classes.npz', classes=classes, x=GRID_X, y=GRID_Y)
+
+    loaded, x, y = load_class_raster(str(tmp_path / 'classes.npy'))
+    np.testing.assert_array_equal(loaded, classes)
+    assert x is None and y is None
+
+    loaded, x, y = load_class_raster(str(tmp_path / 'classes.npz'))
+    np.testing.assert_array_equal(x, GRID_X)
+    with pytest.raises(ValueError):
+        load_class_raster(str(tmp_path / 'classes.tif'))
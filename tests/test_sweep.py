@@ -0,0 +1,55 @@
+import pytest
+
+from core.sweep import completed_keys, point_key, read_parts, run_sweep
+
+DISTANCES = [1.0, 5.0, 10.0]
+
+
+def _points(yields):
+    return [{'yield_kt': yield_kt, 'distances': DISTANCES} for yield_kt in yields]
+
+
+def test_point_key_ignores_numeric_type_and_order():
+    assert (point_key('thermal_radiation', 'calculate_thermal_effects', {'yield_kt': 10, 'burst_height': 0})
+            == point_key('thermal_radiation', 'calculate_thermal_effects', {'burst_height': 0.0, 'yield_kt': 10.0}))
+    assert (point_key('thermal_radiation', 'calculate_thermal_effects', {'yield_kt': 10}, seed=1)
+            != point_key('thermal_radiation', 'calculate_thermal_effects', {'yield_kt': 10}, seed=2))
+
+
+def test_sweep_deduplicates_points(tmp_path):
+    # 10 và 10.0 là cùng một điểm
+    summary = run_sweep('thermal_radiation', _points([10, 10.0, 20]), str(tmp_path))
+
+    assert summary['total'] == 3
+    assert summary['computed'] == 2
+    assert summary['cached'] == 1
+    assert summary['failed'] == 0
+    assert read_parts(str(tmp_path)).num_rows == 2
+
+
+def test_sweep_rerun_computes_only_new_points(tmp_path):
+    run_sweep('thermal_radiation', _points([10, 20]), str(tmp_path))
+    keys = completed_keys(str(tmp_path))
+
+    rerun = run_sweep('thermal_radiation', _points([10, 20]), str(tmp_path))
+    assert rerun['computed'] == 0 and rerun['cached'] == 2 and not rerun['parts']
+
+    extended = run_sweep('thermal_radiation', _points([10, 20, 50]), str(tmp_path))
+    assert extended['computed'] == 1
+    assert len(completed_keys(str(tmp_path))) == len(keys) + 1
+
+
+def test_sweep_reports_failed_points_and_retries_them(tmp_path):
+    points = [{'yield_kt': 10, 'distances': DISTANCES}, {'yield_kt': 10, 'distances': 'không hợp lệ'}]
+
+    summary = run_sweep('thermal_radiation', points, str(tmp_path))
+    assert summary['computed'] == 1 and summary['failed'] == 1
+    assert summary['errors'][0][0] == 1
+
+    # Điểm lỗi không được ghi nên được tính lại ở lần chạy sau
+    assert run_sweep('thermal_radiation', points, str(tmp_path))['failed'] == 1
+
+
+def test_sweep_rejects_unknown_parameters(tmp_path):
+    with pytest.raises(ValueError):
+        run_sweep('thermal_radiation', [{'khong_ton_tai': 1}], str(tmp_path))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from models.flash_effects import FlashEffectsModel
+from models.thermal_radiation import ThermalRadiationModel
+from models.threshold_solver import solve_threshold_radii
+
+
+def test_power_law_radii_are_exact():
+    targets = np.array([[1e-2, 1e-4], [1e-6, 0.5]])
+
+    radii, info = solve_threshold_radii(lambda d: 1.0 / d**2, targets, lower=0.1, upper=1e4, full_output=True)
+
+    assert radii.shape == targets.shape
+    np.testing.assert_allclose(radii, 1.0 / np.sqrt(targets), rtol=1e-9)
+    assert info['converged'].all()
+
+
+def test_non_power_law_matches_brentq():
+    def field(distance):
+        return np.exp(-distance / 7.0) / distance
+
+    targets = np.geomspace(1e-8, 1.0, 9)
+    radii = solve_threshold_radii(field, targets, lower=0.01, upper=200)
+
+    expected = [brentq(lambda d: field(d) - target, 0.01, 200, xtol=1e-14) for target in targets]
+    np.testing.assert_allclose(radii, expected, rtol=1e-8)
+
+
+def test_targets_outside_search_range():
+    radii = solve_threshold_radii(lambda d: 1.0 / d, [1e3, 1e-3, 0.0], lower=0.1, upper=100)
+
+    # Ngưỡng lớn hơn f(lower): không có vùng ảnh hưởng; nhỏ hơn f(upper) hoặc không dương: toàn khoảng
+    np.testing.assert_array_equal(radii, [0.0, 100.0, 100.0])
+
+
+def test_invalid_bracket():
+    with pytest.raises(ValueError):
+        solve_threshold_radii(lambda d: 1.0 / d, 1.0, lower=10, upper=1)
+
+
+@pytest.mark.parametrize('probability', [0.1, 0.5, 0.9])
+def test_thermal_damage_radii_invert_effect_probabilities(probability):
+    model = ThermalRadiationModel(yield_kt=100, burst_height=500)
+
+    radii = model.get_damage_radii(probability_thresholds=probability)
+    effects = model.calculate_thermal_effects(np.array([radii[effect] for effect in radii]))
+
+    for index, effect in enumerate(radii):
+        key = f"{effect}_burn_probability" if effect.endswith('degree') else f"{effect}_probability"
+        np.testing.assert_allclose(effects[key][index], probability, rtol=1e-6)
+
+
+@pytest.mark.parametrize('probability', [0.1, 0.5, 0.9])
+def test_flash_distances_invert_eye_effect_probabilities(probability):
+    model = FlashEffectsModel(yield_kt=100)
+
+    distances = model.get_max_effect_distances(probabilities=probability)
+    effects = model.calculate_eye_effects(np.array([distances[effect] for effect in distances]))
+
+    for index, effect in enumerate(distances):
+        np.testing.assert_allclose(effects[f"{effect}_probability"][index], probability, rtol=1e-6)
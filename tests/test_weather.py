@@ -0,0 +1,103 @@
+import pickle
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from scipy.interpolate import RegularGridInterpolator
+
+from models.weather import WeatherStore
+from models.wind_field import WindField
+
+AXES = (np.array([0.0, 600.0, 1800.0, 3600.0, 7200.0]), np.array([0.0, 500.0, 2000.0]),
+        np.linspace(-50, 50, 6), np.linspace(-80, 80, 9))
+
+
+def _fields():
+    rng = np.random.default_rng(0)
+    shape = tuple(len(axis) for axis in AXES)
+    return {'u': rng.normal(size=shape), 'v': rng.normal(size=shape)}
+
+
+def _points(rng, n, margin=0.0):
+    return tuple(rng.uniform(axis[0] - margin * np.ptp(axis), axis[-1] + margin * np.ptp(axis), n)
+                 for axis in AXES)
+
+
+def test_sample_matches_regular_grid_interpolator(tmp_path):
+    fields = _fields()
+    store = WeatherStore.from_arrays(str(tmp_path), *AXES, fields, chunk_size=2, dtype=np.float64)
+    points = _points(np.random.default_rng(1), 500)
+
+    values = store.sample(['u', 'v'], *points)
+
+    for name, data in fields.items():
+        expected = RegularGridInterpolator(AXES, data)(np.column_stack(points))
+        np.testing.assert_allclose(values[name], expected, rtol=1e-12, atol=1e-12)
+
+
+def test_sample_clamps_outside_the_grid(tmp_path):
+    fields = _fields()
+    store = WeatherStore.from_arrays(str(tmp_path), *AXES, fields, chunk_size=3, dtype=np.float64)
+    points = _points(np.random.default_rng(2), 200, margin=0.3)
+
+    # Ngoài lưới giữ giá trị biên, tương đương nội suy tại điểm đã kẹp vào lưới
+    clipped = np.column_stack([np.clip(p, axis[0], axis[-1]) for p, axis in zip(points, AXES)])
+    expected = RegularGridInterpolator(AXES, fields['u'])(clipped)
+    np.testing.assert_allclose(store.sample('u', *points), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_single_point_axes_and_broadcasting(tmp_path):
+    y, x = np.linspace(0, 10, 3), np.linspace(0, 20, 5)
+    data = np.add.outer(y, x)[np.newaxis, np.newaxis]
+    store = WeatherStore.from_arrays(str(tmp_path), [0.0], [0.0], y, x, {'t': data})
+
+    grid_y, grid_x = np.meshgrid(np.linspace(0, 10, 7), np.linspace(0, 20, 4), indexing='ij')
+    values = store.sample('t', 12345.0, 800.0, grid_y, grid_x)
+    assert values.shape == (7, 4)
+    np.testing.assert_allclose(values, grid_y + grid_x, rtol=1e-6)
+
+
+def test_import_formats_round_trip(tmp_path):
+    fields = _fields()
+    np.savez(tmp_path / 'source.npz', time=AXES[0], height=AXES[1], y=AXES[2], x=AXES[3], **fields)
+    from_npz = WeatherStore.from_npz(str(tmp_path / 'source.npz'), str(tmp_path / 'npz'), chunk_size=2)
+
+    grids = np.meshgrid(*AXES, indexing='ij')
+    table = pa.table({name: grid.ravel() for name, grid in zip(('time', 'height', 'y', 'x'), grids)}
+                     | {name: data.ravel() for name, data in fields.items()})
+    pq.write_table(table, tmp_path / 'source.parquet', row_group_size=50)
+    from_parquet = WeatherStore.from_parquet(str(tmp_path / 'source.parquet'), str(tmp_path / 'parquet'))
+
+    for store in (from_npz, from_parquet):
+        assert sorted(store.variables) == ['u', 'v']
+        for name, data in fields.items():
+            np.testing.assert_allclose(store[name].to_numpy(), data.astype(np.float32))
+
+
+def test_read_only_store_and_pickling(tmp_path):
+    store = WeatherStore.from_arrays(str(tmp_path), *AXES, _fields())
+
+    with pytest.raises(ValueError):
+        store.add_variable('w')
+    with pytest.raises(ValueError):
+        store['w']
+
+    restored = pickle.loads(pickle.dumps(store))
+    np.testing.assert_array_equal(restored['u'].to_numpy(), store['u'].to_numpy())
+
+
+def test_wind_field_from_weather_matches_store(tmp_path):
+    store = WeatherStore.from_arrays(str(tmp_path), *AXES, _fields())
+    wind = WindField.from_weather(store)
+    points = _points(np.random.default_rng(3), 100)
+
+    u, v, w = wind.sample(*points)
+    np.testing.assert_array_equal(u, store.sample('u', *points))
+    np.testing.assert_array_equal(v, store.sample('v', *points))
+    np.testing.assert_array_equal(w, 0.0)
+
+
+def test_axes_must_increase(tmp_path):
+    with pytest.raises(ValueError):
+        WeatherStore.create(str(tmp_path), [0.0, 0.0], [0.0], [0.0], [0.0])
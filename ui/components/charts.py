@@ -1,6 +1,7 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
+from functools import lru_cache
 from ui.theme_manager import theme_manager
 import plotly.io as pio
 
@@ -64,31 +65,32 @@ class ChartThemeManager:
         return palette['colorscale']
     
     @staticmethod
-    def apply_theme_to_figure(fig):
-        """Apply current theme to figure"""
-        palette = ChartThemeManager.get_color_palette()
-        
-        # Apply template from theme manager
-        fig.update_layout(template=theme_manager.get_template())
-        
-        # Apply colors based on theme
-        fig.update_layout(
+    @lru_cache(maxsize=None)
+    def _theme_layout(theme):
+        """Layout properties for a theme (memoized per theme, do not modify)"""
+        palette = DARK_THEME_COLORS if theme == "dark" else LIGHT_THEME_COLORS
+        return dict(
+            template=theme_manager.get_template(),
             title_font_color=palette['text']['title'],
             xaxis_title_font_color=palette['text']['axis'],
             yaxis_title_font_color=palette['text']['axis'],
             paper_bgcolor=palette['background']['paper'],
-            plot_bgcolor=palette['background']['plot']
+            plot_bgcolor=palette['background']['plot'],
+            # 3D charts
+            scene=dict(
+                xaxis_title_font_color=palette['text']['axis'],
+                yaxis_title_font_color=palette['text']['axis'],
+                zaxis_title_font_color=palette['text']['axis']
+            )
         )
+    
+    @staticmethod
+    def apply_theme_to_figure(fig):
+        """Apply current theme to figure"""
+        palette = ChartThemeManager.get_color_palette()
         
-        # Handle 3D charts
-        if hasattr(fig.layout, 'scene'):
-            fig.update_layout(
-                scene=dict(
-                    xaxis_title_font_color=palette['text']['axis'],
-                    yaxis_title_font_color=palette['text']['axis'],
-                    zaxis_title_font_color=palette['text']['axis']
-                )
-            )
+        # Apply template and theme colors in a single layout update
+        fig.update_layout(**ChartThemeManager._theme_layout(theme_manager.get_theme()))
         
         # Update trace colors
         if hasattr(fig, 'data') and fig.data:
@@ -104,6 +106,104 @@ class ChartThemeManager:
         
         return fig
 
+# Default maximum number of points sent to the browser per trace
+DEFAULT_POINT_BUDGET = 2000
+
+class ChartData:
+    """
+    Server-side preparation of chart data.
+    
+    Large series are binned, decimated or aggregated with NumPy before figures are built,
+    so the JSON payload sent to the browser stays within a fixed point budget.
+    """
+    @staticmethod
+    def histogram(values, bins=30, value_range=None):
+        """
+        Bin values server-side (NaN and infinite values are ignored)
+        
+        Returns:
+            Tuple (bin centers, counts, bin widths)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        counts, edges = np.histogram(values, bins=bins, range=value_range)
+        return (edges[:-1] + edges[1:]) / 2, counts, np.diff(edges)
+    
+    @staticmethod
+    def lttb(x_data, y_data, max_points=DEFAULT_POINT_BUDGET):
+        """
+        Decimate a line series with Largest-Triangle-Three-Buckets
+        
+        The first and last points are kept; every other bucket keeps the point forming
+        the largest triangle with the previously kept point and the mean of the next bucket,
+        which preserves peaks and the visual shape of the line.
+        
+        Returns:
+            Tuple (x, y) with at most max_points points
+        """
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        n = len(x_data)
+        if max_points < 3 or n <= max_points:
+            return x_data, y_data
+        
+        # Interior buckets [edges[i], edges[i + 1]) between the first and last point
+        edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+        selected = np.empty(max_points, dtype=int)
+        selected[0], selected[-1] = 0, n - 1
+        
+        previous = 0
+        for i in range(max_points - 2):
+            start, end = edges[i], edges[i + 1]
+            if i + 2 < len(edges):
+                next_x = x_data[end:edges[i + 2]].mean()
+                next_y = y_data[end:edges[i + 2]].mean()
+            else:
+                next_x, next_y = x_data[-1], y_data[-1]
+            
+            area = np.abs((x_data[previous] - next_x) * (y_data[start:end] - y_data[previous])
+                          - (x_data[previous] - x_data[start:end]) * (next_y - y_data[previous]))
+            previous = start + int(np.argmax(area))
+            selected[i + 1] = previous
+        
+        return x_data[selected], y_data[selected]
+    
+    @staticmethod
+    def aggregate(x_data, y_data, max_points=DEFAULT_POINT_BUDGET, statistic='mean'):
+        """
+        Aggregate a series into at most max_points consecutive buckets
+        
+        statistic: 'mean', 'min' or 'max' of each bucket (x is the bucket mean)
+        
+        Returns:
+            Tuple (x, y)
+        """
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        n = len(x_data)
+        if n <= max_points:
+            return x_data, y_data
+        
+        starts = np.linspace(0, n, max_points, endpoint=False).astype(int)
+        sizes = np.diff(np.append(starts, n))
+        x_values = np.add.reduceat(x_data, starts) / sizes
+        if statistic == 'mean':
+            y_values = np.add.reduceat(y_data, starts) / sizes
+        elif statistic == 'min':
+            y_values = np.minimum.reduceat(y_data, starts)
+        elif statistic == 'max':
+            y_values = np.maximum.reduceat(y_data, starts)
+        else:
+            raise ValueError(f"Unknown statistic: {statistic}")
+        return x_values, y_values
+    
+    @staticmethod
+    def line(x_data, y_data, max_points=DEFAULT_POINT_BUDGET):
+        """Prepare a line series for plotting (LTTB decimation above the point budget)"""
+        if max_points is None or len(x_data) <= max_points:
+            return x_data, y_data
+        return ChartData.lttb(x_data, y_data, max_points)
+
 class ChartBuilder:
     @staticmethod
     def create_base_figure(title, x_label, y_label):
@@ -118,11 +218,12 @@ class ChartBuilder:
         return fig
     
     @staticmethod
-    def line_chart(x_data, y_data, title, x_label, y_label, color='blue'):
-        """Create simple line chart"""
+    def line_chart(x_data, y_data, title, x_label, y_label, color='blue', max_points=DEFAULT_POINT_BUDGET):
+        """Create simple line chart (decimated to max_points, None disables)"""
         fig = ChartBuilder.create_base_figure(title, x_label, y_label)
         
         themed_color = ChartThemeManager.get_color_for_theme(color)
+        x_data, y_data = ChartData.line(x_data, y_data, max_points)
         
         fig.add_trace(go.Scatter(
             x=x_data,
@@ -134,17 +235,18 @@ class ChartBuilder:
         return fig
     
     @staticmethod
-    def multi_line_chart(x_data, y_data_dict, title, x_label, y_label):
-        """Create multi-line chart"""
+    def multi_line_chart(x_data, y_data_dict, title, x_label, y_label, max_points=DEFAULT_POINT_BUDGET):
+        """Create multi-line chart (each line decimated to max_points, None disables)"""
         fig = ChartBuilder.create_base_figure(title, x_label, y_label)
         
         palette = ChartThemeManager.get_color_palette()
         colors = palette['primary']
         
         for i, (name, y_data) in enumerate(y_data_dict.items()):
+            line_x, line_y = ChartData.line(x_data, y_data, max_points)
             fig.add_trace(go.Scatter(
-                x=x_data,
-                y=y_data,
+                x=line_x,
+                y=line_y,
                 mode='lines',
                 name=name,
                 line=dict(color=colors[i % len(colors)], width=2)
@@ -152,6 +254,23 @@ class ChartBuilder:
         
         return fig
     
+    @staticmethod
+    def histogram_chart(values, title, x_label, y_label, bins=30, color='blue', name=None):
+        """Create histogram chart from values binned server-side (only the bins are sent)"""
+        fig = ChartBuilder.create_base_figure(title, x_label, y_label)
+        
+        centers, counts, widths = ChartData.histogram(values, bins)
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=counts,
+            width=widths,
+            name=name,
+            marker_color=ChartThemeManager.get_color_for_theme(color)
+        ))
+        fig.update_layout(bargap=0)
+        
+        return fig
+    
     @staticmethod
     def heatmap(x_data, y_data, z_data, title, x_label, y_label):
         """Create heatmap chart"""
@@ -168,6 +287,39 @@ class ChartBuilder:
         
         return fig
     
+    @staticmethod
+    def isoline_chart(contours, title, x_label, y_label, unit=''):
+        """
+        Create iso-line chart from extracted contours
+        ({level: {'lines': [...], ...}} as returned by models.contours)
+        """
+        fig = ChartBuilder.create_base_figure(title, x_label, y_label)
+        
+        palette = ChartThemeManager.get_color_palette()
+        colors = palette['primary']
+        
+        for i, (level, contour) in enumerate(sorted(contours.items())):
+            if not contour['lines']:
+                continue
+            
+            # One trace per level, lines separated by None
+            x_values, y_values = [], []
+            for line in contour['lines']:
+                x_values.extend(line[:, 0].tolist() + [None])
+                y_values.extend(line[:, 1].tolist() + [None])
+            
+            fig.add_trace(go.Scatter(
+                x=x_values,
+                y=y_values,
+                mode='lines',
+                name=f"{level:g} {unit}".strip(),
+                line=dict(color=colors[i % len(colors)], width=2),
+                connectgaps=False
+            ))
+        
+        fig.update_yaxes(scaleanchor='x', scaleratio=1)
+        return fig
+    
     @staticmethod
     def surface_3d(x_data, y_data, z_data, title, x_label, y_label, z_label):
         """Create 3D surface chart"""
@@ -203,18 +355,28 @@ def get_color_for_theme(color_name):
     """Get appropriate color code for current theme"""
     return ChartThemeManager.get_color_for_theme(color_name)
 
-def create_line_chart(x_data, y_data, title, x_label, y_label, color='blue', theme_template=None):
+def create_line_chart(x_data, y_data, title, x_label, y_label, color='blue', theme_template=None,
+                      max_points=DEFAULT_POINT_BUDGET):
     """Create simple line chart"""
-    return ChartBuilder.line_chart(x_data, y_data, title, x_label, y_label, color)
+    return ChartBuilder.line_chart(x_data, y_data, title, x_label, y_label, color, max_points)
 
-def create_multi_line_chart(x_data, y_data_dict, title, x_label, y_label, theme_template=None):
+def create_multi_line_chart(x_data, y_data_dict, title, x_label, y_label, theme_template=None,
+                            max_points=DEFAULT_POINT_BUDGET):
     """Create multi-line chart"""
-    return ChartBuilder.multi_line_chart(x_data, y_data_dict, title, x_label, y_label)
+    return ChartBuilder.multi_line_chart(x_data, y_data_dict, title, x_label, y_label, max_points)
+
+def create_histogram_chart(values, title, x_label, y_label, bins=30, color='blue', name=None):
+    """Create histogram chart binned server-side"""
+    return ChartBuilder.histogram_chart(values, title, x_label, y_label, bins, color, name)
 
 def create_heatmap(x_data, y_data, z_data, title, x_label, y_label, theme_template=None):
     """Create heatmap chart"""
     return ChartBuilder.heatmap(x_data, y_data, z_data, title, x_label, y_label)
 
+def create_isoline_chart(contours, title, x_label, y_label, unit=''):
+    """Create iso-line chart from extracted contours"""
+    return ChartBuilder.isoline_chart(contours, title, x_label, y_label, unit)
+
 def create_3d_surface(x_data, y_data, z_data, title, x_label, y_label, z_label, theme_template=None):
     """Create 3D surface chart"""
     return ChartBuilder.surface_3d(x_data, y_data, z_data, title, x_label, y_label, z_label)
@@ -225,9 +387,6 @@ def update_figure_with_theme(fig):
 
 def plotly_chart_with_theme(fig, **kwargs):
     """Wrapper for st.plotly_chart with automatic theme update"""
-    # Ensure theme_manager has set up global theme
-    theme_manager._setup_global_theme()
-    
     # Update figure with current theme
     updated_fig = ChartThemeManager.apply_theme_to_figure(fig)
     
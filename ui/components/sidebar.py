@@ -4,6 +4,7 @@ from ui.theme_manager import theme_manager
 import plotly.io as pio
 import json
 import os
+from functools import lru_cache
 
 def render_sidebar():
     """Render sidebar with language selector and simulation categories"""
@@ -148,8 +149,13 @@ def _handle_theme_change(current_theme, selected_theme):
 
 def _apply_theme_css():
     """Apply CSS styling based on current theme"""
+    st.markdown(_build_theme_css(theme_manager.get_theme()), unsafe_allow_html=True)
+
+@lru_cache(maxsize=None)
+def _build_theme_css(theme):
+    """Build theme CSS (memoized per theme)"""
     # Get theme values
-    is_dark = theme_manager.is_dark_mode()
+    is_dark = theme == "dark"
     
     # Set theme colors
     colors = {
@@ -200,7 +206,7 @@ def _apply_theme_css():
         }}
         
         /* Theme colors */
-        html[theme="{theme_manager.get_theme()}"], body, .stApp, [data-testid="stAppViewContainer"],
+        html[theme="{theme}"], body, .stApp, [data-testid="stAppViewContainer"],
         .main, [data-testid="stVerticalBlock"], .element-container, .stMarkdown, .block-container {{
             color: var(--text-color) !important;
             background-color: var(--background-color) !important;
@@ -262,12 +268,16 @@ def _apply_theme_css():
     </style>
     """
     
-    st.markdown(css, unsafe_allow_html=True)
+    return css
 
 def _apply_theme_js():
     """Apply JavaScript for theme handling"""
-    theme = theme_manager.get_theme()
-    is_dark = theme_manager.is_dark_mode()
+    st.markdown(_build_theme_js(theme_manager.get_theme()), unsafe_allow_html=True)
+
+@lru_cache(maxsize=None)
+def _build_theme_js(theme):
+    """Build theme JavaScript (memoized per theme)"""
+    is_dark = theme == "dark"
     
     # Theme colors
     colors = {
@@ -299,4 +309,51 @@ def _apply_theme_js():
     </script>
     """
     
-    st.markdown(js, unsafe_allow_html=True)
\ No newline at end of file
+    return js
+
+def render_debug_panel():
+    """Render debug panel with model timers, counters, cache stats and the last page profile"""
+    from core import instrumentation
+    from core.cache import get_default_cache
+    
+    with st.sidebar:
+        with st.expander(f"🐞 {locale.get_text('debug.title')}", expanded=False):
+            profile = st.session_state.get("last_profile")
+            if profile is not None:
+                st.markdown(f"**{locale.get_text('debug.last_run')}**")
+                st.code(instrumentation.format_profile(profile), language=None)
+                st.download_button(
+                    locale.get_text("debug.download"),
+                    data=json.dumps(profile, indent=2),
+                    file_name=f"{profile['name'].replace(':', '-')}.json",
+                    mime="application/json",
+                    key="debug_download"
+                )
+                if profile.get("report"):
+                    st.markdown(f"**{locale.get_text('debug.cprofile_report')}**")
+                    st.code(profile["report"], language=None)
+            
+            st.checkbox(locale.get_text("debug.cprofile"), key="debug_cprofile")
+            
+            # Totals since the server process started (shared by all sessions), only when
+            # instrumentation was enabled for the whole process by NUCLEAR_SIM_PROFILE
+            if instrumentation.is_enabled():
+                st.markdown(f"**{locale.get_text('debug.process_totals')}**")
+                st.code(instrumentation.format_profile(instrumentation.get_stats()), language=None)
+            
+            cache = get_default_cache()
+            st.markdown(f"**{locale.get_text('debug.cache')}**")
+            if cache is None:
+                st.caption(locale.get_text("debug.cache_disabled"))
+            else:
+                st.json(cache.stats())
+            
+            import_times = st.session_state.get("page_import_times", {})
+            if import_times:
+                st.markdown(f"**{locale.get_text('debug.import_times')}**")
+                st.code("\n".join(f"{seconds * 1000:8.0f} ms  {module_name}"
+                                  for module_name, seconds in import_times.items()), language=None)
+            
+            # Only this session's data is cleared, the process totals belong to the operators
+            if st.button(locale.get_text("debug.reset"), key="debug_reset"):
+                st.session_state.pop("last_profile", None)
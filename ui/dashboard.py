@@ -5,18 +5,41 @@ from ui.theme_manager import theme_manager
 from ui.components.sidebar import render_sidebar
 from ui.components.header import render_header
 from ui.components.footer import render_footer
+from ui.components.sidebar import render_debug_panel
+from core import instrumentation
 import plotly.io as pio
+import importlib
+from functools import lru_cache
+import sys
+import time
 
-# Import tất cả các trang
-from ui.pages.chain_reaction import render_page as chain_reaction_page
-from ui.pages.neutron_transport import render_page as neutron_transport_page
-from ui.pages.monte_carlo import render_page as monte_carlo_page
-from ui.pages.blast_wave import render_page as blast_wave_page
-from ui.pages.thermal_radiation import render_page as thermal_radiation_page
-from ui.pages.emp_effects import render_page as emp_effects_page
-from ui.pages.fallout import render_page as fallout_page
-from ui.pages.weapon_design import render_page as weapon_design_page
-from ui.pages.flash_effects import render_page as flash_effects_page
+# Bảng trang: khóa điều hướng -> module của trang.
+# Module của trang (và các mô hình nó dùng) chỉ được nhập khi trang được chọn lần đầu.
+PAGE_MODULES = {
+    "nav.chain_reaction": "ui.pages.chain_reaction",
+    "nav.neutron_transport": "ui.pages.neutron_transport",
+    "nav.monte_carlo": "ui.pages.monte_carlo",
+    "nav.blast_wave": "ui.pages.blast_wave",
+    "nav.thermal_radiation": "ui.pages.thermal_radiation",
+    "nav.emp_effects": "ui.pages.emp_effects",
+    "nav.fallout": "ui.pages.fallout",
+    "nav.weapon_design": "ui.pages.weapon_design",
+    "nav.flash_effects": "ui.pages.flash_effects",
+}
+
+def load_page(nav_key):
+    """
+    Nhập module của trang theo khóa điều hướng và trả về hàm render_page của nó.
+    
+    Thời gian nhập lần đầu của mỗi module được ghi vào session_state["page_import_times"] (giây).
+    """
+    module_name = PAGE_MODULES[nav_key]
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        st.session_state.setdefault("page_import_times", {})[module_name] = time.perf_counter() - start
+    return module.render_page
 
 def apply_theme():
     """Áp dụng theme dựa vào ThemeManager"""
@@ -27,8 +50,16 @@ def apply_theme():
     # Cập nhật dark_mode trong session_state để tương thích ngược
     st.session_state["dark_mode"] = has_dark_mode
     
+    # CSS và script của theme được dựng một lần cho mỗi theme và ghi trong một phần tử duy nhất
+    st.markdown(_theme_html(current_theme, has_dark_mode), unsafe_allow_html=True)
+
+@lru_cache(maxsize=None)
+def _theme_html(current_theme, has_dark_mode):
+    """Dựng CSS và script của theme (được ghi nhớ theo theme, dùng chung giữa các phiên)"""
+    parts = []
+    
     # CSS chung cho cả dark và light mode
-    st.markdown("""
+    parts.append("""
     <style>
     /* Cho phép nhận diện theme với data-theme */
     :root {
@@ -50,22 +81,22 @@ def apply_theme():
         color: #333333;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
     
     # Thêm data-theme attribute vào html element
-    st.markdown(f"""
+    parts.append(f"""
     <script>
         // Đặt theme ngay lập tức để tránh nhấp nháy màn hình
         (function() {{
             document.documentElement.setAttribute('data-theme', '{current_theme}');
         }})();
     </script>
-    """, unsafe_allow_html=True)
+    """)
     
     # Kiểm tra theme có phải là dark không
     if has_dark_mode:
         # CSS cho Dark Mode - được áp dụng với mức độ ưu tiên cao nhất
-        st.markdown("""
+        parts.append("""
         <style>
         /* CSS cho Dark Mode */
         :root {
@@ -286,10 +317,10 @@ def apply_theme():
             background-color: #1E1E1E !important;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """)
     else:
         # CSS cho Light Mode (tùy chọn)
-        st.markdown("""
+        parts.append("""
         <style>
         /* CSS cho Light Mode */
         :root {
@@ -486,7 +517,9 @@ def apply_theme():
             background-color: #F0F2F6 !important;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """)
+    
+    return "\n".join(parts)
 
 def run_dashboard():
     # Lấy theme từ URL query params trước khi cấu hình trang
@@ -503,8 +536,9 @@ def run_dashboard():
     if "current_page" not in st.session_state:
         st.session_state.current_page = locale.get_text("nav.chain_reaction")
     
-    # Bật debug mode bằng query param debug=true
-    if "debug" in query_params:
+    # Bật debug mode bằng query param debug=true (hoặc biến môi trường NUCLEAR_SIM_PROFILE=1).
+    # Query param chỉ đo các lần hiển thị của phiên này (profile_run), không bật đo đạc của tiến trình.
+    if "debug" in query_params or instrumentation.is_enabled():
         st.session_state["show_debug"] = True
     
     # Tải bản dịch
@@ -550,24 +584,21 @@ def run_dashboard():
     current_page = render_sidebar()
     
     # Hiển thị trang tương ứng dựa vào current_page
-    if current_page == locale.get_text("nav.chain_reaction"):
-        chain_reaction_page()
-    elif current_page == locale.get_text("nav.neutron_transport"):
-        neutron_transport_page()
-    elif current_page == locale.get_text("nav.monte_carlo"):
-        monte_carlo_page()
-    elif current_page == locale.get_text("nav.blast_wave"):
-        blast_wave_page()
-    elif current_page == locale.get_text("nav.thermal_radiation"):
-        thermal_radiation_page()
-    elif current_page == locale.get_text("nav.emp_effects"):
-        emp_effects_page()
-    elif current_page == locale.get_text("nav.fallout"):
-        fallout_page()
-    elif current_page == locale.get_text("nav.weapon_design"):
-        weapon_design_page()
-    elif current_page == locale.get_text("nav.flash_effects"):
-        flash_effects_page()
+    for nav_key in PAGE_MODULES:
+        if current_page == locale.get_text(nav_key):
+            if st.session_state.get("show_debug", False):
+                # Ghi profile của lần hiển thị trang cho bảng debug trong sidebar
+                profiler = "cprofile" if st.session_state.get("debug_cprofile", False) else None
+                with instrumentation.profile_run(f"page:{nav_key[len('nav.'):]}", profiler=profiler) as profile:
+                    load_page(nav_key)()
+                st.session_state["last_profile"] = profile.to_dict()
+            else:
+                load_page(nav_key)()
+            break
+    
+    # Bảng debug (thời gian, bộ đếm, profile của lần hiển thị gần nhất)
+    if st.session_state.get("show_debug", False):
+        render_debug_panel()
     
     # Hiển thị footer
     render_footer()
@@ -0,0 +1,104 @@
+import argparse
+import subprocess
+import sys
+
+# Module gốc của ứng dụng và của từng trang (nhập riêng rẽ khi trang được chọn)
+DEFAULT_MODULES = [
+    "ui.dashboard",
+    "ui.pages.chain_reaction",
+    "ui.pages.neutron_transport",
+    "ui.pages.monte_carlo",
+    "ui.pages.blast_wave",
+    "ui.pages.thermal_radiation",
+    "ui.pages.emp_effects",
+    "ui.pages.fallout",
+    "ui.pages.weapon_design",
+    "ui.pages.flash_effects",
+]
+
+
+def measure_import_times(module_name, python=sys.executable):
+    """
+    Đo thời gian nhập từng module khi nhập module_name trong một tiến trình mới
+    (khởi động nguội), dựa trên tùy chọn -X importtime của CPython.
+
+    Tham số:
+        module_name: Tên module cần nhập
+        python: Trình thông dịch dùng để đo
+
+    Trả về:
+        Danh sách dictionary {'module', 'self', 'cumulative', 'depth'} (thời gian tính bằng giây)
+        theo thứ tự hoàn tất nhập
+    """
+    completed = subprocess.run([python, "-X", "importtime", "-c", f"import {module_name}"],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise ValueError(f"Không nhập được module {module_name}:\n{completed.stderr.strip()}")
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append({
+            'module': name.strip(),
+            'self': int(self_us) / 1e6,
+            'cumulative': int(cumulative_us) / 1e6,
+            'depth': (len(name) - len(name.lstrip())) // 2
+        })
+    return timings
+
+
+def import_budget_report(modules=None, budget=1.0, top=10, python=sys.executable):
+    """
+    Báo cáo thời gian nhập nguội của các module so với ngân sách thời gian.
+
+    Tham số:
+        modules: Danh sách module cần đo (None = DEFAULT_MODULES)
+        budget: Ngân sách thời gian nhập của mỗi module (giây)
+        top: Số module con tốn thời gian nhất (theo thời gian riêng) được liệt kê
+        python: Trình thông dịch dùng để đo
+
+    Trả về:
+        Danh sách dictionary {'module', 'total', 'over_budget', 'slowest'} với slowest là
+        danh sách các cặp (module con, thời gian riêng)
+    """
+    report = []
+    for module_name in modules or DEFAULT_MODULES:
+        timings = measure_import_times(module_name, python)
+        total = sum(timing['self'] for timing in timings)
+        slowest = sorted(timings, key=lambda timing: timing['self'], reverse=True)[:top]
+        report.append({
+            'module': module_name,
+            'total': total,
+            'over_budget': total > budget,
+            'slowest': [(timing['module'], timing['self']) for timing in slowest]
+        })
+    return report
+
+
+def format_report(report, budget):
+    """Định dạng báo cáo của import_budget_report thành văn bản"""
+    lines = []
+    for entry in report:
+        status = "VƯỢT NGÂN SÁCH" if entry['over_budget'] else "đạt"
+        lines.append(f"{entry['module']}: {entry['total'] * 1000:.0f} ms / {budget * 1000:.0f} ms ({status})")
+        for name, seconds in entry['slowest']:
+            lines.append(f"    {seconds * 1000:8.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Báo cáo thời gian nhập nguội của các module")
+    parser.add_argument("modules", nargs="*", help="Các module cần đo (mặc định: ứng dụng và từng trang)")
+    parser.add_argument("--budget", type=float, default=1.0, help="Ngân sách thời gian nhập (giây)")
+    parser.add_argument("--top", type=int, default=10, help="Số module con chậm nhất được liệt kê")
+    args = parser.parse_args(argv)
+
+    report = import_budget_report(args.modules or None, args.budget, args.top)
+    print(format_report(report, args.budget))
+    return 1 if any(entry['over_budget'] for entry in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
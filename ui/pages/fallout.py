@@ -1,3 +1,4 @@
+import base64
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
@@ -6,8 +7,13 @@ from ui.translator import translator as locale
 from ui.theme_manager import theme_manager
 from ui.components.header import render_header
 from models.fallout import FalloutModel
+from models.geo import MAX_MOSAIC_TILES, TileRenderer, fit_zoom, tiles_covering
+from models.contours import extract_contours
 from ui.conclusions import get_conclusions
-from ui.components.charts import plotly_chart_with_theme
+from ui.components.charts import create_isoline_chart, plotly_chart_with_theme
+
+# Các mức tốc độ liều (rad/h) hiển thị dạng đường đồng mức
+FALLOUT_DOSE_LEVELS = [0.1, 1, 10, 100, 1000, 10000, 100000]
 
 def render_page():
     """Hiển thị trang mô phỏng mưa phóng xạ"""
@@ -124,25 +130,13 @@ def render_page():
             if burst_height > 200:
                 Z *= 0.1 * np.exp(-burst_height / 1000)
             
-            # Tạo biểu đồ mưa phóng xạ
-            fig = go.Figure(data=go.Contour(
-                z=Z,
-                x=x,
-                y=y,
-                colorscale='Viridis',
-                contours=dict(
-                    showlabels=True,
-                    labelfont=dict(size=12, color='white'),
-                ),
-                colorbar=dict(
-                    title=dict(
-                        text=locale.get_text("fallout.dose_rate_unit"),
-                        side='right'
-                    ),
-                    tickmode='auto',
-                    tickfont=dict(size=12),
-                )
-            ))
+            # Chỉ trích các đường đồng mức tại các mức liều cố định thay vì gửi toàn bộ lưới
+            levels = [level for level in FALLOUT_DOSE_LEVELS if level <= Z.max()]
+            contours = extract_contours(x, y, Z, levels, simplify_tolerance=0.5 * (x[1] - x[0]),
+                                        log_scale=True)
+            fig = create_isoline_chart(contours, locale.get_text("fallout.pattern_title", time=time_hours),
+                                       locale.get_text("fallout.x_axis"), locale.get_text("fallout.y_axis"),
+                                       unit="rad/h")
             
             # Thêm điểm tâm vụ nổ
             fig.add_trace(go.Scatter(
@@ -192,6 +186,13 @@ def render_page():
             
             plotly_chart_with_theme(fig, use_container_width=True)
             
+            # Diện tích và tầm xa của vùng vượt từng mức liều
+            st.table({
+                locale.get_text("fallout.contour_level"): [f"{level:g}" for level in contours],
+                locale.get_text("fallout.contour_area"): [f"{c['area']:.1f}" for c in contours.values()],
+                locale.get_text("fallout.contour_range"): [f"{c['max_range']:.1f}" for c in contours.values()]
+            })
+            
             # Hiển thị thông tin bổ sung
             with st.expander(locale.get_text("fallout.info_title")):
                 st.markdown(f"""
@@ -203,6 +204,128 @@ def render_page():
                 {locale.get_text("fallout.info_dose")}
                 """)
     
+    # Bản đồ địa lý: chỉ các ô hiển thị được tính, ở độ phân giải của mức zoom đã chọn
+    if st.checkbox(locale.get_text("fallout.map_view")):
+        render_fallout_map(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction, time_hours)
+    
+    # Hoạt ảnh theo thời gian: các khung được phát dần từ generator của mô hình
+    if st.checkbox(locale.get_text("fallout.animate")):
+        render_fallout_animation(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction)
+    
     # Phần kết luận khoa học
     with st.expander(locale.get_text("conclusions.title"), expanded=True):
-        st.markdown(get_conclusions("fallout", locale.current_lang)) 
\ No newline at end of file
+        st.markdown(get_conclusions("fallout", locale.current_lang))
+
+def get_tile_renderer(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction, time_hours,
+                      latitude, longitude):
+    """
+    Lấy TileRenderer của bộ tham số hiện tại, giữ lại giữa các lần chạy lại trang.
+    Các ô nằm trong bộ nhớ đệm dùng chung của tiến trình (theo bộ tham số), không theo phiên.
+    """
+    key = (yield_kt, burst_height, fission_fraction, wind_speed, wind_direction, time_hours, latitude, longitude)
+    cached = st.session_state.get("fallout_tile_renderer")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    model = FalloutModel(yield_kt, fission_fraction, burst_height)
+    # Hướng gió trên trang tính theo độ từ hướng Bắc theo chiều kim đồng hồ
+    direction = np.radians(90 - wind_direction)
+    renderer = TileRenderer(model.field_function(time_hours, wind_speed, direction), latitude, longitude,
+                            field_key=('fallout',) + key)
+    st.session_state["fallout_tile_renderer"] = (key, renderer)
+    return renderer
+
+def render_fallout_map(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction, time_hours):
+    """Hiển thị tốc độ liều mưa phóng xạ trên bản đồ địa lý từ các ô tính theo yêu cầu"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        latitude = st.number_input(locale.get_text("fallout.latitude"), min_value=-80.0, max_value=80.0,
+                                   value=21.03, step=0.01, format="%.4f")
+        longitude = st.number_input(locale.get_text("fallout.longitude"), min_value=-180.0, max_value=180.0,
+                                    value=105.85, step=0.01, format="%.4f")
+    
+    with col2:
+        zoom = st.slider(locale.get_text("fallout.zoom"), min_value=5, max_value=12, value=8)
+        extent = st.slider(locale.get_text("fallout.map_extent"), min_value=10, max_value=500, value=100, step=10)
+    
+    renderer = get_tile_renderer(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction,
+                                 time_hours, latitude, longitude)
+    
+    # Hộp bao kinh độ/vĩ độ của vùng hiển thị
+    corners_x = np.array([-extent, extent, extent, -extent, 0, 0])
+    corners_y = np.array([-extent, -extent, extent, extent, -extent, extent])
+    lat, lon = renderer.projection.inverse(corners_x, corners_y)
+    bounds = (lon.min(), lat.min(), lon.max(), lat.max())
+    
+    # Giảm mức zoom khi vùng hiển thị cần quá nhiều ô (ảnh ghép được nhúng trực tiếp vào trang)
+    tile_zoom = fit_zoom(*bounds, zoom)
+    if tile_zoom < zoom:
+        st.info(locale.get_text("fallout.map_zoom_reduced", zoom=zoom, tile_zoom=tile_zoom,
+                                max_tiles=MAX_MOSAIC_TILES))
+    values, (west, south, east, north) = renderer.mosaic(*bounds, tile_zoom)
+    
+    vmax = max(float(values.max()), 1e-30)
+    png = TileRenderer.to_png(values, vmax * 1e-6, vmax)
+    image = "data:image/png;base64," + base64.b64encode(png).decode()
+    
+    # plotly >= 5.24 dùng MapLibre (Scattermap), các phiên bản cũ hơn dùng Scattermapbox
+    scatter_map = getattr(go, "Scattermap", None)
+    map_key = "map" if scatter_map is not None else "mapbox"
+    scatter_map = scatter_map or go.Scattermapbox
+    
+    fig = go.Figure(scatter_map(
+        lat=[latitude],
+        lon=[longitude],
+        mode='markers',
+        marker=dict(size=10, color='red'),
+        name=locale.get_text("chart.detonation_center")
+    ))
+    fig.update_layout(**{
+        map_key: dict(
+            style="carto-positron",
+            center=dict(lat=latitude, lon=longitude),
+            zoom=zoom - 1,
+            layers=[dict(
+                sourcetype="image",
+                source=image,
+                coordinates=[[west, north], [east, north], [east, south], [west, south]]
+            )]
+        ),
+        'title': locale.get_text("fallout.map_title", time=time_hours),
+        'height': 700,
+        'margin': dict(t=60, b=20, l=20, r=20)
+    })
+    
+    plotly_chart_with_theme(fig, use_container_width=True)
+    
+    info = renderer.cache_info()
+    st.caption(locale.get_text("fallout.map_tiles", zoom=tile_zoom, tiles=len(tiles_covering(*bounds, tile_zoom)),
+                               computed=info['misses'], hits=info['hits'])) 
+
+def render_fallout_animation(yield_kt, burst_height, fission_fraction, wind_speed, wind_direction):
+    """Phát hoạt ảnh tốc độ liều mưa phóng xạ từ 1 đến 720 giờ sau vụ nổ"""
+    num_frames = st.slider(locale.get_text("fallout.animation_frames"), min_value=30, max_value=300,
+                           value=120, step=10)
+    
+    if not st.button(locale.get_text("fallout.animate_button")):
+        return
+    
+    model = FalloutModel(yield_kt, fission_fraction, burst_height)
+    # Hướng gió trên trang tính theo độ từ hướng Bắc theo chiều kim đồng hồ
+    direction = np.radians(90 - wind_direction)
+    
+    frames = model.animate_fallout_pattern(max_distance=100, resolution=200, wind_speed=wind_speed,
+                                           wind_direction=direction, times=np.geomspace(1, 720, num_frames))
+    
+    placeholder = st.empty()
+    progress = st.progress(0.0)
+    for frame in frames:
+        # Thang màu cố định theo giá trị lớn nhất của cả chuỗi (có ngay từ khung đầu tiên) để
+        # thấy rõ sự lan rộng và suy giảm; khung đầu có thể bằng 0 khi mưa phóng xạ chưa tới
+        vmax = max(frame['peak'], 1e-30)
+        # Hàng đầu tiên của lưới ở phía Nam, ảnh cần hàng đầu tiên ở phía Bắc
+        rgba = TileRenderer.to_rgba(frame['dose_rate'][::-1], vmax * 1e-6, vmax)
+        placeholder.image(rgba, caption=locale.get_text("fallout.animation_caption", time=frame['time']),
+                          use_container_width=True)
+        progress.progress((frame['index'] + 1) / num_frames)
@@ -173,10 +173,13 @@ def render_page():
             # Hiển thị biểu đồ
             plotly_chart_with_theme(fig2, use_container_width=True)
             
-            # Tính khoảng cách tối đa cho mỗi loại tác động
-            max_flash_blindness = model.get_max_effect_distance("temporary_blindness", 0.5)
-            max_retinal_burn = model.get_max_effect_distance("retinal_burn", 0.5)
-            max_permanent_damage = model.get_max_effect_distance("permanent_damage", 0.5)
+            # Tính khoảng cách tối đa cho mỗi loại tác động (một lần giải cho tất cả)
+            max_distances = model.get_max_effect_distances(
+                ["temporary_blindness", "retinal_burn", "permanent_damage"], 0.5
+            )
+            max_flash_blindness = float(max_distances["temporary_blindness"])
+            max_retinal_burn = float(max_distances["retinal_burn"])
+            max_permanent_damage = float(max_distances["permanent_damage"])
             
             # Hiển thị thông tin bổ sung
             with st.expander(locale.get_text("flash.info_title")):
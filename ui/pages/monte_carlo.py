@@ -2,13 +2,14 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
-import time
+import uuid
 from models.monte_carlo import MonteCarloNeutronTransport as MonteCarloModel
+from core.jobs import CANCELLED, DONE, FAILED, FINISHED_STATES, RUNNING, get_job_manager
 from ui.translator import translator as locale
 from ui.theme_manager import theme_manager
 from ui.components.header import render_header
 from ui.conclusions import get_conclusions
-from ui.components.charts import plotly_chart_with_theme
+from ui.components.charts import create_histogram_chart, plotly_chart_with_theme
 
 def render_page():
     """Hiển thị trang mô phỏng Monte Carlo cho neutron"""
@@ -116,40 +117,99 @@ def render_page():
     
     # Run simulation button
     if st.button(locale.get_text("monte.button"), key="run_monte_carlo"):
-        with st.spinner(locale.get_text("common.calculating")):
-            # Record start time
-            start_time = time.time()
-            
-            # Create and run model
-            model = MonteCarloModel(
-                radius=radius,
-                fission_xs=sigma_f,
-                scattering_xs=sigma_s,
-                absorption_xs=sigma_a,
-                fission_neutrons=nu_bar,
-                energy_groups=num_groups,
-                max_generations=max_gen,
-                initial_distribution=spatial_distribution.lower()
-            )
-            
-            # Run simulation
-            results = model.simulate_neutrons(
+        # Create model and submit the simulation as a background job
+        model = MonteCarloModel(
+            radius=radius,
+            fission_xs=sigma_f,
+            scattering_xs=sigma_s,
+            absorption_xs=sigma_a,
+            fission_neutrons=nu_bar,
+            energy_groups=num_groups,
+            max_generations=max_gen,
+            initial_distribution=spatial_distribution.lower()
+        )
+        
+        try:
+            job_id = get_job_manager().submit(
+                model.simulate_neutrons,
+                owner=_session_owner(),
+                description="monte_carlo",
                 num_neutrons=num_neutrons,
-                show_progress=show_progress,
+                show_progress=False,
                 fission_chain=simulate_chain,
                 use_parallel=use_multiprocessing
             )
-            
-            # Calculate timing
-            execution_time = time.time() - start_time
-            
-            # Display results
-            _display_results(results, execution_time, model)
+            st.session_state["monte_carlo_job"] = (job_id, model)
+        except ValueError:
+            st.warning(locale.get_text("monte.job_limit"))
+    
+    # Show progress and results of the current job
+    if "monte_carlo_job" in st.session_state:
+        job_id, model = st.session_state["monte_carlo_job"]
+        _render_job(job_id, model, show_progress)
     
     # Conclusions section
     with st.expander(locale.get_text("conclusions.title"), expanded=True):
         st.markdown(get_conclusions("monte_carlo", locale.current_lang))
 
+def _session_owner():
+    """Identifier of the current browser session, used to limit concurrent jobs per user"""
+    if "session_owner" not in st.session_state:
+        st.session_state["session_owner"] = uuid.uuid4().hex
+    return st.session_state["session_owner"]
+
+def _render_job(job_id, model, show_progress):
+    """Poll a background simulation job, stream its progress and display its results"""
+    manager = get_job_manager()
+    try:
+        status = manager.status(job_id)
+    except ValueError:
+        # Job was cleaned up by the manager
+        del st.session_state["monte_carlo_job"]
+        return
+    
+    if status['status'] not in FINISHED_STATES:
+        if st.button(locale.get_text("monte.cancel"), key="cancel_monte_carlo"):
+            manager.cancel(job_id)
+        
+        progress_bar = st.progress(0.0)
+        progress_text = st.empty()
+        progress_text.caption(locale.get_text("monte.job_queued"))
+        
+        # Stream progress events until the job finishes (a rerun simply resumes polling).
+        # The page is updated on every poll, even without new events or with progress hidden,
+        # because a click on Cancel only interrupts this loop at the next Streamlit call.
+        caption = None
+        for _, event in manager.stream(job_id, heartbeat=True):
+            if event is not None and show_progress:
+                eta = event['eta']
+                fraction = event['elapsed'] / (event['elapsed'] + eta) if eta is not None else 0.0
+                progress_bar.progress(min(fraction, 1.0))
+                caption = locale.get_text(
+                    "monte.job_progress",
+                    generation=event['generation'],
+                    done=event['generation_done'],
+                    size=event['generation_size'],
+                    total=event['histories_done'],
+                    k="–" if event['k'] is None else f"{event['k']:.3f}",
+                    eta="–" if eta is None else f"{eta:.1f}"
+                )
+            elif caption is None or not show_progress:
+                running = manager.status(job_id)['status'] == RUNNING
+                caption = locale.get_text("monte.job_running" if running else "monte.job_queued")
+            progress_text.caption(caption)
+        
+        progress_bar.empty()
+        progress_text.empty()
+        status = manager.status(job_id)
+    
+    if status['status'] == DONE:
+        _display_results(manager.result(job_id), status['finished'] - status['started'], model)
+    elif status['status'] == CANCELLED:
+        st.warning(locale.get_text("monte.job_cancelled"))
+    elif status['status'] == FAILED:
+        st.error(locale.get_text("monte.job_failed", error=status['error']))
+
 def _display_results(results, execution_time, model):
     """Display Monte Carlo simulation results with interactive charts."""
     # Execution time
@@ -219,20 +279,14 @@ def _display_results(results, execution_time, model):
         
         plotly_chart_with_theme(fig_pie, use_container_width=True)
         
-        # Neutron path length histogram if available
+        # Neutron path length histogram if available (binned server-side)
         if 'path_lengths' in results and len(results['path_lengths']) > 0:
-            fig_path = go.Figure()
-            
-            fig_path.add_trace(go.Histogram(
-                x=results['path_lengths'],
-                nbinsx=30,
-                marker_color='blue'
-            ))
-            
-            fig_path.update_layout(
+            fig_path = create_histogram_chart(
+                results['path_lengths'],
                 title=locale.get_text("chart.path_length_distribution"),
-                xaxis_title=locale.get_text("chart.path_length"),
-                yaxis_title=locale.get_text("chart.frequency")
+                x_label=locale.get_text("chart.path_length"),
+                y_label=locale.get_text("chart.frequency"),
+                color='blue'
             )
             
             plotly_chart_with_theme(fig_path, use_container_width=True)
@@ -247,15 +301,15 @@ def _display_results(results, execution_time, model):
             else:
                 radial_positions = results['final_positions']  # Already distances
             
-            fig_pos = go.Figure()
-            
-            # Histogram of final positions
-            fig_pos.add_trace(go.Histogram(
-                x=radial_positions,
-                nbinsx=30,
-                marker_color='green',
+            # Histogram of final positions (binned server-side)
+            fig_pos = create_histogram_chart(
+                radial_positions,
+                title=locale.get_text("chart.final_position"),
+                x_label=locale.get_text("chart.radial_position"),
+                y_label=locale.get_text("chart.frequency"),
+                color='green',
                 name=locale.get_text("chart.final_position")
-            ))
+            )
             
             # Add vertical line for system boundary
             fig_pos.add_vline(
@@ -266,12 +320,6 @@ def _display_results(results, execution_time, model):
                 annotation_position="top right"
             )
             
-            fig_pos.update_layout(
-                title=locale.get_text("chart.final_position"),
-                xaxis_title=locale.get_text("chart.radial_position"),
-                yaxis_title=locale.get_text("chart.frequency")
-            )
-            
             plotly_chart_with_theme(fig_pos, use_container_width=True)
         
         # Generation populations if available
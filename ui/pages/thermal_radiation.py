@@ -57,13 +57,13 @@ def render_page():
             
             # Tính toán các hiệu ứng nhiệt ở các khoảng cách khác nhau
             distances = np.linspace(0.1, max_distance, 100)  # km
-            thermal_effects = model.calculate_thermal_effects(distances)
+            thermal_effects = model.calculate_thermal_effects(distances * 1000)  # mô hình dùng mét
             
             # Tạo biểu đồ mật độ năng lượng nhiệt
             fig1 = go.Figure()
             
             fig1.add_trace(go.Scatter(
-                x=thermal_effects['distances'],
+                x=distances,
                 y=thermal_effects['energy_density'],
                 mode='lines',
                 name='Mật độ năng lượng nhiệt',
@@ -87,7 +87,7 @@ def render_page():
             fig2 = go.Figure()
             
             fig2.add_trace(go.Scatter(
-                x=thermal_effects['distances'],
+                x=distances,
                 y=thermal_effects['first_degree_burn_probability'],
                 mode='lines',
                 name=locale.get_text("thermal.first_degree"),
@@ -95,7 +95,7 @@ def render_page():
             ))
             
             fig2.add_trace(go.Scatter(
-                x=thermal_effects['distances'],
+                x=distances,
                 y=thermal_effects['second_degree_burn_probability'],
                 mode='lines',
                 name=locale.get_text("thermal.second_degree"),
@@ -103,7 +103,7 @@ def render_page():
             ))
             
             fig2.add_trace(go.Scatter(
-                x=thermal_effects['distances'],
+                x=distances,
                 y=thermal_effects['third_degree_burn_probability'],
                 mode='lines',
                 name=locale.get_text("thermal.third_degree"),
@@ -121,6 +121,23 @@ def render_page():
             
             # Hiển thị biểu đồ
             plotly_chart_with_theme(fig2, use_container_width=True)
+            
+            # Tính bán kính thiệt hại cho mọi loại ảnh hưởng trong một lần giải
+            damage_radii = model.get_damage_radii(probability_thresholds=0.5)
+            effect_labels = {
+                'first_degree': locale.get_text("thermal.first_degree"),
+                'second_degree': locale.get_text("thermal.second_degree"),
+                'third_degree': locale.get_text("thermal.third_degree"),
+                'paper_ignition': locale.get_text("thermal.paper_ignition"),
+                'grass_ignition': locale.get_text("thermal.grass_ignition"),
+                'wood_ignition': locale.get_text("thermal.wood_ignition")
+            }
+            
+            with st.expander(locale.get_text("thermal.radii_title")):
+                st.markdown("\n".join(
+                    f"- {effect_labels[effect]}: {float(radius) / 1000:.2f} km"
+                    for effect, radius in damage_radii.items()
+                ))
     
     # Phần kết luận khoa học
     with st.expander(locale.get_text("conclusions.title"), expanded=True):
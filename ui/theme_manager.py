@@ -1,4 +1,7 @@
 class ThemeManager:
+    # Template Plotly dựng sẵn theo tên, dùng chung cho mọi phiên trong tiến trình
+    _templates = {}
+    
     def __init__(self):
         self.current_theme = "light"
         self.themes = {
@@ -29,16 +32,20 @@ class ThemeManager:
         """Check if current theme is dark mode"""
         return self.current_theme == "dark"
     
-    def _setup_global_theme(self):
-        """Thiết lập theme Plotly toàn cục"""
-        import plotly.io as pio
+    def template_name(self, theme_code=None):
+        """Tên template Plotly đã đăng ký của theme"""
+        return f"custom_app_template_{theme_code or self.current_theme}"
+    
+    @staticmethod
+    def _build_template(dark):
+        """Dựng template Plotly cho theme sáng hoặc tối"""
         import plotly.graph_objects as go
         
         # Tạo template hoàn toàn mới
         template = go.layout.Template()
         
         # Tùy chỉnh màu sắc dựa trên theme hiện tại
-        if self.is_dark_mode():
+        if dark:
             # Dark mode colors
             custom_colors = ['#8dd3c7', '#fdb462', '#bebada', '#fb8072', '#80b1d3', '#b3de69']
             template.layout.update(
@@ -90,21 +97,31 @@ class ThemeManager:
             transition_duration=0  # Tắt hiệu ứng chuyển đổi để ngăn theme hệ thống
         )
         
-        # Đăng ký template với tên duy nhất cho ứng dụng
-        template_name = 'custom_app_template'
-        pio.templates[template_name] = template
+        return template
+    
+    def _setup_global_theme(self):
+        """
+        Thiết lập theme Plotly toàn cục.
+        
+        Template của mỗi theme chỉ được dựng và đăng ký vào pio.templates một lần cho cả
+        tiến trình; các lần gọi sau chỉ đổi template mặc định khi theme thay đổi.
+        """
+        import plotly.io as pio
+        
+        template_name = self.template_name()
+        if template_name not in ThemeManager._templates:
+            pio.templates[template_name] = self._build_template(self.is_dark_mode())
+            ThemeManager._templates[template_name] = pio.templates[template_name]
         
         # Đặt template này làm mặc định và vô hiệu hóa template khác
-        pio.templates.default = template_name
+        if pio.templates.default != template_name:
+            pio.templates.default = template_name
     
     def get_template(self):
-        """Get plotly template based on current theme"""
+        """Get plotly template based on current theme (prebuilt, shared - do not modify)"""
         # Đảm bảo template toàn cục đã được cài đặt
         self._setup_global_theme()
-        
-        import plotly.io as pio
-        # Trả về template mặc định hiện tại
-        return pio.templates[pio.templates.default]
+        return ThemeManager._templates[self.template_name()]
     
     def get_display_name(self, theme_code=None):
         """Get display name for theme"""
@@ -32,6 +32,16 @@ translations = {
         "theme.system": "Use system theme",
         "theme.settings": "Theme Settings",
         "theme.selector": "Select Theme",
+        "debug.title": "Debug & profiling",
+        "debug.last_run": "Last page render",
+        "debug.download": "Download profile (JSON)",
+        "debug.cprofile": "Run cProfile on the next render",
+        "debug.cprofile_report": "cProfile report",
+        "debug.process_totals": "Process totals",
+        "debug.cache": "Result cache",
+        "debug.cache_disabled": "The result cache is disabled (NUCLEAR_SIM_CACHE=0).",
+        "debug.import_times": "Page import times",
+        "debug.reset": "Clear last profile",
         "theme.apply_changes": "Click 'Apply New Theme' button above to apply the changes.",
         "theme.use_system": "The application will use your system theme.",
         
@@ -74,6 +84,13 @@ translations = {
         "monte.simulate_fission_chain": "Simulate Fission Chain",
         "monte.execution_time": "Execution Time: {time:.2f} seconds",
         "monte.k_effective": "Effective Multiplication Factor (k-eff): {value:.4f} ± {error:.4f}",
+        "monte.cancel": "Cancel Simulation",
+        "monte.job_queued": "Simulation queued...",
+        "monte.job_running": "Simulation running...",
+        "monte.job_progress": "Generation {generation}: {done}/{size} histories ({total} in total), k ≈ {k}, ETA {eta} s",
+        "monte.job_cancelled": "The simulation was cancelled.",
+        "monte.job_failed": "The simulation failed: {error}",
+        "monte.job_limit": "A simulation is already running in this session. Wait for it to finish or cancel it.",
         
         # Blast wave page
         "blast.header": "Sedov-Taylor Blast Wave Solution",
@@ -121,6 +138,10 @@ translations = {
         "thermal.second_degree": "2nd Degree Burns",
         "thermal.third_degree": "3rd Degree Burns",
         "thermal.button": "Simulate Thermal Radiation Effects",
+        "thermal.radii_title": "Damage Radii (50% probability)",
+        "thermal.paper_ignition": "Dry Paper Ignition",
+        "thermal.grass_ignition": "Dry Grass Ignition",
+        "thermal.wood_ignition": "Wood Ignition",
         
         # EMP effects page
         "nav.emp_effects": "EMP Effects",
@@ -174,6 +195,21 @@ translations = {
         "fallout.info_air": "- Air bursts (>2000m) produce very little fallout",
         "fallout.info_wind": "- Wind significantly affects fallout distribution",
         "fallout.info_dose": "- Dose rates above 100 rad/h are extremely dangerous, requiring immediate evacuation",
+        "fallout.contour_level": "Dose rate level (rad/h)",
+        "fallout.contour_area": "Area above level (km²)",
+        "fallout.contour_range": "Maximum range (km)",
+        "fallout.map_view": "Show on geographic map",
+        "fallout.latitude": "Ground Zero Latitude (°)",
+        "fallout.longitude": "Ground Zero Longitude (°)",
+        "fallout.zoom": "Map zoom level",
+        "fallout.map_extent": "Map extent from Ground Zero (km)",
+        "fallout.map_title": "Fallout dose rate map after {time} hours",
+        "fallout.map_zoom_reduced": "The map extent needs too many tiles at zoom {zoom}; rendering at zoom {tile_zoom} (at most {max_tiles} tiles).",
+        "fallout.map_tiles": "Tiles at zoom {zoom}: {tiles} visible, {computed} computed in total, {hits} served from cache",
+        "fallout.animate": "Show time-series animation",
+        "fallout.animation_frames": "Number of animation frames",
+        "fallout.animate_button": "Play animation",
+        "fallout.animation_caption": "Dose rate {time:.1f} hours after detonation",
         
         # Weapon design page
         "nav.weapon_design": "Weapon Design Analysis",
@@ -359,6 +395,16 @@ translations = {
         "theme.system": "Sử dụng giao diện hệ thống",
         "theme.settings": "Cài Đặt Giao Diện",
         "theme.selector": "Chọn Giao Diện",
+        "debug.title": "Gỡ lỗi & đo hiệu năng",
+        "debug.last_run": "Lần hiển thị trang gần nhất",
+        "debug.download": "Tải profile (JSON)",
+        "debug.cprofile": "Chạy cProfile ở lần hiển thị sau",
+        "debug.cprofile_report": "Báo cáo cProfile",
+        "debug.process_totals": "Tổng của tiến trình",
+        "debug.cache": "Bộ nhớ đệm kết quả",
+        "debug.cache_disabled": "Bộ nhớ đệm kết quả đang tắt (NUCLEAR_SIM_CACHE=0).",
+        "debug.import_times": "Thời gian nhập trang",
+        "debug.reset": "Xóa profile gần nhất",
         "theme.apply_changes": "Nhấp vào nút 'Áp dụng giao diện mới' ở trên để thực hiện thay đổi.",
         "theme.use_system": "Ứng dụng sẽ sử dụng giao diện của hệ thống.",
         
@@ -401,6 +447,13 @@ translations = {
         "monte.simulate_fission_chain": "Mô phỏng chuỗi phân hạch",
         "monte.execution_time": "Thời gian thực thi: {time:.2f} giây",
         "monte.k_effective": "Hệ số nhân hiệu dụng (k-eff): {value:.4f} ± {error:.4f}",
+        "monte.cancel": "Hủy Mô Phỏng",
+        "monte.job_queued": "Mô phỏng đang chờ...",
+        "monte.job_running": "Mô phỏng đang chạy...",
+        "monte.job_progress": "Thế hệ {generation}: {done}/{size} lịch sử ({total} tổng cộng), k ≈ {k}, còn khoảng {eta} giây",
+        "monte.job_cancelled": "Mô phỏng đã bị hủy.",
+        "monte.job_failed": "Mô phỏng thất bại: {error}",
+        "monte.job_limit": "Phiên này đang có một mô phỏng chạy. Hãy chờ nó kết thúc hoặc hủy nó.",
         
         # Blast wave page
         "blast.header": "Mô Hình Sóng Xung Kích Sedov-Taylor",
@@ -448,6 +501,10 @@ translations = {
         "thermal.second_degree": "Bỏng Độ 2",
         "thermal.third_degree": "Bỏng Độ 3",
         "thermal.button": "Mô phỏng hiệu ứng bức xạ nhiệt",
+        "thermal.radii_title": "Bán Kính Thiệt Hại (xác suất 50%)",
+        "thermal.paper_ignition": "Cháy Giấy Khô",
+        "thermal.grass_ignition": "Cháy Cỏ Khô",
+        "thermal.wood_ignition": "Cháy Gỗ",
         
         # EMP effects page
         "nav.emp_effects": "Hiệu Ứng Xung Điện Từ",
@@ -501,6 +558,21 @@ translations = {
         "fallout.info_air": "- Vụ nổ trên không (>2.000 m) tạo ra phóng xạ rơi rất ít",
         "fallout.info_wind": "- Gió ảnh hưởng đáng kể đến sự phân bố phóng xạ rơi",
         "fallout.info_dose": "- Liều lượng trên 100 rad/h cực kỳ nguy hiểm, cần sơ tán ngay lập tức",
+        "fallout.contour_level": "Mức liều (rad/h)",
+        "fallout.contour_area": "Diện tích vượt mức (km²)",
+        "fallout.contour_range": "Tầm xa nhất (km)",
+        "fallout.map_view": "Hiển thị trên bản đồ địa lý",
+        "fallout.latitude": "Vĩ Độ Tâm Nổ (°)",
+        "fallout.longitude": "Kinh Độ Tâm Nổ (°)",
+        "fallout.zoom": "Mức phóng to bản đồ",
+        "fallout.map_extent": "Phạm vi bản đồ từ tâm nổ (km)",
+        "fallout.map_title": "Bản đồ tốc độ liều phóng xạ rơi sau {time} giờ",
+        "fallout.map_zoom_reduced": "Vùng hiển thị cần quá nhiều ô ở mức {zoom}; bản đồ được tính ở mức {tile_zoom} (tối đa {max_tiles} ô).",
+        "fallout.map_tiles": "Ô bản đồ ở mức {zoom}: {tiles} ô hiển thị, tổng cộng {computed} ô đã tính, {hits} lần lấy từ bộ nhớ đệm",
+        "fallout.animate": "Hiển thị hoạt ảnh theo thời gian",
+        "fallout.animation_frames": "Số khung hình của hoạt ảnh",
+        "fallout.animate_button": "Phát hoạt ảnh",
+        "fallout.animation_caption": "Tốc độ liều {time:.1f} giờ sau vụ nổ",
         
         # Weapon design page
         "nav.weapon_design": "Phân Tích Thiết Kế Vũ Khí",